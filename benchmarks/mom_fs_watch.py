@@ -0,0 +1,79 @@
+"""
+EventsWatcher file watching benchmark
+
+Builds a directory tree with many files, watches it with EventsWatcher in
+polling mode and in inotify mode, and reports:
+- CPU time used by the process while the tree is idle
+- latency from modifying one file to the callback firing
+
+Usage:
+    python benchmarks/mom_fs_watch.py [--files 100000] [--idle 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from koda.mom.events import EventsWatcher
+
+
+def build_tree(root: str, files: int, per_dir: int = 1000) -> str:
+    for i in range(files):
+        directory = os.path.join(root, f"d{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i}.txt"), "w") as f:
+            f.write("x")
+    return os.path.join(root, "d0000", "f0.txt")
+
+
+async def run(root: str, target: str, native: bool, idle: float):
+    watcher = EventsWatcher(use_native_fs_events=native)
+    changed = asyncio.Event()
+
+    def on_change(path, event_type):
+        if path == target:
+            changed.set()
+
+    setup_started = time.perf_counter()
+    watcher.watch_directory(root, on_change)
+    setup = time.perf_counter() - setup_started
+
+    await watcher.start()
+    mode = "inotify" if any(w.get("native") for w in watcher._file_watchers.values()) else "polling"
+
+    cpu_started = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu = time.process_time() - cpu_started
+
+    modified_at = time.perf_counter()
+    with open(target, "a") as f:
+        f.write("y")
+    await asyncio.wait_for(changed.wait(), timeout=120)
+    latency = time.perf_counter() - modified_at
+
+    await watcher.stop()
+    print(
+        f"{mode:8s} setup={setup:6.2f}s  idle cpu={idle_cpu:6.2f}s over {idle:.0f}s "
+        f"({idle_cpu / idle * 100:5.1f}% of a core)  change latency={latency * 1000:7.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--idle", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        started = time.perf_counter()
+        target = build_tree(root, args.files)
+        print(f"built {args.files} files in {time.perf_counter() - started:.1f}s")
+
+        await run(root, target, native=False, idle=args.idle)
+        await run(root, target, native=True, idle=args.idle)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
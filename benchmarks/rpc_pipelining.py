@@ -0,0 +1,94 @@
+"""
+RPC pipelining load test
+
+Drives one RPCServer connection with mixed traffic: a steady stream of
+cheap ``status`` calls interleaved with slow ``prompt`` calls, and reports
+p50/p99 latency of the cheap calls. Run once with ``max_in_flight=1``
+(equivalent to strictly sequential dispatch) and once pipelined.
+
+Usage:
+    python benchmarks/rpc_pipelining.py [--requests 500] [--slow-every 10]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from koda.coding.modes.rpc import RPCClient, RPCClientConfig, RPCServer
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(max_in_flight: int, requests: int, slow_every: int, slow_seconds: float):
+    server = RPCServer(max_in_flight=max_in_flight)
+
+    async def prompt(text: str = ""):
+        await asyncio.sleep(slow_seconds)
+        return {"text": text}
+
+    server.register_method("prompt", prompt)
+    server.register_method("status", lambda: {"status": "running"})
+
+    server._running = True
+    tcp = await asyncio.start_server(server._handle_client, "127.0.0.1", 0)
+    port = tcp.sockets[0].getsockname()[1]
+
+    client = RPCClient(RPCClientConfig(host="127.0.0.1", port=port, timeout=120.0))
+    await client.connect()
+
+    latencies = []
+
+    async def timed_status():
+        started = time.perf_counter()
+        await client.call("status")
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    calls = []
+    for i in range(requests):
+        if slow_every and i % slow_every == 0:
+            calls.append(asyncio.create_task(client.call("prompt", {"text": str(i)})))
+        else:
+            calls.append(asyncio.create_task(timed_status()))
+        # Spread submissions slightly, like an interactive client
+        await asyncio.sleep(0)
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - started
+
+    client.disconnect()
+    # Give the server a moment to observe EOF and close its side
+    await asyncio.sleep(0.1)
+    server.stop()
+    tcp.close()
+    await tcp.wait_closed()
+
+    return {
+        "max_in_flight": max_in_flight,
+        "elapsed": elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--slow-every", type=int, default=10)
+    parser.add_argument("--slow-seconds", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for window in (1, 32):
+        result = await run(window, args.requests, args.slow_every, args.slow_seconds)
+        print(
+            f"max_in_flight={result['max_in_flight']:>3}  "
+            f"total={result['elapsed']:.2f}s  "
+            f"status p50={result['p50_ms']:.1f}ms  p99={result['p99_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Tool argument validation microbenchmark
+
+Measures per-call cost of validating typical tool arguments through each
+validator front-end, with compiled schemas served from the cache versus
+recompiled on every call (the cost of interpreting the schema each time).
+
+Usage:
+    python benchmarks/schema_validation.py [--calls 20000]
+"""
+import argparse
+import time
+
+from koda.ai.json_schema import JSONSchemaValidator
+from koda.ai.schema_compiler import clear_schema_cache
+from koda.ai.typebox_helpers import Validator
+from koda.ai.validation import validate_with_coercion
+
+TOOLS = {
+    "read": (
+        {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string", "minLength": 1},
+                "offset": {"type": "integer", "minimum": 1},
+                "limit": {"type": "integer", "minimum": 1},
+            },
+            "required": ["path"],
+        },
+        {"path": "src/main.py", "offset": "10", "limit": 200},
+    ),
+    "bash": (
+        {
+            "type": "object",
+            "properties": {
+                "command": {"type": "string"},
+                "timeout": {"type": "number", "exclusiveMinimum": 0},
+            },
+            "required": ["command"],
+        },
+        {"command": "pytest -q tests/", "timeout": "120"},
+    ),
+    "edit": (
+        {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string"},
+                "edits": {
+                    "type": "array",
+                    "minItems": 1,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "old_text": {"type": "string"},
+                            "new_text": {"type": "string"},
+                            "replace_all": {"type": "boolean"},
+                        },
+                        "required": ["old_text", "new_text"],
+                    },
+                },
+            },
+            "required": ["path", "edits"],
+        },
+        {
+            "path": "a.py",
+            "edits": [
+                {"old_text": "foo", "new_text": "bar", "replace_all": "true"},
+                {"old_text": "x = 1", "new_text": "x = 2"},
+            ],
+        },
+    ),
+}
+
+FRONT_ENDS = {
+    "validate_with_coercion": lambda schema, args: validate_with_coercion(args, schema),
+    "typebox.Validator": lambda schema, args: Validator(schema).validate(args),
+    "JSONSchemaValidator": lambda schema, args: JSONSchemaValidator().validate(args, schema),
+}
+
+
+def per_call_us(func, schema, args, calls: int, recompile: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        if recompile:
+            clear_schema_cache()
+        func(schema, args)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'front-end':24s} {'tool':6s} {'recompiled':>12s} {'cached':>10s} {'speedup':>8s}")
+    for front_end, func in FRONT_ENDS.items():
+        for tool, (schema, tool_args) in TOOLS.items():
+            uncached = per_call_us(func, schema, tool_args, args.calls // 10, recompile=True)
+            cached = per_call_us(func, schema, tool_args, args.calls, recompile=False)
+            print(
+                f"{front_end:24s} {tool:6s} {uncached:10.1f}us {cached:8.1f}us "
+                f"{uncached / cached:7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,8 @@ def get_llm_config_from_settings(settings: Optional[EvoSkillConfig] = None) -> L
         max_tokens=settings.max_tokens,
         thinking_level=settings.thinking_level,
         headers=settings.headers,
+        response_cache_path=str(settings.llm_cache_path) if settings.llm_cache_path else None,
+        response_cache_ttl=settings.llm_cache_ttl,
     )
 
 
@@ -152,156 +154,160 @@ async def _chat_async(workspace: Optional[Path], skills_dir: Optional[Path]):
         title="[bold blue]欢迎使用 EvoSkill[/bold blue]",
     ))
     
-    # 主循环
-    while True:
-        try:
-            user_input = console.input("[bold blue]You[/bold blue]: ").strip()
+    try:
+        # 主循环
+        while True:
+            try:
+                user_input = console.input("[bold blue]You[/bold blue]: ").strip()
             
-            if not user_input:
-                continue
+                if not user_input:
+                    continue
             
-            # 处理命令
-            if user_input.startswith("/"):
-                cmd = user_input[1:].lower()
+                # 处理命令
+                if user_input.startswith("/"):
+                    cmd = user_input[1:].lower()
                 
-                if cmd == "exit" or cmd == "quit":
-                    console.print("[dim]再见！[/dim]")
-                    break
+                    if cmd == "exit" or cmd == "quit":
+                        console.print("[dim]再见！[/dim]")
+                        break
                 
-                elif cmd == "help":
-                    _show_help()
-                    continue
+                    elif cmd == "help":
+                        _show_help()
+                        continue
                 
-                elif cmd == "skills":
-                    _show_skills(skill_loader)
-                    continue
+                    elif cmd == "skills":
+                        _show_skills(skill_loader)
+                        continue
                 
-                elif cmd == "clear":
-                    session.clear_history()
-                    console.print("[dim]对话历史已清空[/dim]")
-                    continue
+                    elif cmd == "clear":
+                        session.clear_history()
+                        console.print("[dim]对话历史已清空[/dim]")
+                        continue
                 
-                elif cmd.startswith("create "):
-                    skill_name = cmd[7:].strip()
-                    if skill_name:
-                        # 实时获取最新的 skills 列表，避免重复创建
-                        current_skills_info = [
-                            {
-                                "name": skill.name,
-                                "description": skill.description,
-                                "tools": [{"name": t.name, "description": t.description} for t in skill.tools],
-                            }
-                            for skill in skill_loader.load_all_skills()
-                        ]
-                        await _create_skill(evolution, skill_name, current_skills_info)
-                        # 创建成功后重新加载 skills
-                        skill_loader.load_all_skills()
-                    continue
+                    elif cmd.startswith("create "):
+                        skill_name = cmd[7:].strip()
+                        if skill_name:
+                            # 实时获取最新的 skills 列表，避免重复创建
+                            current_skills_info = [
+                                {
+                                    "name": skill.name,
+                                    "description": skill.description,
+                                    "tools": [{"name": t.name, "description": t.description} for t in skill.tools],
+                                }
+                                for skill in skill_loader.load_all_skills()
+                            ]
+                            await _create_skill(evolution, skill_name, current_skills_info)
+                            # 创建成功后重新加载 skills
+                            skill_loader.load_all_skills()
+                        continue
                 
-                else:
-                    console.print(f"[red]未知命令: /{cmd}[/red]")
-                    continue
+                    else:
+                        console.print(f"[red]未知命令: /{cmd}[/red]")
+                        continue
             
-            # 检查是否需要进化（使用正确格式的 skills 信息）
-            current_skills_info = [
-                {
-                    "name": skill.name,
-                    "description": skill.description,
-                    "tools": [{"name": t.name, "description": t.description} for t in skill.tools],
-                }
-                for skill in skill_loader.load_all_skills()
-            ]
+                # 检查是否需要进化（使用正确格式的 skills 信息）
+                current_skills_info = [
+                    {
+                        "name": skill.name,
+                        "description": skill.description,
+                        "tools": [{"name": t.name, "description": t.description} for t in skill.tools],
+                    }
+                    for skill in skill_loader.load_all_skills()
+                ]
             
-            if await evolution.should_evolve(user_input, current_skills_info):
-                console.print("[yellow]检测到新需求，正在创建 Skill...[/yellow]")
+                if await evolution.should_evolve(user_input, current_skills_info):
+                    console.print("[yellow]检测到新需求，正在创建 Skill...[/yellow]")
                 
-                async for event in evolution.evolve(
-                    user_input,
-                    existing_skills=current_skills_info
-                ):
-                    if event.type == EventType.SKILL_CREATED:
-                        data = event.data
-                        if data.get("step") == "deploy" and data.get("status") == "completed":
-                            console.print(f"[green][OK] Skill '{data['skill_name']}' 已创建！[/green]")
-                            # 重新加载 Skills
-                            loaded_skills = skill_loader.load_all_skills()
-                            for skill in loaded_skills:
-                                if skill.name == data['skill_name']:
-                                    session.register_skill(skill)
-                        elif data.get("step") == "error":
-                            console.print(f"[red][ERROR] {data.get('message')}[/red]")
+                    async for event in evolution.evolve(
+                        user_input,
+                        existing_skills=current_skills_info
+                    ):
+                        if event.type == EventType.SKILL_CREATED:
+                            data = event.data
+                            if data.get("step") == "deploy" and data.get("status") == "completed":
+                                console.print(f"[green][OK] Skill '{data['skill_name']}' 已创建！[/green]")
+                                # 重新加载 Skills
+                                loaded_skills = skill_loader.load_all_skills()
+                                for skill in loaded_skills:
+                                    if skill.name == data['skill_name']:
+                                        session.register_skill(skill)
+                            elif data.get("step") == "error":
+                                console.print(f"[red][ERROR] {data.get('message')}[/red]")
             
-            # 处理用户输入
-            console.print(f"[bold green]EvoSkill[/bold green]: ", end="")
+                # 处理用户输入
+                console.print(f"[bold green]EvoSkill[/bold green]: ", end="")
             
-            async for event in session.prompt(user_input):
-                if event.type == EventType.TEXT_DELTA:
-                    console.print(event.data.get("content", ""), end="")
-                elif event.type == EventType.TOOL_EXECUTION_START:
-                    tool_name = event.data.get("tool_name", "")
-                    console.print(f"\n[dim]▶ 使用工具: {tool_name}[/dim]")
-                elif event.type == EventType.TOOL_EXECUTION_END:
-                    from evoskill.core.types import ToolResult
-                    result_obj = event.data.get("result")
+                async for event in session.prompt(user_input):
+                    if event.type == EventType.TEXT_DELTA:
+                        console.print(event.data.get("content", ""), end="")
+                    elif event.type == EventType.TOOL_EXECUTION_START:
+                        tool_name = event.data.get("tool_name", "")
+                        console.print(f"\n[dim]▶ 使用工具: {tool_name}[/dim]")
+                    elif event.type == EventType.TOOL_EXECUTION_END:
+                        from evoskill.core.types import ToolResult
+                        result_obj = event.data.get("result")
                     
-                    if event.data.get("is_error"):
-                        console.print(f"[red][ERROR] 工具执行失败[/red]")
-                        if result_obj:
-                            if isinstance(result_obj, ToolResult):
-                                console.print(f"[red]  错误: {result_obj.content}[/red]")
-                            else:
-                                console.print(f"[red]  错误详情: {result_obj}[/red]")
-                    else:
-                        console.print(f"[dim][DONE] 工具执行完成[/dim]")
+                        if event.data.get("is_error"):
+                            console.print(f"[red][ERROR] 工具执行失败[/red]")
+                            if result_obj:
+                                if isinstance(result_obj, ToolResult):
+                                    console.print(f"[red]  错误: {result_obj.content}[/red]")
+                                else:
+                                    console.print(f"[red]  错误详情: {result_obj}[/red]")
+                        else:
+                            console.print(f"[dim][DONE] 工具执行完成[/dim]")
                         
-                        # 解析并显示工具返回的结果
-                        if isinstance(result_obj, ToolResult):
-                            try:
-                                import json
-                                content = result_obj.content
-                                # 尝试解析 JSON
-                                if isinstance(content, str):
-                                    data = json.loads(content)
-                                    if isinstance(data, dict):
-                                        if data.get("success"):
-                                            result_data = data.get("result", "无数据")
-                                            console.print(f"\n[green]结果:[/green] {result_data}")
+                            # 解析并显示工具返回的结果
+                            if isinstance(result_obj, ToolResult):
+                                try:
+                                    import json
+                                    content = result_obj.content
+                                    # 尝试解析 JSON
+                                    if isinstance(content, str):
+                                        data = json.loads(content)
+                                        if isinstance(data, dict):
+                                            if data.get("success"):
+                                                result_data = data.get("result", "无数据")
+                                                console.print(f"\n[green]结果:[/green] {result_data}")
+                                            else:
+                                                error = data.get("error", "未知错误")
+                                                console.print(f"\n[yellow]警告:[/yellow] {error}")
                                         else:
-                                            error = data.get("error", "未知错误")
-                                            console.print(f"\n[yellow]警告:[/yellow] {error}")
+                                            console.print(f"\n[dim]返回:[/dim] {content}")
                                     else:
                                         console.print(f"\n[dim]返回:[/dim] {content}")
-                                else:
-                                    console.print(f"\n[dim]返回:[/dim] {content}")
-                            except json.JSONDecodeError:
-                                # 非 JSON 结果直接显示
-                                console.print(f"\n[dim]返回:[/dim] {result_obj.content}")
-                            except Exception as e:
-                                console.print(f"\n[dim]返回:[/dim] {result_obj.content}")
-                elif event.type == EventType.CONTEXT_WARNING:
-                    # 上下文警告（75% 阈值）
-                    message = event.data.get("message", "")
-                    if message:
-                        console.print(f"\n[yellow][!] {message}[/yellow]")
-                elif event.type == EventType.CONTEXT_COMPACTED:
-                    # 上下文已压缩（80% 阈值）
-                    original = event.data.get("original_tokens", 0)
-                    new = event.data.get("new_tokens", 0)
-                    saved = event.data.get("saved_ratio", 0) * 100
-                    count = event.data.get("compacted_count", 0)
-                    console.print(
-                        f"\n[dim][↻] 上下文已压缩: "
-                        f"{original}→{new} tokens (-{saved:.1f}%), "
-                        f"合并 {count} 条消息[/dim]"
-                    )
+                                except json.JSONDecodeError:
+                                    # 非 JSON 结果直接显示
+                                    console.print(f"\n[dim]返回:[/dim] {result_obj.content}")
+                                except Exception as e:
+                                    console.print(f"\n[dim]返回:[/dim] {result_obj.content}")
+                    elif event.type == EventType.CONTEXT_WARNING:
+                        # 上下文警告（75% 阈值）
+                        message = event.data.get("message", "")
+                        if message:
+                            console.print(f"\n[yellow][!] {message}[/yellow]")
+                    elif event.type == EventType.CONTEXT_COMPACTED:
+                        # 上下文已压缩（80% 阈值）
+                        original = event.data.get("original_tokens", 0)
+                        new = event.data.get("new_tokens", 0)
+                        saved = event.data.get("saved_ratio", 0) * 100
+                        count = event.data.get("compacted_count", 0)
+                        console.print(
+                            f"\n[dim][↻] 上下文已压缩: "
+                            f"{original}→{new} tokens (-{saved:.1f}%), "
+                            f"合并 {count} 条消息[/dim]"
+                        )
             
-            console.print()  # 换行
+                console.print()  # 换行
         
-        except KeyboardInterrupt:
-            console.print("\n[dim]再见！[/dim]")
-            break
-        except Exception as e:
-            console.print(f"[red]错误: {e}[/red]")
+            except KeyboardInterrupt:
+                console.print("\n[dim]再见！[/dim]")
+                break
+            except Exception as e:
+                console.print(f"[red]错误: {e}[/red]")
+    finally:
+        # 关闭 pytest worker 池等后台进程
+        await evolution.close()
 
 
 def _show_help():
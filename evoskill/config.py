@@ -86,6 +86,16 @@ class EvoSkillConfig(BaseSettings):
         description="自定义 HTTP 请求头"
     )
     
+    # LLM 响应缓存（仅缓存 temperature=0 的请求）
+    llm_cache_path: Optional[Path] = Field(
+        default=None,
+        description="LLM 响应缓存数据库路径（不设置则不缓存）"
+    )
+    llm_cache_ttl: Optional[float] = Field(
+        default=None,
+        description="LLM 响应缓存过期时间（秒）"
+    )
+    
     # 路径配置
     workspace: Path = Field(
         default=Path.cwd(),
@@ -144,6 +154,8 @@ class EvoSkillConfig(BaseSettings):
             "max_tokens": self.max_tokens,
             "thinking_level": self.thinking_level,
             "headers": self.headers,
+            "llm_cache_path": str(self.llm_cache_path) if self.llm_cache_path else None,
+            "llm_cache_ttl": self.llm_cache_ttl,
             "workspace": str(self.workspace),
             "skills_dir": str(self.skills_dir) if self.skills_dir else None,
             "sessions_dir": str(self.sessions_dir) if self.sessions_dir else None,
@@ -309,6 +321,12 @@ temperature: 0.7
 #   - high   : 深度思考
 # thinking_level: medium
 
+# llm_cache_path: LLM 响应缓存 (SQLite)
+#   只缓存 temperature 为 0 的请求，相同请求直接回放
+#   不设置则不缓存
+# llm_cache_path: ~/.evoskill/llm_cache.db
+# llm_cache_ttl: 86400
+
 # ============================================
 # 路径配置 (可选)
 # ============================================
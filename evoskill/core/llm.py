@@ -392,15 +392,23 @@ def create_llm_provider(config: LLMConfig) -> LLMProvider:
         config: LLM 配置
         
     Returns:
-        LLMProvider 实例
+        LLMProvider 实例（配置了 response_cache_path 时包装响应缓存）
     """
     if config.provider == "openai":
-        return OpenAIProvider(config)
+        provider: LLMProvider = OpenAIProvider(config)
     elif config.provider == "anthropic":
-        return AnthropicProvider(config)
+        provider = AnthropicProvider(config)
     elif config.provider == "kimi-coding":
         # Kimi For Coding 使用 OpenAI 格式，但需要特殊 User-Agent
-        return OpenAIProvider(config)
+        provider = OpenAIProvider(config)
     else:
         # 默认使用 OpenAI 格式（兼容大多数 API）
-        return OpenAIProvider(config)
+        provider = OpenAIProvider(config)
+    
+    if config.response_cache_path:
+        from evoskill.core.llm_cache import CachedLLMProvider, LLMResponseCache
+        
+        cache = LLMResponseCache(config.response_cache_path, ttl=config.response_cache_ttl)
+        provider = CachedLLMProvider(provider, cache)
+    
+    return provider
@@ -0,0 +1,232 @@
+"""
+LLM 响应缓存
+
+可选的缓存层，包装任意 LLMProvider：
+- 请求指纹（模型、参数、消息、工具定义）→ 完整事件序列
+- SQLite 存储，支持 TTL 过期和按总大小的 LRU 淘汰
+- 命中时按原顺序回放事件，流式与非流式调用均可回放
+
+默认只缓存 temperature == 0 的确定性请求。
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from evoskill.core.llm import LLMProvider
+from evoskill.core.types import Message, ToolDefinition
+
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class LLMResponseCache:
+    """
+    SQLite 响应缓存
+
+    Args:
+        path: 数据库文件路径（":memory:" 表示仅内存）
+        ttl: 过期时间（秒），None 表示不过期
+        max_bytes: 缓存总大小上限，超出时淘汰最久未使用的条目
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = ":memory:",
+        ttl: Optional[float] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = str(path) if str(path) == ":memory:" else str(Path(path).expanduser())
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                events TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """读取缓存的事件序列，未命中或已过期返回 None"""
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT events, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            events, created_at = row
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(events)
+
+    def put(self, key: str, events: List[Dict[str, Any]]) -> None:
+        """写入事件序列，并按大小上限淘汰"""
+        data = json.dumps(events, ensure_ascii=False, default=str)
+        size = len(data.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, events, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """删除过期条目，并按 LRU 淘汰到大小上限以内（调用方持有锁）"""
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLMProvider(LLMProvider):
+    """
+    带响应缓存的 LLMProvider 包装
+
+    Args:
+        provider: 被包装的 Provider
+        cache: 响应缓存
+        max_temperature: 只缓存 temperature 不超过该值的请求
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        cache: LLMResponseCache,
+        max_temperature: float = 0.0,
+    ):
+        super().__init__(provider.config)
+        self.provider = provider
+        self.cache = cache
+        self.max_temperature = max_temperature
+
+    def fingerprint(
+        self,
+        messages: List[Message],
+        tools: Optional[List[ToolDefinition]],
+        stream: bool,
+        kwargs: Dict[str, Any],
+    ) -> str:
+        """计算请求指纹（不包含 API 密钥和请求头）"""
+        config = self.config
+        payload = {
+            "provider": type(self.provider).__name__,
+            "base_url": config.base_url,
+            "model": config.model,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+            "thinking_level": config.thinking_level,
+            "messages": self._messages_to_provider_format(messages),
+            "tools": [tool.to_dict() for tool in tools] if tools else None,
+            "stream": stream,
+            "kwargs": kwargs,
+        }
+        data = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _cacheable(self, kwargs: Dict[str, Any]) -> bool:
+        temperature = kwargs.get("temperature", self.config.temperature)
+        return temperature is not None and temperature <= self.max_temperature
+
+    async def chat(
+        self,
+        messages: List[Message],
+        tools: Optional[List[ToolDefinition]] = None,
+        stream: bool = True,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """对话（命中缓存时回放，否则调用原 Provider 并记录）"""
+        if not self._cacheable(kwargs):
+            async for event in self.provider.chat(messages, tools=tools, stream=stream, **kwargs):
+                yield event
+            return
+
+        key = self.fingerprint(messages, tools, stream, kwargs)
+
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            for event in cached:
+                yield event
+            return
+
+        events: List[Dict[str, Any]] = []
+        async for event in self.provider.chat(messages, tools=tools, stream=stream, **kwargs):
+            events.append(event)
+            yield event
+
+        # 出错的响应不缓存；调用方提前中断时不会执行到这里
+        if not any(event.get("type") == "error" for event in events):
+            await asyncio.to_thread(self.cache.put, key, events)
@@ -352,6 +352,8 @@ class LLMConfig:
     max_tokens: Optional[int] = None
     thinking_level: Optional[str] = None  # "low", "medium", "high"
     headers: Optional[Dict[str, str]] = None  # 自定义 HTTP 头（如 User-Agent）
+    response_cache_path: Optional[str] = None  # LLM 响应缓存数据库路径（None 表示不缓存）
+    response_cache_ttl: Optional[float] = None  # 缓存过期时间（秒）
 
 
 # ============== 流式响应 ==============
@@ -11,6 +11,7 @@ from evoskill.evolution.designer import SkillDesigner, SkillDesign
 from evoskill.evolution.generator import SkillGenerator
 from evoskill.evolution.validator import SkillValidator, ValidationResult
 from evoskill.evolution.integrator import SkillIntegrator
+from evoskill.evolution.pipeline import StageCache, ConcurrencyLimitedLLM
 
 __all__ = [
     "SkillEvolutionEngine",
@@ -25,4 +26,6 @@ __all__ = [
     "SkillValidator",
     "ValidationResult",
     "SkillIntegrator",
+    "StageCache",
+    "ConcurrencyLimitedLLM",
 ]
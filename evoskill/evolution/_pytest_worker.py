@@ -0,0 +1,116 @@
+"""
+pytest 常驻 worker 进程
+
+由 runner_pool.PytestWorkerPool 以脚本方式启动（不导入 evoskill 包）。
+启动时预先导入 pytest，之后在 stdin/stdout 上按行收发 JSON：
+
+    请求: {"test_file": "...", "cwd": "..."}
+    响应: {"exit_code": 0, "output": "...", "duration": 0.1, "cases": [...]}
+
+每次运行后移除本次导入的非安装模块（Skill 代码、测试模块）并恢复 sys.path / cwd，
+避免不同 Skill 的同名模块互相污染；pytest 插件等已安装模块保持常驻。
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+
+class _CaseCollector:
+    """收集每个测试用例的结果和耗时（setup + call + teardown）"""
+
+    def __init__(self):
+        self.cases = {}
+
+    def pytest_runtest_logreport(self, report):
+        case = self.cases.setdefault(
+            report.nodeid,
+            {"nodeid": report.nodeid, "outcome": "passed", "duration": 0.0},
+        )
+        case["duration"] += report.duration
+
+        if report.failed:
+            case["outcome"] = "failed" if report.when == "call" else "error"
+        elif report.skipped:
+            case["outcome"] = "skipped"
+
+
+def _is_installed_module(module):
+    """模块是否来自 Python 安装目录（标准库 / site-packages）"""
+    file = getattr(module, "__file__", None)
+    if not file:
+        return False
+    file = os.path.abspath(file)
+    return any(file.startswith(prefix) for prefix in _INSTALL_PREFIXES)
+
+
+_INSTALL_PREFIXES = tuple(
+    os.path.abspath(p) + os.sep for p in {sys.prefix, sys.base_prefix, sys.exec_prefix}
+)
+
+
+def _run(pytest, request):
+    collector = _CaseCollector()
+    buffer = io.StringIO()
+    started = time.perf_counter()
+
+    os.chdir(request["cwd"])
+    with contextlib.redirect_stdout(buffer), contextlib.redirect_stderr(buffer):
+        try:
+            exit_code = int(pytest.main(
+                [request["test_file"], "-v", "--tb=short", "-p", "no:cacheprovider"],
+                plugins=[collector],
+            ))
+        except BaseException as e:  # pytest.main 通常不会抛出，防御 SystemExit 等
+            print(f"pytest 运行失败: {e!r}")
+            exit_code = -1
+
+    return {
+        "exit_code": exit_code,
+        "output": buffer.getvalue(),
+        "duration": time.perf_counter() - started,
+        "cases": list(collector.cases.values()),
+    }
+
+
+def main():
+    # 协议使用原 stdout 的副本，fd 1 重定向到 devnull，防止测试输出破坏协议
+    proto = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+    def send(message):
+        proto.write(json.dumps(message, ensure_ascii=False) + "\n")
+        proto.flush()
+
+    import pytest
+
+    base_modules = set(sys.modules)
+    base_path = list(sys.path)
+    base_cwd = os.getcwd()
+
+    send({"ready": True})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            response = _run(pytest, json.loads(line))
+        except Exception as e:
+            response = {"exit_code": -1, "output": f"worker 错误: {e!r}", "duration": 0.0, "cases": []}
+        finally:
+            for name in set(sys.modules) - base_modules:
+                if not _is_installed_module(sys.modules[name]):
+                    del sys.modules[name]
+            sys.path[:] = base_path
+            os.chdir(base_cwd)
+
+        send(response)
+
+
+if __name__ == "__main__":
+    main()
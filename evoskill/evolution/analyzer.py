@@ -3,10 +3,16 @@
 """
 import json
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from evoskill.core.llm import LLMProvider
 from evoskill.core.types import UserMessage
+from evoskill.evolution.pipeline import (
+    StageCache,
+    make_cache_key,
+    normalize_request,
+    skills_fingerprint,
+)
 
 
 @dataclass
@@ -24,11 +30,13 @@ class NeedAnalyzer:
     """
     需求分析器
     
-    分析用户的自然语言请求，提取结构化需求信息
+    分析用户的自然语言请求，提取结构化需求信息。
+    传入 cache 时，结果按 (规范化请求, 现有 Skills 指纹) 缓存。
     """
     
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(self, llm_provider: LLMProvider, cache: Optional[StageCache] = None):
         self.llm = llm_provider
+        self.cache = cache
     
     async def analyze(
         self,
@@ -45,6 +53,30 @@ class NeedAnalyzer:
         Returns:
             NeedAnalysis 分析结果
         """
+        if self.cache is None:
+            analysis, _ = await self._analyze(user_request, existing_skills)
+            return analysis
+        
+        key = make_cache_key(
+            "analyze",
+            normalize_request(user_request),
+            skills_fingerprint(existing_skills),
+        )
+        return await self.cache.get_or_create(
+            key, lambda: self._analyze(user_request, existing_skills)
+        )
+    
+    async def _analyze(
+        self,
+        user_request: str,
+        existing_skills: List[Dict[str, Any]],
+    ) -> Tuple[NeedAnalysis, bool]:
+        """
+        调用 LLM 分析需求
+        
+        Returns:
+            (分析结果, 是否可缓存)；LLM 失败时的默认结果不可缓存
+        """
         # 构建 prompt
         existing_skills_text = "\n".join([
             f"- {s.get('name', 'unknown')}: {s.get('description', 'No description')}"
@@ -84,7 +116,8 @@ class NeedAnalyzer:
             messages = [UserMessage(content=prompt)]
             
             response_text = ""
-            async for event in self.llm.chat(messages=messages, stream=False):
+            # temperature=0：结果确定，可由 LLM 响应缓存复用
+            async for event in self.llm.chat(messages=messages, stream=False, temperature=0):
                 if event.get("type") == "text_delta":
                     response_text += event.get("content", "")
             
@@ -108,7 +141,7 @@ class NeedAnalyzer:
                 complexity=result.get("complexity", "medium"),
                 can_use_existing=result.get("can_use_existing", False),
                 suggested_skill_name=result.get("suggested_skill_name"),
-            )
+            ), True
             
         except json.JSONDecodeError as e:
             # JSON 解析失败，使用默认值
@@ -119,7 +152,7 @@ class NeedAnalyzer:
                 complexity="medium",
                 can_use_existing=False,
                 suggested_skill_name=None,
-            )
+            ), False
         except Exception as e:
             # 其他错误，使用默认值
             return NeedAnalysis(
@@ -129,4 +162,4 @@ class NeedAnalyzer:
                 complexity="medium",
                 can_use_existing=False,
                 suggested_skill_name=None,
-            )
+            ), False
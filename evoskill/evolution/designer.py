@@ -3,11 +3,12 @@ Skill 设计器 - 设计 Skill 结构和工具接口
 """
 import json
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 from evoskill.core.llm import LLMProvider
 from evoskill.core.types import UserMessage
 from evoskill.evolution.analyzer import NeedAnalysis
+from evoskill.evolution.pipeline import StageCache, make_cache_key
 
 
 @dataclass
@@ -46,11 +47,13 @@ class SkillDesigner:
     """
     Skill 设计器
     
-    根据需求分析结果，设计 Skill 的完整结构
+    根据需求分析结果，设计 Skill 的完整结构。
+    传入 cache 时，结果按 (需求分析, 现有 Skill 名称) 缓存。
     """
     
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(self, llm_provider: LLMProvider, cache: Optional[StageCache] = None):
         self.llm = llm_provider
+        self.cache = cache
     
     async def design(
         self,
@@ -67,6 +70,27 @@ class SkillDesigner:
         Returns:
             SkillDesign 设计结果
         """
+        if self.cache is None:
+            design, _ = await self._design(need, existing_skills)
+            return design
+        
+        existing_names = sorted(s.get("name", "") for s in existing_skills)
+        key = make_cache_key("design", need, existing_names)
+        return await self.cache.get_or_create(
+            key, lambda: self._design(need, existing_skills)
+        )
+    
+    async def _design(
+        self,
+        need: NeedAnalysis,
+        existing_skills: List[Dict[str, Any]],
+    ) -> Tuple[SkillDesign, bool]:
+        """
+        调用 LLM 设计 Skill
+        
+        Returns:
+            (设计结果, 是否可缓存)；LLM 失败时的默认设计不可缓存
+        """
         # 构建设计 prompt
         existing_names = [s.get("name", "") for s in existing_skills]
         
@@ -140,7 +164,8 @@ class SkillDesigner:
             messages = [UserMessage(content=prompt)]
             
             response_text = ""
-            async for event in self.llm.chat(messages=messages, stream=False):
+            # temperature=0：结果确定，可由 LLM 响应缓存复用
+            async for event in self.llm.chat(messages=messages, stream=False, temperature=0):
                 if event.get("type") == "text_delta":
                     response_text += event.get("content", "")
             
@@ -176,11 +201,11 @@ class SkillDesigner:
                 tools=tools,
                 dependencies=result.get("dependencies", []),
                 examples=result.get("examples", []),
-            )
+            ), True
             
         except Exception as e:
             # 失败时返回默认设计
-            return self._default_design(need)
+            return self._default_design(need), False
     
     def _extract_json(self, text: str) -> str:
         """从文本中提取 JSON"""
@@ -4,10 +4,11 @@ Skill 进化引擎 - 核心协调器
 协调整个 Skill 进化流程：
 分析 → 匹配 → 决策 → 设计 → 生成 → 验证 → 集成
 """
+import asyncio
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Any, Optional, AsyncIterator
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 
 from evoskill.core.llm import LLMProvider
 from evoskill.core.session import AgentSession
@@ -19,6 +20,7 @@ from evoskill.evolution.designer import SkillDesigner, SkillDesign
 from evoskill.evolution.generator import SkillGenerator
 from evoskill.evolution.validator import SkillValidator, ValidationResult
 from evoskill.evolution.integrator import SkillIntegrator
+from evoskill.evolution.pipeline import ConcurrencyLimitedLLM, StageCache
 
 
 @dataclass
@@ -39,21 +41,28 @@ class SkillEvolutionEngine:
     Skill 进化引擎
     
     核心协调器，管理整个 Skill 进化流程
+    
+    所有子组件共享一个限流的 LLM Provider（最多 llm_concurrency 个并发调用），
+    需求分析和 Skill 设计的结果在 stage_cache 中缓存。
     """
     
     def __init__(
         self,
         llm_provider: LLMProvider,
         skills_dir: Path,
+        llm_concurrency: int = 4,
+        cache_size: int = 128,
     ):
-        self.llm = llm_provider
+        self.llm = ConcurrencyLimitedLLM(llm_provider, llm_concurrency)
         self.skills_dir = skills_dir
+        self.stage_cache = StageCache(max_size=cache_size)
+        self._skill_locks: Dict[str, asyncio.Lock] = {}
         
         # 子组件
-        self.analyzer = NeedAnalyzer(llm_provider)
+        self.analyzer = NeedAnalyzer(self.llm, cache=self.stage_cache)
         self.matcher = SkillMatcher()
-        self.designer = SkillDesigner(llm_provider)
-        self.generator = SkillGenerator(llm_provider)
+        self.designer = SkillDesigner(self.llm, cache=self.stage_cache)
+        self.generator = SkillGenerator(self.llm)
         self.validator = SkillValidator()
         self.integrator = SkillIntegrator(skills_dir)
     
@@ -175,127 +184,219 @@ class SkillEvolutionEngine:
             }
         )
         
-        # 步骤 4: 生成代码
-        yield Event(
-            type=EventType.SKILL_CREATED,
-            data={
-                "status": "generating",
-                "message": f"正在生成 {design.name} 代码...",
-            }
+        # 步骤 4-6 按 Skill 名称串行，避免并发请求写入同一目录。
+        # 加锁部分在独立任务中运行、事件经队列转发，锁不会跨 yield 持有：
+        # 消费者中途放弃迭代时，锁在该任务结束后即释放
+        queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+        task = asyncio.create_task(
+            self._build_skill(design, need, match, session, queue.put_nowait)
         )
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def _build_skill(
+        self,
+        design: SkillDesign,
+        need: NeedAnalysis,
+        match: Optional[MatchResult],
+        session: Optional[AgentSession],
+        emit: Callable[[Optional[Event]], None],
+    ) -> None:
+        """
+        生成、验证并集成 Skill（持有 Skill 名称锁）
         
-        generated_files = await self.generator.generate(design, self.skills_dir)
+        进度事件通过 emit 发出，结束时发出 None
+        """
+        async with self._skill_lock(design.name):
+            try:
+                # 步骤 4: 生成代码
+                emit(Event(
+                    type=EventType.SKILL_CREATED,
+                    data={
+                        "status": "generating",
+                        "message": f"正在生成 {design.name} 代码...",
+                    }
+                ))
         
-        skill_path = self.skills_dir / design.name
+                generated_files = await self.generator.generate(design, self.skills_dir)
         
-        yield Event(
-            type=EventType.SKILL_CREATED,
-            data={
-                "status": "generated",
-                "skill_path": str(skill_path),
-                "files": list(generated_files.keys()),
-            }
-        )
+                skill_path = self.skills_dir / design.name
         
-        # 步骤 5: 验证
-        yield Event(
-            type=EventType.SKILL_CREATED,
-            data={
-                "status": "validating",
-                "message": "正在验证代码...",
-            }
-        )
+                emit(Event(
+                    type=EventType.SKILL_CREATED,
+                    data={
+                        "status": "generated",
+                        "skill_path": str(skill_path),
+                        "files": list(generated_files.keys()),
+                    }
+                ))
         
-        validation = await self.validator.validate(skill_path)
+                # 步骤 5: 验证
+                emit(Event(
+                    type=EventType.SKILL_CREATED,
+                    data={
+                        "status": "validating",
+                        "message": "正在验证代码...",
+                    }
+                ))
         
-        yield Event(
-            type=EventType.SKILL_CREATED,
-            data={
-                "status": "validated",
-                "valid": validation.valid,
-                "errors": validation.errors,
-                "warnings": validation.warnings,
-            }
-        )
+                validation = await self.validator.validate(skill_path)
         
-        if not validation.valid:
-            result = EvolutionResult(
-                status="failed",
-                skill_name=design.name,
-                skill_path=skill_path,
-                message=f"验证失败: {', '.join(validation.errors)}",
-                need_analysis=need,
-                match_result=match,
-                validation_result=validation,
-            )
+                emit(Event(
+                    type=EventType.SKILL_CREATED,
+                    data={
+                        "status": "validated",
+                        "valid": validation.valid,
+                        "errors": validation.errors,
+                        "warnings": validation.warnings,
+                    }
+                ))
+        
+                if not validation.valid:
+                    result = EvolutionResult(
+                        status="failed",
+                        skill_name=design.name,
+                        skill_path=skill_path,
+                        message=f"验证失败: {', '.join(validation.errors)}",
+                        need_analysis=need,
+                        match_result=match,
+                        validation_result=validation,
+                    )
             
-            yield Event(
-                type=EventType.SKILL_CREATED,
-                data={
-                    "status": "failed",
-                    "message": f"验证失败: {', '.join(validation.errors)}",
-                    "result": result,
-                }
-            )
-            return
-        
-        # 步骤 6: 集成
-        yield Event(
-            type=EventType.SKILL_CREATED,
-            data={
-                "status": "integrating",
-                "message": "正在集成到系统...",
-            }
-        )
+                    emit(Event(
+                        type=EventType.SKILL_CREATED,
+                        data={
+                            "status": "failed",
+                            "message": f"验证失败: {', '.join(validation.errors)}",
+                            "result": result,
+                        }
+                    ))
+                    return
+        
+                # 步骤 6: 集成
+                emit(Event(
+                    type=EventType.SKILL_CREATED,
+                    data={
+                        "status": "integrating",
+                        "message": "正在集成到系统...",
+                    }
+                ))
+        
+                integration = self.integrator.integrate(skill_path, session)
+        
+                if integration["success"]:
+                    result = EvolutionResult(
+                        status="created",
+                        skill_name=design.name,
+                        skill_path=skill_path,
+                        message=f"成功创建 Skill '{design.name}'，包含 {len(design.tools)} 个工具",
+                        need_analysis=need,
+                        match_result=match,
+                        validation_result=validation,
+                        details={
+                            "files": list(generated_files.keys()),
+                            "tools": [t.name for t in design.tools],
+                            "integration": integration,
+                        }
+                    )
+            
+                    emit(Event(
+                        type=EventType.SKILL_CREATED,
+                        data={
+                            "status": "completed",
+                            "skill_name": design.name,
+                            "skill_path": str(skill_path),
+                            "tools": integration.get("registered_tools", []),
+                            "message": f"Skill '{design.name}' 创建完成并激活！",
+                            "result": result,
+                        }
+                    ))
+                else:
+                    result = EvolutionResult(
+                        status="warning",
+                        skill_name=design.name,
+                        skill_path=skill_path,
+                        message=f"代码已生成，但集成失败: {integration.get('error')}",
+                        need_analysis=need,
+                        match_result=match,
+                        validation_result=validation,
+                    )
+            
+                    emit(Event(
+                        type=EventType.SKILL_CREATED,
+                        data={
+                            "status": "warning",
+                            "message": f"代码已生成，但集成失败: {integration.get('error')}",
+                            "result": result,
+                        }
+                    ))
+            finally:
+                emit(None)
+    
+    async def close(self) -> None:
+        """释放后台资源（验证器的 pytest worker 进程）"""
+        await self.validator.close()
+    
+    def _skill_lock(self, skill_name: str) -> asyncio.Lock:
+        """获取 Skill 名称对应的锁"""
+        lock = self._skill_locks.get(skill_name)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._skill_locks[skill_name] = lock
+        return lock
+    
+    async def evolve_many(
+        self,
+        user_requests: List[str],
+        existing_skills: List[Dict[str, Any]],
+        session: Optional[AgentSession] = None,
+    ) -> List[EvolutionResult]:
+        """
+        并发执行多个 Skill 进化请求
         
-        integration = self.integrator.integrate(skill_path, session)
+        各请求独立运行，LLM 调用总数受 llm_concurrency 限制；
+        相同的请求会命中阶段缓存，不会重复调用 LLM。
         
-        if integration["success"]:
-            result = EvolutionResult(
-                status="created",
-                skill_name=design.name,
-                skill_path=skill_path,
-                message=f"成功创建 Skill '{design.name}'，包含 {len(design.tools)} 个工具",
-                need_analysis=need,
-                match_result=match,
-                validation_result=validation,
-                details={
-                    "files": list(generated_files.keys()),
-                    "tools": [t.name for t in design.tools],
-                    "integration": integration,
-                }
-            )
-            
-            yield Event(
-                type=EventType.SKILL_CREATED,
-                data={
-                    "status": "completed",
-                    "skill_name": design.name,
-                    "skill_path": str(skill_path),
-                    "tools": integration.get("registered_tools", []),
-                    "message": f"Skill '{design.name}' 创建完成并激活！",
-                    "result": result,
-                }
-            )
-        else:
-            result = EvolutionResult(
-                status="warning",
-                skill_name=design.name,
-                skill_path=skill_path,
-                message=f"代码已生成，但集成失败: {integration.get('error')}",
-                need_analysis=need,
-                match_result=match,
-                validation_result=validation,
-            )
+        Args:
+            user_requests: 用户请求列表
+            existing_skills: 现有 Skills 列表
+            session: 可选的 Session，用于立即集成
             
-            yield Event(
-                type=EventType.SKILL_CREATED,
-                data={
-                    "status": "warning",
-                    "message": f"代码已生成，但集成失败: {integration.get('error')}",
-                    "result": result,
-                }
-            )
+        Returns:
+            与 user_requests 顺序一致的 EvolutionResult 列表
+        """
+        async def run_one(user_request: str) -> EvolutionResult:
+            result: Optional[EvolutionResult] = None
+            try:
+                async for event in self.evolve(user_request, existing_skills, session):
+                    if "result" in event.data:
+                        result = event.data["result"]
+            except Exception as e:
+                result = EvolutionResult(
+                    status="failed",
+                    skill_name="",
+                    skill_path=None,
+                    message=f"进化失败: {e}",
+                    need_analysis=NeedAnalysis(
+                        intent=user_request,
+                        domain="other",
+                        required_capabilities=[],
+                        complexity="medium",
+                        can_use_existing=False,
+                        suggested_skill_name=None,
+                    ),
+                )
+            return result
+        
+        return list(await asyncio.gather(*(run_one(r) for r in user_requests)))
     
     async def should_evolve(
         self,
@@ -4,7 +4,7 @@ Skill 集成器 - 将验证通过的 Skill 集成到系统
 import importlib.util
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from evoskill.core.session import AgentSession
 
@@ -13,11 +13,13 @@ class SkillIntegrator:
     """
     Skill 集成器
     
-    将新创建的 Skill 加载到系统中，立即可用
+    将新创建的 Skill 加载到系统中，立即可用。
+    已加载的模块按 main.py 的 (mtime, size) 缓存，文件未变化时不重复执行。
     """
     
     def __init__(self, skills_dir: Path):
         self.skills_dir = skills_dir
+        self._modules: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
     
     def integrate(
         self,
@@ -97,6 +99,16 @@ class SkillIntegrator:
         skill_name = skill_path.name
         main_py = skill_path / "main.py"
         
+        try:
+            st = main_py.stat()
+        except OSError:
+            return None
+        stat = (st.st_mtime_ns, st.st_size)
+        
+        cached = self._modules.get(skill_path)
+        if cached is not None and cached[0] == stat and sys.modules.get(skill_name) is cached[1]:
+            return cached[1]
+        
         # 使用 importlib 动态加载
         spec = importlib.util.spec_from_file_location(
             skill_name,
@@ -113,6 +125,7 @@ class SkillIntegrator:
         
         try:
             spec.loader.exec_module(module)
+            self._modules[skill_path] = (stat, module)
             return module
         except Exception as e:
             # 清理
@@ -184,6 +197,7 @@ class SkillIntegrator:
         # 从 sys.modules 移除旧模块
         if skill_name in sys.modules:
             del sys.modules[skill_name]
+        self._modules.pop(skill_path, None)
         
         # 重新加载
         module = self._load_module(skill_path)
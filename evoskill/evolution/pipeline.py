@@ -0,0 +1,175 @@
+"""
+进化流水线支持 - 阶段结果缓存与 LLM 并发控制
+
+- StageCache: 内容寻址的阶段结果缓存（LRU），并合并相同 key 的并发请求
+- ConcurrencyLimitedLLM: 限制同时进行的 LLM 调用数量
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from dataclasses import asdict, is_dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from evoskill.core.llm import LLMProvider
+
+
+def normalize_request(text: str) -> str:
+    """规范化用户请求：去除首尾空白、合并空白、转小写"""
+    return re.sub(r"\s+", " ", text.strip()).lower()
+
+
+def skills_fingerprint(existing_skills: List[Dict[str, Any]]) -> str:
+    """
+    计算现有 Skills 的指纹
+
+    只取名称和描述（与 prompt 中使用的字段一致），与列表顺序无关
+    """
+    items = sorted(
+        (str(s.get("name", "")), str(s.get("description", "")))
+        for s in existing_skills
+    )
+    return hashlib.sha256(
+        json.dumps(items, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def make_cache_key(stage: str, *parts: Any) -> str:
+    """
+    生成内容寻址的缓存 key
+
+    Args:
+        stage: 阶段名称（如 "analyze"、"design"）
+        parts: 参与计算的内容，dataclass 会被展开为字典
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    payload = [stage] + [asdict(p) if is_dataclass(p) else p for p in parts]
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def _cancelling() -> bool:
+    """当前任务是否正被取消（Python 3.11 之前无法区分，视为否）"""
+    task = asyncio.current_task()
+    cancelling = getattr(task, "cancelling", None)
+    return bool(cancelling and cancelling())
+
+
+class StageCache:
+    """
+    阶段结果缓存
+
+    LRU 淘汰；get_or_create 会合并相同 key 的并发计算，
+    避免突发的相同请求重复调用 LLM；计算方被取消时，等待者会重新发起计算。
+    返回值为深拷贝，调用方可以安全修改。
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存（未命中返回 None）"""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(self._entries[key])
+
+    def put(self, key: str, value: Any) -> None:
+        """写入缓存"""
+        self._entries[key] = copy.deepcopy(value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_create(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Tuple[Any, bool]]],
+    ) -> Any:
+        """
+        读取缓存，未命中时计算
+
+        Args:
+            key: 缓存 key
+            factory: 计算函数，返回 (结果, 是否可缓存)；
+                失败时的降级结果应标记为不可缓存
+
+        Returns:
+            结果（深拷贝）
+        """
+        while True:
+            if key in self._entries:
+                self.hits += 1
+                return self.get(key)
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            try:
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 计算方被取消（而非本调用方）时重试，由某个等待者接手计算
+                if not inflight.cancelled() or _cancelling():
+                    raise
+                continue
+            self.hits += 1
+            return copy.deepcopy(value)
+
+        self.misses += 1
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            value, cacheable = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        else:
+            if cacheable:
+                self.put(key, value)
+            future.set_result(value)
+            return copy.deepcopy(value)
+        finally:
+            self._inflight.pop(key, None)
+
+
+class ConcurrencyLimitedLLM:
+    """
+    限制并发的 LLM Provider 包装
+
+    chat() 在整个流式响应期间占用一个并发槽位，其他属性透传给原 Provider
+    """
+
+    def __init__(self, llm_provider: LLMProvider, max_concurrency: int = 4):
+        self._llm = llm_provider
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def chat(self, *args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        async with self._semaphore:
+            async for event in self._llm.chat(*args, **kwargs):
+                yield event
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
@@ -0,0 +1,240 @@
+"""
+pytest worker 池 - 在常驻解释器中运行 Skill 单元测试
+
+每个 worker 是一个预先导入 pytest 的 Python 进程，复用以省去解释器启动、
+pytest 导入和插件发现的开销；运行 max_runs_per_worker 次后回收重建。
+"""
+import asyncio
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+WORKER_SCRIPT = Path(__file__).with_name("_pytest_worker.py")
+
+# 单行 JSON 响应可能包含完整的测试输出
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+
+@dataclass
+class CaseResult:
+    """单个测试用例结果"""
+    nodeid: str
+    outcome: str  # "passed", "failed", "error", "skipped"
+    duration: float
+
+
+@dataclass
+class PytestRunResult:
+    """一次 pytest 运行结果"""
+    passed: bool
+    exit_code: int
+    output: str
+    duration: float = 0.0
+    cases: List[CaseResult] = field(default_factory=list)
+
+
+class _Worker:
+    """单个常驻 pytest 进程"""
+
+    def __init__(self, proc: asyncio.subprocess.Process):
+        self.proc = proc
+        self.runs = 0
+
+    @classmethod
+    async def spawn(cls, python: str, startup_timeout: float) -> "_Worker":
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                python,
+                str(WORKER_SCRIPT),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=_STREAM_LIMIT,
+            )
+        except OSError as e:
+            raise RuntimeError(f"pytest worker 启动失败: {e}") from e
+        worker = cls(proc)
+
+        try:
+            line = await asyncio.wait_for(proc.stdout.readline(), startup_timeout)
+            ready = json.loads(line) if line else {}
+        except (asyncio.TimeoutError, ValueError):
+            ready = {}
+
+        if not ready.get("ready"):
+            await worker.close(kill=True)
+            raise RuntimeError("pytest worker 启动失败（pytest 是否已安装？）")
+
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def request(self, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        self.runs += 1
+        self.proc.stdin.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.proc.stdin.drain()
+
+        line = await asyncio.wait_for(self.proc.stdout.readline(), timeout)
+        if not line:
+            raise RuntimeError("pytest worker 意外退出")
+        return json.loads(line)
+
+    async def close(self, kill: bool = False) -> None:
+        if not self.alive:
+            return
+        if not kill:
+            try:
+                self.proc.stdin.close()
+                await asyncio.wait_for(self.proc.wait(), 2)
+                return
+            except (asyncio.TimeoutError, OSError):
+                pass
+        self.proc.kill()
+        await self.proc.wait()
+
+
+class PytestWorkerPool:
+    """
+    pytest worker 池
+
+    Example:
+        pool = PytestWorkerPool(size=4)
+        result = await pool.run(skill_path / "tests" / "test_main.py", cwd=skill_path)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_runs_per_worker: int = 20,
+        timeout: float = 30.0,
+        startup_timeout: float = 30.0,
+        python: str = sys.executable,
+    ):
+        self.size = size
+        self.max_runs_per_worker = max_runs_per_worker
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.python = python
+
+        # 空闲队列中的 None 表示补位启动失败的空槽位
+        self._idle: Optional["asyncio.Queue[Optional[_Worker]]"] = None
+        self._start_lock = asyncio.Lock()
+        self._workers: List[_Worker] = []
+        self._tasks: Set["asyncio.Future[None]"] = set()
+        self._closed = False
+
+    async def start(self) -> None:
+        """预先启动所有 worker（首次 run 时也会自动调用）"""
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+
+            workers = await asyncio.gather(
+                *(_Worker.spawn(self.python, self.startup_timeout) for _ in range(self.size)),
+                return_exceptions=True,
+            )
+            started = [w for w in workers if isinstance(w, _Worker)]
+            if not started:
+                raise RuntimeError(f"无法启动 pytest worker: {workers[0]}")
+
+            self._idle = asyncio.Queue()
+            for worker in started:
+                self._workers.append(worker)
+                self._idle.put_nowait(worker)
+
+    async def run(self, test_file: Path, cwd: Path) -> PytestRunResult:
+        """
+        在空闲 worker 中运行测试文件
+
+        Args:
+            test_file: 测试文件路径
+            cwd: 运行目录
+
+        Returns:
+            PytestRunResult
+        """
+        if self._closed:
+            raise RuntimeError("PytestWorkerPool 已关闭")
+        await self.start()
+
+        worker = await self._acquire()
+        # 请求被中断（包括取消）时响应可能仍未读出，worker 不能再复用
+        failed = True
+
+        try:
+            response = await worker.request(
+                {"test_file": str(test_file), "cwd": str(cwd)},
+                self.timeout,
+            )
+            failed = False
+        except asyncio.TimeoutError:
+            return PytestRunResult(passed=False, exit_code=-1, output="测试超时")
+        except Exception as e:
+            return PytestRunResult(passed=False, exit_code=-1, output=f"测试运行失败: {e}")
+        finally:
+            if failed or not worker.alive or worker.runs >= self.max_runs_per_worker:
+                task = asyncio.ensure_future(self._replace(worker, kill=failed))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                self._idle.put_nowait(worker)
+
+        return PytestRunResult(
+            passed=response.get("exit_code") == 0,
+            exit_code=response.get("exit_code", -1),
+            output=response.get("output", ""),
+            duration=response.get("duration", 0.0),
+            cases=[CaseResult(**case) for case in response.get("cases", [])],
+        )
+
+    async def _acquire(self) -> _Worker:
+        """取出空闲 worker；取到空槽位时当场启动"""
+        worker = await self._idle.get()
+        if worker is not None:
+            return worker
+
+        try:
+            worker = await _Worker.spawn(self.python, self.startup_timeout)
+        except Exception:
+            self._idle.put_nowait(None)
+            raise
+        self._workers.append(worker)
+        return worker
+
+    async def _replace(self, worker: _Worker, kill: bool) -> None:
+        """回收 worker 并启动新的 worker 补位"""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        # 超时或出错的 worker 状态未知，直接结束
+        await worker.close(kill=kill)
+
+        if self._closed:
+            return
+
+        try:
+            new_worker: Optional[_Worker] = await _Worker.spawn(
+                self.python, self.startup_timeout
+            )
+        except Exception:
+            new_worker = None
+
+        if new_worker is not None:
+            if self._closed:
+                await new_worker.close()
+                return
+            self._workers.append(new_worker)
+
+        self._idle.put_nowait(new_worker)
+
+    async def close(self) -> None:
+        """关闭所有 worker"""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*(w.close() for w in workers), return_exceptions=True)
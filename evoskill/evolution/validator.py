@@ -2,12 +2,15 @@
 Skill 验证器 - 验证生成的 Skill 是否可用
 """
 import ast
+import asyncio
 import sys
 import subprocess
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from evoskill.evolution.runner_pool import CaseResult, PytestWorkerPool
+
 
 @dataclass
 class ValidationResult:
@@ -19,6 +22,8 @@ class ValidationResult:
     import_valid: bool = False
     tests_passed: bool = False
     test_output: str = ""
+    test_duration: float = 0.0
+    test_cases: List[CaseResult] = field(default_factory=list)
 
 
 class SkillValidator:
@@ -29,8 +34,42 @@ class SkillValidator:
     1. 语法正确性
     2. 可导入性
     3. 单元测试通过
+    
+    单元测试在常驻的 pytest worker 池中运行；worker 无法启动时
+    退回到每次启动一个 pytest 子进程。
     """
     
+    def __init__(
+        self,
+        pool_size: int = 2,
+        max_runs_per_worker: int = 20,
+        test_timeout: float = 30.0,
+        use_pool: bool = True,
+    ):
+        self.pool_size = pool_size
+        self.max_runs_per_worker = max_runs_per_worker
+        self.test_timeout = test_timeout
+        self.use_pool = use_pool
+        self._pool: Optional[PytestWorkerPool] = None
+    
+    async def validate_many(self, skill_paths: List[Path]) -> List[ValidationResult]:
+        """
+        并发验证多个 Skill
+        
+        Args:
+            skill_paths: Skill 目录路径列表
+            
+        Returns:
+            与 skill_paths 顺序一致的 ValidationResult 列表
+        """
+        return list(await asyncio.gather(*(self.validate(p) for p in skill_paths)))
+    
+    async def close(self) -> None:
+        """关闭 pytest worker 池"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+    
     async def validate(self, skill_path: Path) -> ValidationResult:
         """
         验证 Skill
@@ -73,6 +112,8 @@ class SkillValidator:
             test_result = await self._run_tests(skill_path)
             result.tests_passed = test_result["passed"]
             result.test_output = test_result["output"]
+            result.test_duration = test_result.get("duration", 0.0)
+            result.test_cases = test_result.get("cases", [])
             if not test_result["passed"]:
                 result.warnings.append("单元测试未完全通过（但 Skill 可能仍可用）")
         
@@ -125,6 +166,30 @@ class SkillValidator:
         if not test_file.exists():
             return {"passed": True, "output": "No tests"}
         
+        if self.use_pool:
+            if self._pool is None:
+                self._pool = PytestWorkerPool(
+                    size=self.pool_size,
+                    max_runs_per_worker=self.max_runs_per_worker,
+                    timeout=self.test_timeout,
+                )
+            try:
+                run = await self._pool.run(test_file, skill_path)
+                return {
+                    "passed": run.passed,
+                    "output": run.output,
+                    "duration": run.duration,
+                    "cases": run.cases,
+                }
+            except RuntimeError:
+                # worker 无法启动，退回子进程模式
+                await self.close()
+                self.use_pool = False
+        
+        return await asyncio.to_thread(self._run_tests_subprocess, skill_path, test_file)
+    
+    def _run_tests_subprocess(self, skill_path: Path, test_file: Path) -> Dict[str, Any]:
+        """在独立的 pytest 子进程中运行单元测试"""
         try:
             # 运行 pytest
             result = subprocess.run(
@@ -132,7 +197,7 @@ class SkillValidator:
                 cwd=str(skill_path),
                 capture_output=True,
                 text=True,
-                timeout=30,
+                timeout=self.test_timeout,
             )
             
             passed = result.returncode == 0
@@ -2,5 +2,6 @@
 
 from evoskill.skills.loader import SkillLoader
 from evoskill.skills.builtin import register_builtin_tools
+from evoskill.skills.watcher import SkillWatcher
 
-__all__ = ["SkillLoader", "register_builtin_tools"]
+__all__ = ["SkillLoader", "SkillWatcher", "register_builtin_tools"]
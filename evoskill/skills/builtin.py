@@ -4,14 +4,19 @@
 提供基础的文件、代码、网络等工具
 """
 
+import asyncio
 import json
-import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import aiofiles
 
 from evoskill.core.session import AgentSession
+from evoskill.skills.workspace_index import (
+    get_workspace_index,
+    notify_path_changed,
+    ripgrep_search,
+)
 
 
 async def read_file(path: str, offset: int = 0, limit: Optional[int] = None) -> str:
@@ -69,6 +74,7 @@ async def write_file(path: str, content: str, append: bool = False) -> str:
         async with aiofiles.open(file_path, mode, encoding="utf-8") as f:
             await f.write(content)
         
+        notify_path_changed(file_path)
         return f"Successfully wrote to {path}"
     except Exception as e:
         return f"Error writing file: {e}"
@@ -78,6 +84,8 @@ async def list_dir(path: str = ".", recursive: bool = False) -> str:
     """
     列出目录内容
     
+    递归模式使用工作区索引，跳过 .gitignore 中忽略的文件
+    
     Args:
         path: 目录路径
         recursive: 是否递归列出
@@ -97,9 +105,10 @@ async def list_dir(path: str = ".", recursive: bool = False) -> str:
         items = []
         
         if recursive:
-            for item in dir_path.rglob("*"):
-                rel_path = item.relative_to(dir_path)
-                item_type = "📁" if item.is_dir() else "📄"
+            # 使用工作区索引（遵守 .gitignore）
+            index = get_workspace_index(dir_path)
+            for rel_path, is_dir in await asyncio.to_thread(index.list_entries):
+                item_type = "📁" if is_dir else "📄"
                 items.append(f"{item_type} {rel_path}")
         else:
             for item in sorted(dir_path.iterdir()):
@@ -130,6 +139,9 @@ async def search_files(
     """
     搜索文件内容
     
+    优先使用 ripgrep；不可用时使用工作区索引（遵守 .gitignore，
+    三元组索引过滤候选文件）。搜索在线程池中执行，不阻塞事件循环。
+    
     Args:
         pattern: 搜索模式（支持简单字符串匹配）
         path: 搜索路径
@@ -138,37 +150,25 @@ async def search_files(
     Returns:
         搜索结果
     """
-    import fnmatch
-    
     search_path = Path(path)
-    results = []
+    
+    if not search_path.is_dir():
+        return f"Error: Directory not found: {path}"
+    
+    def _search():
+        found = ripgrep_search(pattern, search_path, file_pattern, max_results=20)
+        if found is None:
+            found = get_workspace_index(search_path).search(
+                pattern, file_pattern, max_results=20
+            )
+        return found
     
     try:
-        for root, dirs, files in os.walk(search_path):
-            for filename in files:
-                if file_pattern and not fnmatch.fnmatch(filename, file_pattern):
-                    continue
-                
-                file_path = Path(root) / filename
-                
-                try:
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                        
-                        if pattern in content:
-                            lines = content.split("\n")
-                            for i, line in enumerate(lines, 1):
-                                if pattern in line:
-                                    rel_path = file_path.relative_to(search_path)
-                                    results.append(f"{rel_path}:{i}: {line.strip()}")
-                                    
-                                    # 限制结果数量
-                                    if len(results) >= 20:
-                                        results.append("... (results truncated)")
-                                        return "\n".join(results)
-                
-                except Exception:
-                    continue
+        matches, truncated = await asyncio.to_thread(_search)
+        
+        results = [f"{rel_path}:{line_no}: {line.strip()}" for rel_path, line_no, line in matches]
+        if truncated:
+            results.append("... (results truncated)")
         
         return "\n".join(results) if results else f"No matches found for '{pattern}'"
     
@@ -189,8 +189,6 @@ async def execute_command(command: str, cwd: Optional[str] = None) -> str:
     Returns:
         命令输出
     """
-    import asyncio
-    
     # 安全检查
     dangerous_commands = ["rm -rf /", "> /dev/sda", "dd if=/dev/zero"]
     for dangerous in dangerous_commands:
@@ -293,6 +291,7 @@ async def edit_code(
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(new_content)
         
+        notify_path_changed(file_path)
         return f"Successfully edited {path}"
     
     except Exception as e:
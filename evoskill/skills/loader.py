@@ -4,17 +4,39 @@ Skill 加载器
 支持从本地目录、GitHub 等来源动态加载 Skills
 """
 
+import ast
+import hashlib
 import importlib.util
+import inspect
 import json
+import os
 import re
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import yaml
 
 from evoskill.core.types import Skill, SkillMetadata, ToolDefinition, ParameterSchema
 
 
+# 持久化的 SKILL.md 解析缓存
+MANIFEST_FILENAME = ".skill_manifest.json"
+MANIFEST_VERSION = 1
+
+# (SKILL.md mtime_ns, size, main.py mtime_ns, size)
+_Fingerprint = Tuple[int, int, int, int]
+
+
+def _stat_key(path: Path) -> Tuple[int, int]:
+    """文件的 (mtime_ns, size)，不存在时为 (0, -1)"""
+    try:
+        st = path.stat()
+    except OSError:
+        return (0, -1)
+    return (st.st_mtime_ns, st.st_size)
+
+
 class SkillLoader:
     """
     Skill 加载器
@@ -23,11 +45,31 @@ class SkillLoader:
     1. 从本地目录加载
     2. 从远程 URL 加载（TODO）
     3. 热重载
+    
+    增量加载:
+    - SKILL.md 的解析结果按 (mtime, size, sha256) 缓存在 manifest 文件中，跨进程复用
+    - refresh() 只重新加载文件发生变化的 Skill
+    - 工具处理函数在第一次调用时才导入 main.py，main.py 修改后自动重新导入
     """
     
-    def __init__(self, skills_dir: Union[str, Path]):
+    def __init__(
+        self,
+        skills_dir: Union[str, Path],
+        manifest_path: Optional[Union[str, Path]] = None,
+    ):
         self.skills_dir = Path(skills_dir)
+        self.manifest_path = (
+            Path(manifest_path) if manifest_path else self.skills_dir / MANIFEST_FILENAME
+        )
         self._loaded_skills: Dict[str, Skill] = {}
+        
+        # 增量刷新状态
+        self._fingerprints: Dict[Path, _Fingerprint] = {}
+        self._skill_names: Dict[Path, str] = {}
+        self._modules: Dict[Path, Tuple[Tuple[int, int], ModuleType]] = {}
+        
+        self._manifest: Dict[str, Dict[str, Any]] = self._read_manifest()
+        self._manifest_dirty = False
     
     def discover_skills(self) -> List[Path]:
         """
@@ -59,8 +101,12 @@ class SkillLoader:
         Returns:
             Skill 对象，加载失败返回 None
         """
-        skill_path = Path(skill_path)
-        
+        skill = self._load_skill(Path(skill_path))
+        self._save_manifest()
+        return skill
+    
+    def _load_skill(self, skill_path: Path) -> Optional[Skill]:
+        """加载单个 Skill（不写入 manifest 文件）"""
         if not skill_path.exists():
             print(f"Skill path not found: {skill_path}")
             return None
@@ -72,20 +118,12 @@ class SkillLoader:
             return None
         
         try:
-            with open(skill_md_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            # 解析 frontmatter
-            frontmatter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
-            
-            if not frontmatter_match:
+            parsed = self._read_skill_md(skill_path, skill_md_path)
+            if parsed is None:
                 print(f"Invalid SKILL.md format in {skill_path}")
                 return None
             
-            yaml_content = frontmatter_match.group(1)
-            markdown_content = frontmatter_match.group(2)
-            
-            metadata = yaml.safe_load(yaml_content)
+            metadata, markdown_content = parsed
             
             # 提取工具定义
             tools = self._parse_tools(metadata.get("tools", []), skill_path)
@@ -106,12 +144,106 @@ class SkillLoader:
             )
             
             self._loaded_skills[skill.name] = skill
+            self._skill_names[skill_path] = skill.name
+            self._fingerprints[skill_path] = self._fingerprint(skill_path)
             return skill
         
         except Exception as e:
             print(f"Error loading skill from {skill_path}: {e}")
             return None
     
+    def _read_skill_md(
+        self,
+        skill_path: Path,
+        skill_md_path: Path,
+    ) -> Optional[Tuple[Dict[str, Any], str]]:
+        """
+        读取并解析 SKILL.md（优先使用 manifest 缓存）
+        
+        Returns:
+            (frontmatter 元数据, markdown 正文)，格式无效返回 None
+        """
+        key = str(skill_path.resolve())
+        mtime_ns, size = _stat_key(skill_md_path)
+        entry = self._manifest.get(key)
+        
+        if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+            return entry["metadata"], entry["readme"]
+        
+        with open(skill_md_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if entry and entry["sha256"] == digest:
+            # 内容未变（例如只是被 touch），只更新 mtime
+            entry["mtime_ns"], entry["size"] = mtime_ns, size
+            self._manifest_dirty = True
+            return entry["metadata"], entry["readme"]
+        
+        # 解析 frontmatter
+        frontmatter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
+        
+        if not frontmatter_match:
+            return None
+        
+        yaml_content = frontmatter_match.group(1)
+        markdown_content = frontmatter_match.group(2)
+        
+        metadata = yaml.safe_load(yaml_content)
+        
+        entry = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "sha256": digest,
+            "metadata": metadata,
+            "readme": markdown_content,
+        }
+        try:
+            # YAML 中的日期等类型无法写入 JSON，这类 Skill 不缓存
+            json.dumps(entry)
+        except (TypeError, ValueError):
+            self._manifest.pop(key, None)
+        else:
+            self._manifest[key] = entry
+        self._manifest_dirty = True
+        
+        return metadata, markdown_content
+    
+    def _read_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """读取 manifest 缓存文件"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("skills", {})
+    
+    def _save_manifest(self) -> None:
+        """写入 manifest 缓存文件（仅在有变化时）"""
+        if not self._manifest_dirty or not self.skills_dir.exists():
+            return
+        
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "skills": self._manifest},
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.manifest_path)
+            self._manifest_dirty = False
+        except OSError:
+            # 缓存写入失败不影响加载
+            pass
+    
+    def _fingerprint(self, skill_path: Path) -> _Fingerprint:
+        """Skill 目录的文件指纹"""
+        return _stat_key(skill_path / "SKILL.md") + _stat_key(skill_path / "main.py")
+    
     def _parse_tools(
         self,
         tools_config: List[Dict[str, Any]],
@@ -128,6 +260,7 @@ class SkillLoader:
             工具定义列表
         """
         tools = []
+        module_names = self._module_names(skill_path)
         
         for tool_config in tools_config:
             name = tool_config.get("name")
@@ -145,7 +278,7 @@ class SkillLoader:
                 )
             
             # 查找处理函数
-            handler = self._load_tool_handler(skill_path, name)
+            handler = self._load_tool_handler(skill_path, name, module_names)
             
             tool = ToolDefinition(
                 name=name,
@@ -157,13 +290,111 @@ class SkillLoader:
         
         return tools
     
+    def _module_names(self, skill_path: Path) -> Optional[Set[str]]:
+        """
+        静态解析 main.py 模块级定义的名称（不导入模块）
+        
+        包括 if/try/with/for/while 语句块内的定义，例如平台相关的实现或
+        ``try: import ... except ImportError: def ...`` 形式的回退实现
+        
+        Returns:
+            名称集合，main.py 不存在或无法解析时为空集合；
+            含 ``from ... import *`` 或模块级 ``__getattr__`` 时无法确定，返回 None
+        """
+        try:
+            tree = ast.parse((skill_path / "main.py").read_bytes())
+        except (OSError, SyntaxError, ValueError):
+            return set()
+        
+        names: Set[str] = set()
+        if not self._collect_names(tree.body, names) or "__getattr__" in names:
+            return None
+        return names
+    
+    @classmethod
+    def _collect_names(cls, body: List[ast.stmt], names: Set[str]) -> bool:
+        """收集语句块中绑定的名称；遇到 star import 时返回 False"""
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                names.add(node.name)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    names.update(
+                        n.id for n in ast.walk(target)
+                        if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)
+                    )
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    if alias.name == "*":
+                        return False
+                    names.add(alias.asname or alias.name.split(".")[0])
+            else:
+                # 复合语句：递归进入各个子语句块
+                blocks = [getattr(node, field, None) or [] for field in ("body", "orelse", "finalbody")]
+                blocks += [handler.body for handler in getattr(node, "handlers", [])]
+                for block in blocks:
+                    if not cls._collect_names(block, names):
+                        return False
+        return True
+    
+    @staticmethod
+    def _handler_names(tool_name: str) -> List[str]:
+        """工具处理函数的候选名称（多种命名约定）"""
+        return [
+            tool_name,
+            f"handle_{tool_name}",
+            tool_name.replace("-", "_"),
+        ]
+    
     def _load_tool_handler(
+        self,
+        skill_path: Path,
+        tool_name: str,
+        module_names: Optional[Set[str]] = None,
+    ) -> Optional[Callable]:
+        """
+        创建延迟加载的工具处理函数
+        
+        main.py 在第一次调用工具时才导入；是否存在处理函数在加载时
+        通过静态解析判断
+        
+        Args:
+            skill_path: Skill 目录路径
+            tool_name: 工具名称
+            module_names: main.py 模块级名称（见 _module_names），None 表示无法确定
+            
+        Returns:
+            处理函数，main.py 中没有对应的处理函数时返回 None
+        """
+        if not (skill_path / "main.py").exists():
+            return None
+        if module_names is not None and not any(
+            name in module_names for name in self._handler_names(tool_name)
+        ):
+            return None
+        
+        async def lazy_handler(**kwargs: Any) -> Any:
+            handler = self._resolve_tool_handler(skill_path, tool_name)
+            if handler is None:
+                raise RuntimeError(f"Tool handler not found: {tool_name} in {skill_path}")
+            
+            result = handler(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        
+        lazy_handler.__name__ = tool_name
+        lazy_handler.__qualname__ = tool_name
+        return lazy_handler
+    
+    def _resolve_tool_handler(
         self,
         skill_path: Path,
         tool_name: str
     ) -> Optional[Callable]:
         """
-        加载工具处理函数
+        查找工具的实际处理函数
         
         Args:
             skill_path: Skill 目录路径
@@ -172,10 +403,34 @@ class SkillLoader:
         Returns:
             处理函数，找不到返回 None
         """
-        # 尝试加载 main.py
+        module = self._import_skill_module(skill_path)
+        if module is None:
+            return None
+        
+        for name in self._handler_names(tool_name):
+            if hasattr(module, name):
+                return getattr(module, name)
+        
+        return None
+    
+    def _import_skill_module(self, skill_path: Path) -> Optional[ModuleType]:
+        """
+        导入 Skill 的 main.py（按 mtime 缓存，每个 Skill 只导入一次）
+        
+        Args:
+            skill_path: Skill 目录路径
+            
+        Returns:
+            模块对象，失败返回 None
+        """
         main_file = skill_path / "main.py"
+        stat = _stat_key(main_file)
+        
+        cached = self._modules.get(skill_path)
+        if cached is not None and cached[0] == stat:
+            return cached[1]
         
-        if not main_file.exists():
+        if stat[1] < 0:
             return None
         
         try:
@@ -190,38 +445,81 @@ class SkillLoader:
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
             
-            # 查找处理函数（多种命名约定）
-            handler_names = [
-                tool_name,
-                f"handle_{tool_name}",
-                tool_name.replace("-", "_"),
-            ]
-            
-            for name in handler_names:
-                if hasattr(module, name):
-                    return getattr(module, name)
-            
-            return None
+            self._modules[skill_path] = (stat, module)
+            return module
         
         except Exception as e:
-            print(f"Error loading tool handler {tool_name}: {e}")
+            print(f"Error loading skill module {main_file}: {e}")
             return None
     
     def load_all_skills(self) -> List[Skill]:
         """
         加载所有发现的 Skills
         
+        只重新加载文件有变化的 Skill，未变化的直接返回已加载的对象
+        
         Returns:
             Skill 对象列表
         """
-        skills = []
+        self.refresh()
         
-        for skill_path in self.discover_skills():
-            skill = self.load_skill(skill_path)
-            if skill:
-                skills.append(skill)
+        return [
+            self._loaded_skills[name]
+            for name in self._skill_names.values()
+            if name in self._loaded_skills
+        ]
+    
+    def refresh(self) -> Tuple[List[Skill], List[str]]:
+        """
+        增量刷新 Skills
+        
+        对比每个 Skill 目录中 SKILL.md 和 main.py 的 (mtime, size)，
+        只重新加载新增或修改的 Skill，并移除已删除的 Skill
+        
+        Returns:
+            (新增或修改的 Skill 列表, 被移除的 Skill 名称列表)
+        """
+        current = {path: self._fingerprint(path) for path in self.discover_skills()}
+        changed: List[Skill] = []
+        removed: List[str] = []
+        
+        for skill_path, fingerprint in current.items():
+            if (
+                self._fingerprints.get(skill_path) == fingerprint
+                and self._skill_names.get(skill_path) in self._loaded_skills
+            ):
+                continue
+            
+            old_name = self._skill_names.get(skill_path)
+            skill = self._load_skill(skill_path)
+            
+            if skill is not None:
+                changed.append(skill)
+                if old_name and old_name != skill.name:
+                    self._loaded_skills.pop(old_name, None)
+                    removed.append(old_name)
+            else:
+                # 记录指纹，文件未再变化前不重复尝试加载
+                self._fingerprints[skill_path] = fingerprint
+                self._skill_names.pop(skill_path, None)
+                if old_name and self._loaded_skills.pop(old_name, None) is not None:
+                    removed.append(old_name)
+        
+        for skill_path in list(self._fingerprints):
+            if skill_path in current:
+                continue
+            
+            del self._fingerprints[skill_path]
+            self._modules.pop(skill_path, None)
+            if self._manifest.pop(str(skill_path.resolve()), None) is not None:
+                self._manifest_dirty = True
+            
+            name = self._skill_names.pop(skill_path, None)
+            if name and self._loaded_skills.pop(name, None) is not None:
+                removed.append(name)
         
-        return skills
+        self._save_manifest()
+        return changed, removed
     
     def get_skill(self, name: str) -> Optional[Skill]:
         """
@@ -247,6 +545,7 @@ class SkillLoader:
         """
         skill = self._loaded_skills.get(name)
         if skill:
+            self._modules.pop(skill.source_path, None)
             return self.load_skill(skill.source_path)
         return None
     
@@ -0,0 +1,143 @@
+"""
+Skill 目录监视器
+
+监视 skills 目录，文件变化时调用 SkillLoader.refresh() 只重新加载变化的 Skill。
+安装了 watchdog 时使用系统文件通知（Linux 上为 inotify），否则定时轮询。
+"""
+
+import asyncio
+import inspect
+from typing import Any, Callable, List, Optional
+
+from evoskill.core.types import Skill
+from evoskill.skills.loader import MANIFEST_FILENAME, SkillLoader
+
+MANIFEST_STEM = MANIFEST_FILENAME.rsplit(".", 1)[0]
+
+# on_change(changed_skills, removed_names)
+ChangeCallback = Callable[[List[Skill], List[str]], Any]
+
+
+class SkillWatcher:
+    """
+    Skill 热重载监视器
+
+    Example:
+        watcher = SkillWatcher(loader, on_change=lambda changed, removed: ...)
+        await watcher.start()
+        ...
+        await watcher.stop()
+    """
+
+    def __init__(
+        self,
+        loader: SkillLoader,
+        on_change: Optional[ChangeCallback] = None,
+        poll_interval: float = 2.0,
+        debounce: float = 0.3,
+        use_native: bool = True,
+    ):
+        """
+        Args:
+            loader: Skill 加载器
+            on_change: 有 Skill 变化时的回调（可以是协程函数）
+            poll_interval: 轮询间隔（秒）；使用系统通知时作为兜底检查间隔
+            debounce: 收到文件通知后等待的合并时间（秒）
+            use_native: 是否尝试使用 watchdog
+        """
+        self.loader = loader
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.use_native = use_native
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._observer: Any = None
+
+    @property
+    def native(self) -> bool:
+        """是否正在使用系统文件通知"""
+        return self._observer is not None
+
+    async def start(self) -> None:
+        """开始监视（需在事件循环中调用）"""
+        if self._task is not None:
+            return
+
+        self._wakeup = asyncio.Event()
+        if self.use_native:
+            self._observer = self._start_observer(asyncio.get_running_loop())
+
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止监视"""
+        if self._observer is not None:
+            self._observer.stop()
+            await asyncio.to_thread(self._observer.join, 2)
+            self._observer = None
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _start_observer(self, loop: asyncio.AbstractEventLoop) -> Any:
+        """启动 watchdog 观察者，不可用时返回 None"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        if not self.loader.skills_dir.exists():
+            return None
+
+        wakeup = self._wakeup
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event: Any) -> None:
+                path = str(getattr(event, "src_path", ""))
+                # 忽略 manifest 自身（及其临时文件）的写入
+                if MANIFEST_STEM in path or "__pycache__" in path:
+                    return
+                loop.call_soon_threadsafe(wakeup.set)
+
+        try:
+            observer = Observer()
+            observer.schedule(_Handler(), str(self.loader.skills_dir), recursive=True)
+            observer.daemon = True
+            observer.start()
+        except Exception:
+            return None
+        return observer
+
+    async def _run(self) -> None:
+        """监视循环"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                # 合并短时间内的多次通知
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Skill watcher error: {e}")
+
+    async def check(self) -> None:
+        """立即检查一次变化"""
+        # refresh() 会读取并解析文件，放到线程中避免阻塞事件循环
+        changed, removed = await asyncio.to_thread(self.loader.refresh)
+
+        if (changed or removed) and self.on_change:
+            result = self.on_change(changed, removed)
+            if inspect.isawaitable(result):
+                await result
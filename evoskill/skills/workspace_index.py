@@ -0,0 +1,567 @@
+"""
+工作区文件索引
+
+为内置工具 search_files / list_dir 提供加速:
+1. 文件列表 + mtime 缓存，按目录 mtime 增量刷新
+2. 遵守 .gitignore（支持嵌套 .gitignore）
+3. 三元组（trigram）内容索引，只读取可能命中的文件
+4. 系统安装了 ripgrep 时优先使用 rg
+"""
+
+import fnmatch
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+
+# 始终跳过的目录
+ALWAYS_IGNORED_DIRS = {".git", ".hg", ".svn"}
+
+# 超过该大小的文件不进入内容索引
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+# 两次自动刷新之间的最小间隔（秒）
+DEFAULT_REFRESH_INTERVAL = 1.0
+
+# 进程内最多缓存的索引数量
+MAX_CACHED_INDEXES = 8
+
+# (规则所在目录前缀, 正则, 是否取反, 是否仅匹配目录)
+_Rule = Tuple[str, "re.Pattern[str]", bool, bool]
+
+
+def _translate_gitignore_glob(pattern: str) -> str:
+    """将 gitignore glob 转换为正则表达式"""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_gitignore(content: str, base: str = "") -> List[_Rule]:
+    """
+    解析 .gitignore 内容
+
+    Args:
+        content: .gitignore 文件内容
+        base: .gitignore 所在目录（相对索引根目录，以 "/" 结尾或为空）
+
+    Returns:
+        规则列表
+    """
+    rules: List[_Rule] = []
+
+    for raw_line in content.splitlines():
+        line = raw_line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        if line.startswith("\\"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        # 含有 "/" 的模式相对 .gitignore 所在目录锚定
+        anchored = "/" in line
+        line = line.lstrip("/")
+
+        regex = _translate_gitignore_glob(line)
+        if not anchored:
+            regex = "(?:.*/)?" + regex
+
+        rules.append((base, re.compile(f"^{regex}$"), negate, dir_only))
+
+    return rules
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: List[_Rule]) -> bool:
+    """
+    判断路径是否被忽略（最后一条匹配的规则生效）
+
+    Args:
+        rel_path: 相对索引根目录的路径（使用 "/" 分隔）
+        is_dir: 是否为目录
+        rules: 规则列表
+
+    Returns:
+        是否忽略
+    """
+    ignored = False
+
+    for base, regex, negate, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if base and not rel_path.startswith(base):
+            continue
+        if regex.match(rel_path[len(base):]):
+            ignored = not negate
+
+    return ignored
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    """提取文本的所有三元组"""
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class WorkspaceIndex:
+    """
+    工作区文件索引
+
+    文件列表按目录 mtime 增量刷新：目录未变化时复用上次的目录项，
+    只重新 stat 文件；内容索引只对 (mtime, size) 变化的文件重建。
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL,
+        use_gitignore: bool = True,
+    ):
+        self.root = Path(root).resolve()
+        self.refresh_interval = refresh_interval
+        self.use_gitignore = use_gitignore
+
+        self._lock = threading.RLock()
+        self._last_refresh: Optional[float] = None
+        self._stale = True
+
+        # 目录项缓存: rel_dir -> (mtime_ns, [(name, is_dir)])
+        self._listings: Dict[str, Tuple[int, List[Tuple[str, bool]]]] = {}
+        # .gitignore 缓存: rel_dir -> (mtime_ns, rules)
+        self._gitignores: Dict[str, Tuple[int, List[_Rule]]] = {}
+
+        # 文件列表: rel_path -> (mtime_ns, size)
+        self._files: Dict[str, Tuple[int, int]] = {}
+        self._dirs: List[str] = []
+
+        # 内容索引
+        self._content_indexed = False
+        self._postings: Dict[str, Set[str]] = {}
+        self._file_grams: Dict[str, FrozenSet[str]] = {}
+        self._indexed_stats: Dict[str, Tuple[int, int]] = {}
+
+    # ------------------------------------------------------------------
+    # 文件列表
+    # ------------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """标记索引过期，下次访问时强制刷新"""
+        with self._lock:
+            self._stale = True
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        增量刷新文件列表
+
+        Args:
+            force: 忽略刷新间隔，立即刷新
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (
+                not force
+                and not self._stale
+                and self._last_refresh is not None
+                and now - self._last_refresh < self.refresh_interval
+            ):
+                return
+
+            files: Dict[str, Tuple[int, int]] = {}
+            dirs: List[str] = []
+            seen_dirs: Set[str] = set()
+
+            self._scan_dir("", [], files, dirs, seen_dirs)
+
+            # 清理已删除目录的缓存
+            for rel_dir in list(self._listings):
+                if rel_dir not in seen_dirs:
+                    del self._listings[rel_dir]
+                    self._gitignores.pop(rel_dir, None)
+
+            self._files = files
+            self._dirs = dirs
+            self._last_refresh = time.monotonic()
+            self._stale = False
+
+            if self._content_indexed:
+                self._update_content_index()
+
+    def _scan_dir(
+        self,
+        rel_dir: str,
+        rules: List[_Rule],
+        files: Dict[str, Tuple[int, int]],
+        dirs: List[str],
+        seen_dirs: Set[str],
+    ) -> None:
+        """递归扫描目录（rel_dir 为空或以 "/" 结尾）"""
+        abs_dir = self.root / rel_dir if rel_dir else self.root
+        seen_dirs.add(rel_dir)
+
+        try:
+            dir_mtime = abs_dir.stat().st_mtime_ns
+        except OSError:
+            return
+
+        cached = self._listings.get(rel_dir)
+        if cached is not None and cached[0] == dir_mtime:
+            entries = cached[1]
+        else:
+            entries = []
+            try:
+                with os.scandir(abs_dir) as it:
+                    for entry in it:
+                        try:
+                            entries.append((entry.name, entry.is_dir(follow_symlinks=False)))
+                        except OSError:
+                            continue
+            except OSError:
+                return
+            entries.sort()
+            self._listings[rel_dir] = (dir_mtime, entries)
+
+        if self.use_gitignore:
+            rules = rules + self._load_gitignore(rel_dir, abs_dir)
+
+        for name, entry_is_dir in entries:
+            rel_path = rel_dir + name
+
+            if entry_is_dir:
+                if name in ALWAYS_IGNORED_DIRS or is_ignored(rel_path, True, rules):
+                    continue
+                dirs.append(rel_path)
+                self._scan_dir(rel_path + "/", rules, files, dirs, seen_dirs)
+            else:
+                if is_ignored(rel_path, False, rules):
+                    continue
+                try:
+                    st = (abs_dir / name).stat()
+                except OSError:
+                    continue
+                files[rel_path] = (st.st_mtime_ns, st.st_size)
+
+    def _load_gitignore(self, rel_dir: str, abs_dir: Path) -> List[_Rule]:
+        """读取目录下的 .gitignore（按 mtime 缓存）"""
+        gitignore = abs_dir / ".gitignore"
+
+        try:
+            mtime = gitignore.stat().st_mtime_ns
+        except OSError:
+            self._gitignores.pop(rel_dir, None)
+            return []
+
+        cached = self._gitignores.get(rel_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        try:
+            content = gitignore.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            return []
+
+        rules = parse_gitignore(content, rel_dir)
+        self._gitignores[rel_dir] = (mtime, rules)
+        return rules
+
+    def list_files(self, file_pattern: Optional[str] = None) -> List[str]:
+        """
+        列出所有（未被忽略的）文件
+
+        Args:
+            file_pattern: 文件名过滤模式（如 "*.py"）
+
+        Returns:
+            相对路径列表（已排序）
+        """
+        self.refresh()
+        with self._lock:
+            paths = sorted(self._files)
+
+        if file_pattern:
+            paths = [p for p in paths if fnmatch.fnmatch(p.rsplit("/", 1)[-1], file_pattern)]
+        return paths
+
+    def list_entries(self) -> List[Tuple[str, bool]]:
+        """
+        列出所有（未被忽略的）文件和目录
+
+        Returns:
+            (相对路径, 是否目录) 列表（已排序）
+        """
+        self.refresh()
+        with self._lock:
+            entries = [(d, True) for d in self._dirs]
+            entries.extend((f, False) for f in self._files)
+        return sorted(entries)
+
+    # ------------------------------------------------------------------
+    # 内容索引
+    # ------------------------------------------------------------------
+
+    def _read_text(self, rel_path: str) -> Optional[str]:
+        """读取文本文件，二进制文件返回 None"""
+        try:
+            with open(self.root / rel_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        if b"\0" in data[:8192]:
+            return None
+        return data.decode("utf-8", errors="ignore")
+
+    def _update_content_index(self) -> None:
+        """只为新增/修改/删除的文件更新三元组索引"""
+        for rel_path in list(self._indexed_stats):
+            if rel_path not in self._files:
+                self._drop_from_content_index(rel_path)
+
+        for rel_path, stat in self._files.items():
+            if self._indexed_stats.get(rel_path) == stat:
+                continue
+
+            self._drop_from_content_index(rel_path)
+            self._indexed_stats[rel_path] = stat
+
+            if stat[1] > MAX_INDEXED_FILE_SIZE:
+                continue
+            text = self._read_text(rel_path)
+            if text is None:
+                continue
+
+            grams = _trigrams(text)
+            self._file_grams[rel_path] = grams
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(rel_path)
+
+    def _drop_from_content_index(self, rel_path: str) -> None:
+        """从三元组索引中移除文件"""
+        self._indexed_stats.pop(rel_path, None)
+        grams = self._file_grams.pop(rel_path, None)
+        if not grams:
+            return
+
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(rel_path)
+                if not posting:
+                    del self._postings[gram]
+
+    def candidates(self, pattern: str) -> List[str]:
+        """
+        返回可能包含 pattern 的文件
+
+        pattern 不足 3 个字符时无法利用索引，返回全部文件；
+        超过索引大小上限的文件总是作为候选。
+
+        Args:
+            pattern: 搜索字符串
+
+        Returns:
+            候选文件相对路径列表（已排序）
+        """
+        self.refresh()
+
+        with self._lock:
+            if not self._content_indexed:
+                self._content_indexed = True
+                self._update_content_index()
+
+            if len(pattern) < 3:
+                return sorted(self._files)
+
+            result: Optional[Set[str]] = None
+            # 从最稀有的三元组开始求交集
+            postings = sorted(
+                (self._postings.get(gram, set()) for gram in _trigrams(pattern)),
+                key=len,
+            )
+            for posting in postings:
+                result = set(posting) if result is None else result & posting
+                if not result:
+                    break
+
+            matched = result or set()
+            oversized = {p for p, st in self._files.items() if st[1] > MAX_INDEXED_FILE_SIZE}
+            return sorted(matched | oversized)
+
+    def search(
+        self,
+        pattern: str,
+        file_pattern: Optional[str] = None,
+        max_results: int = 20,
+    ) -> Tuple[List[Tuple[str, int, str]], bool]:
+        """
+        搜索文件内容（纯字符串匹配）
+
+        Args:
+            pattern: 搜索字符串
+            file_pattern: 文件名过滤模式（如 "*.py"）
+            max_results: 最大结果数
+
+        Returns:
+            ([(相对路径, 行号, 行内容)], 是否被截断)
+        """
+        results: List[Tuple[str, int, str]] = []
+
+        for rel_path in self.candidates(pattern):
+            if file_pattern and not fnmatch.fnmatch(rel_path.rsplit("/", 1)[-1], file_pattern):
+                continue
+
+            text = self._read_text(rel_path)
+            if text is None or pattern not in text:
+                continue
+
+            for i, line in enumerate(text.split("\n"), 1):
+                if pattern in line:
+                    if len(results) >= max_results:
+                        return results, True
+                    results.append((rel_path, i, line))
+
+        return results, False
+
+
+def ripgrep_search(
+    pattern: str,
+    path: Union[str, Path],
+    file_pattern: Optional[str] = None,
+    max_results: int = 20,
+    timeout: float = 30.0,
+) -> Optional[Tuple[List[Tuple[str, int, str]], bool]]:
+    """
+    使用 ripgrep 搜索（rg 自身遵守 .gitignore）
+
+    Args:
+        pattern: 搜索字符串
+        path: 搜索路径
+        file_pattern: 文件名过滤模式
+        max_results: 最大结果数
+        timeout: 超时时间（秒）
+
+    Returns:
+        与 WorkspaceIndex.search 相同的结构；rg 不可用或执行失败返回 None
+    """
+    rg = shutil.which("rg")
+    if rg is None:
+        return None
+
+    cmd = [rg, "--fixed-strings", "--line-number", "--no-heading", "--color=never", "--sort=path"]
+    # 与索引保持一致：不在 git 仓库中也遵守 .gitignore，包含隐藏文件
+    cmd.extend(["--no-require-git", "--hidden"])
+    for name in sorted(ALWAYS_IGNORED_DIRS):
+        cmd.extend(["--glob", f"!{name}/"])
+    if file_pattern:
+        cmd.extend(["--glob", file_pattern])
+    cmd.extend(["--", pattern, "."])
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            cwd=str(path),
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    # 0: 有结果, 1: 无结果, 其他: 出错
+    if proc.returncode not in (0, 1):
+        return None
+
+    results: List[Tuple[str, int, str]] = []
+    for raw_line in proc.stdout.decode("utf-8", errors="replace").splitlines():
+        parts = raw_line.split(":", 2)
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+
+        rel_path = parts[0][2:] if parts[0].startswith("./") else parts[0]
+        if len(results) >= max_results:
+            return results, True
+        results.append((rel_path, int(parts[1]), parts[2]))
+
+    return results, False
+
+
+_indexes: "OrderedDict[Path, WorkspaceIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_workspace_index(root: Union[str, Path]) -> WorkspaceIndex:
+    """
+    获取（或创建）指定目录的共享索引
+
+    Args:
+        root: 索引根目录
+
+    Returns:
+        WorkspaceIndex 实例
+    """
+    key = Path(root).resolve()
+
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = WorkspaceIndex(key)
+            _indexes[key] = index
+            while len(_indexes) > MAX_CACHED_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+def notify_path_changed(path: Union[str, Path]) -> None:
+    """
+    通知文件已被修改，使包含该路径的索引在下次访问时刷新
+
+    Args:
+        path: 被修改的文件路径
+    """
+    target = Path(path).resolve()
+
+    with _indexes_lock:
+        indexes = list(_indexes.items())
+
+    for root, index in indexes:
+        if target == root or root in target.parents:
+            index.invalidate()
@@ -8,6 +8,7 @@ Pi Coding Agent 没有的 Koda 增强功能：
 - 智能代码修复
 """
 import ast
+import inspect
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -47,6 +48,17 @@ class ExecutionResult:
     error: Optional[str] = None
 
 
+def _accepts_temperature(method: Any) -> bool:
+    """判断 LLM 方法是否接受 temperature 参数"""
+    try:
+        params = inspect.signature(method).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(
+        p.name == "temperature" or p.kind is inspect.Parameter.VAR_KEYWORD for p in params
+    )
+
+
 class Reflector:
     """
     代码反思器 - Koda 增强功能
@@ -214,11 +226,8 @@ Be thorough but concise."""
 
         try:
             # 调用 LLM
-            if hasattr(self.llm, 'complete'):
-                response = await self.llm.complete(prompt)
-            elif hasattr(self.llm, 'chat'):
-                response = await self.llm.chat([{"role": "user", "content": prompt}])
-            else:
+            response = await self._ask(prompt)
+            if response is None:
                 return {"issues": [], "suggestions": [], "can_fix": False, "confidence": 0.5}
             
             # 解析响应
@@ -232,6 +241,22 @@ Be thorough but concise."""
                 "confidence": 0.0
             }
     
+    async def _ask(self, prompt: str) -> Optional[str]:
+        """
+        调用 LLM 的 complete() 或 chat()，不支持时返回 None
+        
+        支持 temperature 参数时使用 temperature=0：结果确定，可由 LLM 响应缓存复用
+        """
+        if hasattr(self.llm, 'complete'):
+            method, args = self.llm.complete, (prompt,)
+        elif hasattr(self.llm, 'chat'):
+            method, args = self.llm.chat, ([{"role": "user", "content": prompt}],)
+        else:
+            return None
+        
+        kwargs = {"temperature": 0} if _accepts_temperature(method) else {}
+        return await method(*args, **kwargs)
+    
     def _parse_llm_response(self, response: str) -> Dict[str, Any]:
         """解析 LLM 响应"""
         issues = []
@@ -318,11 +343,8 @@ Return ONLY the fixed code, no explanations:
 """
         
         try:
-            if hasattr(self.llm, 'complete'):
-                fixed = await self.llm.complete(prompt)
-            elif hasattr(self.llm, 'chat'):
-                fixed = await self.llm.chat([{"role": "user", "content": prompt}])
-            else:
+            fixed = await self._ask(prompt)
+            if fixed is None:
                 return None
             
             return self._clean_code(fixed)
@@ -14,6 +14,7 @@ P1/P2 Enhancements:
 from koda.agent.agent import Agent, AgentConfig, AgentState
 from koda.agent.events import EventBus, Event, EventType
 from koda.agent.tools import ToolRegistry, Tool, ToolContext
+from koda.agent.context_cache import FileSnapshotCache, MessageView
 from koda.agent.queue import MessageQueue, QueuedMessage
 from koda.agent.loop import AgentLoop, AgentLoopConfig, AgentTool
 from koda.agent.types import (
@@ -54,6 +55,9 @@ __all__ = [
     "ToolRegistry",
     "Tool",
     "ToolContext",
+    # Context cache
+    "FileSnapshotCache",
+    "MessageView",
     # Queue
     "MessageQueue",
     "QueuedMessage",
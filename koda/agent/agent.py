@@ -20,9 +20,11 @@ from pathlib import Path
 from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
 
 from koda.ai.provider import LLMProvider, Message, StreamEvent, ToolCall
+from koda.ai.rate_limiter import TokenBudgetLimiter
 from koda.ai.types import AssistantMessage, UserMessage, TextContent, ImageContent
 from koda.agent.events import EventBus, Event, EventType
 from koda.agent.tools import ToolRegistry, ToolContext
+from koda.agent.context_cache import FileSnapshotCache
 from koda.agent.queue import MessageQueue, DeliveryMode
 from koda.agent.transform import convert_to_llm, transform_context, TransformConfig
 from koda.agent.types import (
@@ -77,6 +79,11 @@ class AgentConfig:
     # P1: Thinking budget configuration
     thinking_budget: Optional[ThinkingBudget] = None
 
+    # Shared token/request budget (e.g. agents using one API key); the key
+    # defaults to the provider's, which its rate-limit headers also update
+    rate_limiter: Optional[TokenBudgetLimiter] = None
+    rate_limit_key: Optional[str] = None
+
 
 @dataclass
 class AgentMessage:
@@ -206,6 +213,11 @@ class Agent:
         self.llm = llm_provider
         self.config = config or AgentConfig()
 
+        # Let the provider's response headers adapt the budget we reserve from
+        if (self.config.rate_limiter is not None and hasattr(self.llm, "rate_limiter")
+                and self.llm.rate_limiter is None):
+            self.llm.rate_limiter = self.config.rate_limiter
+
         # P1: Dynamic API Key resolution
         self._get_api_key = get_api_key
 
@@ -238,6 +250,11 @@ class Agent:
         # P1: Pending tool calls tracking
         self._pending_tool_calls: Dict[str, PendingToolCall] = {}
 
+        # Memoized system prompt, keyed by tools version + AGENTS.md stamps
+        self._agents_md_cache = FileSnapshotCache()
+        self._system_prompt_key: Optional[tuple] = None
+        self._system_prompt: Optional[str] = None
+
         # Register built-in tools
         self._register_builtin_tools()
 
@@ -564,16 +581,12 @@ class Agent:
 
     def _apply_transform(self, messages: List[Message]) -> List[Message]:
         """Apply context transformation"""
-        from koda.ai.types import Context, Tool
+        from koda.ai.types import Context
 
         # Convert to Context for transform
         tools = None
         if self.tools:
-            tools = [
-                Tool(name=t.name, description=t.description, parameters=t.parameters)
-                for t in [self.tools.get(name) for name in self.tools.list_tools()]
-                if t
-            ]
+            tools = self.tools.get_ai_tools()
 
         context = Context(
             system_prompt=self._build_system_prompt(),
@@ -590,8 +603,35 @@ class Agent:
 
         return list(result.context.messages)
 
+    def _agents_md_paths(self) -> List[Path]:
+        """AGENTS.md locations, global first"""
+        return [
+            Path.home() / ".koda" / "AGENTS.md",
+            Path(self.config.working_dir) / "AGENTS.md",
+        ]
+
     def _build_system_prompt(self) -> str:
-        """Build system prompt"""
+        """
+        Build system prompt
+
+        The rendered prompt is reused until a tool is (un)registered, the
+        working directory changes or an AGENTS.md file changes on disk.
+        """
+        paths = self._agents_md_paths()
+        key = (
+            self.tools.version,
+            str(self.config.working_dir),
+            self._agents_md_cache.stamp(paths),
+        )
+        if self._system_prompt is not None and key == self._system_prompt_key:
+            return self._system_prompt
+
+        self._system_prompt = self._render_system_prompt()
+        self._system_prompt_key = key
+        return self._system_prompt
+
+    def _render_system_prompt(self) -> str:
+        """Render system prompt from tools, config and AGENTS.md"""
         lines = [
             "You are Koda, a helpful coding assistant.",
             "",
@@ -621,31 +661,8 @@ class Agent:
 
     def _load_agents_md(self) -> str:
         """Load AGENTS.md files"""
-        content = []
-
-        # Global
-        global_path = Path.home() / ".koda" / "AGENTS.md"
-        if global_path.exists():
-            content.append(global_path.read_text(encoding="utf-8"))
-
-        # Local
-        local_path = self.config.working_dir / "AGENTS.md"
-        if local_path.exists():
-            content.append(local_path.read_text(encoding="utf-8"))
-
-        return "\n\n".join(content)
-
-    async def _call_llm(self, messages: List[Message]) -> AsyncIterator[StreamEvent]:
-        """Call LLM provider"""
-        tool_definitions = self.tools.get_definitions()
-
-        async for event in self.llm.chat(
-            messages=messages,
-            tools=tool_definitions,
-            temperature=self.config.temperature,
-            stream=True
-        ):
-            yield event
+        content = [self._agents_md_cache.read(path) for path in self._agents_md_paths()]
+        return "\n\n".join(c for c in content if c)
 
     def cancel(self) -> None:
         """Cancel current execution"""
@@ -917,62 +934,49 @@ class Agent:
         
         return messages
     
-    def _build_system_prompt(self) -> str:
-        """Build system prompt"""
-        lines = [
-            "You are Koda, a helpful coding assistant.",
-            "",
-            "Available tools:",
-        ]
-        
-        for name in self.tools.list_tools():
-            tool = self.tools.get(name)
-            lines.append(f"- {name}: {tool.description}")
-        
-        lines.extend([
-            "",
-            f"Working directory: {self.config.working_dir}",
-            "",
-            "Rules:",
-            "1. Use tools to accomplish tasks",
-            "2. Reference files with @filename",
-            "3. Use bash for file operations when appropriate",
-        ])
-        
-        # Load AGENTS.md
-        agents_md = self._load_agents_md()
-        if agents_md:
-            lines.extend(["", "Context from AGENTS.md:", agents_md])
-        
-        return "\n".join(lines)
-    
-    def _load_agents_md(self) -> str:
-        """Load AGENTS.md files"""
-        content = []
-        
-        # Global
-        global_path = Path.home() / ".koda" / "AGENTS.md"
-        if global_path.exists():
-            content.append(global_path.read_text(encoding="utf-8"))
-        
-        # Local
-        local_path = self.config.working_dir / "AGENTS.md"
-        if local_path.exists():
-            content.append(local_path.read_text(encoding="utf-8"))
-        
-        return "\n\n".join(content)
+    def _rate_limit_key(self) -> str:
+        """Budget key: configured, else the provider's (matches its header feedback)"""
+        return self.config.rate_limit_key or getattr(self.llm, "rate_limit_key", None) or "default"
     
     async def _call_llm(self, messages: List[Message]) -> AsyncIterator[StreamEvent]:
         """Call LLM provider"""
         tool_definitions = self.tools.get_definitions()
         
-        async for event in self.llm.chat(
-            messages=messages,
-            tools=tool_definitions,
-            temperature=self.config.temperature,
-            stream=True
-        ):
-            yield event
+        limiter = self.config.rate_limiter
+        if limiter is None:
+            async for event in self.llm.chat(
+                messages=messages,
+                tools=tool_definitions,
+                temperature=self.config.temperature,
+                stream=True
+            ):
+                yield event
+            return
+        
+        # Reserve the estimated cost, then settle it with the reported usage
+        reservation = await limiter.acquire(
+            self._rate_limit_key(),
+            input_tokens=self.history.optimizer.count_tokens(messages),
+        )
+        usage = None
+        try:
+            async for event in self.llm.chat(
+                messages=messages,
+                tools=tool_definitions,
+                temperature=self.config.temperature,
+                stream=True
+            ):
+                if event.type == "usage":
+                    usage = event.data
+                elif event.type == "stop":
+                    # Callers stop iterating here, so settle before yielding
+                    limiter.reconcile(reservation, usage)
+                yield event
+        except Exception:
+            limiter.release(reservation)
+            raise
+        finally:
+            limiter.reconcile(reservation, usage)
     
     def cancel(self) -> None:
         """Cancel current execution"""
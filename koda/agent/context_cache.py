@@ -0,0 +1,134 @@
+"""
+Context Cache
+
+Helpers for assembling LLM context without redoing work on every turn.
+
+Provides:
+- FileSnapshotCache: text file reads revalidated by (mtime, size)
+- MessageView: read-only, copy-free snapshot of a message list
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union, overload
+
+T = TypeVar("T")
+
+# (st_mtime_ns, st_size) of a file, or None when it does not exist
+FileStamp = Optional[Tuple[int, int]]
+
+
+def file_stamp(path: Union[str, Path]) -> FileStamp:
+    """Cheap change marker for a file: one stat() call, no read"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileSnapshotCache:
+    """
+    Cache of small text files (AGENTS.md and friends)
+
+    A file is re-read only when its mtime or size changes, so checking
+    whether prompt inputs are still current costs a stat() per file.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[FileStamp, str]] = {}
+        self._lock = threading.Lock()
+        self.reads = 0
+
+    def stamp(self, paths: Sequence[Union[str, Path]]) -> Tuple[FileStamp, ...]:
+        """Combined change marker for several files"""
+        return tuple(file_stamp(p) for p in paths)
+
+    def read(self, path: Union[str, Path]) -> str:
+        """
+        Read a text file, reusing the cached content if unchanged
+
+        Args:
+            path: File path
+
+        Returns:
+            File content, or "" if the file does not exist
+        """
+        key = str(path)
+        stamp = file_stamp(key)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] == stamp:
+                return cached[1]
+
+        if stamp is None:
+            content = ""
+        else:
+            try:
+                content = Path(key).read_text(encoding="utf-8")
+            except OSError:
+                content = ""
+            self.reads += 1
+
+        with self._lock:
+            self._entries[key] = (stamp, content)
+        return content
+
+    def clear(self) -> None:
+        """Drop all cached file contents"""
+        with self._lock:
+            self._entries.clear()
+
+
+class MessageView(Sequence[T]):
+    """
+    Read-only view of the first N items of a list
+
+    Handing providers a view instead of list(messages) avoids copying the
+    whole conversation on every call. The length is fixed at creation, so
+    messages appended to the session while a request is in flight do not
+    leak into it.
+    """
+
+    __slots__ = ("_items", "_length")
+
+    def __init__(self, items: List[T], length: Optional[int] = None):
+        if isinstance(items, MessageView):
+            base_length = items._length
+            items = items._items
+        else:
+            base_length = len(items)
+        self._items = items
+        self._length = base_length if length is None else min(length, base_length)
+
+    def __len__(self) -> int:
+        return min(self._length, len(self._items))
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._items[:len(self)][index]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("message index out of range")
+        return self._items[index]
+
+    def __iter__(self) -> Iterator[T]:
+        items = self._items
+        for i in range(len(self)):
+            yield items[i]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (MessageView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"MessageView({len(self)} messages)"
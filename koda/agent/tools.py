@@ -61,11 +61,25 @@ class ToolRegistry:
     - Register/unregister tools
     - Tool lookup by name
     - Execute tools with context
+    - Versioned, cached LLM definitions
     """
     
     def __init__(self):
         self._tools: Dict[str, Tool] = {}
         self._execution_history: List[Dict[str, Any]] = []
+        self._version = 0
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._ai_tools: Optional[List[Any]] = None
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever the set of tools changes"""
+        return self._version
+    
+    def _changed(self) -> None:
+        self._version += 1
+        self._definitions = None
+        self._ai_tools = None
     
     def register(self, tool: Tool) -> None:
         """
@@ -75,6 +89,7 @@ class ToolRegistry:
             tool: Tool to register
         """
         self._tools[tool.name] = tool
+        self._changed()
     
     def unregister(self, name: str) -> bool:
         """
@@ -88,6 +103,7 @@ class ToolRegistry:
         """
         if name in self._tools:
             del self._tools[name]
+            self._changed()
             return True
         return False
     
@@ -112,8 +128,20 @@ class ToolRegistry:
         return list(self._tools.keys())
     
     def get_definitions(self) -> List[Dict[str, Any]]:
-        """Get all tool definitions for LLM"""
-        return [tool.to_definition() for tool in self._tools.values()]
+        """Get all tool definitions for LLM (built once per registry version)"""
+        if self._definitions is None:
+            self._definitions = [tool.to_definition() for tool in self._tools.values()]
+        return list(self._definitions)
+    
+    def get_ai_tools(self) -> List[Any]:
+        """Get all tools as koda.ai.types.Tool (built once per registry version)"""
+        if self._ai_tools is None:
+            from koda.ai.types import Tool as AITool
+            self._ai_tools = [
+                AITool(name=tool.name, description=tool.description, parameters=tool.parameters)
+                for tool in self._tools.values()
+            ]
+        return list(self._ai_tools)
     
     async def execute(
         self,
@@ -22,13 +22,14 @@ from .overflow import is_context_overflow, get_overflow_patterns, add_overflow_p
 from .settings import SettingsManager
 from .agent_proxy import HTTPStreamProxy
 from .json_schema import JSONSchemaValidator, validate_json_schema
+from .schema_compiler import CompiledSchema, compile_schema
 from .validation import MessageValidator, ValidationResult
 from .session import SessionManager, SessionEntry, SessionEntryType
 from .edits import EditOperation, EditProcessor, EditResult
 from .pkce import generate_code_verifier, generate_code_challenge, generate_pkce_challenge
 from .transform_messages import transform_messages
 from .token_counter import TokenCounter, TokenCount, count_tokens, estimate_cost
-from .rate_limiter import RateLimiter, RateLimitConfig, RateLimitStrategy, MultiKeyRateLimiter, rate_limited
+from .rate_limiter import RateLimiter, RateLimitConfig, RateLimitStrategy, MultiKeyRateLimiter, TokenBudgetLimiter, rate_limited
 from .retry import RetryHandler, RetryConfig, RetryStrategy, CircuitBreaker, CircuitBreakerConfig, CircuitState, CircuitBreakerOpenError, ResilientClient, retry
 from .env_api_keys import EnvAPIKeyManager, get_api_key, has_api_key, get_all_api_keys
 from .sanitize_unicode import sanitize_surrogates, sanitize_for_json
@@ -81,6 +82,8 @@ __all__ = [
     # JSON Schema
     "JSONSchemaValidator",
     "validate_json_schema",
+    "CompiledSchema",
+    "compile_schema",
     # Validation
     "MessageValidator",
     "ValidationResult",
@@ -108,6 +111,7 @@ __all__ = [
     "RateLimitConfig",
     "RateLimitStrategy",
     "MultiKeyRateLimiter",
+    "TokenBudgetLimiter",
     "rate_limited",
     # Retry
     "RetryHandler",
@@ -295,6 +295,8 @@ class GitHubCopilotProvider(BaseProvider):
             if e.code == 401:
                 raise OAuthError(f"Authentication failed: {error_msg}")
             elif e.code == 429:
+                # retry-after / x-ratelimit-* on the 429 tighten the shared budget
+                self._apply_rate_limits(dict(e.headers or {}))
                 raise Exception(f"Rate limited: {error_msg}")
             else:
                 raise Exception(f"HTTP {e.code}: {error_msg}")
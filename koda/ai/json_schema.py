@@ -7,10 +7,14 @@ JSON Schema validation utilities.
 from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 
+from .schema_compiler import compile_schema
+
 
 try:
     import jsonschema
     from jsonschema import validate, ValidationError as JsonSchemaValidationError
+    from jsonschema.exceptions import best_match
+    from jsonschema.validators import validator_for
     HAS_JSONSCHEMA = True
 except ImportError:
     HAS_JSONSCHEMA = False
@@ -28,7 +32,9 @@ class JSONSchemaValidator:
     """
     JSON Schema validator.
     
-    Validates data against JSON Schema.
+    Validates data against JSON Schema. Schemas are compiled once and
+    cached by schema hash (a jsonschema validator instance when the
+    library is installed, koda.ai.schema_compiler closures otherwise).
     
     Example:
         >>> validator = JSONSchemaValidator()
@@ -56,37 +62,23 @@ class JSONSchemaValidator:
             # Fallback: basic type checking
             return self._basic_validate(data, schema)
         
-        try:
-            validate(instance=data, schema=schema)
+        compiled = compile_schema(schema)
+        validator = compiled.extensions.get("jsonschema")
+        if validator is None:
+            # Checks the schema itself once, like jsonschema.validate()
+            cls = validator_for(compiled.schema)
+            cls.check_schema(compiled.schema)
+            validator = cls(compiled.schema)
+            compiled.extensions["jsonschema"] = validator
+        
+        error = best_match(validator.iter_errors(data))
+        if error is None:
             return ValidationResult(valid=True, errors=[])
-        except JsonSchemaValidationError as e:
-            return ValidationResult(valid=False, errors=[str(e)])
+        return ValidationResult(valid=False, errors=[str(error)])
     
     def _basic_validate(self, data: Any, schema: Dict[str, Any]) -> ValidationResult:
-        """Basic validation without jsonschema library"""
-        errors = []
-        
-        schema_type = schema.get("type")
-        if schema_type:
-            if schema_type == "object" and not isinstance(data, dict):
-                errors.append(f"Expected object, got {type(data).__name__}")
-            elif schema_type == "array" and not isinstance(data, list):
-                errors.append(f"Expected array, got {type(data).__name__}")
-            elif schema_type == "string" and not isinstance(data, str):
-                errors.append(f"Expected string, got {type(data).__name__}")
-            elif schema_type == "number" and not isinstance(data, (int, float)):
-                errors.append(f"Expected number, got {type(data).__name__}")
-            elif schema_type == "integer" and not isinstance(data, int):
-                errors.append(f"Expected integer, got {type(data).__name__}")
-            elif schema_type == "boolean" and not isinstance(data, bool):
-                errors.append(f"Expected boolean, got {type(data).__name__}")
-        
-        # Check required properties
-        if "required" in schema and isinstance(data, dict):
-            for prop in schema["required"]:
-                if prop not in data:
-                    errors.append(f"Missing required property: {prop}")
-        
+        """Validation without jsonschema library (compiled closures)"""
+        errors = compile_schema(schema).errors(data, dialect="jsonschema")
         return ValidationResult(valid=len(errors) == 0, errors=errors)
     
     def is_valid(self, data: Any, schema: Dict[str, Any]) -> bool:
@@ -5,9 +5,11 @@ Defines the unified interface for all LLM providers.
 """
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Union
 from datetime import datetime
 
+from koda.ai.rate_limiter import rate_limit_key
+
 
 @dataclass
 class ToolCall:
@@ -125,12 +127,38 @@ class LLMProvider(ABC):
     All providers must implement:
     - chat(): Main chat interface with streaming support
     - get_models(): List available models
+    
+    Pass rate_limiter=TokenBudgetLimiter(...) to feed response rate-limit
+    headers into a shared budget (see _http_event_hooks()).
     """
     
+    provider_id: str = "llm"  # Override in subclasses
+    
     def __init__(self, api_key: str, base_url: Optional[str] = None, **kwargs):
         self.api_key = api_key
         self.base_url = base_url
         self.config = kwargs
+        self.rate_limiter = kwargs.get("rate_limiter")
+    
+    @property
+    def rate_limit_key(self) -> str:
+        """Budget key shared by all providers using the same account"""
+        return rate_limit_key(self.provider_id, self.api_key)
+    
+    def _apply_rate_limits(self, headers: Mapping[str, str]) -> None:
+        """Feed response rate-limit headers (incl. retry-after) into the limiter"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(self.rate_limit_key, headers)
+    
+    def _http_event_hooks(self) -> Dict[str, List]:
+        """httpx event hooks that report every response's headers, 429s included"""
+        if self.rate_limiter is None:
+            return {}
+        
+        async def on_response(response) -> None:
+            self._apply_rate_limits(response.headers)
+        
+        return {"response": [on_response]}
     
     @abstractmethod
     async def chat(
@@ -23,8 +23,10 @@ from koda.ai.types import (
 if TYPE_CHECKING:
     from koda.ai.event_stream import AssistantMessageEventStream
     from koda.ai.http_proxy import ProxyConfig
+    from koda.ai.rate_limiter import TokenBudgetLimiter
 
 from koda.ai.event_stream import EventType, AssistantMessageEvent
+from koda.ai.rate_limiter import rate_limit_key
 
 
 @dataclass
@@ -43,6 +45,9 @@ class ProviderConfig:
     proxy_enabled: bool = True
     """Whether to use proxy for requests (default: True if proxy is configured)"""
 
+    rate_limiter: Optional["TokenBudgetLimiter"] = None
+    """Shared limiter fed with response rate-limit headers (keyed per provider + API key)"""
+
 
 class BaseProvider(ABC):
     """
@@ -56,6 +61,7 @@ class BaseProvider(ABC):
         self.config = config or ProviderConfig()
         self._rate_limit_remaining: Optional[int] = None
         self._rate_limit_reset: Optional[int] = None
+        self.rate_limiter: Optional["TokenBudgetLimiter"] = getattr(self.config, "rate_limiter", None)
         self._proxy_config: Optional["ProxyConfig"] = None
         self._session_manager = None
     
@@ -245,11 +251,21 @@ class BaseProvider(ABC):
         Standard headers:
         - x-ratelimit-remaining
         - x-ratelimit-reset
+        
+        When a rate_limiter is configured, all rate-limit headers
+        (including retry-after) are fed back into its budget.
         """
         self._rate_limit_remaining = int(headers.get("x-ratelimit-remaining", -1))
         reset_timestamp = headers.get("x-ratelimit-reset")
         if reset_timestamp:
             self._rate_limit_reset = int(reset_timestamp)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update_from_headers(self.rate_limit_key, headers)
+    
+    @property
+    def rate_limit_key(self) -> str:
+        """Budget key shared by all providers using the same account"""
+        return rate_limit_key(self.provider_id, getattr(self.config, "api_key", None))
     
     def should_retry(self, error: Exception, attempt: int) -> bool:
         """
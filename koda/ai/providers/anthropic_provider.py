@@ -19,6 +19,8 @@ class AnthropicProvider(LLMProvider):
     - 200K context window
     """
 
+    provider_id = "anthropic"
+
     DEFAULT_BASE_URL = "https://api.anthropic.com"
 
     def __init__(
@@ -64,14 +66,20 @@ class AnthropicProvider(LLMProvider):
                 "base_url": self.base_url,
             }
 
-            # Configure proxy if available
+            # Configure proxy and rate-limit header feedback if needed
             proxy_url = self._get_proxy_config()
-            if proxy_url:
+            event_hooks = self._http_event_hooks()
+            if proxy_url or event_hooks:
                 try:
-                    import httpx
-                    client_kwargs["http_client"] = httpx.AsyncClient(
-                        proxy=proxy_url,
-                        timeout=httpx.Timeout(60.0, connect=30.0)
+                    try:
+                        # The SDK's own client class, so hooks see its requests
+                        from anthropic import DefaultAsyncHttpxClient as AsyncClient, Timeout
+                    except ImportError:
+                        from httpx import AsyncClient, Timeout
+                    client_kwargs["http_client"] = AsyncClient(
+                        proxy=proxy_url or None,
+                        timeout=Timeout(60.0, connect=30.0),
+                        event_hooks=event_hooks,
                     )
                 except ImportError:
                     pass
@@ -19,6 +19,8 @@ class KimiProvider(LLMProvider):
     - Standard Kimi models
     """
 
+    provider_id = "kimi"
+
     DEFAULT_BASE_URL = "https://api.moonshot.cn/v1"
     CODING_BASE_URL = "https://api.kimi.com/coding/v1"
 
@@ -80,13 +82,20 @@ class KimiProvider(LLMProvider):
                 "default_headers": headers,
             }
 
+            # Configure proxy and rate-limit header feedback if needed
             proxy_url = self._get_proxy_config()
-            if proxy_url:
+            event_hooks = self._http_event_hooks()
+            if proxy_url or event_hooks:
                 try:
-                    import httpx
-                    client_kwargs["http_client"] = httpx.AsyncClient(
-                        proxy=proxy_url,
-                        timeout=httpx.Timeout(60.0, connect=30.0)
+                    try:
+                        # The SDK's own client class, so hooks see its requests
+                        from openai import DefaultAsyncHttpxClient as AsyncClient, Timeout
+                    except ImportError:
+                        from httpx import AsyncClient, Timeout
+                    client_kwargs["http_client"] = AsyncClient(
+                        proxy=proxy_url or None,
+                        timeout=Timeout(60.0, connect=30.0),
+                        event_hooks=event_hooks,
                     )
                 except ImportError:
                     # httpx not available, continue without proxy
@@ -18,6 +18,8 @@ class OpenAIProvider(LLMProvider):
     - Compatible APIs (Kimi, OpenRouter, Azure, etc.)
     """
 
+    provider_id = "openai"
+
     def __init__(
         self,
         api_key: str,
@@ -61,14 +63,20 @@ class OpenAIProvider(LLMProvider):
                 "base_url": self.base_url,
             }
 
-            # Configure proxy if available
+            # Configure proxy and rate-limit header feedback if needed
             proxy_url = self._get_proxy_config()
-            if proxy_url:
+            event_hooks = self._http_event_hooks()
+            if proxy_url or event_hooks:
                 try:
-                    import httpx
-                    client_kwargs["http_client"] = httpx.AsyncClient(
-                        proxy=proxy_url,
-                        timeout=httpx.Timeout(60.0, connect=30.0)
+                    try:
+                        # The SDK's own client class, so hooks see its requests
+                        from openai import DefaultAsyncHttpxClient as AsyncClient, Timeout
+                    except ImportError:
+                        from httpx import AsyncClient, Timeout
+                    client_kwargs["http_client"] = AsyncClient(
+                        proxy=proxy_url or None,
+                        timeout=Timeout(60.0, connect=30.0),
+                        event_hooks=event_hooks,
                     )
                 except ImportError:
                     # httpx not available, continue without proxy
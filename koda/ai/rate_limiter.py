@@ -2,11 +2,16 @@
 Rate Limiter
 Equivalent to Pi Mono's packages/ai/src/utils/rate-limiter.ts
 
-Advanced rate limiting with token bucket and sliding window.
+Advanced rate limiting with token bucket and sliding window, plus a
+token-budget limiter that adapts to provider rate-limit headers.
 """
 import time
 import asyncio
-from typing import Dict, Optional, Callable, Any
+import hashlib
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Callable, Any
 from dataclasses import dataclass
 from enum import Enum
 from collections import deque
@@ -27,6 +32,7 @@ class RateLimitConfig:
     tokens_per_minute: int = 100000
     burst_size: int = 10
     strategy: RateLimitStrategy = RateLimitStrategy.TOKEN_BUCKET
+    default_output_tokens: int = 4096  # reserved when a request sets no max_tokens
 
 
 class RateLimiter:
@@ -281,6 +287,343 @@ class MultiKeyRateLimiter:
         return {k: v.get_status() for k, v in self._limiters.items()}
 
 
+# Header names per quantity, most specific first (OpenAI style, Anthropic style, legacy)
+_LIMIT_REQUESTS_HEADERS = ("x-ratelimit-limit-requests", "anthropic-ratelimit-requests-limit")
+_LIMIT_TOKENS_HEADERS = ("x-ratelimit-limit-tokens", "anthropic-ratelimit-tokens-limit")
+_REMAINING_REQUESTS_HEADERS = (
+    "x-ratelimit-remaining-requests", "anthropic-ratelimit-requests-remaining", "x-ratelimit-remaining",
+)
+_REMAINING_TOKENS_HEADERS = ("x-ratelimit-remaining-tokens", "anthropic-ratelimit-tokens-remaining")
+_RESET_REQUESTS_HEADERS = (
+    "x-ratelimit-reset-requests", "anthropic-ratelimit-requests-reset", "x-ratelimit-reset",
+)
+_RESET_TOKENS_HEADERS = ("x-ratelimit-reset-tokens", "anthropic-ratelimit-tokens-reset")
+
+# Go-style durations used by OpenAI, e.g. "20ms", "1s", "6m0s", "1h2m3.5s"
+_DURATION_RE = re.compile(r"^(?:([\d.]+)h)?(?:([\d.]+)m(?!s))?(?:([\d.]+)s)?(?:([\d.]+)ms)?$")
+
+
+def rate_limit_key(provider: str, api_key: Optional[str] = None) -> str:
+    """Budget key for a provider account (the API key is hashed, never stored)"""
+    if not api_key:
+        return provider
+    return f"{provider}:{hashlib.sha256(api_key.encode()).hexdigest()[:12]}"
+
+
+def _first_header(headers: Mapping[str, str], names) -> Optional[str]:
+    for name in names:
+        value = headers.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until a reset given as a duration, delta, epoch or timestamp"""
+    if value is None:
+        return None
+    value = value.strip()
+    number = _parse_number(value)
+    if number is not None:
+        # Large values are epoch timestamps, small ones are deltas
+        return max(0.0, number - time.time()) if number > 1e9 else max(0.0, number)
+    match = _DURATION_RE.match(value)
+    if match and any(match.groups()):
+        h, m, sec, ms = (float(g) if g else 0.0 for g in match.groups())
+        return h * 3600 + m * 60 + sec + ms / 1000
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, reset_at.timestamp() - time.time())
+
+
+def _parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to back off from retry-after-ms / retry-after (delta or HTTP date)"""
+    retry_ms = _parse_number(headers.get("retry-after-ms"))
+    if retry_ms is not None:
+        return max(0.0, retry_ms / 1000)
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    seconds = _parse_number(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage_tokens(usage: Any) -> int:
+    """Billed tokens from koda.ai.types.Usage or koda.ai.provider.Usage"""
+    total = (getattr(usage, "input", 0) or 0) + (getattr(usage, "output", 0) or 0)
+    if not total:
+        total = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+    return total or (getattr(usage, "total_tokens", 0) or 0)
+
+
+@dataclass
+class RateLimitReservation:
+    """Budget taken by one request, settled with reconcile() or release()"""
+    key: str
+    tokens: int
+    settled: bool = False
+
+
+class _Budget:
+    """Request and token buckets for one key (refilled continuously per minute)"""
+    
+    __slots__ = (
+        "requests_limit", "tokens_limit", "requests", "tokens",
+        "updated", "blocked_until", "waiters", "in_flight",
+    )
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_limit = float(requests_per_minute)
+        self.tokens_limit = float(tokens_per_minute)
+        self.requests = self.requests_limit
+        self.tokens = self.tokens_limit
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters: deque = deque()
+        self.in_flight = 0
+    
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed <= 0:
+            return
+        self.requests = min(self.requests_limit, self.requests + elapsed * self.requests_limit / 60)
+        self.tokens = min(self.tokens_limit, self.tokens + elapsed * self.tokens_limit / 60)
+        self.updated = now
+    
+    def wait_time(self, now: float, tokens: int) -> float:
+        """Seconds until one request of `tokens` fits (0 if it fits now)"""
+        wait = max(0.0, self.blocked_until - now)
+        if self.requests < 1:
+            wait = max(wait, (1 - self.requests) * 60 / self.requests_limit)
+        # A request larger than the whole budget waits for a full bucket only
+        needed = min(tokens, self.tokens_limit)
+        if self.tokens < needed:
+            wait = max(wait, (needed - self.tokens) * 60 / self.tokens_limit)
+        return wait
+
+
+class TokenBudgetLimiter:
+    """
+    Per-key limiter budgeting both requests/min and tokens/min.
+    
+    Each request reserves its estimated cost (input estimate + max output)
+    before it is sent and is reconciled with the actual usage afterwards,
+    so concurrent agents sharing one API key stay under the provider's
+    limits without 429s. Limits and remaining budget adapt to the
+    provider's x-ratelimit-* / anthropic-ratelimit-* and retry-after
+    headers. Waiters are served in FIFO order so large requests are not
+    starved by small ones.
+    
+    Example:
+        >>> limiter = TokenBudgetLimiter(RateLimitConfig(requests_per_minute=50, tokens_per_minute=40000))
+        >>> reservation = await limiter.acquire("anthropic", input_tokens=estimate_tokens(context), output_tokens=1024)
+        >>> # Make API call
+        >>> limiter.update_from_headers("anthropic", response.headers)
+        >>> limiter.reconcile(reservation, message.usage)
+    """
+    
+    def __init__(self, config: Optional[RateLimitConfig] = None):
+        self.config = config or RateLimitConfig()
+        self._budgets: Dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+    
+    def _budget(self, key: str) -> _Budget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = _Budget(
+                self.config.requests_per_minute, self.config.tokens_per_minute
+            )
+        return budget
+    
+    async def acquire(
+        self,
+        key: str = "default",
+        input_tokens: int = 0,
+        output_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[RateLimitReservation]:
+        """
+        Wait until a request fits the budget and reserve its estimated cost.
+        
+        Args:
+            key: Budget key, e.g. rate_limit_key(provider, api_key)
+            input_tokens: Estimated prompt tokens
+            output_tokens: Max output tokens (config.default_output_tokens if None)
+            timeout: Maximum wait time in seconds
+            
+        Returns:
+            Reservation to settle after the call, or None on timeout
+        """
+        if output_tokens is None:
+            output_tokens = self.config.default_output_tokens
+        tokens = max(0, int(input_tokens)) + max(0, int(output_tokens))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+        
+        with self._lock:
+            budget = self._budget(key)
+            budget.waiters.append(ticket)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    budget.refill(now)
+                    if budget.waiters[0] is ticket:
+                        wait = budget.wait_time(now, tokens)
+                        if wait <= 0:
+                            budget.requests -= 1
+                            budget.tokens -= tokens
+                            budget.in_flight += 1
+                            return RateLimitReservation(key=key, tokens=tokens)
+                    else:
+                        # Queued behind another request
+                        wait = 0.05
+                
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    wait = min(wait, remaining)
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                try:
+                    budget.waiters.remove(ticket)
+                except ValueError:
+                    pass
+    
+    def reconcile(self, reservation: RateLimitReservation, usage: Any = None, actual_tokens: Optional[int] = None) -> None:
+        """
+        Settle a reservation with the tokens the request actually used.
+        
+        Unused reserved tokens are returned to the budget; an overrun is
+        charged, delaying later requests. Without usage the estimate stands.
+        """
+        if reservation.settled:
+            return
+        if actual_tokens is None and usage is not None:
+            actual_tokens = _usage_tokens(usage)
+        with self._lock:
+            budget = self._budget(reservation.key)
+            budget.refill(time.monotonic())
+            if actual_tokens is not None:
+                budget.tokens = min(budget.tokens_limit, budget.tokens + reservation.tokens - actual_tokens)
+            budget.in_flight = max(0, budget.in_flight - 1)
+        reservation.settled = True
+    
+    def release(self, reservation: RateLimitReservation) -> None:
+        """Return all reserved tokens (the request failed before being processed)"""
+        self.reconcile(reservation, actual_tokens=0)
+    
+    def set_limits(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        """Override the per-minute limits for a key"""
+        with self._lock:
+            budget = self._budget(key)
+            budget.refill(time.monotonic())
+            if requests_per_minute and requests_per_minute > 0:
+                budget.requests_limit = float(requests_per_minute)
+                budget.requests = min(budget.requests, budget.requests_limit)
+            if tokens_per_minute and tokens_per_minute > 0:
+                budget.tokens_limit = float(tokens_per_minute)
+                budget.tokens = min(budget.tokens, budget.tokens_limit)
+    
+    def update_from_headers(self, key: str, headers: Mapping[str, str]) -> None:
+        """
+        Adapt a key's budget to provider rate-limit headers.
+        
+        - *-limit-*: replaces the per-minute limits
+        - *-remaining-*: lowers the local budget to what the server reports
+        - *-reset-*: blocks the key until reset when a budget is exhausted
+        - retry-after(-ms): blocks the key and restarts refilling afterwards
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        self.set_limits(
+            key,
+            requests_per_minute=_parse_number(_first_header(headers, _LIMIT_REQUESTS_HEADERS)),
+            tokens_per_minute=_parse_number(_first_header(headers, _LIMIT_TOKENS_HEADERS)),
+        )
+        
+        remaining_requests = _parse_number(_first_header(headers, _REMAINING_REQUESTS_HEADERS))
+        remaining_tokens = _parse_number(_first_header(headers, _REMAINING_TOKENS_HEADERS))
+        retry_after = _parse_retry_after(headers)
+        
+        with self._lock:
+            budget = self._budget(key)
+            now = time.monotonic()
+            budget.refill(now)
+            
+            # Headers can be stale relative to other in-flight requests,
+            # so they only ever lower the local budget
+            if remaining_requests is not None and remaining_requests >= 0:
+                budget.requests = min(budget.requests, remaining_requests)
+                if remaining_requests < 1:
+                    reset = _parse_reset(_first_header(headers, _RESET_REQUESTS_HEADERS))
+                    if reset:
+                        budget.blocked_until = max(budget.blocked_until, now + reset)
+            if remaining_tokens is not None and remaining_tokens >= 0:
+                budget.tokens = min(budget.tokens, remaining_tokens)
+                if remaining_tokens < 1:
+                    reset = _parse_reset(_first_header(headers, _RESET_TOKENS_HEADERS))
+                    if reset:
+                        budget.blocked_until = max(budget.blocked_until, now + reset)
+            
+            if retry_after is not None:
+                # Rate limited: drain and start refilling once the block ends
+                budget.blocked_until = max(budget.blocked_until, now + retry_after)
+                budget.requests = min(budget.requests, 0.0)
+                budget.tokens = min(budget.tokens, 0.0)
+                budget.updated = max(budget.updated, budget.blocked_until)
+    
+    def time_until_available(self, key: str = "default", tokens: int = 0) -> float:
+        """Seconds until a request of `tokens` could be admitted for a key"""
+        with self._lock:
+            budget = self._budget(key)
+            now = time.monotonic()
+            budget.refill(now)
+            return budget.wait_time(now, tokens)
+    
+    def get_status(self, key: Optional[str] = None) -> Dict[str, Any]:
+        """Get budget status for all or a specific key"""
+        with self._lock:
+            now = time.monotonic()
+            keys = [key] if key else list(self._budgets)
+            status = {}
+            for k in keys:
+                budget = self._budget(k)
+                budget.refill(now)
+                status[k] = {
+                    "requests_per_minute": budget.requests_limit,
+                    "tokens_per_minute": budget.tokens_limit,
+                    "available_requests": budget.requests,
+                    "available_tokens": budget.tokens,
+                    "in_flight": budget.in_flight,
+                    "waiting": len(budget.waiters),
+                    "blocked_for": max(0.0, budget.blocked_until - now),
+                }
+            return status
+
+
 # Decorator for rate limiting
 def rate_limited(
     requests_per_minute: int = 60,
@@ -314,5 +657,8 @@ __all__ = [
     "RateLimitConfig",
     "RateLimitStrategy",
     "MultiKeyRateLimiter",
+    "TokenBudgetLimiter",
+    "RateLimitReservation",
+    "rate_limit_key",
     "rate_limited",
 ]
@@ -2,13 +2,24 @@
 Model Registry - Dynamic model discovery and metadata management
 Equivalent to Pi Mono's packages/ai/src/models.ts + packages/coding-agent/src/core/model-registry.ts
 """
-from typing import Dict, List, Optional, Set, Callable, Any
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Callable, Any, Tuple
+from dataclasses import dataclass, field, replace
 from enum import Enum
+from functools import lru_cache
+from bisect import bisect_left
 import json
+import os
+import threading
+import time
 from pathlib import Path
 
 
+# On-disk catalog format; bump when the layout changes so old caches are ignored
+CATALOG_SCHEMA_VERSION = 2
+DEFAULT_CATALOG_PATH = Path.home() / ".koda" / "models-catalog.json"
+DEFAULT_CATALOG_MAX_AGE = 24 * 60 * 60  # seconds
+
+
 class ModelCapability(Enum):
     """Model capabilities"""
     CHAT = "chat"
@@ -74,21 +85,12 @@ class ModelInfo:
         )
 
 
-class ModelRegistry:
-    """
-    Central registry for all available models.
-    Supports dynamic discovery and metadata queries.
-    """
-    
-    def __init__(self):
-        self._models: Dict[str, ModelInfo] = {}
-        self._provider_discoverers: Dict[str, Callable[[], List[ModelInfo]]] = {}
-        self._load_builtin_models()
-    
-    def _load_builtin_models(self):
-        """Load built-in model definitions"""
+@lru_cache(maxsize=1)
+def _builtin_models() -> Tuple[ModelInfo, ...]:
+    """Built-in model definitions (constructed once per process)"""
+    return (
         # OpenAI models
-        self.register(ModelInfo(
+        ModelInfo(
             id="gpt-4o",
             name="GPT-4o",
             provider="openai",
@@ -102,9 +104,9 @@ class ModelRegistry:
             pricing_input_per_1k=0.0025,
             pricing_output_per_1k=0.01,
             description="OpenAI's flagship model",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="gpt-4o-mini",
             name="GPT-4o Mini",
             provider="openai",
@@ -118,9 +120,9 @@ class ModelRegistry:
             pricing_input_per_1k=0.00015,
             pricing_output_per_1k=0.0006,
             description="Fast, affordable small model",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="o3-mini",
             name="o3 Mini",
             provider="openai",
@@ -133,9 +135,9 @@ class ModelRegistry:
             pricing_input_per_1k=0.0011,
             pricing_output_per_1k=0.0044,
             description="Reasoning model",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="o1",
             name="o1",
             provider="openai",
@@ -148,10 +150,10 @@ class ModelRegistry:
             pricing_input_per_1k=0.015,
             pricing_output_per_1k=0.06,
             description="Advanced reasoning model",
-        ))
-        
+        ),
+
         # Anthropic models
-        self.register(ModelInfo(
+        ModelInfo(
             id="claude-3-5-sonnet-20241022",
             name="Claude 3.5 Sonnet",
             provider="anthropic",
@@ -165,9 +167,9 @@ class ModelRegistry:
             pricing_input_per_1k=0.003,
             pricing_output_per_1k=0.015,
             description="Balanced intelligence and speed",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="claude-3-5-haiku-20241022",
             name="Claude 3.5 Haiku",
             provider="anthropic",
@@ -180,9 +182,9 @@ class ModelRegistry:
             pricing_input_per_1k=0.0008,
             pricing_output_per_1k=0.004,
             description="Fast, cost-effective",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="claude-3-opus-20240229",
             name="Claude 3 Opus",
             provider="anthropic",
@@ -195,10 +197,10 @@ class ModelRegistry:
             pricing_input_per_1k=0.015,
             pricing_output_per_1k=0.075,
             description="Most capable Claude model",
-        ))
-        
+        ),
+
         # Kimi models
-        self.register(ModelInfo(
+        ModelInfo(
             id="kimi-k2",
             name="Kimi K2",
             provider="kimi",
@@ -209,9 +211,9 @@ class ModelRegistry:
                 ModelCapability.TOOLS, ModelCapability.STREAMING
             },
             description="Moonshot AI's Kimi K2 model",
-        ))
-        
-        self.register(ModelInfo(
+        ),
+
+        ModelInfo(
             id="kimi-k1-5",
             name="Kimi K1.5",
             provider="kimi",
@@ -222,17 +224,95 @@ class ModelRegistry:
                 ModelCapability.STREAMING
             },
             description="Kimi reasoning model",
-        ))
+        ),
+    )
+
+
+class _RegistryIndex:
+    """Lookup tables derived from the registered models (rebuilt per version)"""
+    
+    __slots__ = ("by_id_lower", "by_provider", "by_capability", "providers", "by_context", "lists", "names")
+    
+    def __init__(self, models: Dict[str, ModelInfo]):
+        self.by_id_lower: Dict[str, ModelInfo] = {}
+        self.by_provider: Dict[str, Set[str]] = {}
+        self.by_capability: Dict[ModelCapability, Set[str]] = {}
+        for model in models.values():
+            self.by_id_lower.setdefault(model.id.lower(), model)
+            self.by_provider.setdefault(model.provider, set()).add(model.id)
+            for capability in model.capabilities:
+                self.by_capability.setdefault(capability, set()).add(model.id)
+        self.providers = sorted(self.by_provider)
+        # Ascending context window, for bisecting select_for_context()
+        self.by_context = sorted(models.values(), key=lambda m: m.context_window)
+        # Memoized query results
+        self.lists: Dict[Tuple, List[ModelInfo]] = {}
+        self.names: Dict[str, Optional[ModelInfo]] = {}
+
+
+class ModelRegistry:
+    """
+    Central registry for all available models.
+    Supports dynamic discovery and metadata queries.
+    
+    Lookups go through indexes by provider, capability and context window
+    that are rebuilt at most once per change. With a cache_path, discovered
+    models are persisted to an on-disk catalog and loaded at startup, and
+    refresh_in_background() revalidates stale providers while queries keep
+    serving the cached catalog. Only discovered models are persisted, so
+    built-in definitions always come from the running version.
+    """
+    
+    def __init__(self, cache_path: Optional[Path] = None):
+        self._models: Dict[str, ModelInfo] = {}
+        self._provider_discoverers: Dict[str, Callable[[], List[ModelInfo]]] = {}
+        self._lock = threading.RLock()
+        self._version = 0
+        self._index: Optional[_RegistryIndex] = None
+        self._index_version = -1
+        self._fetched_at: Dict[str, float] = {}  # provider -> last successful discovery
+        self._discovered: Set[str] = set()  # ids of models from discoverers (persisted)
+        self._refresh_task: Optional[Any] = None
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._load_builtin_models()
+        if self.cache_path:
+            self.load_catalog()
+    
+    def _load_builtin_models(self):
+        """Load built-in model definitions"""
+        for model in _builtin_models():
+            # Copy so per-registry edits never leak into the shared table
+            self.register(replace(model, capabilities=set(model.capabilities)))
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped on every change to the registered models"""
+        return self._version
+    
+    def _get_index(self) -> _RegistryIndex:
+        index = self._index
+        if index is not None and self._index_version == self._version:
+            return index
+        with self._lock:
+            if self._index is None or self._index_version != self._version:
+                self._index = _RegistryIndex(self._models)
+                self._index_version = self._version
+            return self._index
     
     def register(self, model: ModelInfo) -> None:
         """Register a model"""
-        self._models[model.id] = model
+        with self._lock:
+            self._models[model.id] = model
+            self._version += 1
     
     def unregister(self, model_id: str) -> bool:
         """Unregister a model"""
-        if model_id in self._models:
-            del self._models[model_id]
-            return True
+        with self._lock:
+            if model_id in self._models:
+                del self._models[model_id]
+                self._discovered.discard(model_id)
+                self._version += 1
+                return True
         return False
     
     def get(self, model_id: str) -> Optional[ModelInfo]:
@@ -246,22 +326,33 @@ class ModelRegistry:
         exclude_deprecated: bool = True
     ) -> List[ModelInfo]:
         """List models with optional filtering"""
-        models = list(self._models.values())
-        
-        if provider:
-            models = [m for m in models if m.provider == provider]
+        index = self._get_index()
+        key = (provider, capability, exclude_deprecated)
+        cached = index.lists.get(key)
+        if cached is not None:
+            return list(cached)
         
-        if capability:
-            models = [m for m in models if capability in m.capabilities]
+        with self._lock:
+            if provider and capability:
+                ids = index.by_provider.get(provider, set()) & index.by_capability.get(capability, set())
+            elif provider:
+                ids = index.by_provider.get(provider, set())
+            elif capability:
+                ids = index.by_capability.get(capability, set())
+            else:
+                ids = self._models.keys()
+            models = [self._models[i] for i in ids if i in self._models]
         
         if exclude_deprecated:
             models = [m for m in models if not m.deprecated]
         
-        return sorted(models, key=lambda m: m.name)
+        models.sort(key=lambda m: m.name)
+        index.lists[key] = models
+        return list(models)
     
     def list_providers(self) -> List[str]:
         """List all providers"""
-        return sorted(set(m.provider for m in self._models.values()))
+        return list(self._get_index().providers)
     
     def register_provider_discoverer(
         self, 
@@ -274,44 +365,125 @@ class ModelRegistry:
         """
         self._provider_discoverers[provider] = discoverer
     
-    async def refresh(self) -> int:
+    async def refresh(self, providers: Optional[List[str]] = None) -> int:
         """
-        Refresh model list by calling all registered discoverers.
+        Refresh model list by calling registered discoverers concurrently.
+        Sync discoverers run in a worker thread so they do not block the loop.
         Returns number of models discovered.
         """
         import asyncio
-        discovered = 0
         
-        for provider, discoverer in self._provider_discoverers.items():
-            try:
-                if asyncio.iscoroutinefunction(discoverer):
-                    models = await discoverer()
-                else:
-                    models = discoverer()
-                
+        discoverers = {
+            provider: discoverer
+            for provider, discoverer in self._provider_discoverers.items()
+            if providers is None or provider in providers
+        }
+        
+        async def discover(discoverer):
+            if asyncio.iscoroutinefunction(discoverer):
+                return await discoverer()
+            return await asyncio.get_running_loop().run_in_executor(None, discoverer)
+        
+        results = await asyncio.gather(
+            *(discover(d) for d in discoverers.values()),
+            return_exceptions=True,
+        )
+        
+        discovered = 0
+        for provider, models in zip(discoverers, results):
+            if isinstance(models, BaseException):
+                print(f"Failed to discover models from {provider}: {models}")
+                continue
+            with self._lock:
                 for model in models:
                     self.register(model)
+                    self._discovered.add(model.id)
                     discovered += 1
-            except Exception as e:
-                print(f"Failed to discover models from {provider}: {e}")
+                self._fetched_at[provider] = time.time()
+        
+        if self.cache_path and discovered:
+            try:
+                self.save_catalog()
+            except OSError as e:
+                print(f"Failed to save model catalog: {e}")
         
         return discovered
     
+    def stale_providers(self, max_age: float = DEFAULT_CATALOG_MAX_AGE) -> List[str]:
+        """Providers with a discoverer whose models are older than max_age seconds"""
+        now = time.time()
+        return [
+            provider for provider in self._provider_discoverers
+            if now - self._fetched_at.get(provider, 0.0) > max_age
+        ]
+    
+    def refresh_in_background(self, max_age: float = DEFAULT_CATALOG_MAX_AGE) -> Optional[Any]:
+        """
+        Stale-while-revalidate refresh.
+        
+        Queries keep serving the current (possibly cached) catalog while the
+        stale providers are rediscovered. Inside a running event loop the
+        refresh is scheduled as a task; otherwise it runs on a daemon thread.
+        
+        Returns:
+            The asyncio.Task or threading.Thread doing the refresh, or None if
+            nothing is stale or a refresh is already running
+        """
+        import asyncio
+        
+        if self._refresh_running():
+            return None
+        
+        stale = self.stale_providers(max_age)
+        if not stale:
+            return None
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            self._refresh_task = loop.create_task(self.refresh(stale))
+        else:
+            self._refresh_task = threading.Thread(
+                target=lambda: asyncio.run(self.refresh(stale)),
+                name="koda-model-refresh",
+                daemon=True,
+            )
+            self._refresh_task.start()
+        return self._refresh_task
+    
+    def _refresh_running(self) -> bool:
+        task = self._refresh_task
+        if task is None:
+            return False
+        if isinstance(task, threading.Thread):
+            return task.is_alive()
+        return not task.done()
+    
     def find_by_name(self, name: str) -> Optional[ModelInfo]:
         """Find model by name (fuzzy match)"""
         name_lower = name.lower()
+        index = self._get_index()
         
         # Exact match first
-        for model in self._models.values():
-            if model.id.lower() == name_lower:
-                return model
+        model = index.by_id_lower.get(name_lower)
+        if model is not None:
+            return model
         
-        # Partial match
-        for model in self._models.values():
-            if name_lower in model.id.lower() or name_lower in model.name.lower():
-                return model
+        if name_lower in index.names:
+            return index.names[name_lower]
         
-        return None
+        # Partial match (memoized until the registry changes)
+        found = None
+        with self._lock:
+            for model in self._models.values():
+                if name_lower in model.id.lower() or name_lower in model.name.lower():
+                    found = model
+                    break
+        index.names[name_lower] = found
+        return found
     
     def estimate_cost(self, model_id: str, input_tokens: int, output_tokens: int) -> Optional[float]:
         """Estimate cost for a request"""
@@ -334,13 +506,21 @@ class ModelRegistry:
         provider: Optional[str] = None
     ) -> List[ModelInfo]:
         """Select models that can handle given context size"""
-        models = self.list_models(provider=provider, capability=capability)
-        return [m for m in models if m.context_window >= context_size]
+        index = self._get_index()
+        start = bisect_left(index.by_context, context_size, key=lambda m: m.context_window)
+        models = [
+            m for m in index.by_context[start:]
+            if not m.deprecated
+            and (provider is None or m.provider == provider)
+            and (capability is None or capability in m.capabilities)
+        ]
+        models.sort(key=lambda m: m.name)
+        return models
     
     def save_to_file(self, path: Path) -> None:
         """Save registry to JSON file"""
         data = {
-            "models": [m.to_dict() for m in self._models.values()],
+            "models": [m.to_dict() for m in list(self._models.values())],
             "providers": self.list_providers(),
         }
         path.parent.mkdir(parents=True, exist_ok=True)
@@ -361,6 +541,58 @@ class ModelRegistry:
                 print(f"Failed to load model: {e}")
         
         return count
+    
+    def save_catalog(self, path: Optional[Path] = None) -> None:
+        """
+        Persist discovered models with the schema version and discovery times.
+        Written to a temp file and renamed, so readers never see a partial file.
+        """
+        path = Path(path or self.cache_path)
+        with self._lock:
+            data = {
+                "schema_version": CATALOG_SCHEMA_VERSION,
+                "saved_at": time.time(),
+                "fetched_at": dict(self._fetched_at),
+                "models": [
+                    self._models[model_id].to_dict()
+                    for model_id in sorted(self._discovered)
+                    if model_id in self._models
+                ],
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    
+    def load_catalog(self, path: Optional[Path] = None) -> int:
+        """
+        Load a catalog written by save_catalog().
+        Missing, corrupt or other-schema files are ignored.
+        Returns number of models loaded.
+        """
+        path = Path(path or self.cache_path)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(data, dict) or data.get("schema_version") != CATALOG_SCHEMA_VERSION:
+            return 0
+        
+        count = 0
+        with self._lock:
+            for m_data in data.get("models", []):
+                try:
+                    model = ModelInfo.from_dict(m_data)
+                    self.register(model)
+                    self._discovered.add(model.id)
+                    count += 1
+                except (KeyError, TypeError) as e:
+                    print(f"Failed to load model: {e}")
+            for provider, fetched_at in data.get("fetched_at", {}).items():
+                self._fetched_at[provider] = float(fetched_at)
+        return count
 
 
 # Global registry instance
@@ -371,7 +603,7 @@ def get_registry() -> ModelRegistry:
     """Get the global model registry"""
     global _global_registry
     if _global_registry is None:
-        _global_registry = ModelRegistry()
+        _global_registry = ModelRegistry(cache_path=DEFAULT_CATALOG_PATH)
     return _global_registry
 
 
@@ -0,0 +1,546 @@
+"""
+Schema Compiler
+Equivalent to Pi Mono's compiled AJV validators in packages/ai/src/validation.ts
+
+Compiles a JSON Schema into specialized validation and coercion closures
+once, instead of interpreting the schema dict on every call. Compiled
+schemas are cached by a canonical hash of the schema (and, as a fast path,
+by the identity of the schema dict), and shared by all validator
+front-ends:
+
+- koda.ai.validation.SchemaValidator / validate_with_coercion / coerce_types
+- koda.ai.typebox_helpers.Validator
+- koda.ai.json_schema.JSONSchemaValidator
+
+Each compiled schema works from its own deep copy of the schema, and an
+identity hit is only trusted while the dict still equals that copy, so a
+schema mutated after its first validation is recompiled.
+"""
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Appends errors for a value at a path
+CheckFunc = Callable[[Any, str, List[str]], None]
+CoerceFunc = Callable[[Any], Any]
+
+MAX_CACHED_SCHEMAS = 256
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+# Error message templates per front-end. Placeholders: at (path prefix),
+# expected, actual, value, limit, length, field, pattern, kind, enum, const
+_MESSAGES: Dict[str, Dict[str, str]] = {
+    "validation": {
+        "type": "{at}Expected type {expected}, got {actual}",
+        "type_union": "{at}Expected one of types {expected}, got {actual}",
+        "enum": "{at}Value must be one of {enum}",
+        "const": "{at}Expected {const}, got {value}",
+        "any_of": "{at}Value does not match anyOf schema",
+        "one_of": "{at}Value must match exactly one oneOf schema",
+        "min_length": "{at}String length {length} is less than minimum {limit}",
+        "max_length": "{at}String length {length} exceeds maximum {limit}",
+        "pattern": "{at}String does not match pattern {pattern}",
+        "minimum": "{at}Value {value} is less than minimum {limit}",
+        "maximum": "{at}Value {value} exceeds maximum {limit}",
+        "exclusive_minimum": "{at}Value {value} must be greater than {limit}",
+        "exclusive_maximum": "{at}Value {value} must be less than {limit}",
+        "min_items": "{at}Array length {length} is less than minimum {limit}",
+        "max_items": "{at}Array length {length} exceeds maximum {limit}",
+        "required": "{at}Missing required field '{field}'",
+    },
+    "typebox": {
+        "type": "{at}Expected {expected}, got {actual}",
+        "type_union": "{at}Expected one of types {expected}, got {actual}",
+        "enum": "{at}Value must be one of {enum}",
+        "const": "{at}Expected {const}, got {value}",
+        "any_of": "{at}Value does not match anyOf schema",
+        "one_of": "{at}Value must match exactly one oneOf schema",
+        "min_length": "{at}String too short (min {limit})",
+        "max_length": "{at}String too long (max {limit})",
+        "pattern": "{at}String does not match pattern {pattern}",
+        "minimum": "{at}{kind} below minimum {limit}",
+        "maximum": "{at}{kind} above maximum {limit}",
+        "exclusive_minimum": "{at}{kind} must be greater than {limit}",
+        "exclusive_maximum": "{at}{kind} must be less than {limit}",
+        "min_items": "{at}Array too short (min {limit})",
+        "max_items": "{at}Array too long (max {limit})",
+        "required": "{at}Missing required property '{field}'",
+    },
+}
+_MESSAGES["jsonschema"] = {
+    **_MESSAGES["typebox"],
+    "required": "{at}Missing required property: {field}",
+}
+
+# Whether errors at the root path still get a ": " prefix
+_ROOT_PREFIX = {"validation": True, "typebox": True, "jsonschema": False}
+
+
+def canonical_schema_hash(schema: Any) -> str:
+    """
+    Hash a schema independently of key order.
+
+    Args:
+        schema: JSON Schema
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding
+    """
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _Compiler:
+    """Builds check closures for one message dialect"""
+
+    def __init__(self, dialect: str):
+        if dialect not in _MESSAGES:
+            raise ValueError(f"Unknown schema dialect: {dialect}")
+        self.messages = _MESSAGES[dialect]
+        self.root_prefix = _ROOT_PREFIX[dialect]
+
+    def error(self, errors: List[str], key: str, path: str, **params: Any) -> None:
+        at = f"{path}: " if path or self.root_prefix else ""
+        errors.append(self.messages[key].format(at=at, **params))
+
+    def compile(self, schema: Any) -> CheckFunc:
+        if not isinstance(schema, dict) or not schema:
+            return lambda value, path, errors: None
+
+        checks: List[CheckFunc] = []
+        error = self.error
+
+        for key in ("anyOf", "oneOf", "allOf"):
+            if key in schema:
+                checks.append(self._compile_combinator(key, schema[key]))
+
+        if "const" in schema:
+            const = schema["const"]
+
+            def check_const(value, path, errors):
+                if value != const:
+                    error(errors, "const", path, const=const, value=value)
+            checks.append(check_const)
+
+        enum_values = schema.get("enum")
+        if enum_values:
+            def check_enum(value, path, errors):
+                if value not in enum_values:
+                    error(errors, "enum", path, enum=enum_values)
+            checks.append(check_enum)
+
+        schema_type = schema.get("type")
+        if isinstance(schema_type, list):
+            type_checks = [_TYPE_CHECKS[t] for t in schema_type if t in _TYPE_CHECKS]
+
+            def check_type_union(value, path, errors):
+                for type_check in type_checks:
+                    if type_check(value):
+                        return
+                error(errors, "type_union", path, expected=schema_type, actual=type(value).__name__)
+            checks.append(check_type_union)
+        elif schema_type in _TYPE_CHECKS:
+            type_check = _TYPE_CHECKS[schema_type]
+
+            def check_type(value, path, errors):
+                if not type_check(value):
+                    error(errors, "type", path, expected=schema_type, actual=type(value).__name__)
+            checks.append(check_type)
+
+        string_check = self._compile_string(schema)
+        if string_check is not None:
+            checks.append(string_check)
+
+        number_check = self._compile_number(schema)
+        if number_check is not None:
+            checks.append(number_check)
+
+        array_check = self._compile_array(schema)
+        if array_check is not None:
+            checks.append(array_check)
+
+        object_check = self._compile_object(schema)
+        if object_check is not None:
+            checks.append(object_check)
+
+        if not checks:
+            return lambda value, path, errors: None
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return check_all
+
+    def _compile_combinator(self, key: str, subschemas: List[Any]) -> CheckFunc:
+        compiled = [self.compile(s) for s in subschemas]
+
+        if key == "allOf":
+            def check_all_of(value, path, errors):
+                for check in compiled:
+                    check(value, path, errors)
+            return check_all_of
+
+        def matches(check: CheckFunc, value: Any, path: str) -> bool:
+            sub_errors: List[str] = []
+            check(value, path, sub_errors)
+            return not sub_errors
+
+        if key == "anyOf":
+            def check_any_of(value, path, errors):
+                for check in compiled:
+                    if matches(check, value, path):
+                        return
+                self.error(errors, "any_of", path)
+            return check_any_of
+
+        def check_one_of(value, path, errors):
+            if sum(1 for check in compiled if matches(check, value, path)) != 1:
+                self.error(errors, "one_of", path)
+        return check_one_of
+
+    def _compile_string(self, schema: Dict[str, Any]) -> Optional[CheckFunc]:
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        pattern = schema.get("pattern")
+        if min_length is None and max_length is None and not pattern:
+            return None
+
+        regex = re.compile(pattern) if pattern else None
+        error = self.error
+
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return
+            if min_length is not None and len(value) < min_length:
+                error(errors, "min_length", path, length=len(value), limit=min_length)
+            if max_length is not None and len(value) > max_length:
+                error(errors, "max_length", path, length=len(value), limit=max_length)
+            if regex is not None and not regex.search(value):
+                error(errors, "pattern", path, pattern=pattern)
+        return check_string
+
+    def _compile_number(self, schema: Dict[str, Any]) -> Optional[CheckFunc]:
+        limits = [
+            (key, schema.get(name))
+            for key, name in (
+                ("minimum", "minimum"),
+                ("maximum", "maximum"),
+                ("exclusive_minimum", "exclusiveMinimum"),
+                ("exclusive_maximum", "exclusiveMaximum"),
+            )
+        ]
+        limits = [(key, limit) for key, limit in limits if limit is not None]
+        if not limits:
+            return None
+
+        kind = "Integer" if schema.get("type") == "integer" else "Number"
+        error = self.error
+
+        def check_number(value, path, errors):
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            for key, limit in limits:
+                if key == "minimum":
+                    failed = value < limit
+                elif key == "maximum":
+                    failed = value > limit
+                elif key == "exclusive_minimum":
+                    failed = value <= limit
+                else:
+                    failed = value >= limit
+                if failed:
+                    error(errors, key, path, value=value, limit=limit, kind=kind)
+        return check_number
+
+    def _compile_array(self, schema: Dict[str, Any]) -> Optional[CheckFunc]:
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        items_schema = schema.get("items")
+        if min_items is None and max_items is None and not items_schema:
+            return None
+
+        check_item = self.compile(items_schema) if items_schema else None
+        error = self.error
+
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                error(errors, "min_items", path, length=len(value), limit=min_items)
+            if max_items is not None and len(value) > max_items:
+                error(errors, "max_items", path, length=len(value), limit=max_items)
+            if check_item is not None:
+                for i, item in enumerate(value):
+                    check_item(item, f"{path}[{i}]", errors)
+        return check_array
+
+    def _compile_object(self, schema: Dict[str, Any]) -> Optional[CheckFunc]:
+        required = schema.get("required") or []
+        properties = schema.get("properties") or {}
+        if not required and not properties:
+            return None
+
+        property_checks = [(key, self.compile(sub)) for key, sub in properties.items()]
+        error = self.error
+
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for field in required:
+                if field not in value:
+                    error(errors, "required", path, field=field)
+            for key, check in property_checks:
+                if key in value:
+                    check(value[key], f"{path}.{key}" if path else key, errors)
+        return check_object
+
+
+def _scalar_coercer(coerce: Callable[[Any], Any]) -> CoerceFunc:
+    def coerce_scalar(value):
+        if value is None:
+            return None
+        result = coerce(value)
+        return value if result is None else result
+    return coerce_scalar
+
+
+def _compile_coercer(
+    schema: Any,
+    strings_to_numbers: bool,
+    strings_to_booleans: bool,
+    numbers_to_strings: bool,
+) -> CoerceFunc:
+    """Build an AJV-style coercion closure (see validation.coerce_types)"""
+    # validation imports this module; import its coercers at compile time
+    from .validation import (
+        coerce_string, coerce_number, coerce_integer,
+        coerce_boolean, coerce_array, coerce_object,
+    )
+
+    if not isinstance(schema, dict):
+        return _identity
+
+    flags = (strings_to_numbers, strings_to_booleans, numbers_to_strings)
+    schema_type = schema.get("type")
+
+    if isinstance(schema_type, list):
+        branches = [
+            (_compile_coercer({**schema, "type": t}, *flags), _TYPE_CHECKS.get(t))
+            for t in schema_type
+        ]
+
+        def coerce_union(value):
+            if value is None:
+                return None
+            for coerce, type_check in branches:
+                coerced = coerce(value)
+                if type_check is not None and type_check(coerced):
+                    return coerced
+            return value
+        return coerce_union
+
+    if schema_type == "string":
+        return _scalar_coercer(coerce_string) if numbers_to_strings else _identity
+    if schema_type == "integer":
+        return _scalar_coercer(coerce_integer) if strings_to_numbers else _identity
+    if schema_type == "number":
+        return _scalar_coercer(coerce_number) if strings_to_numbers else _identity
+    if schema_type == "boolean":
+        return _scalar_coercer(coerce_boolean) if strings_to_booleans else _identity
+
+    if schema_type == "array":
+        items_schema = schema.get("items")
+        coerce_item = _compile_coercer(items_schema, *flags) if items_schema else None
+
+        def coerce_list(value):
+            if value is None:
+                return None
+            if not isinstance(value, list):
+                value = coerce_array(value)
+            if coerce_item is None or coerce_item is _identity:
+                return value
+            return [coerce_item(item) for item in value]
+        return coerce_list
+
+    if schema_type == "object":
+        property_coercers = {
+            key: _compile_coercer(sub, *flags)
+            for key, sub in (schema.get("properties") or {}).items()
+        }
+        property_coercers = {k: c for k, c in property_coercers.items() if c is not _identity}
+
+        def coerce_dict(value):
+            if value is None:
+                return None
+            if not isinstance(value, dict):
+                coerced = coerce_object(value)
+                if coerced is None:
+                    return value
+                value = coerced
+            if not property_coercers:
+                return dict(value)
+            return {
+                key: property_coercers[key](item) if key in property_coercers else item
+                for key, item in value.items()
+            }
+        return coerce_dict
+
+    return _identity
+
+
+class CompiledSchema:
+    """
+    A schema compiled into validation and coercion closures.
+
+    Closures are built lazily, once per message dialect / coercion option
+    set, and reused for every call. ``schema`` is a private deep copy, so
+    later changes to the caller's dict cannot leak into them.
+
+    Example:
+        >>> compiled = compile_schema({"type": "object", "properties": {"n": {"type": "integer"}}})
+        >>> compiled.coerce({"n": "3"})
+        {'n': 3}
+        >>> compiled.errors({"n": "x"})
+        ['n: Expected type integer, got str']
+    """
+
+    def __init__(self, schema: Any, schema_hash: str):
+        self.schema = copy.deepcopy(schema)
+        self.hash = schema_hash
+        self._checks: Dict[str, CheckFunc] = {}
+        self._coercers: Dict[Tuple[bool, bool, bool], CoerceFunc] = {}
+        self._lock = threading.Lock()
+        # Per-library compiled validators (e.g. a jsonschema validator instance)
+        self.extensions: Dict[str, Any] = {}
+
+    def errors(self, value: Any, dialect: str = "validation") -> List[str]:
+        """
+        Validate a value.
+
+        Args:
+            value: Value to validate
+            dialect: Error message style ("validation", "typebox" or "jsonschema")
+
+        Returns:
+            List of error messages (empty if valid)
+        """
+        check = self._checks.get(dialect)
+        if check is None:
+            with self._lock:
+                check = self._checks.get(dialect)
+                if check is None:
+                    check = _Compiler(dialect).compile(self.schema)
+                    self._checks[dialect] = check
+
+        errors: List[str] = []
+        check(value, "", errors)
+        return errors
+
+    def is_valid(self, value: Any) -> bool:
+        """Check if a value is valid"""
+        return not self.errors(value)
+
+    def coercer(
+        self,
+        strings_to_numbers: bool = True,
+        strings_to_booleans: bool = True,
+        numbers_to_strings: bool = True,
+    ) -> CoerceFunc:
+        """Get the coercion closure for a set of coercion options"""
+        key = (strings_to_numbers, strings_to_booleans, numbers_to_strings)
+        coerce = self._coercers.get(key)
+        if coerce is None:
+            with self._lock:
+                coerce = self._coercers.get(key)
+                if coerce is None:
+                    coerce = _compile_coercer(self.schema, *key)
+                    self._coercers[key] = coerce
+        return coerce
+
+    def coerce(self, value: Any, **options: bool) -> Any:
+        """Coerce a value to the schema's types (AJV coerceTypes)"""
+        return self.coercer(**options)(value)
+
+
+_by_hash: "OrderedDict[str, CompiledSchema]" = OrderedDict()
+_by_id: "OrderedDict[int, Tuple[Any, CompiledSchema]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def compile_schema(schema: Any) -> CompiledSchema:
+    """
+    Get the compiled form of a schema.
+
+    Lookups by the same dict object skip hashing as long as the dict is
+    unchanged; structurally equal schemas share one CompiledSchema through
+    the canonical hash.
+
+    Args:
+        schema: JSON Schema
+
+    Returns:
+        CompiledSchema
+    """
+    entry = _by_id.get(id(schema))
+    # Comparing with the compiled copy is cheaper than re-hashing
+    if entry is not None and entry[0] is schema and entry[1].schema == schema:
+        return entry[1]
+
+    schema_hash = canonical_schema_hash(schema)
+    with _cache_lock:
+        compiled = _by_hash.get(schema_hash)
+        if compiled is None:
+            compiled = CompiledSchema(schema, schema_hash)
+            _by_hash[schema_hash] = compiled
+            if len(_by_hash) > MAX_CACHED_SCHEMAS:
+                _by_hash.popitem(last=False)
+        else:
+            _by_hash.move_to_end(schema_hash)
+
+        # Holding the schema keeps its id from being reused while cached
+        _by_id[id(schema)] = (schema, compiled)
+        if len(_by_id) > MAX_CACHED_SCHEMAS:
+            _by_id.popitem(last=False)
+
+    return compiled
+
+
+def clear_schema_cache() -> None:
+    """Drop all compiled schemas"""
+    with _cache_lock:
+        _by_hash.clear()
+        _by_id.clear()
+
+
+def get_schema_cache_stats() -> Dict[str, int]:
+    """Number of cached compiled schemas"""
+    return {"schemas": len(_by_hash), "identities": len(_by_id)}
+
+
+__all__ = [
+    "CompiledSchema",
+    "compile_schema",
+    "canonical_schema_hash",
+    "clear_schema_cache",
+    "get_schema_cache_stats",
+]
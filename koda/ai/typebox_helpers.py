@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional, Type, TypeVar, Callable, Union
 from dataclasses import dataclass
 import json
 
+from .schema_compiler import compile_schema
+
 # Try to import Pydantic, fall back to basic validation
 try:
     from pydantic import BaseModel, ValidationError, create_model, Field
@@ -181,131 +183,13 @@ class Validator:
         if not self.schema:
             return ValidationResult(success=True, data=data)
         
-        errors = self._validate_value(data, self.schema, "")
+        # Compiled once per schema (see koda.ai.schema_compiler)
+        errors = compile_schema(self.schema).errors(data, dialect="typebox")
         
         if errors:
             return ValidationResult(success=False, errors=errors)
         
         return ValidationResult(success=True, data=data)
-    
-    def _validate_value(self, value: Any, schema: Dict[str, Any], 
-                        path: str) -> List[str]:
-        """Validate a value against schema (internal)"""
-        errors = []
-        
-        # Handle anyOf
-        if "anyOf" in schema:
-            any_errors = []
-            for subschema in schema["anyOf"]:
-                sub_errors = self._validate_value(value, subschema, path)
-                if not sub_errors:
-                    return []  # Valid against at least one
-                any_errors.extend(sub_errors)
-            errors.append(f"{path}: Value does not match anyOf schema")
-            return errors
-        
-        # Handle const
-        if "const" in schema:
-            if value != schema["const"]:
-                errors.append(f"{path}: Expected {schema['const']}, got {value}")
-            return errors
-        
-        # Handle enum
-        if "enum" in schema:
-            if value not in schema["enum"]:
-                errors.append(f"{path}: Value must be one of {schema['enum']}")
-            return errors
-        
-        # Type validation
-        if "type" in schema:
-            type_errors = self._validate_type(value, schema["type"], path, schema)
-            errors.extend(type_errors)
-        
-        return errors
-    
-    def _validate_type(self, value: Any, type_name: str, 
-                       path: str, schema: Dict[str, Any]) -> List[str]:
-        """Validate type-specific constraints"""
-        errors = []
-        
-        if type_name == "string":
-            if not isinstance(value, str):
-                errors.append(f"{path}: Expected string, got {type(value).__name__}")
-                return errors
-            
-            # String constraints
-            if "minLength" in schema and len(value) < schema["minLength"]:
-                errors.append(f"{path}: String too short (min {schema['minLength']})")
-            if "maxLength" in schema and len(value) > schema["maxLength"]:
-                errors.append(f"{path}: String too long (max {schema['maxLength']})")
-        
-        elif type_name == "number":
-            if not isinstance(value, (int, float)):
-                errors.append(f"{path}: Expected number, got {type(value).__name__}")
-                return errors
-            
-            # Number constraints
-            if "minimum" in schema and value < schema["minimum"]:
-                errors.append(f"{path}: Number below minimum {schema['minimum']}")
-            if "maximum" in schema and value > schema["maximum"]:
-                errors.append(f"{path}: Number above maximum {schema['maximum']}")
-        
-        elif type_name == "integer":
-            if not isinstance(value, int) or isinstance(value, bool):
-                errors.append(f"{path}: Expected integer, got {type(value).__name__}")
-                return errors
-            
-            if "minimum" in schema and value < schema["minimum"]:
-                errors.append(f"{path}: Integer below minimum {schema['minimum']}")
-            if "maximum" in schema and value > schema["maximum"]:
-                errors.append(f"{path}: Integer above maximum {schema['maximum']}")
-        
-        elif type_name == "boolean":
-            if not isinstance(value, bool):
-                errors.append(f"{path}: Expected boolean, got {type(value).__name__}")
-        
-        elif type_name == "array":
-            if not isinstance(value, list):
-                errors.append(f"{path}: Expected array, got {type(value).__name__}")
-                return errors
-            
-            # Array constraints
-            if "minItems" in schema and len(value) < schema["minItems"]:
-                errors.append(f"{path}: Array too short (min {schema['minItems']})")
-            if "maxItems" in schema and len(value) > schema["maxItems"]:
-                errors.append(f"{path}: Array too long (max {schema['maxItems']})")
-            
-            # Validate items
-            if "items" in schema:
-                for i, item in enumerate(value):
-                    item_errors = self._validate_value(item, schema["items"], f"{path}[{i}]")
-                    errors.extend(item_errors)
-        
-        elif type_name == "object":
-            if not isinstance(value, dict):
-                errors.append(f"{path}: Expected object, got {type(value).__name__}")
-                return errors
-            
-            # Check required properties
-            if "required" in schema:
-                for prop in schema["required"]:
-                    if prop not in value:
-                        errors.append(f"{path}: Missing required property '{prop}'")
-            
-            # Validate properties
-            if "properties" in schema:
-                for prop, prop_schema in schema["properties"].items():
-                    if prop in value:
-                        prop_errors = self._validate_value(
-                            value[prop], prop_schema, f"{path}.{prop}" if path else prop
-                        )
-                        errors.extend(prop_errors)
-        
-        elif type_name == "null":
-            if value is not None:
-                errors.append(f"{path}: Expected null, got {type(value).__name__}")
-        
-        return errors
 
 
 class PydanticValidator:
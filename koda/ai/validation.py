@@ -9,6 +9,7 @@ from dataclasses import dataclass
 from enum import Enum
 
 from .types import Message, AssistantMessage, UserMessage
+from .schema_compiler import compile_schema
 
 
 class CoercionTarget(Enum):
@@ -342,84 +343,13 @@ def coerce_types(
     if not isinstance(schema, dict):
         return data
 
-    schema_type = schema.get("type")
-
-    # Handle multiple types (union types)
-    if isinstance(schema_type, list):
-        # Try each type in order until one succeeds
-        for t in schema_type:
-            coerced = coerce_types(
-                data,
-                {**schema, "type": t},
-                coerce_strings_to_numbers,
-                coerce_strings_to_booleans,
-                coerce_numbers_to_strings,
-            )
-            # Check if coercion was successful
-            if _check_type(coerced, t):
-                return coerced
-        return data
-
-    # Handle string type
-    if schema_type == "string" and coerce_numbers_to_strings:
-        return coerce_string(data) or data
-
-    # Handle number/integer types
-    if schema_type in ("number", "integer") and coerce_strings_to_numbers:
-        if schema_type == "integer":
-            return coerce_integer(data) or data
-        return coerce_number(data) or data
-
-    # Handle boolean type
-    if schema_type == "boolean" and coerce_strings_to_booleans:
-        return coerce_boolean(data) or data
-
-    # Handle array type
-    if schema_type == "array":
-        if not isinstance(data, list):
-            data = coerce_array(data)
-        if isinstance(data, list):
-            items_schema = schema.get("items")
-            if items_schema:
-                return [
-                    coerce_types(
-                        item,
-                        items_schema,
-                        coerce_strings_to_numbers,
-                        coerce_strings_to_booleans,
-                        coerce_numbers_to_strings,
-                    )
-                    for item in data
-                ]
-        return data
-
-    # Handle object type
-    if schema_type == "object":
-        if not isinstance(data, dict):
-            data = coerce_object(data)
-        if isinstance(data, dict):
-            properties = schema.get("properties", {})
-            additional_properties = schema.get("additionalProperties", True)
-
-            result = {}
-            for key, value in data.items():
-                if key in properties:
-                    # Coerce according to property schema
-                    result[key] = coerce_types(
-                        value,
-                        properties[key],
-                        coerce_strings_to_numbers,
-                        coerce_strings_to_booleans,
-                        coerce_numbers_to_strings,
-                    )
-                else:
-                    # Keep as-is for additional properties
-                    result[key] = value
-
-            return result
-        return data
-
-    return data
+    # Compiled once per schema and option set, then reused
+    coerce = compile_schema(schema).coercer(
+        coerce_strings_to_numbers,
+        coerce_strings_to_booleans,
+        coerce_numbers_to_strings,
+    )
+    return coerce(data)
 
 
 def _check_type(value: Any, expected_type: str) -> bool:
@@ -441,7 +371,9 @@ class SchemaValidator:
     """
     JSON Schema-like validator with type coercion support.
 
-    Provides AJV-style validation with automatic type coercion.
+    Provides AJV-style validation with automatic type coercion. The schema
+    is compiled once (see koda.ai.schema_compiler) and shared by every
+    validator created for an equal schema.
 
     Example:
         >>> validator = SchemaValidator({"type": "integer"})
@@ -482,21 +414,19 @@ class SchemaValidator:
         Returns:
             ValidationResult with coerced_value if coercion was applied
         """
-        errors = []
+        compiled = compile_schema(self.schema)
         coerced_value = data
 
         # Apply coercion if enabled
-        if coerce:
-            coerced_value = coerce_types(
-                data,
-                self.schema,
+        if coerce and data is not None and isinstance(self.schema, dict):
+            coerced_value = compiled.coercer(
                 coerce_strings_to_numbers,
                 coerce_strings_to_booleans,
                 coerce_numbers_to_strings,
-            )
+            )(data)
 
         # Validate coerced value
-        errors = self._validate_against_schema(coerced_value, self.schema)
+        errors = compiled.errors(coerced_value)
 
         result = ValidationResult(
             valid=len(errors) == 0,
@@ -505,108 +435,6 @@ class SchemaValidator:
         result.coerced_value = coerced_value
         return result
 
-    def _validate_against_schema(
-        self,
-        data: Any,
-        schema: Dict[str, Any],
-        path: str = ""
-    ) -> List[str]:
-        """
-        Validate data against schema.
-
-        Args:
-            data: Data to validate
-            schema: Schema to validate against
-            path: Current path for error messages
-
-        Returns:
-            List of validation errors
-        """
-        errors = []
-
-        if not isinstance(schema, dict):
-            return errors
-
-        schema_type = schema.get("type")
-
-        # Type validation
-        if schema_type:
-            if isinstance(schema_type, list):
-                if not any(_check_type(data, t) for t in schema_type):
-                    errors.append(f"{path}: Expected one of types {schema_type}, got {type(data).__name__}")
-            elif not _check_type(data, schema_type):
-                errors.append(f"{path}: Expected type {schema_type}, got {type(data).__name__}")
-
-        # Enum validation
-        enum_values = schema.get("enum")
-        if enum_values and data not in enum_values:
-            errors.append(f"{path}: Value must be one of {enum_values}")
-
-        # String validations
-        if isinstance(data, str):
-            min_length = schema.get("minLength")
-            if min_length is not None and len(data) < min_length:
-                errors.append(f"{path}: String length {len(data)} is less than minimum {min_length}")
-
-            max_length = schema.get("maxLength")
-            if max_length is not None and len(data) > max_length:
-                errors.append(f"{path}: String length {len(data)} exceeds maximum {max_length}")
-
-            pattern = schema.get("pattern")
-            if pattern:
-                import re
-                if not re.search(pattern, data):
-                    errors.append(f"{path}: String does not match pattern {pattern}")
-
-        # Number validations
-        if isinstance(data, (int, float)) and not isinstance(data, bool):
-            minimum = schema.get("minimum")
-            if minimum is not None and data < minimum:
-                errors.append(f"{path}: Value {data} is less than minimum {minimum}")
-
-            maximum = schema.get("maximum")
-            if maximum is not None and data > maximum:
-                errors.append(f"{path}: Value {data} exceeds maximum {maximum}")
-
-            exclusive_minimum = schema.get("exclusiveMinimum")
-            if exclusive_minimum is not None and data <= exclusive_minimum:
-                errors.append(f"{path}: Value {data} must be greater than {exclusive_minimum}")
-
-            exclusive_maximum = schema.get("exclusiveMaximum")
-            if exclusive_maximum is not None and data >= exclusive_maximum:
-                errors.append(f"{path}: Value {data} must be less than {exclusive_maximum}")
-
-        # Array validations
-        if isinstance(data, list):
-            min_items = schema.get("minItems")
-            if min_items is not None and len(data) < min_items:
-                errors.append(f"{path}: Array length {len(data)} is less than minimum {min_items}")
-
-            max_items = schema.get("maxItems")
-            if max_items is not None and len(data) > max_items:
-                errors.append(f"{path}: Array length {len(data)} exceeds maximum {max_items}")
-
-            items_schema = schema.get("items")
-            if items_schema:
-                for i, item in enumerate(data):
-                    item_path = f"{path}[{i}]" if path else f"[{i}]"
-                    errors.extend(self._validate_against_schema(item, items_schema, item_path))
-
-        # Object validations
-        if isinstance(data, dict):
-            required = schema.get("required", [])
-            for field in required:
-                if field not in data:
-                    errors.append(f"{path}: Missing required field '{field}'")
-
-            properties = schema.get("properties", {})
-            for key, value in data.items():
-                if key in properties:
-                    prop_path = f"{path}.{key}" if path else key
-                    errors.extend(self._validate_against_schema(value, properties[key], prop_path))
-
-        return errors
-
 
 def validate_with_coercion(
     data: Any,
@@ -27,6 +27,8 @@ from .utils import (
     run_command,
     GitUtils,
     GitInfo,
+    GitState,
+    get_git_state_service,
     is_git_repo,
     get_git_info,
     ClipboardUtils,
@@ -158,7 +160,7 @@ from .download import (
     DownloadResult,
     is_downloadable_url,
 )
-from .export_html import export_to_html, export_to_markdown, ExportOptions
+from .export_html import export_to_html, export_to_markdown, ExportOptions, SessionExporter
 from .extensions import (
     Extension,
     ExtensionMetadata,
@@ -202,6 +204,8 @@ __all__ = [
     "run_command",
     "GitUtils",
     "GitInfo",
+    "GitState",
+    "get_git_state_service",
     "is_git_repo",
     "get_git_info",
     "ClipboardUtils",
@@ -300,6 +304,7 @@ __all__ = [
     "export_to_html",
     "export_to_markdown",
     "ExportOptions",
+    "SessionExporter",
     # Extensions
     "Extension",
     "ExtensionMetadata",
@@ -4,11 +4,22 @@ Image Resize - Pi compatible image processing
 Based on: packages/coding-agent/src/utils/image-resize.ts
 
 Uses PIL/Pillow instead of Photon (Rust/WASM) for Python compatibility.
+
+The pipeline works on raw bytes and decodes each image once (JPEGs are
+downscaled during decoding with ``draft()``). Every scale step resizes
+once, encodes PNG once, and binary-searches the JPEG quality against the
+byte budget. Results are cached by content hash + limits, and
+resize_image_async() runs the work in a process pool.
 """
+import asyncio
 import base64
+import hashlib
 import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
 from pathlib import Path
 
 try:
@@ -54,6 +65,260 @@ def format_dimension_note(result: ResizedImage) -> Optional[str]:
     )
 
 
+# JPEG quality search range and downscale steps (relative to the target size)
+MIN_JPEG_QUALITY = 40
+SCALE_STEPS = [1.0, 0.75, 0.5, 0.35, 0.25]
+MIN_DIMENSION = 100
+
+# Results cached by (content hash, limits)
+RESIZE_CACHE_SIZE = 32
+_cache: "OrderedDict[Tuple, ResizedImage]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def _unchanged(img_data: str, mime_type: str, width: int = 0, height: int = 0) -> ResizedImage:
+    return ResizedImage(
+        data=img_data,
+        mimeType=mime_type,
+        originalWidth=width,
+        originalHeight=height,
+        width=width,
+        height=height,
+        wasResized=False
+    )
+
+
+def _fit_dimensions(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """Scale (width, height) down to fit the limits, keeping the aspect ratio"""
+    if width > max_width:
+        height = round(height * max_width / width)
+        width = max_width
+    if height > max_height:
+        width = round(width * max_height / height)
+        height = max_height
+    return width, height
+
+
+def _encode(img: "Image.Image", format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+def _encode_within_budget(
+    img: "Image.Image",
+    max_bytes: int,
+    max_quality: int,
+    try_png: bool = True
+) -> Tuple[bytes, str, Optional[int]]:
+    """
+    Encode one resized image as small as needed to fit max_bytes.
+
+    PNG is encoded once (its size does not depend on JPEG quality). JPEG
+    at max_quality is used when it fits and beats PNG; otherwise a fitting
+    PNG wins, and failing that the highest JPEG quality that fits is found
+    by binary search. If nothing fits, the smallest encoding is returned.
+
+    Returns:
+        (data, mime_type, png_size); png_size is None when PNG was skipped
+    """
+    # Without a PNG candidate, compare against an "infinitely large" PNG
+    png_data = _encode(img, 'PNG') if try_png else None
+    png_size = len(png_data) if png_data is not None else None
+    png_len = png_size if png_size is not None else float('inf')
+
+    rgb = img.convert('RGB') if img.mode != 'RGB' else img
+    jpeg_data = _encode(rgb, 'JPEG', quality=max_quality)
+
+    if len(jpeg_data) <= max_bytes and len(jpeg_data) < png_len:
+        return jpeg_data, 'image/jpeg', png_size
+    if png_len <= max_bytes:
+        return png_data, 'image/png', png_size
+
+    fitting: Optional[bytes] = None
+    smallest = jpeg_data
+    low, high = MIN_JPEG_QUALITY, max_quality - 1
+    while low <= high:
+        quality = (low + high) // 2
+        data = _encode(rgb, 'JPEG', quality=quality)
+        if len(data) <= max_bytes:
+            fitting = data
+            low = quality + 1
+        else:
+            high = quality - 1
+        if len(data) < len(smallest):
+            smallest = data
+
+    if fitting is not None:
+        return fitting, 'image/jpeg', png_size
+    if png_len < len(smallest):
+        return png_data, 'image/png', png_size
+    return smallest, 'image/jpeg', png_size
+
+
+def _resize_bytes(
+    input_buffer: bytes,
+    mime_type: str,
+    max_width: int,
+    max_height: int,
+    max_bytes: int,
+    jpeg_quality: int
+) -> Tuple[Optional[bytes], str, int, int, int, int]:
+    """
+    Resize raw image bytes (runs in worker processes).
+
+    Returns:
+        (data, mime_type, original_width, original_height, width, height);
+        data is None when the image is already within limits
+    """
+    img = Image.open(io.BytesIO(input_buffer))
+    original_width, original_height = img.size
+
+    # Only the header has been read so far
+    if (original_width <= max_width and
+        original_height <= max_height and
+        len(input_buffer) <= max_bytes):
+        return None, mime_type, original_width, original_height, original_width, original_height
+
+    target_width, target_height = _fit_dimensions(
+        original_width, original_height, max_width, max_height
+    )
+
+    # JPEG: let the decoder downscale by a power of two (never below the target)
+    if img.format == 'JPEG':
+        img.draft('RGB', (target_width, target_height))
+    img.load()
+
+    data, out_mime = b'', mime_type
+    width, height = target_width, target_height
+    png_size: Optional[int] = None
+    previous_pixels = 0
+
+    for scale in SCALE_STEPS:
+        width = max(MIN_DIMENSION, round(target_width * scale))
+        height = max(MIN_DIMENSION, round(target_height * scale))
+
+        if img.size == (width, height):
+            resized = img
+        else:
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+
+        # PNG size tracks pixel count; skip PNG when it cannot come close
+        try_png = True
+        if png_size is not None and previous_pixels:
+            estimate = png_size * (width * height) / previous_pixels
+            try_png = estimate <= 2 * max_bytes
+
+        data, out_mime, png_size = _encode_within_budget(
+            resized, max_bytes, jpeg_quality, try_png
+        )
+        if len(data) <= max_bytes:
+            break
+        if not try_png:
+            png_size = int(estimate)
+        previous_pixels = width * height
+
+    return data, out_mime, original_width, original_height, width, height
+
+
+def _cache_key(
+    input_buffer: bytes,
+    max_width: int,
+    max_height: int,
+    max_bytes: int,
+    jpeg_quality: int
+) -> Tuple:
+    digest = hashlib.sha256(input_buffer).hexdigest()
+    return (digest, max_width, max_height, max_bytes, jpeg_quality)
+
+
+def _cache_get(key: Tuple) -> Optional[ResizedImage]:
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _cache_put(key: Tuple, result: ResizedImage) -> None:
+    with _cache_lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > RESIZE_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def clear_resize_cache() -> None:
+    """Drop all cached resize results"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def _to_result(
+    raw: Tuple[Optional[bytes], str, int, int, int, int],
+    input_buffer: bytes,
+    img_data: Optional[str]
+) -> ResizedImage:
+    data, out_mime, original_width, original_height, width, height = raw
+    if data is None:
+        if img_data is None:
+            img_data = base64.b64encode(input_buffer).decode('utf-8')
+        return _unchanged(img_data, out_mime, original_width, original_height)
+
+    return ResizedImage(
+        data=base64.b64encode(data).decode('utf-8'),
+        mimeType=out_mime,
+        originalWidth=original_width,
+        originalHeight=original_height,
+        width=width,
+        height=height,
+        wasResized=True
+    )
+
+
+def resize_image_bytes(
+    input_buffer: bytes,
+    mime_type: str,
+    max_width: int = DEFAULT_MAX_WIDTH,
+    max_height: int = DEFAULT_MAX_HEIGHT,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+    _img_data: Optional[str] = None
+) -> ResizedImage:
+    """
+    Resize raw image bytes to fit the specified max dimensions and file size
+
+    Strategy for staying under maxBytes:
+    1. Decode once (JPEGs downscaled during decode) and resize to maxWidth/maxHeight
+    2. Encode PNG once and JPEG at jpeg_quality, pick the smaller one that fits
+    3. If neither fits, binary-search the highest JPEG quality that fits
+    4. If still too large, progressively reduce dimensions
+    """
+    if not PIL_AVAILABLE:
+        if _img_data is None:
+            _img_data = base64.b64encode(input_buffer).decode('utf-8')
+        return _unchanged(_img_data, mime_type)
+
+    key = _cache_key(input_buffer, max_width, max_height, max_bytes, jpeg_quality)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        raw = _resize_bytes(input_buffer, mime_type, max_width, max_height, max_bytes, jpeg_quality)
+    except Exception:
+        if _img_data is None:
+            _img_data = base64.b64encode(input_buffer).decode('utf-8')
+        return _unchanged(_img_data, mime_type)
+
+    result = _to_result(raw, input_buffer, _img_data)
+    _cache_put(key, result)
+    return result
+
+
 def resize_image(
     img_data: str,
     mime_type: str,
@@ -63,154 +328,103 @@ def resize_image(
     jpeg_quality: int = DEFAULT_JPEG_QUALITY
 ) -> ResizedImage:
     """
-    Resize an image to fit within the specified max dimensions and file size
-    
-    Strategy for staying under maxBytes:
-    1. First resize to maxWidth/maxHeight
-    2. Try both PNG and JPEG formats, pick the smaller one
-    3. If still too large, try JPEG with decreasing quality
-    4. If still too large, progressively reduce dimensions
+    Resize a base64 image to fit within the specified max dimensions and file size
+
+    See resize_image_bytes(); callers holding raw bytes should use that
+    (or resize_image_async()) to skip the base64 round trip.
     """
     if not PIL_AVAILABLE:
-        return ResizedImage(
-            data=img_data,
-            mimeType=mime_type,
-            originalWidth=0,
-            originalHeight=0,
-            width=0,
-            height=0,
-            wasResized=False
-        )
-    
+        return _unchanged(img_data, mime_type)
+
     try:
         input_buffer = base64.b64decode(img_data)
-        img = Image.open(io.BytesIO(input_buffer))
-        original_width, original_height = img.size
-        original_size = len(input_buffer)
-        
-        # Check if already within limits
-        if (original_width <= max_width and 
-            original_height <= max_height and 
-            original_size <= max_bytes):
-            return ResizedImage(
-                data=img_data,
-                mimeType=mime_type,
-                originalWidth=original_width,
-                originalHeight=original_height,
-                width=original_width,
-                height=original_height,
-                wasResized=False
-            )
-        
-        # Calculate target dimensions
-        target_width = original_width
-        target_height = original_height
-        
-        if target_width > max_width:
-            target_height = round(target_height * max_width / target_width)
-            target_width = max_width
-        
-        if target_height > max_height:
-            target_width = round(target_width * max_height / target_height)
-            target_height = max_height
-        
-        def try_both_formats(width: int, height: int, quality: int) -> Tuple[str, str, int]:
-            """Try PNG and JPEG, return (base64_data, mime_type, size) of smaller"""
-            resized = img.resize((width, height), Image.Resampling.LANCZOS)
-            
-            # Try PNG
-            png_buffer = io.BytesIO()
-            resized.save(png_buffer, format='PNG')
-            png_data = png_buffer.getvalue()
-            
-            # Try JPEG
-            jpeg_buffer = io.BytesIO()
-            if resized.mode in ('RGBA', 'LA', 'P'):
-                rgb_resized = resized.convert('RGB')
-                rgb_resized.save(jpeg_buffer, format='JPEG', quality=quality)
-            else:
-                resized.save(jpeg_buffer, format='JPEG', quality=quality)
-            jpeg_data = jpeg_buffer.getvalue()
-            
-            if len(png_data) <= len(jpeg_data):
-                return base64.b64encode(png_data).decode('utf-8'), 'image/png', len(png_data)
-            else:
-                return base64.b64encode(jpeg_data).decode('utf-8'), 'image/jpeg', len(jpeg_data)
-        
-        quality_steps = [85, 70, 55, 40]
-        scale_steps = [1.0, 0.75, 0.5, 0.35, 0.25]
-        
-        final_width = target_width
-        final_height = target_height
-        best_data, best_mime, best_size = try_both_formats(target_width, target_height, jpeg_quality)
-        
-        if best_size <= max_bytes:
-            return ResizedImage(
-                data=best_data,
-                mimeType=best_mime,
-                originalWidth=original_width,
-                originalHeight=original_height,
-                width=final_width,
-                height=final_height,
-                wasResized=True
-            )
-        
-        # Try decreasing quality
-        for quality in quality_steps:
-            best_data, best_mime, best_size = try_both_formats(target_width, target_height, quality)
-            if best_size <= max_bytes:
-                return ResizedImage(
-                    data=best_data,
-                    mimeType=best_mime,
-                    originalWidth=original_width,
-                    originalHeight=original_height,
-                    width=final_width,
-                    height=final_height,
-                    wasResized=True
-                )
-        
-        # Reduce dimensions
-        for scale in scale_steps:
-            final_width = max(100, round(target_width * scale))
-            final_height = max(100, round(target_height * scale))
-            
-            if final_width < 100 or final_height < 100:
-                break
-            
-            for quality in quality_steps:
-                best_data, best_mime, best_size = try_both_formats(final_width, final_height, quality)
-                if best_size <= max_bytes:
-                    return ResizedImage(
-                        data=best_data,
-                        mimeType=best_mime,
-                        originalWidth=original_width,
-                        originalHeight=original_height,
-                        width=final_width,
-                        height=final_height,
-                        wasResized=True
-                    )
-        
-        return ResizedImage(
-            data=best_data,
-            mimeType=best_mime,
-            originalWidth=original_width,
-            originalHeight=original_height,
-            width=final_width,
-            height=final_height,
-            wasResized=True
-        )
-        
     except Exception:
-        return ResizedImage(
-            data=img_data,
-            mimeType=mime_type,
-            originalWidth=0,
-            originalHeight=0,
-            width=0,
-            height=0,
-            wasResized=False
+        return _unchanged(img_data, mime_type)
+
+    return resize_image_bytes(
+        input_buffer, mime_type, max_width, max_height, max_bytes, jpeg_quality,
+        _img_data=img_data
+    )
+
+
+def _get_executor() -> Executor:
+    """Process pool shared by resize_image_async()"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=2)
+        return _executor
+
+
+def shutdown_resize_executor() -> None:
+    """Stop the resize worker processes"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+async def resize_image_async(
+    img_data: Union[bytes, str],
+    mime_type: str,
+    max_width: int = DEFAULT_MAX_WIDTH,
+    max_height: int = DEFAULT_MAX_HEIGHT,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    jpeg_quality: int = DEFAULT_JPEG_QUALITY
+) -> ResizedImage:
+    """
+    resize_image_bytes() without blocking the event loop
+
+    Images already within limits and cached results are answered inline;
+    everything else is decoded and re-encoded in a worker process.
+
+    Args:
+        img_data: Raw bytes or base64 string
+    """
+    if isinstance(img_data, str):
+        encoded: Optional[str] = img_data
+        try:
+            input_buffer = base64.b64decode(img_data)
+        except Exception:
+            return _unchanged(img_data, mime_type)
+    else:
+        encoded, input_buffer = None, img_data
+
+    if not PIL_AVAILABLE:
+        return resize_image_bytes(input_buffer, mime_type, _img_data=encoded)
+
+    key = _cache_key(input_buffer, max_width, max_height, max_bytes, jpeg_quality)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    # Header-only size check; small images never leave this process
+    try:
+        with Image.open(io.BytesIO(input_buffer)) as img:
+            width, height = img.size
+    except Exception:
+        return resize_image_bytes(input_buffer, mime_type, _img_data=encoded)
+    if width <= max_width and height <= max_height and len(input_buffer) <= max_bytes:
+        return _to_result(
+            (None, mime_type, width, height, width, height), input_buffer, encoded
         )
 
+    loop = asyncio.get_running_loop()
+    args = (input_buffer, mime_type, max_width, max_height, max_bytes, jpeg_quality)
+    try:
+        raw = await loop.run_in_executor(_get_executor(), _resize_bytes, *args)
+    except Exception:
+        # No usable process pool (or the worker died): resize on a thread
+        try:
+            raw = await loop.run_in_executor(None, _resize_bytes, *args)
+        except Exception:
+            return resize_image_bytes(input_buffer, mime_type, _img_data=encoded)
+
+    result = _to_result(raw, input_buffer, encoded)
+    _cache_put(key, result)
+    return result
+
 
 def resize_image_file(file_path: Path, auto_resize: bool = True) -> Optional[ResizedImage]:
     """Read and resize an image file"""
@@ -229,9 +443,9 @@ def resize_image_file(file_path: Path, auto_resize: bool = True) -> Optional[Res
         mime_type = mime_map.get(ext, 'image/png')
         
         with open(file_path, 'rb') as f:
-            img_data = base64.b64encode(f.read()).decode('utf-8')
+            input_buffer = f.read()
         
-        return resize_image(img_data, mime_type)
+        return resize_image_bytes(input_buffer, mime_type)
         
     except Exception:
         return None
@@ -6,9 +6,12 @@ Pi Coding Agent compatible implementation:
 - Head truncation (for file reads)
 - Tail truncation (for bash output)
 - Multi-byte UTF-8 handling
+- Streaming truncators (HeadTruncator/TailTruncator) for chunked output
 """
+import codecs
+from collections import deque
 from dataclasses import dataclass
-from typing import Optional
+from typing import Deque, List, Optional, Tuple, Union
 
 
 # Default limits (matching Pi)
@@ -41,89 +44,330 @@ class TruncationResult:
     output_bytes: int
     last_line_partial: bool = False
     first_line_exceeds_limit: bool = False
+    last_line_bytes: int = 0
     max_lines: int = DEFAULT_MAX_LINES
     max_bytes: int = DEFAULT_MAX_BYTES
     next_offset: int = 0
 
 
-def truncate_head(
-    content: str,
-    max_lines: int = DEFAULT_MAX_LINES,
-    max_bytes: int = DEFAULT_MAX_BYTES,
-) -> TruncationResult:
+def _utf8_len(text: str) -> int:
+    """UTF-8 byte length without encoding huge strings in one piece"""
+    if text.isascii():
+        return len(text)
+    if len(text) <= _BLOCK_CHARS:
+        return len(text.encode('utf-8'))
+    return sum(
+        len(text[i:i + _BLOCK_CHARS].encode('utf-8'))
+        for i in range(0, len(text), _BLOCK_CHARS)
+    )
+
+
+# Large str inputs are processed in blocks of this many characters
+_BLOCK_CHARS = 1 << 20
+
+
+class _StreamingTruncator:
     """
-    Head truncation - keep beginning of content
+    Base for streaming truncators
     
-    Used for file reads.
-    Never returns partial lines.
+    Accepts str or bytes chunks (bytes are decoded as UTF-8 with
+    replacement, multi-byte characters may span chunks). Totals are
+    counted without retaining data.
     """
-    total_bytes = len(content.encode('utf-8'))
-    lines = content.split('\n')
-    total_lines = len(lines)
     
-    # No truncation needed
-    if total_lines <= max_lines and total_bytes <= max_bytes:
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._newlines = 0
+        self._decoder = None
+        self._finished: Optional[TruncationResult] = None
+    
+    @property
+    def total_lines(self) -> int:
+        """Lines seen so far (a trailing partial line counts as one)"""
+        return self._newlines + 1
+    
+    def write(self, chunk: Union[str, bytes]) -> None:
+        """Consume a chunk of output"""
+        if self._finished is not None:
+            raise ValueError("write() after finish()")
+        if isinstance(chunk, (bytes, bytearray, memoryview)):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            chunk = self._decoder.decode(bytes(chunk))
+        for i in range(0, len(chunk), _BLOCK_CHARS):
+            self._feed(chunk[i:i + _BLOCK_CHARS])
+    
+    def finish(self) -> TruncationResult:
+        """Finish the stream and build the result (idempotent)"""
+        if self._finished is None:
+            if self._decoder is not None:
+                self._feed(self._decoder.decode(b'', final=True))
+            self._finished = self._result()
+        return self._finished
+    
+    def _feed(self, text: str) -> None:
+        raise NotImplementedError
+    
+    def _result(self) -> TruncationResult:
+        raise NotImplementedError
+
+
+class HeadTruncator(_StreamingTruncator):
+    """
+    Streaming head truncation - keep beginning of output
+    
+    Holds at most max_bytes of complete lines; once the head window is
+    full the rest of the stream is only counted. Produces the same result
+    as truncate_head() on the concatenated input.
+    """
+    
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(max_lines, max_bytes)
+        self._lines: List[str] = []
+        self._output_bytes = 0
+        self._current: List[str] = []
+        self._current_bytes = 0
+        self._truncated_by: Optional[str] = None
+        self._first_line_exceeds = False
+    
+    @property
+    def full(self) -> bool:
+        """True once no further input can appear in the output"""
+        return self._truncated_by is not None
+    
+    def _feed(self, text: str) -> None:
+        if not text:
+            return
+        self.total_bytes += _utf8_len(text)
+        if self.full:
+            self._newlines += text.count('\n')
+            return
+        
+        pos = 0
+        while True:
+            end = text.find('\n', pos)
+            segment = text[pos:] if end < 0 else text[pos:end]
+            if segment:
+                self._current.append(segment)
+                self._current_bytes += _utf8_len(segment)
+            if end < 0:
+                # Give up early on a partial line that can no longer fit
+                self._check_line(complete=False)
+                return
+            self._newlines += 1
+            self._check_line(complete=True)
+            pos = end + 1
+            if self.full:
+                self._newlines += text.count('\n', pos)
+                return
+    
+    def _check_line(self, complete: bool) -> None:
+        index = len(self._lines)
+        line_bytes = self._current_bytes + (1 if index > 0 else 0)
+        if index >= self.max_lines:
+            self._close("lines")
+        elif self._output_bytes + line_bytes > self.max_bytes:
+            self._first_line_exceeds = index == 0
+            self._close("bytes")
+        elif complete:
+            self._lines.append(''.join(self._current))
+            self._output_bytes += line_bytes
+            self._current = []
+            self._current_bytes = 0
+    
+    def _close(self, reason: str) -> None:
+        self._truncated_by = reason
+        self._current = []
+        self._current_bytes = 0
+    
+    def _result(self) -> TruncationResult:
+        if not self.full:
+            # Final (possibly empty) line
+            self._check_line(complete=True)
+        
+        truncated = self.full
+        if self._first_line_exceeds:
+            content, output_lines, output_bytes = "", 0, 0
+        else:
+            content = '\n'.join(self._lines)
+            output_lines = len(self._lines)
+            output_bytes = self._output_bytes
+        
         return TruncationResult(
             content=content,
-            truncated=False,
-            truncated_by=None,
-            total_lines=total_lines,
-            total_bytes=total_bytes,
-            output_lines=total_lines,
-            output_bytes=total_bytes,
-            max_lines=max_lines,
-            max_bytes=max_bytes,
+            truncated=truncated,
+            truncated_by=self._truncated_by,
+            total_lines=self.total_lines,
+            total_bytes=self.total_bytes,
+            output_lines=output_lines,
+            output_bytes=output_bytes,
+            first_line_exceeds_limit=self._first_line_exceeds,
+            max_lines=self.max_lines,
+            max_bytes=self.max_bytes,
         )
+
+
+class TailTruncator(_StreamingTruncator):
+    """
+    Streaming tail truncation - keep end of output
     
-    # Check if first line alone exceeds byte limit
-    first_line_bytes = len(lines[0].encode('utf-8'))
-    if first_line_bytes > max_bytes:
-        return TruncationResult(
-            content="",
-            truncated=True,
-            truncated_by="bytes",
-            total_lines=total_lines,
-            total_bytes=total_bytes,
-            output_lines=0,
-            output_bytes=0,
-            first_line_exceeds_limit=True,
-            max_lines=max_lines,
-            max_bytes=max_bytes,
-        )
+    Keeps a rolling window of the last complete lines within the limits
+    plus the tail of the current line, so memory stays O(max_bytes) no
+    matter how much is written. Produces the same result as
+    truncate_tail() on the concatenated input.
+    """
     
-    # Collect complete lines that fit
-    output_lines_arr = []
-    output_bytes_count = 0
-    truncated_by = "lines"
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(max_lines, max_bytes)
+        self._lines: Deque[Tuple[str, int]] = deque()
+        self._window_bytes = 0  # bytes of _lines including separators
+        self._evicted_bytes: Optional[int] = None  # line just before the window
+        self._current: Deque[Tuple[str, int]] = deque()
+        self._current_kept = 0
+        self._current_bytes = 0
     
-    for i, line in enumerate(lines):
-        if i >= max_lines:
-            truncated_by = "lines"
-            break
+    def _feed(self, text: str) -> None:
+        if not text:
+            return
+        self.total_bytes += _utf8_len(text)
         
-        line_bytes = len(line.encode('utf-8')) + (1 if i > 0 else 0)  # +1 for newline
+        parts = text.split('\n')
+        tail = parts.pop()
+        if parts:
+            self._newlines += len(parts)
+            skip = len(parts) - (self.max_lines + 1)
+            if skip > 0:
+                # Earlier lines would be pushed out by the line limit anyway
+                self._current.clear()
+                self._current_kept = self._current_bytes = 0
+                parts = parts[skip:]
+            else:
+                if parts[0]:
+                    self._append_current(parts[0])
+                parts[0] = None
+            for line in parts:
+                self._push_line(line)
+        if tail:
+            self._append_current(tail)
+    
+    def _append_current(self, segment: str) -> None:
+        size = _utf8_len(segment)
+        self._current.append((segment, size))
+        self._current_kept += size
+        self._current_bytes += size
+        # Only the last max_bytes of a line can ever be shown
+        while len(self._current) > 1 and self._current_kept - self._current[0][1] >= self.max_bytes:
+            self._current_kept -= self._current.popleft()[1]
+    
+    def _push_line(self, line: Optional[str] = None) -> None:
+        """Push a complete line (None: the accumulated current line)"""
+        if line is None:
+            size = self._current_bytes
+            # Lines over max_bytes can never be shown, keep only their size
+            line = "" if size > self.max_bytes else ''.join(s for s, _ in self._current)
+            self._current.clear()
+            self._current_kept = self._current_bytes = 0
+        else:
+            size = _utf8_len(line)
         
-        if output_bytes_count + line_bytes > max_bytes:
-            truncated_by = "bytes"
-            break
+        lines = self._lines
+        self._window_bytes += size + (1 if lines else 0)
+        lines.append((line, size))
+        while lines and (len(lines) > self.max_lines or self._window_bytes > self.max_bytes):
+            _, evicted = lines.popleft()
+            self._window_bytes -= evicted + (1 if lines else 0)
+            self._evicted_bytes = evicted
+    
+    def _result(self) -> TruncationResult:
+        final_line = ''.join(s for s, _ in self._current)
+        final_bytes = self._current_bytes
+        total_lines = self.total_lines
         
-        output_lines_arr.append(line)
-        output_bytes_count += line_bytes
-    
-    output_content = '\n'.join(output_lines_arr)
-    final_output_bytes = len(output_content.encode('utf-8'))
-    
-    return TruncationResult(
-        content=output_content,
-        truncated=True,
-        truncated_by=truncated_by,
-        total_lines=total_lines,
-        total_bytes=total_bytes,
-        output_lines=len(output_lines_arr),
-        output_bytes=final_output_bytes,
-        max_lines=max_lines,
-        max_bytes=max_bytes,
-    )
+        # No truncation needed
+        if total_lines <= self.max_lines and self.total_bytes <= self.max_bytes:
+            content = '\n'.join([line for line, _ in self._lines] + [final_line])
+            return TruncationResult(
+                content=content,
+                truncated=False,
+                truncated_by=None,
+                total_lines=total_lines,
+                total_bytes=self.total_bytes,
+                output_lines=total_lines,
+                output_bytes=self.total_bytes,
+                last_line_bytes=final_bytes,
+                max_lines=self.max_lines,
+                max_bytes=self.max_bytes,
+            )
+        
+        # Work backwards from the end: final line, then the window, then
+        # the most recently evicted line (only its size is known)
+        candidates = [(final_line, final_bytes)]
+        candidates.extend(reversed(self._lines))
+        if self._evicted_bytes is not None:
+            candidates.append((None, self._evicted_bytes))
+        
+        output_lines_arr: List[str] = []
+        output_bytes_count = 0
+        truncated_by = "lines"
+        last_line_partial = False
+        
+        for line, size in candidates:
+            if len(output_lines_arr) >= self.max_lines:
+                truncated_by = "lines"
+                break
+            
+            line_bytes = size + (1 if output_lines_arr else 0)
+            
+            if output_bytes_count + line_bytes > self.max_bytes or line is None:
+                truncated_by = "bytes"
+                # Edge case: the last line alone exceeds maxBytes, take its end
+                if not output_lines_arr:
+                    truncated_line = _truncate_string_to_bytes_from_end(line, self.max_bytes)
+                    output_lines_arr.append(truncated_line)
+                    output_bytes_count = _utf8_len(truncated_line)
+                    last_line_partial = True
+                break
+            
+            output_lines_arr.append(line)
+            output_bytes_count += line_bytes
+        
+        output_lines_arr.reverse()
+        output_content = '\n'.join(output_lines_arr)
+        
+        return TruncationResult(
+            content=output_content,
+            truncated=True,
+            truncated_by=truncated_by,
+            total_lines=total_lines,
+            total_bytes=self.total_bytes,
+            output_lines=len(output_lines_arr),
+            output_bytes=_utf8_len(output_content),
+            last_line_partial=last_line_partial,
+            last_line_bytes=final_bytes,
+            max_lines=self.max_lines,
+            max_bytes=self.max_bytes,
+        )
+
+
+def truncate_head(
+    content: str,
+    max_lines: int = DEFAULT_MAX_LINES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> TruncationResult:
+    """
+    Head truncation - keep beginning of content
+    
+    Used for file reads.
+    Never returns partial lines.
+    """
+    truncator = HeadTruncator(max_lines, max_bytes)
+    truncator.write(content)
+    result = truncator.finish()
+    if not result.truncated:
+        result.content = content
+    return result
 
 
 def truncate_tail(
@@ -137,67 +381,12 @@ def truncate_tail(
     Used for bash output.
     May return partial first line if last line exceeds byte limit.
     """
-    total_bytes = len(content.encode('utf-8'))
-    lines = content.split('\n')
-    total_lines = len(lines)
-    
-    # No truncation needed
-    if total_lines <= max_lines and total_bytes <= max_bytes:
-        return TruncationResult(
-            content=content,
-            truncated=False,
-            truncated_by=None,
-            total_lines=total_lines,
-            total_bytes=total_bytes,
-            output_lines=total_lines,
-            output_bytes=total_bytes,
-            max_lines=max_lines,
-            max_bytes=max_bytes,
-        )
-    
-    # Work backwards from the end
-    output_lines_arr = []
-    output_bytes_count = 0
-    truncated_by = "lines"
-    last_line_partial = False
-    
-    for i in range(len(lines) - 1, -1, -1):
-        if len(output_lines_arr) >= max_lines:
-            truncated_by = "lines"
-            break
-        
-        line = lines[i]
-        line_bytes = len(line.encode('utf-8')) + (1 if output_lines_arr else 0)
-        
-        if output_bytes_count + line_bytes > max_bytes:
-            truncated_by = "bytes"
-            # Edge case: if we haven't added ANY lines yet and this line exceeds maxBytes,
-            # take the end of the line (partial)
-            if not output_lines_arr:
-                truncated_line = _truncate_string_to_bytes_from_end(line, max_bytes)
-                output_lines_arr.insert(0, truncated_line)
-                output_bytes_count = len(truncated_line.encode('utf-8'))
-                last_line_partial = True
-            break
-        
-        output_lines_arr.insert(0, line)
-        output_bytes_count += line_bytes
-    
-    output_content = '\n'.join(output_lines_arr)
-    final_output_bytes = len(output_content.encode('utf-8'))
-    
-    return TruncationResult(
-        content=output_content,
-        truncated=True,
-        truncated_by=truncated_by,
-        total_lines=total_lines,
-        total_bytes=total_bytes,
-        output_lines=len(output_lines_arr),
-        output_bytes=final_output_bytes,
-        last_line_partial=last_line_partial,
-        max_lines=max_lines,
-        max_bytes=max_bytes,
-    )
+    truncator = TailTruncator(max_lines, max_bytes)
+    truncator.write(content)
+    result = truncator.finish()
+    if not result.truncated:
+        result.content = content
+    return result
 
 
 def _truncate_string_to_bytes_from_end(s: str, max_bytes: int) -> str:
@@ -220,6 +409,20 @@ def _truncate_string_to_bytes_from_end(s: str, max_bytes: int) -> str:
     return encoded[start:].decode('utf-8')
 
 
+@dataclass
+class LineTruncation:
+    """Single line truncation result"""
+    text: str
+    was_truncated: bool
+
+
+def truncate_line(line: str, max_chars: int = GREP_MAX_LINE_LENGTH) -> LineTruncation:
+    """Truncate a single line to max_chars (used for grep match lines)"""
+    if len(line) <= max_chars:
+        return LineTruncation(text=line, was_truncated=False)
+    return LineTruncation(text=f"{line[:max_chars]}... [truncated]", was_truncated=True)
+
+
 def format_truncation_message(result: TruncationResult, mode: str = "head") -> str:
     """Format truncation notice message"""
     if not result.truncated:
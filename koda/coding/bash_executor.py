@@ -4,17 +4,25 @@ Equivalent to Pi Mono's packages/coding-agent/src/core/bash-executor.ts
 
 Advanced bash execution with hooks, timeout, and security.
 """
+import codecs
+import io
 import os
 import re
 import shlex
 import signal
 import subprocess
+import tempfile
 import threading
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Callable, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+from koda.coding._support.truncation import TailTruncator, DEFAULT_MAX_BYTES, DEFAULT_MAX_LINES
+
+# Pipe read size for incremental capture
+READ_CHUNK_SIZE = 64 * 1024
+
 
 class ExitCode(Enum):
     """Special exit codes"""
@@ -39,6 +47,7 @@ class BashResult:
     duration_ms: float
     timed_out: bool = False
     killed: bool = False
+    truncated: bool = False
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -58,6 +67,7 @@ class BashHooks:
         self._before_exec: List[Callable[[BashHookContext], None]] = []
         self._after_exec: List[Callable[[BashHookContext, BashResult], None]] = []
         self._on_error: List[Callable[[BashHookContext, BashResult], None]] = []
+        self._on_output: List[Callable[[BashHookContext, str, str], None]] = []
     
     def before_exec(self, callback: Callable[[BashHookContext], None]):
         """Register before-execution hook"""
@@ -74,6 +84,16 @@ class BashHooks:
         self._on_error.append(callback)
         return callback
     
+    def on_output(self, callback: Callable[[BashHookContext, str, str], None]):
+        """
+        Register output progress hook
+        
+        Called with (context, stream, text) for every chunk read, where
+        stream is "stdout" or "stderr". Runs on the reader thread.
+        """
+        self._on_output.append(callback)
+        return callback
+    
     def trigger_before(self, context: BashHookContext):
         """Trigger before hooks"""
         for hook in self._before_exec:
@@ -97,6 +117,116 @@ class BashHooks:
                 hook(context, result)
             except Exception:
                 pass
+    
+    def trigger_output(self, context: BashHookContext, stream: str, text: str):
+        """Trigger output progress hooks"""
+        for hook in self._on_output:
+            try:
+                hook(context, stream, text)
+            except Exception:
+                pass
+
+
+class _StreamCapture:
+    """
+    Incremental capture of one output stream
+    
+    "full" keeps all text. "tail" keeps only a rolling tail within the
+    byte/line limits and spills the complete raw output to a temp file
+    once it exceeds the limit. Writes after finish() are discarded, so a
+    reader still draining a pipe cannot touch the finished state.
+    """
+    
+    def __init__(self, name: str, mode: str, max_bytes: int, max_lines: int):
+        self.name = name
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True
+        )
+        self._parts: List[str] = []
+        self._truncator = TailTruncator(max_lines, max_bytes) if mode == "tail" else None
+        self._pending: List[bytes] = []
+        self._spill = None
+        self.spill_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self.finished = False
+    
+    def write(self, data: bytes) -> str:
+        """Consume raw bytes, return the decoded text"""
+        with self._lock:
+            if self.finished:
+                return ''
+            return self._write(data)
+    
+    def _write(self, data: bytes) -> str:
+        self.total_bytes += len(data)
+        text = self._decoder.decode(data)
+        if self._truncator is None:
+            self._parts.append(text)
+            return text
+        
+        self._truncator.write(text)
+        if self._spill is None and self.total_bytes > self.max_bytes:
+            self._spill = tempfile.NamedTemporaryFile(
+                mode='w+b',
+                delete=False,
+                suffix=f'.{self.name}.log',
+                prefix='koda-bash-'
+            )
+            self.spill_path = self._spill.name
+            for chunk in self._pending:
+                self._spill.write(chunk)
+            self._pending = []
+        if self._spill is not None:
+            self._spill.write(data)
+        else:
+            self._pending.append(data)
+        return text
+    
+    def finish(self) -> tuple:
+        """Return (text, stats); stops accepting writes"""
+        with self._lock:
+            self.finished = True
+            return self._finish()
+    
+    def _finish(self) -> tuple:
+        tail = self._decoder.decode(b'', final=True)
+        if self._truncator is None:
+            text = ''.join(self._parts) + tail
+            self._parts = []
+            lines = text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+            return text, {
+                "total_bytes": self.total_bytes,
+                "total_lines": lines,
+                "captured_bytes": self.total_bytes,
+                "captured_lines": lines,
+                "dropped_bytes": 0,
+                "dropped_lines": 0,
+                "truncated": False,
+            }
+        
+        self._truncator.write(tail)
+        if self._spill is not None:
+            self._spill.close()
+        self._pending = []
+        result = self._truncator.finish()
+        # The truncator counts split('\n') pieces; like "full" mode, don't
+        # count the empty piece after a trailing newline
+        trailing = 1 if result.content == '' or result.content.endswith('\n') else 0
+        total_lines = result.total_lines - trailing
+        captured_lines = result.output_lines - trailing
+        return result.content, {
+            "total_bytes": self.total_bytes,
+            "total_lines": total_lines,
+            "captured_bytes": result.output_bytes,
+            "captured_lines": captured_lines,
+            "dropped_bytes": max(0, result.total_bytes - result.output_bytes),
+            "dropped_lines": total_lines - captured_lines,
+            "truncated": result.truncated,
+            "full_output_path": self.spill_path,
+        }
 
 
 class BashExecutor:
@@ -106,9 +236,11 @@ class BashExecutor:
     Features:
     - Command timeout with graceful kill
     - Security validation
-    - Execution hooks
+    - Execution hooks (including per-chunk output progress)
     - Environment management
     - Working directory control
+    - Incremental output capture; "tail" mode bounds memory and spills
+      full output to a temp file
     
     Example:
         >>> executor = BashExecutor(timeout=30)
@@ -135,7 +267,10 @@ class BashExecutor:
         timeout: int = 60,
         shell: str = "/bin/bash",
         hooks: Optional[BashHooks] = None,
-        allow_dangerous: bool = False
+        allow_dangerous: bool = False,
+        capture: str = "full",
+        max_output_bytes: int = DEFAULT_MAX_BYTES,
+        max_output_lines: int = DEFAULT_MAX_LINES
     ):
         """
         Initialize bash executor.
@@ -147,13 +282,22 @@ class BashExecutor:
             shell: Shell to use
             hooks: Execution hooks
             allow_dangerous: Skip dangerous command check
+            capture: "full" keeps all output, "tail" keeps only the last
+                max_output_bytes/max_output_lines of each stream in memory
+            max_output_bytes: Byte limit per stream in "tail" mode
+            max_output_lines: Line limit per stream in "tail" mode
         """
+        if capture not in ("full", "tail"):
+            raise ValueError(f"Unknown capture mode: {capture}")
         self.cwd = cwd or os.getcwd()
         self.env = {**os.environ, **(env or {})}
         self.timeout = timeout
         self.shell = shell
         self.hooks = hooks or BashHooks()
         self.allow_dangerous = allow_dangerous
+        self.capture = capture
+        self.max_output_bytes = max_output_bytes
+        self.max_output_lines = max_output_lines
         self._process: Optional[subprocess.Popen] = None
         self._killed = False
     
@@ -217,7 +361,8 @@ class BashExecutor:
                 cwd=cwd,
                 env=env,
                 timeout=timeout,
-                input_data=input_data
+                input_data=input_data,
+                hook_context=hook_context
             )
             
             duration_ms = (time.perf_counter() - start_time) * 1000
@@ -258,11 +403,10 @@ class BashExecutor:
         cwd: Union[str, Path],
         env: Dict[str, str],
         timeout: int,
-        input_data: Optional[str] = None
+        input_data: Optional[str] = None,
+        hook_context: Optional[BashHookContext] = None
     ) -> BashResult:
-        """Execute command with timeout handling"""
-        import time
-        
+        """Execute command with timeout handling and incremental capture"""
         self._killed = False
         
         # Start process
@@ -272,9 +416,9 @@ class BashExecutor:
                 shell=True,
                 cwd=cwd,
                 env=env,
+                stdin=subprocess.PIPE if input_data is not None else None,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
                 executable=self.shell if os.name != 'nt' else None
             )
         except Exception as e:
@@ -286,18 +430,59 @@ class BashExecutor:
                 duration_ms=0.0
             )
         
+        process = self._process
+        captures = {
+            name: _StreamCapture(name, self.capture, self.max_output_bytes, self.max_output_lines)
+            for name in ("stdout", "stderr")
+        }
+        
+        # Read both pipes on threads so neither can fill up and block
+        def pump(name: str, stream):
+            capture = captures[name]
+            try:
+                while True:
+                    data = stream.read1(READ_CHUNK_SIZE)
+                    if not data:
+                        break
+                    text = capture.write(data)
+                    if capture.finished:
+                        break
+                    if hook_context is not None and text:
+                        self.hooks.trigger_output(hook_context, name, text)
+            except (OSError, ValueError):
+                pass
+        
+        readers = [
+            threading.Thread(target=pump, args=("stdout", process.stdout), daemon=True),
+            threading.Thread(target=pump, args=("stderr", process.stderr), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        
+        if input_data is not None:
+            def feed_stdin():
+                try:
+                    process.stdin.write(input_data.encode('utf-8'))
+                except (OSError, ValueError):
+                    pass
+                finally:
+                    try:
+                        process.stdin.close()
+                    except OSError:
+                        pass
+            threading.Thread(target=feed_stdin, daemon=True).start()
+        
         # Setup timeout timer
         timer = None
         if timeout > 0:
             def kill_process():
                 self._killed = True
                 try:
-                    self._process.terminate()
+                    process.terminate()
                     # Give it a grace period
-                    import threading
                     def force_kill():
                         try:
-                            self._process.kill()
+                            process.kill()
                         except:
                             pass
                     threading.Timer(2.0, force_kill).start()
@@ -307,43 +492,41 @@ class BashExecutor:
             timer = threading.Timer(timeout, kill_process)
             timer.start()
         
+        hard_timeout = False
         try:
             # Wait for completion
-            stdout, stderr = self._process.communicate(input=input_data, timeout=timeout + 5)
-            
-            if timer:
-                timer.cancel()
-            
-            return BashResult(
-                stdout=stdout or "",
-                stderr=stderr or "",
-                exit_code=self._process.returncode,
-                command=command,
-                duration_ms=0.0,  # Will be set by caller
-                timed_out=self._killed,
-                killed=self._killed
-            )
-            
+            process.wait(timeout=timeout + 5 if timeout > 0 else None)
         except subprocess.TimeoutExpired:
-            if timer:
-                timer.cancel()
-            
-            # Kill the process
+            hard_timeout = True
             try:
-                self._process.kill()
-                stdout, stderr = self._process.communicate()
+                process.kill()
+                process.wait()
             except:
-                stdout, stderr = "", ""
-            
-            return BashResult(
-                stdout=stdout or "",
-                stderr=stderr or "",
-                exit_code=ExitCode.TIMEOUT.value,
-                command=command,
-                duration_ms=0.0,
-                timed_out=True,
-                killed=True
-            )
+                pass
+        finally:
+            if timer:
+                timer.cancel()
+        
+        # Background children may keep the pipes open; don't wait forever.
+        # Readers still blocked afterwards are detached by finish() below.
+        join_timeout = 5 if hard_timeout or timeout <= 0 else timeout + 5
+        for reader in readers:
+            reader.join(timeout=join_timeout)
+        
+        stdout, stdout_stats = captures["stdout"].finish()
+        stderr, stderr_stats = captures["stderr"].finish()
+        
+        return BashResult(
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=ExitCode.TIMEOUT.value if hard_timeout else process.returncode,
+            command=command,
+            duration_ms=0.0,  # Will be set by caller
+            timed_out=hard_timeout or self._killed,
+            killed=hard_timeout or self._killed,
+            truncated=stdout_stats["truncated"] or stderr_stats["truncated"],
+            metadata={"capture": {"stdout": stdout_stats, "stderr": stderr_stats}}
+        )
     
     def _validate_command(self, command: str) -> tuple:
         """
@@ -397,6 +580,7 @@ def run_bash(
     command: str,
     timeout: int = 60,
     cwd: Optional[str] = None,
+    capture: str = "full",
     **kwargs
 ) -> BashResult:
     """
@@ -406,12 +590,13 @@ def run_bash(
         command: Command to run
         timeout: Timeout in seconds
         cwd: Working directory
+        capture: Output capture mode; pass "tail" to bound memory (see BashExecutor)
         **kwargs: Additional arguments
         
     Returns:
         BashResult
     """
-    executor = BashExecutor(timeout=timeout, cwd=cwd)
+    executor = BashExecutor(timeout=timeout, cwd=cwd, capture=capture)
     return executor.run(command, **kwargs)
 
 
@@ -213,17 +213,18 @@ class CommitCommand(BaseCommand):
         auto: bool = False
     ):
         """Generate commit and commit"""
-        from ...coding.utils import GitUtils
+        from ...coding.utils import GitUtils, get_git_state_service
         
         git = GitUtils()
+        # Committing needs the current state, not the cached snapshot
+        state = get_git_state_service(git.cwd).refresh()
         
-        if not git.is_git_repo():
+        if not state.is_git_repo:
             self.console.print("[red]Not a git repository[/red]")
             return
         
         # Check for changes
-        status = git.get_status()
-        if not any([status['staged'], status['modified'], status['untracked']]):
+        if not state.is_dirty:
             self.console.print("[yellow]No changes to commit[/yellow]")
             return
         
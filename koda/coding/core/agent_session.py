@@ -12,7 +12,7 @@ import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 from enum import Enum
 import uuid
 
@@ -23,7 +23,6 @@ from koda.ai.types import (
     UserMessage,
     ToolResultMessage,
     ModelInfo,
-    Tool,
     StopReason,
 )
 from koda.ai.provider_base import BaseProvider
@@ -31,6 +30,7 @@ from koda.ai.event_stream import AssistantMessageEventStream
 from koda.coding.session_manager import SessionManager, SessionEntry
 from koding.coding.core.event_bus import EventBus
 from koda.agent.tools import ToolRegistry, ToolContext
+from koda.mes.message_log import MessageLog
 from koda.agent.queue import MessageQueue, DeliveryMode
 from koda.agent.transform import convert_to_llm, transform_context, TransformConfig
 
@@ -142,7 +142,8 @@ class AgentSession:
 
         # State
         self.state = SessionState.IDLE
-        self._context: Context = Context(messages=[])
+        # Messages live in a persistent log so branch() is O(1)
+        self._context: Context = Context(messages=MessageLog())
         self._idle_event = asyncio.Event()
         self._idle_event.set()
         self._current_task: Optional[asyncio.Task] = None
@@ -165,9 +166,20 @@ class AgentSession:
         return self._context
 
     @property
-    def messages(self) -> List[Message]:
-        """Get messages from context"""
-        return self._context.messages
+    def messages(self) -> Sequence[Message]:
+        """Get messages from context (immutable view)"""
+        return self._message_log()
+
+    def _message_log(self) -> MessageLog:
+        """Get context messages as a MessageLog (adopting lists set from outside)"""
+        messages = self._context.messages
+        if not isinstance(messages, MessageLog):
+            messages = self._context.messages = MessageLog(messages)
+        return messages
+
+    def _append_message(self, message: Message) -> None:
+        """Append a message to the context"""
+        self._context.messages = self._message_log().append(message)
 
     async def initialize(self) -> None:
         """Initialize session and load any existing state"""
@@ -209,7 +221,7 @@ class AgentSession:
             )
 
             # Add to context
-            self._context.messages.append(user_msg)
+            self._append_message(user_msg)
 
             # Emit user message event
             yield SessionEvent("user_message", {"content": message})
@@ -261,7 +273,7 @@ class AgentSession:
                         assistant_msg.stop_reason = event.reason or StopReason.STOP
 
                         # Add to context
-                        self._context.messages.append(assistant_msg)
+                        self._append_message(assistant_msg)
 
                         # Update metrics
                         self._total_tokens_input += assistant_msg.usage.input
@@ -421,11 +433,23 @@ class AgentSession:
         Create a branch from current or specified entry.
 
         Args:
-            entry_id: Entry to branch from (None = current state)
+            entry_id: Entry to branch from (None = current state); matched
+                against a message's ``id`` or a tool result's ``tool_call_id``
 
         Returns:
             New AgentSession with branched context
+
+        Raises:
+            ValueError: If no message matches entry_id
         """
+        messages = self._message_log()
+        if entry_id is not None:
+            messages = messages.find(
+                lambda m: entry_id in (getattr(m, "id", None), getattr(m, "tool_call_id", None))
+            )
+            if messages is None:
+                raise ValueError(f"Entry {entry_id} not found")
+
         # Create new session
         new_config = AgentSessionConfig(
             model=self.config.model,
@@ -436,16 +460,13 @@ class AgentSession:
 
         new_session = AgentSession(self.provider, self.model, new_config)
 
-        # Copy context
-        if entry_id:
-            # Find entry and copy up to it
-            new_session._context = self._context  # Simplified
-        else:
-            new_session._context = Context(
-                system_prompt=self._context.system_prompt,
-                messages=list(self._context.messages),
-                tools=self._context.tools
-            )
+        # Share context: the message log is immutable, so forking is O(1)
+        # and appends on either side do not affect the other
+        new_session._context = Context(
+            system_prompt=self._context.system_prompt,
+            messages=messages,
+            tools=self._context.tools
+        )
 
         return new_session
 
@@ -478,20 +499,13 @@ class AgentSession:
         if not self.config.enable_tools:
             return self._context
 
-        # Add tools to context
-        tools = []
-        for name in self.tools.list_tools():
-            tool = self.tools.get(name)
-            if tool:
-                tools.append(Tool(
-                    name=tool.name,
-                    description=tool.description,
-                    parameters=tool.parameters
-                ))
+        # Add tools to context (cached per registry version); messages are
+        # passed as the immutable log instead of a copy
+        tools = self.tools.get_ai_tools()
 
         context = Context(
             system_prompt=self._context.system_prompt,
-            messages=list(self._context.messages),
+            messages=self._message_log(),
             tools=tools if tools else None
         )
 
@@ -533,7 +547,7 @@ class AgentSession:
                 content=[{"type": "text", "text": str(result)}],
                 timestamp=int(datetime.now().timestamp() * 1000)
             )
-            self._context.messages.append(tool_result)
+            self._append_message(tool_result)
 
             yield SessionEvent("tool_result", {
                 "tool": tool_name,
@@ -549,7 +563,7 @@ class AgentSession:
                 is_error=True,
                 timestamp=int(datetime.now().timestamp() * 1000)
             )
-            self._context.messages.append(error_result)
+            self._append_message(error_result)
 
             yield SessionEvent("tool_error", {
                 "tool": tool_name,
@@ -3,10 +3,18 @@ Export HTML
 Equivalent to Pi Mono's packages/coding-agent/src/core/export-html/
 
 Export conversation sessions to HTML format.
+
+Entries are rendered to per-entry fragments cached by content hash and
+streamed to the output file, so re-exporting a growing session only
+renders the new entries. Large sessions can be split into pages.
 """
+import dataclasses
+import hashlib
 import html
+import io
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, IO, Iterable, List, Optional, Sequence, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -20,6 +28,7 @@ class ExportOptions:
     include_metadata: bool = True
     include_timestamps: bool = True
     theme: str = "light"  # light, dark
+    page_size: Optional[int] = None  # entries per file, None = single file
 
 
 HTML_TEMPLATE = """<!DOCTYPE html>
@@ -127,6 +136,13 @@ HTML_TEMPLATE = """<!DOCTYPE html>
             font-size: 13px;
             font-style: italic;
         }}
+        
+        .page-nav {{
+            display: flex;
+            justify-content: space-between;
+            margin: 20px 0;
+            font-size: 14px;
+        }}
     </style>
 </head>
 <body>
@@ -161,6 +177,243 @@ THEMES = {
 }
 
 
+# Fragment cache budget (rendered text, approximate bytes)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _entry_digest(entry: SessionEntry) -> str:
+    """Content hash of an entry (all fields, in declaration order)"""
+    digest = hashlib.blake2b(type(entry).__name__.encode(), digest_size=16)
+    if dataclasses.is_dataclass(entry):
+        items = ((f.name, getattr(entry, f.name)) for f in dataclasses.fields(entry))
+    else:
+        items = sorted(vars(entry).items())
+    for name, value in items:
+        digest.update(b"\0" + name.encode() + b"=")
+        if isinstance(value, str):
+            digest.update(value.encode("utf-8", "surrogatepass"))
+        else:
+            digest.update(repr(value).encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def _page_path(output_path: str, index: int) -> str:
+    """Path of page `index` (0-based); the first page is output_path itself"""
+    if index == 0:
+        return str(output_path)
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}-{index + 1}{path.suffix}"))
+
+
+class SessionExporter:
+    """
+    Streaming, incremental session exporter
+    
+    Features:
+    - Writes entries to a file handle as it goes (no full document string)
+    - Per-entry fragments cached by content hash (LRU, byte-bounded)
+    - Paginated multi-file output (ExportOptions.page_size)
+    - Pages whose entries did not change are not rewritten
+    
+    Example:
+        >>> exporter = SessionExporter(ExportOptions(page_size=500))
+        >>> exporter.export_html(entries, "session.html")
+        >>> exporter.export_html(entries + new_entries, "session.html")  # renders only new_entries
+    """
+    
+    def __init__(self, options: Optional[ExportOptions] = None, max_cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.options = options or ExportOptions()
+        self.max_cache_bytes = max_cache_bytes
+        self._fragments: "OrderedDict[Tuple[str, bool, str], str]" = OrderedDict()
+        self._cache_bytes = 0
+        self._pages: Dict[str, str] = {}  # page path -> digest of what was written
+        self._page_counts: Dict[str, int] = {}  # output path -> pages written
+        self.rendered = 0
+        self.reused = 0
+        self.pages_written = 0
+        self.pages_skipped = 0
+    
+    def render_entry(self, entry: SessionEntry, fmt: str = "html", digest: Optional[str] = None) -> str:
+        """Render one entry to a fragment, reusing the cached one if unchanged"""
+        key = (fmt, self.options.include_timestamps, digest or _entry_digest(entry))
+        fragment = self._fragments.get(key)
+        if fragment is not None:
+            self._fragments.move_to_end(key)
+            self.reused += 1
+            return fragment
+        
+        if fmt == "html":
+            fragment = _entry_to_html(entry, self.options)
+        else:
+            fragment = _entry_to_markdown(entry)
+        self.rendered += 1
+        
+        self._fragments[key] = fragment
+        self._cache_bytes += len(fragment)
+        while self._cache_bytes > self.max_cache_bytes and len(self._fragments) > 1:
+            _, evicted = self._fragments.popitem(last=False)
+            self._cache_bytes -= len(evicted)
+        return fragment
+    
+    def write_html(
+        self,
+        entries: Iterable[SessionEntry],
+        fp: IO[str],
+        entry_count: Optional[int] = None,
+        nav: str = "",
+    ) -> int:
+        """
+        Stream an HTML document for entries to a text file handle
+        
+        Returns:
+            Number of entries written
+        """
+        if entry_count is None and isinstance(entries, Sequence):
+            entry_count = len(entries)
+        fragments = (self.render_entry(entry, "html") for entry in entries)
+        return self._write_html_document(fragments, fp, entry_count, nav)
+    
+    def write_markdown(self, entries: Iterable[SessionEntry], fp: IO[str], nav: str = "") -> int:
+        """
+        Stream a Markdown document for entries to a text file handle
+        
+        Returns:
+            Number of entries written
+        """
+        fragments = (self.render_entry(entry, "markdown") for entry in entries)
+        return self._write_markdown_document(fragments, fp, nav)
+    
+    def _write_html_document(
+        self,
+        fragments: Iterable[str],
+        fp: IO[str],
+        entry_count: Optional[int],
+        nav: str,
+    ) -> int:
+        theme = THEMES.get(self.options.theme, THEMES["light"])
+        head, tail = HTML_TEMPLATE.split("{messages}")
+        
+        metadata = ""
+        if self.options.include_metadata:
+            metadata = f"""
+        <div class="metadata">
+            Exported: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} | 
+            Entries: {entry_count if entry_count is not None else "?"}
+        </div>
+        """
+        
+        fp.write(head.format(title=html.escape(self.options.title), metadata=metadata, **theme))
+        if nav:
+            fp.write(nav)
+        count = 0
+        for fragment in fragments:
+            fp.write(fragment)
+            count += 1
+        if nav:
+            fp.write(nav)
+        fp.write(tail.format())
+        return count
+    
+    def _write_markdown_document(self, fragments: Iterable[str], fp: IO[str], nav: str) -> int:
+        fp.write(f"# Conversation Export\n\nExported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if nav:
+            fp.write(nav)
+        count = 0
+        for fragment in fragments:
+            fp.write(fragment)
+            count += 1
+        if nav:
+            fp.write(nav)
+        return count
+    
+    def export_html(self, entries: Sequence[SessionEntry], output_path: str) -> List[str]:
+        """Export entries to one or more HTML files, returns page paths"""
+        return self._export(entries, output_path, "html")
+    
+    def export_markdown(self, entries: Sequence[SessionEntry], output_path: str) -> List[str]:
+        """Export entries to one or more Markdown files, returns page paths"""
+        return self._export(entries, output_path, "markdown")
+    
+    def _export(self, entries: Sequence[SessionEntry], output_path: str, fmt: str) -> List[str]:
+        page_size = self.options.page_size or max(1, len(entries))
+        page_count = max(1, -(-len(entries) // page_size))
+        output_path = str(output_path)
+        options_key = repr(dataclasses.astuple(self.options))
+        
+        paths = []
+        for index in range(page_count):
+            page_entries = entries[index * page_size:(index + 1) * page_size]
+            path = _page_path(output_path, index)
+            paths.append(path)
+            digests = [_entry_digest(entry) for entry in page_entries]
+            
+            # Skip pages whose content (ignoring the export time) is unchanged
+            page_digest = hashlib.blake2b(
+                f"{fmt}|{options_key}|{index}|{page_count > index + 1}".encode(), digest_size=16
+            )
+            for digest in digests:
+                page_digest.update(digest.encode())
+            page_digest = page_digest.hexdigest()
+            if self._pages.get(path) == page_digest and Path(path).exists():
+                self.pages_skipped += 1
+                continue
+            
+            nav = self._page_nav(output_path, index, page_count, fmt) if page_count > 1 else ""
+            rendered = (
+                self.render_entry(entry, fmt, digest)
+                for entry, digest in zip(page_entries, digests)
+            )
+            with open(path, "w", encoding="utf-8") as fp:
+                if fmt == "html":
+                    self._write_html_document(rendered, fp, len(page_entries), nav)
+                else:
+                    self._write_markdown_document(rendered, fp, nav)
+            self._pages[path] = page_digest
+            self.pages_written += 1
+        
+        # Remove pages left over from a longer previous export
+        for index in range(page_count, self._page_counts.get(output_path, 0)):
+            stale = _page_path(output_path, index)
+            self._pages.pop(stale, None)
+            try:
+                Path(stale).unlink()
+            except OSError:
+                pass
+        self._page_counts[output_path] = page_count
+        
+        return paths
+    
+    def _page_nav(self, output_path: str, index: int, page_count: int, fmt: str) -> str:
+        """Previous/next links between pages"""
+        prev_name = Path(_page_path(output_path, index - 1)).name if index > 0 else None
+        next_name = Path(_page_path(output_path, index + 1)).name if index + 1 < page_count else None
+        if fmt == "html":
+            prev_link = f'<a href="{html.escape(prev_name)}">&larr; Previous</a>' if prev_name else "<span></span>"
+            next_link = f'<a href="{html.escape(next_name)}">Next &rarr;</a>' if next_name else "<span></span>"
+            return f"""
+    <div class="page-nav">{prev_link}<span>Page {index + 1}</span>{next_link}</div>
+    """
+        links = []
+        if prev_name:
+            links.append(f"[Previous page]({prev_name})")
+        links.append(f"Page {index + 1}")
+        if next_name:
+            links.append(f"[Next page]({next_name})")
+        return "\n" + " | ".join(links) + "\n"
+
+
+# Shared exporter so repeated exports of the same session reuse fragments
+_default_exporter: Optional[SessionExporter] = None
+
+
+def _get_exporter(options: ExportOptions) -> SessionExporter:
+    global _default_exporter
+    if _default_exporter is None:
+        _default_exporter = SessionExporter(options)
+    _default_exporter.options = options
+    return _default_exporter
+
+
 def export_to_html(
     entries: List[SessionEntry],
     output_path: str,
@@ -171,7 +424,7 @@ def export_to_html(
     
     Args:
         entries: Session entries to export
-        output_path: Output file path
+        output_path: Output file path (first page when paginated)
         options: Export options
         
     Returns:
@@ -180,41 +433,14 @@ def export_to_html(
     if options is None:
         options = ExportOptions()
     
-    # Generate HTML
-    html_content = _generate_html(entries, options)
-    
-    # Write to file
-    Path(output_path).write_text(html_content, encoding="utf-8")
-    
-    return output_path
+    return _get_exporter(options).export_html(entries, output_path)[0]
 
 
 def _generate_html(entries: List[SessionEntry], options: ExportOptions) -> str:
-    """Generate HTML content"""
-    theme = THEMES.get(options.theme, THEMES["light"])
-    
-    # Generate metadata
-    metadata = ""
-    if options.include_metadata:
-        metadata = f"""
-        <div class="metadata">
-            Exported: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} | 
-            Entries: {len(entries)}
-        </div>
-        """
-    
-    # Generate messages
-    messages_html = ""
-    for entry in entries:
-        messages_html += _entry_to_html(entry, options)
-    
-    # Fill template
-    return HTML_TEMPLATE.format(
-        title=html.escape(options.title),
-        metadata=metadata,
-        messages=messages_html,
-        **theme,
-    )
+    """Generate HTML content as one string"""
+    buffer = io.StringIO()
+    SessionExporter(options).write_html(entries, buffer)
+    return buffer.getvalue()
 
 
 def _entry_to_html(entry: SessionEntry, options: ExportOptions) -> str:
@@ -261,29 +487,33 @@ def _compaction_to_html(entry: CompactionEntry, options: ExportOptions) -> str:
     """
 
 
+def _entry_to_markdown(entry: SessionEntry) -> str:
+    """Convert entry to a Markdown fragment"""
+    if isinstance(entry, SessionMessageEntry):
+        role = "**User**" if entry.role == "user" else "**Assistant**"
+        return f"\n\n{role}:\n\n{entry.content}\n"
+    elif isinstance(entry, CompactionEntry):
+        return f"\n\n> [Summarized: {entry.summary[:50]}...]\n"
+    return ""
+
+
 def export_to_markdown(
     entries: List[SessionEntry],
     output_path: str,
+    options: Optional[ExportOptions] = None,
 ) -> str:
     """
     Export session entries to Markdown file.
     
     Args:
         entries: Session entries to export
-        output_path: Output file path
+        output_path: Output file path (first page when paginated)
+        options: Export options (only page_size applies)
         
     Returns:
         Path to exported file
     """
-    lines = ["# Conversation Export\n", f"Exported: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"]
-    
-    for entry in entries:
-        if isinstance(entry, SessionMessageEntry):
-            role = "**User**" if entry.role == "user" else "**Assistant**"
-            lines.append(f"\n{role}:\n")
-            lines.append(f"{entry.content}\n")
-        elif isinstance(entry, CompactionEntry):
-            lines.append(f"\n> [Summarized: {entry.summary[:50]}...]\n")
+    if options is None:
+        options = ExportOptions()
     
-    Path(output_path).write_text("\n".join(lines), encoding="utf-8")
-    return output_path
+    return _get_exporter(options).export_markdown(entries, output_path)[0]
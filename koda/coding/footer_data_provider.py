@@ -43,7 +43,8 @@ class FooterDataProvider:
         >>> print(f"{data.model} | {data.tokens_used} tokens")
     """
     
-    def __init__(self):
+    def __init__(self, cwd: Optional[str] = None):
+        self.cwd = cwd
         self._data = FooterData()
         self._providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
         self._register_default_providers()
@@ -169,25 +170,22 @@ class FooterDataProvider:
         )
     
     def _get_git_info(self) -> Dict[str, Any]:
-        """Get git information"""
+        """Get git information (served from the cached git state)"""
         try:
-            from .utils.git import GitUtils
-            git = GitUtils()
+            from .utils.git import get_git_state_service
+            state = get_git_state_service(self.cwd).get_state()
             
-            if not git.is_git_repo():
+            if not state.is_git_repo:
                 return {}
             
-            info = git.get_info()
-            status = git.get_status()
-            
             git_status = ""
-            if status["modified"] or status["staged"]:
+            if state.modified or state.staged:
                 git_status = "*"
-            if status["untracked"]:
+            if state.untracked:
                 git_status += "+"
             
             return {
-                "git_branch": info.branch,
+                "git_branch": state.branch,
                 "git_status": git_status
             }
         except Exception:
@@ -5,7 +5,8 @@ Equivalent to Pi Mono's packages/coding-agent/src/modes/rpc/
 Remote Procedure Call mode for programmatic access.
 """
 from .server import RPCServer, RPCRequest, RPCResponse
-from .client import RPCClient, RPCClientConfig, RPCError
+from .client import RPCClient, RPCClientConfig, RPCSubscription, RPCError
+from .streaming import EventPublisher
 from .handlers import RPCHandlers
 
 __all__ = [
@@ -14,6 +15,8 @@ __all__ = [
     "RPCResponse",
     "RPCClient",
     "RPCClientConfig",
+    "RPCSubscription",
     "RPCError",
+    "EventPublisher",
     "RPCHandlers",
 ]
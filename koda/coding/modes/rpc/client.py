@@ -6,9 +6,16 @@ JSON-RPC client for connecting to agent server.
 """
 import asyncio
 import json
-from typing import Any, Optional, Dict
+from collections import deque
+from typing import Any, Deque, Optional, Dict, List, Tuple
 from dataclasses import dataclass
 
+from .streaming import EVENT_NOTIFICATION, merge_event, shed_event
+
+# Notifications for a subscription id not yet known to the client
+# (they can arrive just before the rpc.subscribe response is handled)
+_MAX_EARLY_FRAMES = 64
+
 
 @dataclass
 class RPCClientConfig:
@@ -22,6 +29,9 @@ class RPCClient:
     """
     JSON-RPC client for agent server.
     
+    Calls may be issued concurrently on one connection: responses are
+    matched to requests by id, in whatever order the server completes them.
+    
     Example:
         >>> client = RPCClient()
         >>> await client.connect()
@@ -35,6 +45,11 @@ class RPCClient:
         self._writer: Optional[asyncio.StreamWriter] = None
         self._connected = False
         self._request_id = 0
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._read_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._subscriptions: Dict[str, "RPCSubscription"] = {}
+        self._early_frames: Dict[str, List[Dict[str, Any]]] = {}
     
     async def connect(self):
         """Connect to RPC server"""
@@ -43,12 +58,95 @@ class RPCClient:
             self.config.port
         )
         self._connected = True
+        self._read_task = asyncio.create_task(self._read_loop())
     
     def disconnect(self):
         """Disconnect from server"""
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
         if self._writer:
             self._writer.close()
         self._connected = False
+        self._fail_pending(ConnectionError("Disconnected"))
+        self._end_subscriptions()
+    
+    async def _read_loop(self):
+        """Read messages from the server and resolve pending calls"""
+        try:
+            while True:
+                data = await self._reader.readline()
+                if not data:
+                    break
+                
+                try:
+                    message = json.loads(data.decode('utf-8'))
+                except json.JSONDecodeError:
+                    continue
+                
+                for item in message if isinstance(message, list) else [message]:
+                    self._handle_message(item)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail_pending(e)
+            self._end_subscriptions()
+            return
+        
+        self._connected = False
+        self._fail_pending(ConnectionError("Connection closed by server"))
+        self._end_subscriptions()
+    
+    def _handle_message(self, message: Dict[str, Any]):
+        """Dispatch one decoded message"""
+        if "id" not in message and message.get("method") == EVENT_NOTIFICATION:
+            self._handle_event_frame(message.get("params") or {})
+            return
+        
+        future = self._pending.pop(message.get("id"), None)
+        if future is None or future.done():
+            return
+        
+        if "error" in message:
+            future.set_exception(RPCError(message["error"]))
+        else:
+            future.set_result(message.get("result"))
+    
+    def _handle_event_frame(self, frame: Dict[str, Any]):
+        """Route a pushed event frame to its subscription"""
+        subscription_id = frame.get("subscription")
+        subscription = self._subscriptions.get(subscription_id)
+        if subscription is not None:
+            subscription._put(frame)
+            return
+        
+        early = self._early_frames.setdefault(subscription_id, [])
+        if len(early) < _MAX_EARLY_FRAMES:
+            early.append(frame)
+    
+    def _end_subscriptions(self):
+        """End every subscription iterator (connection is gone)"""
+        subscriptions, self._subscriptions = self._subscriptions, {}
+        for subscription in subscriptions.values():
+            subscription._put(None)
+        self._early_frames.clear()
+    
+    def _fail_pending(self, error: Exception):
+        """Fail all calls still waiting for a response"""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+    
+    def _next_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+    
+    async def _send(self, payload: Any):
+        request_str = json.dumps(payload) + "\n"
+        async with self._write_lock:
+            self._writer.write(request_str.encode('utf-8'))
+            await self._writer.drain()
     
     async def call(self, method: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
         """
@@ -65,8 +163,7 @@ class RPCClient:
         if not self._connected:
             await self.connect()
         
-        self._request_id += 1
-        request_id = self._request_id
+        request_id = self._next_id()
         
         request = {
             "jsonrpc": "2.0",
@@ -75,23 +172,64 @@ class RPCClient:
             "id": request_id
         }
         
-        request_str = json.dumps(request) + "\n"
-        self._writer.write(request_str.encode('utf-8'))
-        await self._writer.drain()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
         
-        # Read response with timeout
-        to = timeout or self.config.timeout
-        response_data = await asyncio.wait_for(
-            self._reader.readline(),
-            timeout=to
-        )
+        try:
+            await self._send(request)
+            
+            # Wait for response with timeout
+            to = timeout or self.config.timeout
+            return await asyncio.wait_for(future, timeout=to)
+        finally:
+            self._pending.pop(request_id, None)
+    
+    async def call_batch(
+        self,
+        calls: List[Tuple[str, Optional[Dict[str, Any]]]],
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Send several calls as one JSON-RPC batch.
+        
+        Args:
+            calls: (method, params) pairs
+            timeout: Timeout for the whole batch
+            
+        Returns:
+            Results in call order; failed calls are returned as RPCError
+            instances rather than raised
+        """
+        if not self._connected:
+            await self.connect()
         
-        response = json.loads(response_data.decode('utf-8'))
+        loop = asyncio.get_running_loop()
+        batch = []
+        futures = []
         
-        if "error" in response:
-            raise RPCError(response["error"])
+        for method, params in calls:
+            request_id = self._next_id()
+            future = loop.create_future()
+            self._pending[request_id] = future
+            futures.append((request_id, future))
+            batch.append({
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or {},
+                "id": request_id
+            })
         
-        return response.get("result")
+        try:
+            await self._send(batch)
+            
+            to = timeout or self.config.timeout
+            return await asyncio.wait_for(
+                asyncio.gather(*(f for _, f in futures), return_exceptions=True),
+                timeout=to
+            )
+        finally:
+            for request_id, _ in futures:
+                self._pending.pop(request_id, None)
     
     async def notify(self, method: str, params: Optional[Dict[str, Any]] = None):
         """
@@ -110,9 +248,40 @@ class RPCClient:
             "params": params or {}
         }
         
-        request_str = json.dumps(request) + "\n"
-        self._writer.write(request_str.encode('utf-8'))
-        await self._writer.drain()
+        await self._send(request)
+    
+    async def subscribe(self, topic: str = "*", max_pending: int = 256) -> "RPCSubscription":
+        """
+        Subscribe to server-pushed events.
+        
+        Args:
+            topic: Topic name, or "*" for all topics
+            max_pending: Events buffered for a slow consumer before dropping
+            
+        Returns:
+            RPCSubscription; iterate it with ``async for``
+        """
+        result = await self.call("rpc.subscribe", {"topic": topic})
+        subscription = RPCSubscription(self, result["subscription"], topic, max_pending)
+        self._subscriptions[subscription.id] = subscription
+        
+        for frame in self._early_frames.pop(subscription.id, []):
+            subscription._put(frame)
+        return subscription
+    
+    async def unsubscribe(self, subscription: "RPCSubscription"):
+        """
+        Cancel a subscription.
+        
+        Events the server already buffered are still delivered before the
+        iterator ends.
+        """
+        try:
+            if self._connected:
+                await self.call("rpc.unsubscribe", {"subscription": subscription.id})
+        finally:
+            self._subscriptions.pop(subscription.id, None)
+            subscription._put(None)
     
     async def ping(self) -> bool:
         """Ping server to check connection"""
@@ -123,6 +292,69 @@ class RPCClient:
             return False
 
 
+class RPCSubscription:
+    """
+    Async iterator over events pushed for one subscription.
+    
+    Events wait in a buffer bounded like the server's: deltas merge, and
+    when the consumer falls ``max_pending`` events behind, progress events
+    are dropped first (counted in ``dropped``).
+    
+    Example:
+        >>> subscription = await client.subscribe("assistant")
+        >>> async for event in subscription:
+        ...     if event["type"] == "text_delta":
+        ...         print(event["delta"], end="")
+    """
+    
+    def __init__(
+        self,
+        client: RPCClient,
+        subscription_id: str,
+        topic: str,
+        max_pending: int = 256,
+    ):
+        self.client = client
+        self.id = subscription_id
+        self.topic = topic
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._ended = False
+    
+    def _put(self, frame: Optional[Dict[str, Any]]):
+        """Buffer a frame's events (None ends the iterator once drained)"""
+        if frame is None:
+            self._ended = True
+        else:
+            self.dropped += frame.get("dropped", 0)
+            for event in frame.get("events", []):
+                if self._events and merge_event(self._events[-1], event):
+                    continue
+                self._events.append(event)
+                if len(self._events) > self.max_pending:
+                    shed_event(self._events)
+                    self.dropped += 1
+        self._wakeup.set()
+    
+    def __aiter__(self) -> "RPCSubscription":
+        return self
+    
+    async def __anext__(self) -> Dict[str, Any]:
+        while not self._events:
+            if self._ended:
+                raise StopAsyncIteration
+            self._wakeup.clear()
+            await self._wakeup.wait()
+        
+        return self._events.popleft()
+    
+    async def close(self):
+        """Unsubscribe"""
+        await self.client.unsubscribe(self)
+
+
 class RPCError(Exception):
     """RPC error"""
     def __init__(self, error: Dict[str, Any]):
@@ -132,4 +364,4 @@ class RPCError(Exception):
         super().__init__(f"RPC Error {self.code}: {self.message}")
 
 
-__all__ = ["RPCClient", "RPCClientConfig", "RPCError"]
+__all__ = ["RPCClient", "RPCClientConfig", "RPCSubscription", "RPCError"]
@@ -5,11 +5,14 @@ Equivalent to Pi Mono's packages/coding-agent/src/modes/rpc/server.ts
 JSON-RPC server for remote agent access.
 """
 import asyncio
+import contextvars
 import json
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from .streaming import EventPublisher
+
 
 class RPCErrorCode(Enum):
     """JSON-RPC error codes"""
@@ -50,22 +53,75 @@ class RPCResponse:
         return response
 
 
+class _Connection:
+    """
+    Per-connection state.
+    
+    All writes go through a single lock so concurrently completing
+    responses never interleave on the wire.
+    """
+    
+    def __init__(self, writer: asyncio.StreamWriter, max_in_flight: int):
+        self.writer = writer
+        self.window = asyncio.Semaphore(max_in_flight)
+        self.tasks: Set[asyncio.Task] = set()
+        self.subscriptions: Set[str] = set()
+        self._write_lock = asyncio.Lock()
+    
+    async def send(self, payload: Any):
+        """Write one JSON message (object or batch array) followed by a newline"""
+        data = (json.dumps(payload) + "\n").encode('utf-8')
+        async with self._write_lock:
+            self.writer.write(data)
+            await self.writer.drain()
+
+
+# Connection of the request being handled (unset for HTTP requests)
+_current_connection: contextvars.ContextVar[Optional[_Connection]] = contextvars.ContextVar(
+    "rpc_current_connection", default=None
+)
+
+
 class RPCServer:
     """
     JSON-RPC server for agent remote access.
     
     Provides programmatic access to agent functionality via JSON-RPC.
     
+    Requests on a connection are pipelined: each line is dispatched as its
+    own task and responses are written as soon as they complete, so a slow
+    call does not block cheap ones behind it. At most ``max_in_flight``
+    requests run per connection (each batch member counts as one); beyond
+    that the server stops reading until one finishes. JSON-RPC batch arrays
+    are supported.
+    
+    Clients can call ``rpc.subscribe`` to receive events published through
+    ``server.events`` as notifications on their connection (see streaming.py).
+    
     Example:
         >>> server = RPCServer()
         >>> server.register_method("chat", handle_chat)
+        >>> server.events.attach_stream("assistant", stream)
         >>> await server.start(host="localhost", port=8080)
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        flush_interval: float = 0.05,
+        max_pending_events: int = 256
+    ):
         self._methods: Dict[str, Callable] = {}
         self._server: Optional[asyncio.Server] = None
         self._running = False
+        self.max_in_flight = max_in_flight
+        self.events = EventPublisher(
+            flush_interval=flush_interval,
+            max_pending=max_pending_events
+        )
+        
+        self._methods["rpc.subscribe"] = self._subscribe
+        self._methods["rpc.unsubscribe"] = self._unsubscribe
     
     def register_method(self, name: str, handler: Callable):
         """
@@ -82,6 +138,29 @@ class RPCServer:
         if name in self._methods:
             del self._methods[name]
     
+    def publish(self, topic: str, event: Any):
+        """Push an event to all clients subscribed to ``topic``"""
+        self.events.publish(topic, event)
+    
+    async def _subscribe(self, topic: str = "*") -> Dict[str, Any]:
+        """rpc.subscribe: start receiving events for a topic on this connection"""
+        conn = _current_connection.get()
+        if conn is None:
+            raise RuntimeError("Subscriptions require a persistent connection")
+        
+        subscription = self.events.subscribe(topic, conn.send)
+        conn.subscriptions.add(subscription.id)
+        return {"subscription": subscription.id, "topic": topic}
+    
+    async def _unsubscribe(self, subscription: str) -> bool:
+        """rpc.unsubscribe: stop a subscription created on this connection"""
+        conn = _current_connection.get()
+        if conn is None or subscription not in conn.subscriptions:
+            return False
+        
+        conn.subscriptions.discard(subscription)
+        return await self.events.unsubscribe(subscription, flush=True)
+    
     async def start(self, host: str = "localhost", port: int = 8080):
         """
         Start RPC server.
@@ -108,50 +187,159 @@ class RPCServer:
     
     async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
         """Handle client connection"""
-        while self._running:
-            try:
-                # Read request
-                data = await reader.readline()
+        conn = _Connection(writer, self.max_in_flight)
+        
+        try:
+            while self._running:
+                try:
+                    data = await reader.readline()
+                except ValueError:
+                    # Line longer than the stream limit; the stream can't resync
+                    try:
+                        await conn.send(RPCResponse(
+                            error={"code": RPCErrorCode.INVALID_REQUEST.value, "message": "Request too large"}
+                        ).to_dict())
+                    except Exception:
+                        pass
+                    break
+                except Exception:
+                    break
+                
                 if not data:
                     break
                 
                 request_str = data.decode('utf-8').strip()
-                response = await self._process_request(request_str)
+                if not request_str:
+                    continue
                 
-                if response:
-                    response_str = json.dumps(response.to_dict()) + "\n"
-                    writer.write(response_str.encode('utf-8'))
-                    await writer.drain()
-                    
-            except Exception as e:
-                error_response = RPCResponse(
-                    error={"code": RPCErrorCode.INTERNAL_ERROR.value, "message": str(e)}
-                )
-                writer.write(json.dumps(error_response.to_dict()).encode('utf-8'))
-                await writer.drain()
+                # Bound the in-flight window; no more lines are read until a slot frees
+                await conn.window.acquire()
+                task = asyncio.create_task(self._dispatch(conn, request_str))
+                conn.tasks.add(task)
+                task.add_done_callback(conn.tasks.discard)
+            
+            # Let in-flight requests finish before closing
+            if conn.tasks:
+                await asyncio.gather(*conn.tasks, return_exceptions=True)
+        finally:
+            for subscription_id in list(conn.subscriptions):
+                await self.events.unsubscribe(subscription_id)
+            conn.subscriptions.clear()
+            
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+    
+    async def _dispatch(self, conn: _Connection, request_str: str):
+        """Process one request line and write its response"""
+        _current_connection.set(conn)
+        holds_slot = True
+        try:
+            request_data = self._parse(request_str)
+            if isinstance(request_data, list) and request_data:
+                # Hand back the line's slot; each batch member takes its own
+                conn.window.release()
+                holds_slot = False
+                response = await self._process_decoded(request_data, conn.window)
+            else:
+                response = await self._process_decoded(request_data)
+            if response is None:
+                return
+            
+            if isinstance(response, list):
+                await conn.send([r.to_dict() for r in response])
+            else:
+                await conn.send(response.to_dict())
         
-        writer.close()
-        await writer.wait_closed()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        except Exception as e:
+            error_response = RPCResponse(
+                error={"code": RPCErrorCode.INTERNAL_ERROR.value, "message": str(e)}
+            )
+            try:
+                await conn.send(error_response.to_dict())
+            except Exception:
+                pass
+        finally:
+            if holds_slot:
+                conn.window.release()
     
-    async def _process_request(self, request_str: str) -> Optional[RPCResponse]:
+    async def _process_request(
+        self,
+        request_str: str
+    ) -> Optional[Union[RPCResponse, List[RPCResponse]]]:
         """
         Process JSON-RPC request.
         
         Args:
-            request_str: Raw request string
+            request_str: Raw request string (single request or batch array)
             
         Returns:
-            RPCResponse or None for notifications
+            RPCResponse, list of responses for a batch, or None when
+            there is nothing to send back (notifications)
         """
-        # Parse request
+        return await self._process_decoded(self._parse(request_str))
+    
+    def _parse(self, request_str: str) -> Any:
+        """Decode a request line; parse errors become an error response"""
         try:
-            request_data = json.loads(request_str)
+            return json.loads(request_str)
         except json.JSONDecodeError:
             return RPCResponse(
                 error={"code": RPCErrorCode.PARSE_ERROR.value, "message": "Parse error"},
                 id=None
             )
+    
+    async def _process_decoded(
+        self,
+        request_data: Any,
+        window: Optional[asyncio.Semaphore] = None
+    ) -> Optional[Union[RPCResponse, List[RPCResponse]]]:
+        """
+        Process a decoded request or batch.
+        
+        Args:
+            request_data: Decoded JSON (or the parse error response)
+            window: In-flight limit each batch member acquires a slot from
+        """
+        if isinstance(request_data, RPCResponse):
+            return request_data
         
+        if isinstance(request_data, list):
+            if not request_data:
+                return RPCResponse(
+                    error={"code": RPCErrorCode.INVALID_REQUEST.value, "message": "Invalid Request"},
+                    id=None
+                )
+            
+            async def process_member(item):
+                if window is None:
+                    return await self._process_single(item)
+                async with window:
+                    return await self._process_single(item)
+            
+            # Batch members run concurrently; notifications get no entry
+            responses = await asyncio.gather(
+                *(process_member(item) for item in request_data)
+            )
+            responses = [r for r in responses if r is not None]
+            return responses or None
+        
+        return await self._process_single(request_data)
+    
+    async def _process_single(self, request_data: Any) -> Optional[RPCResponse]:
+        """
+        Process one decoded JSON-RPC request object.
+        
+        Args:
+            request_data: Decoded request
+            
+        Returns:
+            RPCResponse or None for notifications
+        """
         # Validate request
         if not isinstance(request_data, dict):
             return RPCResponse(
@@ -180,10 +368,13 @@ class RPCServer:
         
         # Execute method
         try:
+            args = params if isinstance(params, list) else []
+            kwargs = params if isinstance(params, dict) else {}
+            
             if asyncio.iscoroutinefunction(handler):
-                result = await handler(**params)
+                result = await handler(*args, **kwargs)
             else:
-                result = handler(**params)
+                result = handler(*args, **kwargs)
             
             # Don't respond to notifications (no id)
             if request_id is None:
@@ -213,9 +404,11 @@ class RPCServer:
             JSON response
         """
         response = await self._process_request(body)
-        if response:
-            return json.dumps(response.to_dict())
-        return ""
+        if response is None:
+            return ""
+        if isinstance(response, list):
+            return json.dumps([r.to_dict() for r in response])
+        return json.dumps(response.to_dict())
 
 
 __all__ = ["RPCServer", "RPCRequest", "RPCResponse", "RPCErrorCode"]
@@ -0,0 +1,305 @@
+"""
+RPC Event Streaming
+Equivalent to Pi Mono's event forwarding in packages/coding-agent/src/modes/rpc/
+
+Server-push delivery of agent events to RPC clients.
+
+Clients subscribe to a topic with ``rpc.subscribe`` and then receive
+JSON-RPC notifications on the same connection:
+
+    {"jsonrpc": "2.0", "method": "rpc.event",
+     "params": {"subscription": "s1", "events": [...], "dropped": 0}}
+
+Events are buffered per subscription and flushed in time-windowed frames.
+Consecutive text/thinking deltas for the same content block are merged
+into one event, and when a client reads slower than events arrive the
+buffer stays bounded: deltas keep merging and the oldest progress events
+are dropped (counted in ``dropped``).
+"""
+import asyncio
+import itertools
+from dataclasses import is_dataclass, fields
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, MutableSequence, Set
+
+EVENT_NOTIFICATION = "rpc.event"
+
+# Event types whose "delta" field may be concatenated
+MERGEABLE_TYPES = {"text_delta", "thinking_delta", "toolcall_delta", "message_delta", "llm_delta"}
+
+# Events dropped under backpressure only when the buffer holds nothing else
+TERMINAL_TYPES = {"done", "error", "agent_end", "turn_end", "message_end", "llm_end", "llm_error"}
+
+SendFunc = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def event_to_dict(event: Any) -> Dict[str, Any]:
+    """
+    Convert an event object to a JSON-serializable dict.
+
+    Handles AssistantMessageEvent, both EventBus Event types and plain
+    dicts. Large or non-serializable fields (the partial message, raw
+    exceptions) are reduced to what a client needs.
+    """
+    if isinstance(event, dict):
+        return {k: _to_json(v) for k, v in event.items()}
+
+    result: Dict[str, Any] = {}
+
+    if is_dataclass(event):
+        for f in fields(event):
+            value = getattr(event, f.name)
+            if value is None or f.name == "partial":
+                continue
+            result[f.name] = _to_json(value)
+    else:
+        result["data"] = _to_json(event)
+
+    if "type" not in result:
+        result["type"] = type(event).__name__
+    return result
+
+
+def _to_json(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseException):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if is_dataclass(value):
+        return {f.name: _to_json(getattr(value, f.name)) for f in fields(value)}
+    return str(value)
+
+
+def merge_event(last: Dict[str, Any], event: Dict[str, Any]) -> bool:
+    """Append a delta to the previous one when they belong to the same block"""
+    if (
+        event.get("type") in MERGEABLE_TYPES
+        and last.get("type") == event.get("type")
+        and last.get("content_index") == event.get("content_index")
+        and isinstance(last.get("delta"), str)
+        and isinstance(event.get("delta"), str)
+    ):
+        last["delta"] += event["delta"]
+        return True
+    return False
+
+
+def shed_event(pending: MutableSequence[Dict[str, Any]]):
+    """
+    Drop one event from a full buffer.
+
+    Progress-style events go first; merged deltas carry content the
+    client cannot recover, so they go next. If only terminal events
+    are left the oldest one is dropped, keeping the buffer bounded.
+    """
+    for keep in (MERGEABLE_TYPES | TERMINAL_TYPES, TERMINAL_TYPES):
+        for i, event in enumerate(pending):
+            if event.get("type") not in keep:
+                del pending[i]
+                return
+    del pending[0]
+
+
+class Subscription:
+    """
+    One client's subscription to a topic.
+
+    Events are appended to a bounded buffer and written by a single flush
+    task, so a slow client only ever costs ``max_pending`` events of memory.
+    """
+
+    def __init__(
+        self,
+        subscription_id: str,
+        topic: str,
+        send: SendFunc,
+        flush_interval: float = 0.05,
+        max_pending: int = 256,
+    ):
+        self.id = subscription_id
+        self.topic = topic
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.closed = False
+
+        self._send = send
+        self._pending: List[Dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    def push(self, event: Dict[str, Any]):
+        """Queue an event for delivery (never blocks)"""
+        if self.closed:
+            return
+
+        if self._pending and merge_event(self._pending[-1], event):
+            pass
+        else:
+            self._pending.append(event)
+            if len(self._pending) > self.max_pending:
+                self._shed()
+
+        self._wakeup.set()
+
+    def _shed(self):
+        """Drop one event to stay within max_pending (see shed_event)"""
+        shed_event(self._pending)
+        self.dropped += 1
+
+    async def _flush_loop(self):
+        try:
+            while True:
+                await self._wakeup.wait()
+                # Let events accumulate for one window before sending a frame
+                await asyncio.sleep(self.flush_interval)
+                self._wakeup.clear()
+
+                if not self._pending:
+                    continue
+
+                events, self._pending = self._pending, []
+                dropped, self.dropped = self.dropped, 0
+                await self._send({
+                    "jsonrpc": "2.0",
+                    "method": EVENT_NOTIFICATION,
+                    "params": {
+                        "subscription": self.id,
+                        "topic": self.topic,
+                        "events": events,
+                        "dropped": dropped,
+                    },
+                })
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Connection gone; stop delivering
+            self.closed = True
+
+    async def close(self, flush: bool = False):
+        """Stop delivery, optionally sending what is still buffered"""
+        if flush and self._pending and not self.closed:
+            self._wakeup.set()
+            # Wait for the flush loop to drain the buffer
+            while self._pending and not self._task.done():
+                await asyncio.sleep(self.flush_interval)
+
+        self.closed = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class EventPublisher:
+    """
+    Topic-based event hub for RPC subscriptions.
+
+    Example:
+        >>> publisher = EventPublisher()
+        >>> publisher.attach_stream("assistant", stream)
+        >>> publisher.publish("status", {"type": "idle"})
+    """
+
+    def __init__(self, flush_interval: float = 0.05, max_pending: int = 256):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._by_topic: Dict[str, Set[str]] = {}
+        self._ids = itertools.count(1)
+
+    def subscribe(self, topic: str, send: SendFunc) -> Subscription:
+        """
+        Create a subscription that delivers through ``send``.
+
+        Args:
+            topic: Topic name, or "*" for all topics
+            send: Coroutine writing one notification to the client
+        """
+        subscription = Subscription(
+            f"s{next(self._ids)}",
+            topic,
+            send,
+            flush_interval=self.flush_interval,
+            max_pending=self.max_pending,
+        )
+        self._subscriptions[subscription.id] = subscription
+        self._by_topic.setdefault(topic, set()).add(subscription.id)
+        return subscription
+
+    async def unsubscribe(self, subscription_id: str, flush: bool = False) -> bool:
+        """Cancel a subscription; returns False if it does not exist"""
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is None:
+            return False
+
+        ids = self._by_topic.get(subscription.topic)
+        if ids is not None:
+            ids.discard(subscription_id)
+            if not ids:
+                del self._by_topic[subscription.topic]
+
+        await subscription.close(flush=flush)
+        return True
+
+    def publish(self, topic: str, event: Any):
+        """Fan an event out to every subscriber of ``topic`` (and of "*")"""
+        ids = self._by_topic.get(topic, set()) | self._by_topic.get("*", set())
+        if not ids:
+            return
+
+        payload = event_to_dict(event)
+        for subscription_id in ids:
+            subscription = self._subscriptions.get(subscription_id)
+            if subscription is not None:
+                # Each subscriber merges deltas in place, so give it its own copy
+                subscription.push(dict(payload))
+
+    def attach_stream(self, topic: str, stream: Any):
+        """Forward every event of an AssistantMessageEventStream to ``topic``"""
+        stream.on_event(lambda event: self.publish(topic, event))
+
+    def attach_bus(self, topic: str, bus: Any, event_types: List[Any]) -> List[Callable]:
+        """
+        Forward events of the given types from an EventBus to ``topic``.
+
+        Works with both koda.agent.events.EventBus and
+        koda.coding.core.event_bus.EventBus.
+
+        Returns:
+            Unsubscribe callables (empty for buses without them)
+        """
+        unsubscribers = []
+        for event_type in event_types:
+            handler = lambda event: self.publish(topic, event)
+            result = bus.on(event_type, handler)
+            if callable(result):
+                unsubscribers.append(result)
+            else:
+                unsubscribers.append(
+                    lambda event_type=event_type, handler=handler: bus.off(event_type, handler)
+                )
+        return unsubscribers
+
+    def topics(self) -> List[str]:
+        """Topics with at least one subscriber"""
+        return list(self._by_topic)
+
+
+__all__ = [
+    "EventPublisher",
+    "Subscription",
+    "event_to_dict",
+    "merge_event",
+    "shed_event",
+    "EVENT_NOTIFICATION",
+]
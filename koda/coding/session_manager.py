@@ -11,6 +11,7 @@ from pathlib import Path
 from enum import Enum, auto
 
 from koda.ai.types import Message, Context, Usage
+from koda.mes.message_log import MessageLog
 
 
 class EntryType(Enum):
@@ -59,6 +60,8 @@ class BranchSummaryEntry:
     summary: str
     entry_count: int
     file_operations: List[str] = field(default_factory=list)
+    parent_branch: Optional[str] = None
+    fork_entry_id: Optional[str] = None
 
 
 @dataclass
@@ -83,6 +86,10 @@ class SessionContext:
     entries: List[SessionEntryBase] = field(default_factory=list)
     branch_summaries: Dict[str, BranchSummaryEntry] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Runtime only: branch_id -> entry path (shares prefixes with the parent branch)
+    branch_logs: Dict[str, MessageLog] = field(default_factory=dict, repr=False, compare=False)
+    # Runtime only: branch_id -> (entry path, converted messages) for build_context
+    branch_contexts: Dict[str, tuple] = field(default_factory=dict, repr=False, compare=False)
 
 
 SessionEntry = Union[SessionMessageEntry, CompactionEntry, SessionEntryBase]
@@ -95,7 +102,7 @@ class SessionManager:
     Equivalent to Pi Mono's SessionManager
     
     Features:
-    - Tree-based branch navigation
+    - Tree-based branch navigation (O(1) forks with shared history)
     - Session persistence
     - Import/Export
     - Tag system
@@ -170,32 +177,33 @@ class SessionManager:
         
         Equivalent to Pi Mono's fork functionality
         """
-        # Find entry index
-        entry_idx = None
-        for i, entry in enumerate(session.entries):
-            if entry.id == from_entry_id:
-                entry_idx = i
-                break
+        # Find fork point on the current branch first, then anywhere
+        parent_branch = session.current_branch
+        fork_point = self._branch_log(session, parent_branch).find(lambda e: e.id == from_entry_id)
+        if fork_point is None:
+            entry = next((e for e in session.entries if e.id == from_entry_id), None)
+            if entry is not None:
+                parent_branch = entry.branch_id
+                fork_point = self._branch_log(session, parent_branch).find(lambda e: e.id == from_entry_id)
         
-        if entry_idx is None:
+        if fork_point is None:
             raise ValueError(f"Entry {from_entry_id} not found")
         
-        # Create branch summary for entries before fork
-        if entry_idx > 0:
-            summary = f"Branch {new_branch_name} forked at entry {from_entry_id}"
-            branch_summary = BranchSummaryEntry(
-                branch_id=new_branch_name,
-                summary=summary,
-                entry_count=entry_idx
-            )
-            session.branch_summaries[new_branch_name] = branch_summary
+        # Record the fork point; entries before it are shared, not copied
+        summary = f"Branch {new_branch_name} forked at entry {from_entry_id}"
+        session.branch_summaries[new_branch_name] = BranchSummaryEntry(
+            branch_id=new_branch_name,
+            summary=summary,
+            entry_count=len(fork_point) - 1,
+            parent_branch=parent_branch,
+            fork_entry_id=from_entry_id,
+        )
+        session.branch_logs[new_branch_name] = fork_point
+        session.branch_contexts.pop(new_branch_name, None)
         
         # Update current branch
         session.current_branch = new_branch_name
         
-        # Truncate entries to fork point
-        session.entries = session.entries[:entry_idx + 1]
-        
         self.save_session(session)
         return new_branch_name
     
@@ -213,22 +221,47 @@ class SessionManager:
         session: SessionContext,
         branch_id: str
     ) -> List[SessionEntry]:
-        """Get branch's full history"""
-        if branch_id == "main":
-            return [e for e in session.entries if e.branch_id == "main"]
+        """Get branch's full history (shared prefix up to the fork point included)"""
+        return list(self._branch_log(session, branch_id))
+    
+    def _branch_log(
+        self,
+        session: SessionContext,
+        branch_id: str,
+        _resolving: Optional[set] = None
+    ) -> MessageLog:
+        """
+        Get branch's entry path as a persistent log
+        
+        Built once per branch (e.g. after loading) and then extended by
+        add_entry, so it never rescans session.entries.
+        """
+        log = session.branch_logs.get(branch_id)
+        if log is not None:
+            return log
         
-        # For other branches, get entries from branch summary
-        entries = []
-        for entry in session.entries:
-            if entry.branch_id == branch_id:
-                entries.append(entry)
+        resolving = (_resolving or set()) | {branch_id}
+        base: MessageLog = MessageLog()
+        summary = session.branch_summaries.get(branch_id)
+        if summary and summary.fork_entry_id and summary.parent_branch not in (None, *resolving):
+            fork_point = self._branch_log(session, summary.parent_branch, resolving).find(
+                lambda e: e.id == summary.fork_entry_id
+            )
+            if fork_point is not None:
+                base = fork_point
         
-        return entries
+        log = base.extend(e for e in session.entries if e.branch_id == branch_id)
+        session.branch_logs[branch_id] = log
+        return log
     
     def add_entry(self, session: SessionContext, entry: SessionEntryBase) -> None:
         """Add entry to session"""
+        branch_log = self._branch_log(session, session.current_branch)
         entry.branch_id = session.current_branch
+        if entry.parent_id is None and branch_log:
+            entry.parent_id = branch_log.last.id
         session.entries.append(entry)
+        session.branch_logs[session.current_branch] = branch_log.append(entry)
         self.save_session(session)
     
     def build_context(
@@ -239,16 +272,32 @@ class SessionManager:
         """
         Build LLM context with branch summary handling
         """
-        messages: List[Message] = []
+        branch_id = session.current_branch
+        branch_log = self._branch_log(session, branch_id)
+        
+        # Reuse messages converted for an earlier state of this branch
+        cached = session.branch_contexts.get(branch_id)
+        new_entries = branch_log.since(cached[0]) if cached else None
+        if new_entries is None:
+            messages: List[Message] = []
+            new_entries = branch_log
+        else:
+            messages = list(cached[1])
         
-        # Get entries for current branch
-        branch_entries = self.get_branch_history(session, session.current_branch)
+        self._convert_entries(new_entries, messages)
+        session.branch_contexts[branch_id] = (branch_log, tuple(messages))
         
-        # Convert entries to messages
-        for entry in branch_entries:
+        return Context(
+            system_prompt=None,
+            messages=messages
+        )
+    
+    def _convert_entries(self, entries, messages: List[Message]) -> None:
+        """Convert message entries to LLM messages, appending to messages"""
+        from koda.ai.types import UserMessage, AssistantMessage, ToolResultMessage
+        
+        for entry in entries:
             if isinstance(entry, SessionMessageEntry):
-                from koda.ai.types import UserMessage, AssistantMessage, ToolResultMessage
-                
                 if entry.role == "user":
                     messages.append(UserMessage(
                         role="user",
@@ -269,11 +318,6 @@ class SessionManager:
                         content=entry.content,
                         timestamp=entry.timestamp
                     ))
-        
-        return Context(
-            system_prompt=None,
-            messages=messages
-        )
     
     def export_session(
         self,
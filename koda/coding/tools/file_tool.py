@@ -18,7 +18,7 @@ from koda.coding.tools.edit_utils import (
     strip_bom, detect_line_ending, normalize_to_lf, restore_line_endings,
     fuzzy_find_with_replacement, count_occurrences, generate_diff
 )
-from koda.coding._support.image_resize import resize_image, format_dimension_note, PIL_AVAILABLE
+from koda.coding._support.image_resize import resize_image_async, format_dimension_note, PIL_AVAILABLE
 from koda.coding._support.multimodal_types import ImageContent, TextContent
 
 
@@ -165,34 +165,10 @@ class FileTool:
                 mime_type = detect_image_mime_type_from_magic(target)
                 
                 if mime_type:
-                    # 读取图片（Pi 方式）
+                    # 读取图片（Pi 方式）；缩放在事件循环中交给进程池处理
                     with open(target, 'rb') as f:
                         image_bytes = f.read()
-                    
-                    base64_data = base64.b64encode(image_bytes).decode('utf-8')
-                    
-                    # 图片调整大小（Pi 兼容：2000x2000, 4.5MB）
-                    dimension_note = ""
-                    if auto_resize_images and PIL_AVAILABLE:
-                        resized = resize_image(base64_data, mime_type)
-                        if resized.wasResized:
-                            base64_data = resized.data
-                            mime_type = resized.mimeType
-                            note = format_dimension_note(resized)
-                            if note:
-                                dimension_note = f"\n{note}"
-                    
-                    return ReadResult(
-                        content=f"Read image file [{mime_type}]{dimension_note}",
-                        path=str(target),
-                        start_line=0,
-                        end_line=0,
-                        truncated=False,
-                        next_offset=0,
-                        is_image=True,
-                        image_data=base64_data,
-                        mime_type=mime_type,
-                    )
+                    return target, image_bytes, mime_type
                 
                 # 读取文本文件
                 with open(target, 'r', encoding='utf-8', errors='replace') as f:
@@ -271,7 +247,46 @@ class FileTool:
                 )
         
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _read)
+        result = await loop.run_in_executor(self._executor, _read)
+        if isinstance(result, ReadResult):
+            return result
+        
+        target, image_bytes, mime_type = result
+        try:
+            # 图片调整大小（Pi 兼容：2000x2000, 4.5MB，在进程池中处理原始字节）
+            dimension_note = ""
+            if auto_resize_images and PIL_AVAILABLE:
+                resized = await resize_image_async(image_bytes, mime_type)
+                base64_data = resized.data
+                if resized.wasResized:
+                    mime_type = resized.mimeType
+                    note = format_dimension_note(resized)
+                    if note:
+                        dimension_note = f"\n{note}"
+            else:
+                base64_data = base64.b64encode(image_bytes).decode('utf-8')
+            
+            return ReadResult(
+                content=f"Read image file [{mime_type}]{dimension_note}",
+                path=str(target),
+                start_line=0,
+                end_line=0,
+                truncated=False,
+                next_offset=0,
+                is_image=True,
+                image_data=base64_data,
+                mime_type=mime_type,
+            )
+        except Exception as e:
+            return ReadResult(
+                content="",
+                path=path,
+                start_line=0,
+                end_line=0,
+                truncated=False,
+                next_offset=0,
+                error=str(e)
+            )
     
     async def write(self, path: str, content: str) -> WriteResult:
         """
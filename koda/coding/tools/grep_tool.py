@@ -6,11 +6,15 @@ Pi-compatible implementation based on: packages/coding-agent/src/core/tools/grep
 import subprocess
 import json
 import os
+import tempfile
+import threading
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Callable
 from pathlib import Path
 
-from koda.coding._support.truncation import truncate_head, format_size, DEFAULT_MAX_BYTES, GREP_MAX_LINE_LENGTH
+from koda.coding._support.truncation import (
+    HeadTruncator, truncate_line, format_size, DEFAULT_MAX_BYTES, GREP_MAX_LINE_LENGTH
+)
 
 
 @dataclass
@@ -117,45 +121,72 @@ class GrepTool:
         args.extend([pattern, str(search_path)])
         
         try:
-            # Run ripgrep
-            result = subprocess.run(
-                args,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            # ripgrep returns 1 when no matches found
-            if result.returncode not in (0, 1):
-                return GrepResult(
-                    success=False,
-                    output="",
-                    error=f"ripgrep error: {result.stderr or f'exited with code {result.returncode}'}"
-                )
-            
-            # Parse JSON output
+            # Run ripgrep, reading matches as they arrive; rg is stopped as
+            # soon as we know the match limit is exceeded
             matches = []
             file_cache: Dict[str, List[str]] = {}
+            timed_out = threading.Event()
             
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
+            with tempfile.TemporaryFile() as stderr_file:
+                process = subprocess.Popen(
+                    args,
+                    stdout=subprocess.PIPE,
+                    stderr=stderr_file,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',
+                )
                 
-                try:
-                    event = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
+                def on_timeout():
+                    timed_out.set()
+                    process.kill()
                 
-                if event.get('type') == 'match':
-                    data = event.get('data', {})
-                    file_path = data.get('path', {}).get('text', '')
-                    line_number = data.get('line_number', 0)
+                timer = threading.Timer(60, on_timeout)
+                timer.start()
+                try:
+                    for line in process.stdout:
+                        # Only match events are needed; skip parsing the rest
+                        if '"type":"match"' not in line:
+                            continue
+                        
+                        try:
+                            event = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        
+                        if event.get('type') == 'match':
+                            data = event.get('data', {})
+                            file_path = data.get('path', {}).get('text', '')
+                            line_number = data.get('line_number', 0)
+                            
+                            if file_path and line_number:
+                                matches.append({
+                                    'file': file_path,
+                                    'line': line_number
+                                })
+                                if len(matches) > effective_limit:
+                                    break
                     
-                    if file_path and line_number:
-                        matches.append({
-                            'file': file_path,
-                            'line': line_number
-                        })
+                    stopped_early = len(matches) > effective_limit
+                    if stopped_early:
+                        process.kill()
+                    process.stdout.close()
+                    returncode = process.wait()
+                finally:
+                    timer.cancel()
+                
+                if timed_out.is_set():
+                    raise subprocess.TimeoutExpired(args, 60)
+                
+                # ripgrep returns 1 when no matches found
+                if not stopped_early and returncode not in (0, 1):
+                    stderr_file.seek(0)
+                    stderr = stderr_file.read().decode('utf-8', errors='replace')
+                    return GrepResult(
+                        success=False,
+                        output="",
+                        error=f"ripgrep error: {stderr or f'exited with code {returncode}'}"
+                    )
             
             if not matches:
                 return GrepResult(
@@ -168,11 +199,16 @@ class GrepTool:
             match_limit_reached = len(matches) > effective_limit
             matches = matches[:effective_limit]
             
-            # Format output with context
-            output_lines = []
+            # Format output with context, streamed through head truncation
+            # so formatting stops once the byte limit is reached
+            truncator = HeadTruncator(max_lines=float('inf'))
+            separator = ""
             lines_truncated = False
             
             for match in matches:
+                if truncator.full:
+                    break
+                
                 file_path = match['file']
                 line_number = match['line']
                 
@@ -187,12 +223,14 @@ class GrepTool:
                 
                 lines = file_cache.get(file_path, [])
                 if not lines:
-                    output_lines.append(f"{file_path}:{line_number}: (unable to read file)")
+                    truncator.write(f"{separator}{file_path}:{line_number}: (unable to read file)")
+                    separator = "\n"
                     continue
                 
                 # Calculate context range
                 start = max(1, line_number - context_value)
                 end = min(len(lines), line_number + context_value)
+                relative_path = os.path.relpath(file_path, search_path)
                 
                 for current in range(start, end + 1):
                     line_text = lines[current - 1] if current <= len(lines) else ""
@@ -204,15 +242,13 @@ class GrepTool:
                         lines_truncated = True
                     
                     # Format output
-                    relative_path = os.path.relpath(file_path, search_path)
                     if is_match_line:
-                        output_lines.append(f"{relative_path}:{current}: {truncated.text}")
+                        truncator.write(f"{separator}{relative_path}:{current}: {truncated.text}")
                     else:
-                        output_lines.append(f"{relative_path}-{current}- {truncated.text}")
+                        truncator.write(f"{separator}{relative_path}-{current}- {truncated.text}")
+                    separator = "\n"
             
-            # Apply byte truncation
-            raw_output = '\n'.join(output_lines)
-            truncation = truncate_head(raw_output, max_lines=float('inf'))
+            truncation = truncator.finish()
             
             output = truncation.content
             notices = []
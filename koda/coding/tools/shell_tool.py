@@ -13,12 +13,13 @@ from dataclasses import dataclass
 from typing import Optional, Callable
 from pathlib import Path
 import asyncio
+import codecs
 import subprocess
 import tempfile
 import os
 import sys
 
-from koda.coding._support.truncation import truncate_tail, format_size, DEFAULT_MAX_BYTES, DEFAULT_MAX_LINES
+from koda.coding._support.truncation import TailTruncator, format_size, DEFAULT_MAX_BYTES, DEFAULT_MAX_LINES
 
 
 @dataclass
@@ -159,14 +160,15 @@ class ShellTool:
                     cwd=str(self.base_path),
                 )
             
-            # Rolling buffer for recent output
-            chunks = []
-            chunks_bytes = 0
-            max_chunks_bytes = DEFAULT_MAX_BYTES * 2
+            # Streaming tail truncation; chunks are only buffered until the
+            # output spills to the temp file
+            truncator = TailTruncator()
+            pending = []
             total_bytes = 0
             
             async def read_stream(stream, is_stderr=False):
-                nonlocal temp_file, temp_file_path, chunks, chunks_bytes, total_bytes
+                nonlocal temp_file, temp_file_path, pending, total_bytes
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
                 
                 while True:
                     # Check abort signal
@@ -180,6 +182,7 @@ class ShellTool:
                             timeout=0.1
                         )
                         if not line:
+                            truncator.write(decoder.decode(b'', final=True))
                             break
                         
                         total_bytes += len(line)
@@ -194,25 +197,21 @@ class ShellTool:
                             )
                             temp_file_path = temp_file.name
                             # Write buffered chunks
-                            for chunk in chunks:
+                            for chunk in pending:
                                 temp_file.write(chunk)
+                            pending = []
                         
                         # Write to temp file if we have one
                         if temp_file:
                             temp_file.write(line)
+                        else:
+                            pending.append(line)
                         
-                        # Keep rolling buffer
-                        chunks.append(line)
-                        chunks_bytes += len(line)
-                        
-                        # Trim old chunks
-                        while chunks_bytes > max_chunks_bytes and len(chunks) > 1:
-                            removed = chunks.pop(0)
-                            chunks_bytes -= len(removed)
+                        text = decoder.decode(line)
+                        truncator.write(text)
                         
                         # Stream to callback
-                        if on_update:
-                            text = line.decode('utf-8', errors='replace')
+                        if on_update and text:
                             on_update(text)
                             
                     except asyncio.TimeoutError:
@@ -238,32 +237,27 @@ class ShellTool:
             if temp_file:
                 temp_file.close()
             
+            truncation = truncator.finish()
+            
             # Check abort signal
             if signal and signal.aborted:
-                full_output = b''.join(chunks).decode('utf-8', errors='replace')
                 return ShellResult(
                     success=False,
-                    output=full_output,
+                    output=truncation.content,
                     error="Command aborted",
                     exit_code=-1,
                 )
             
             # Check timeout
             if timed_out:
-                full_output = b''.join(chunks).decode('utf-8', errors='replace')
                 return ShellResult(
                     success=False,
-                    output=full_output,
+                    output=truncation.content,
                     error=f"Command timed out after {timeout} seconds",
                     exit_code=-1,
                 )
             
-            # Combine output
-            full_buffer = b''.join(chunks)
-            full_output = full_buffer.decode('utf-8', errors='replace')
-            
-            # Apply tail truncation
-            truncation = truncate_tail(full_output)
+            # Tail truncation was applied while streaming
             output_text = truncation.content or "(no output)"
             
             # Build result with truncation notice
@@ -274,7 +268,7 @@ class ShellTool:
                 end_line = truncation.total_lines
                 
                 if truncation.last_line_partial:
-                    last_line_size = format_size(len(full_output.split('\n')[-1].encode('utf-8')))
+                    last_line_size = format_size(truncation.last_line_bytes)
                     output_text += f"\n\n[Showing last {format_size(truncation.output_bytes)} of line {end_line} (line is {last_line_size}). Full output: {temp_file_path}]"
                 elif truncation.truncated_by == "lines":
                     output_text += f"\n\n[Showing lines {start_line}-{end_line} of {truncation.total_lines}. Full output: {temp_file_path}]"
@@ -3,7 +3,10 @@ Coding Utilities
 Equivalent to Pi Mono's packages/coding-agent/src/utils/
 """
 from .shell import ShellUtils, ShellResult, run_command, escape_shell_arg, which
-from .git import GitUtils, GitInfo, is_git_repo, get_git_info, get_git_diff
+from .git import (
+    GitUtils, GitInfo, GitState, GitStateService,
+    is_git_repo, get_git_info, get_git_diff, get_git_state_service
+)
 from .clipboard import ClipboardUtils, copy_to_clipboard, paste_from_clipboard, is_clipboard_available
 from .image_convert import ImageConverter, ImageInfo, image_to_base64, convert_image
 from .changelog import (
@@ -40,6 +43,9 @@ __all__ = [
     "which",
     # Git
     "GitUtils",
+    "GitState",
+    "GitStateService",
+    "get_git_state_service",
     "GitInfo",
     "is_git_repo",
     "get_git_info",
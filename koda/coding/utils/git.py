@@ -3,10 +3,19 @@ Git Utilities
 Equivalent to Pi Mono's packages/coding-agent/src/utils/git.ts
 
 Git operation helpers.
+
+GitStateService keeps a cached snapshot of the working tree state (branch,
+ahead/behind, changed files) gathered with a single
+``git status --porcelain=v2 --branch``. The snapshot is refreshed in the
+background when ``.git/index`` or HEAD change, or when it gets older than
+``max_age``, so UI code can read it on every render.
 """
 import os
-from typing import Optional, List, Dict, Any
-from dataclasses import dataclass
+import subprocess
+import threading
+import time
+from typing import Optional, List, Dict, Any, Tuple
+from dataclasses import dataclass, field
 
 from .shell import ShellUtils, ShellResult
 
@@ -22,6 +31,288 @@ class GitInfo:
     last_commit_msg: Optional[str] = None
 
 
+@dataclass
+class GitState:
+    """Snapshot of a working tree's git state"""
+    is_git_repo: bool
+    root: Optional[str] = None
+    branch: Optional[str] = None
+    head: Optional[str] = None
+    upstream: Optional[str] = None
+    ahead: int = 0
+    behind: int = 0
+    staged: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    untracked: List[str] = field(default_factory=list)
+    conflicted: List[str] = field(default_factory=list)
+    updated_at: float = 0.0
+
+    @property
+    def is_dirty(self) -> bool:
+        """Whether there is anything to commit"""
+        return bool(self.staged or self.modified or self.untracked or self.conflicted)
+
+    def get_status(self) -> Dict[str, List[str]]:
+        """Status in the GitUtils.get_status() format"""
+        return {
+            "staged": list(self.staged),
+            "modified": list(self.modified),
+            "untracked": list(self.untracked),
+        }
+
+
+def parse_porcelain_v2(output: str) -> GitState:
+    """
+    Parse ``git status --porcelain=v2 --branch`` output.
+
+    Args:
+        output: Command stdout
+
+    Returns:
+        GitState (root is left unset)
+    """
+    state = GitState(is_git_repo=True, updated_at=time.time())
+
+    for line in output.split('\n'):
+        if not line:
+            continue
+
+        if line.startswith('# '):
+            key, _, value = line[2:].partition(' ')
+            if key == 'branch.oid':
+                state.head = None if value == '(initial)' else value
+            elif key == 'branch.head':
+                state.branch = None if value == '(detached)' else value
+            elif key == 'branch.upstream':
+                state.upstream = value
+            elif key == 'branch.ab':
+                ahead, _, behind = value.partition(' ')
+                state.ahead = int(ahead.lstrip('+') or 0)
+                state.behind = int(behind.lstrip('-') or 0)
+            continue
+
+        kind = line[0]
+        if kind == '1':
+            parts = line.split(' ', 8)
+            xy, path = parts[1], parts[8]
+        elif kind == '2':
+            # Path and original path are tab separated
+            parts = line.split(' ', 9)
+            xy, path = parts[1], parts[9].split('\t', 1)[0]
+        elif kind == 'u':
+            state.conflicted.append(line.split(' ', 10)[10])
+            continue
+        elif kind == '?':
+            state.untracked.append(line[2:])
+            continue
+        else:
+            continue
+
+        if xy[0] != '.':
+            state.staged.append(path)
+        if xy[1] in 'MD':
+            state.modified.append(path)
+
+    return state
+
+
+class GitStateService:
+    """
+    Cached, change-invalidated git state for one working directory.
+
+    get_state() always answers from memory (after the first call) and
+    schedules a background refresh when the snapshot is stale. A snapshot
+    is stale when the index, HEAD or the checked-out ref changed on disk,
+    or when it is older than ``max_age`` (which catches unstaged edits).
+
+    Example:
+        >>> service = get_git_state_service()
+        >>> state = service.get_state()
+        >>> if state.is_git_repo:
+        ...     print(state.branch, "*" if state.is_dirty else "")
+    """
+
+    def __init__(self, cwd: Optional[str] = None, max_age: float = 5.0, min_interval: float = 1.0):
+        """
+        Args:
+            cwd: Working directory
+            max_age: Refresh snapshots older than this many seconds
+            min_interval: Minimum seconds between two refreshes (debounce)
+        """
+        self.cwd = cwd or os.getcwd()
+        self.max_age = max_age
+        self.min_interval = min_interval
+
+        self._lock = threading.Lock()
+        self._state: Optional[GitState] = None
+        self._root: Optional[str] = None
+        self._git_dir: Optional[str] = None
+        self._fingerprint: Optional[Tuple] = None
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._refresh_thread: Optional[threading.Thread] = None
+        # Refreshes started / sequence number of the stored snapshot
+        self._refresh_seq = 0
+        self._state_seq = 0
+        self.refresh_count = 0
+
+    def get_state(self) -> GitState:
+        """
+        Get the cached state.
+
+        The first call gathers the state synchronously; later calls never
+        block on git.
+        """
+        state = self._state
+        if state is None:
+            return self.refresh()
+
+        if self._is_stale():
+            self._schedule_refresh()
+        return state
+
+    def refresh(self) -> GitState:
+        """
+        Gather the state now (blocking) and cache it.
+
+        When refreshes overlap, the one that started last wins: an older
+        snapshot finishing late never replaces a newer one.
+        """
+        with self._lock:
+            self._refresh_seq += 1
+            seq = self._refresh_seq
+        self._resolve_git_dir()
+        # Read before collecting, so changes made meanwhile trigger another refresh
+        fingerprint = self._read_fingerprint()
+        state = self._collect()
+        with self._lock:
+            self.refresh_count += 1
+            if seq < self._state_seq:
+                return self._state
+            self._state = state
+            self._state_seq = seq
+            self._fingerprint = fingerprint
+            self._last_refresh = time.monotonic()
+        return state
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a running background refresh.
+
+        Returns:
+            True if no refresh is running anymore
+        """
+        thread = self._refresh_thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def invalidate(self) -> None:
+        """Force the next get_state() to schedule a refresh"""
+        with self._lock:
+            self._fingerprint = None
+            self._last_refresh = 0.0
+
+    def _is_stale(self) -> bool:
+        elapsed = time.monotonic() - self._last_refresh
+        if elapsed < self.min_interval:
+            return False
+        if elapsed >= self.max_age:
+            return True
+        return self._read_fingerprint() != self._fingerprint
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # Keep serving the previous snapshot
+            finally:
+                self._refreshing = False
+
+        thread = threading.Thread(target=run, name="git-state-refresh", daemon=True)
+        self._refresh_thread = thread
+        thread.start()
+
+    def _read_fingerprint(self) -> Optional[Tuple]:
+        """mtimes of the index, HEAD and the ref HEAD points to"""
+        git_dir = self._git_dir
+        if git_dir is None:
+            return None
+
+        head_path = os.path.join(git_dir, "HEAD")
+        paths = [os.path.join(git_dir, "index"), head_path]
+        try:
+            with open(head_path, encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError:
+            head = ""
+        if head.startswith("ref: "):
+            paths.append(os.path.join(git_dir, head[5:]))
+
+        fingerprint = [head]
+        for path in paths:
+            try:
+                fingerprint.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                fingerprint.append(None)
+        return tuple(fingerprint)
+
+    def _git(self, *args: str) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                cwd=self.cwd,
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def _resolve_git_dir(self) -> None:
+        if self._git_dir is None:
+            # Repository location never changes; look it up once
+            output = self._git("rev-parse", "--show-toplevel", "--absolute-git-dir")
+            if output is not None:
+                self._root, self._git_dir = output.strip().split('\n')[:2]
+
+    def _collect(self) -> GitState:
+        if self._git_dir is None:
+            return GitState(is_git_repo=False, updated_at=time.time())
+
+        output = self._git("status", "--porcelain=v2", "--branch")
+        if output is None:
+            self._git_dir = None
+            return GitState(is_git_repo=False, updated_at=time.time())
+
+        state = parse_porcelain_v2(output)
+        state.root = self._root
+        return state
+
+
+_state_services: Dict[str, GitStateService] = {}
+_state_services_lock = threading.Lock()
+
+
+def get_git_state_service(cwd: Optional[str] = None) -> GitStateService:
+    """Get the shared GitStateService for a directory"""
+    key = os.path.realpath(cwd or os.getcwd())
+    with _state_services_lock:
+        service = _state_services.get(key)
+        if service is None:
+            service = GitStateService(cwd=key)
+            _state_services[key] = service
+        return service
+
+
 class GitUtils:
     """
     Git operation utilities.
@@ -112,6 +403,10 @@ class GitUtils:
             "untracked": untracked
         }
     
+    def get_state(self) -> GitState:
+        """Get the cached working tree state (see GitStateService)"""
+        return get_git_state_service(self.cwd).get_state()
+
     def get_diff(self, staged: bool = False) -> str:
         """
         Get git diff.
@@ -196,6 +491,10 @@ def get_git_diff(staged: bool = False, cwd: Optional[str] = None) -> str:
 __all__ = [
     "GitUtils",
     "GitInfo",
+    "GitState",
+    "GitStateService",
+    "get_git_state_service",
+    "parse_porcelain_v2",
     "is_git_repo",
     "get_git_info",
     "get_git_diff",
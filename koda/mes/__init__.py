@@ -7,6 +7,7 @@ Reduces token usage through smart compression and history management.
 from koda.mes.optimizer import MessageOptimizer, OptimizationResult
 from koda.mes.formatter import MessageFormatter, FormattedMessage
 from koda.mes.history import HistoryManager, CompactionResult as HistoryCompactionResult
+from koda.mes.message_log import MessageLog
 from koda.mes.compaction import (
     MessageCompactor,
     CompactionStrategy,
@@ -26,6 +27,7 @@ __all__ = [
     # History
     "HistoryManager",
     "HistoryCompactionResult",
+    "MessageLog",
     # Advanced Compaction
     "MessageCompactor",
     "CompactionStrategy",
@@ -12,6 +12,7 @@ from datetime import datetime
 
 from koda.ai.provider import Message
 from koda.mes.optimizer import MessageOptimizer
+from koda.mes.message_log import MessageLog
 
 
 @dataclass
@@ -29,7 +30,7 @@ class HistoryManager:
     Manages conversation history
     
     Features:
-    - Tree-based branching
+    - Tree-based branching (branches share history via MessageLog)
     - Automatic compaction
     - Token usage tracking
     - Session persistence
@@ -52,15 +53,20 @@ class HistoryManager:
         self.storage_path = storage_path
         self.optimizer = MessageOptimizer(max_tokens, compaction_threshold)
         
-        # In-memory history
-        self._messages: List[Message] = []
-        self._branches: Dict[str, List[Message]] = {}
+        # In-memory history; branches are O(1) forks of a persistent log
+        self._log: MessageLog[Message] = MessageLog()
+        self._branches: Dict[str, MessageLog[Message]] = {}
         self._current_branch: str = "main"
         
         # Metadata
         self._token_usage: List[int] = []
         self._last_compaction: Optional[datetime] = None
     
+    @property
+    def _messages(self) -> Tuple[Message, ...]:
+        """Current branch messages (cached materialization of the log)"""
+        return self._log.to_tuple()
+    
     def add_message(self, message: Message) -> None:
         """
         Add message to history
@@ -68,7 +74,7 @@ class HistoryManager:
         Args:
             message: Message to add
         """
-        self._messages.append(message)
+        self._log = self._log.append(message)
         
         # Check if compaction needed
         if self.should_compact():
@@ -86,7 +92,7 @@ class HistoryManager:
         """
         if limit is None:
             return list(self._messages)
-        return self._messages[-limit:]
+        return list(self._messages[-limit:])
     
     def should_compact(self) -> bool:
         """Check if history needs compaction"""
@@ -106,8 +112,8 @@ class HistoryManager:
         original_tokens = self.optimizer.count_tokens(self._messages)
         
         # Use optimizer
-        result = self.optimizer.optimize(self._messages, aggressive=True)
-        self._messages = result.messages
+        result = self.optimizer.optimize(list(self._messages), aggressive=True)
+        self._log = MessageLog(result.messages)
         
         # Update metadata
         self._last_compaction = datetime.now()
@@ -148,23 +154,18 @@ class HistoryManager:
             branch_name: Name for new branch
             from_message_id: Message ID to branch from (default: current end)
         """
-        # Save current branch
-        self._branches[self._current_branch] = list(self._messages)
+        # Save current branch (O(1): the log is immutable)
+        self._branches[self._current_branch] = self._log
         
         # Create new branch
         if from_message_id:
-            # Find message index
-            idx = None
-            for i, msg in enumerate(self._messages):
-                if getattr(msg, 'id', None) == from_message_id:
-                    idx = i
-                    break
-            
-            if idx is not None:
-                self._messages = self._messages[:idx + 1]
+            # Find newest message with that ID; the prefix is shared, not copied
+            fork_point = self._log.find(lambda msg: getattr(msg, 'id', None) == from_message_id)
+            if fork_point is not None:
+                self._log = fork_point
         
         self._current_branch = branch_name
-        self._branches[branch_name] = list(self._messages)
+        self._branches[branch_name] = self._log
     
     def switch_branch(self, branch_name: str) -> bool:
         """
@@ -178,9 +179,9 @@ class HistoryManager:
         """
         if branch_name in self._branches:
             # Save current
-            self._branches[self._current_branch] = list(self._messages)
+            self._branches[self._current_branch] = self._log
             # Switch
-            self._messages = list(self._branches[branch_name])
+            self._log = self._branches[branch_name]
             self._current_branch = branch_name
             return True
         return False
@@ -191,7 +192,7 @@ class HistoryManager:
     
     def clear(self) -> None:
         """Clear all history"""
-        self._messages = []
+        self._log = MessageLog()
         self._branches = {}
         self._current_branch = "main"
         self._token_usage = []
@@ -281,7 +282,7 @@ class HistoryManager:
                     tool_call_id=data.get("tool_call_id"),
                     name=data.get("name"),
                 )
-                self._messages.append(msg)
+                self._log = self._log.append(msg)
         
         return True
     
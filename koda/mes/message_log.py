@@ -0,0 +1,157 @@
+"""
+Message Log
+
+Persistent (immutable) message log with structural sharing.
+
+Every append returns a new log node pointing at its parent, so forking a
+branch is O(1) and branches share their common prefix instead of copying
+it. Materializing a log into a tuple is cached per node, so reading the
+same log again is free; reading a grown log walks only the new messages
+but still builds a new tuple, which copies the whole history.
+"""
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class MessageLog(Sequence[T]):
+    """
+    Immutable message sequence built from parent pointers
+
+    Example:
+        main = MessageLog().append(system).append(user)
+        fork = main.append(reply_a)      # O(1), shares main
+        other = main.append(reply_b)     # main is unchanged
+    """
+
+    __slots__ = ("_parent", "_item", "_length", "_items", "_children")
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._parent: Optional["MessageLog[T]"] = None
+        self._item = None
+        self._length = 0
+        self._items: Optional[Tuple[T, ...]] = ()
+        self._children = 0
+        if items:
+            # Become the head of a chain built from a separate empty root
+            node = MessageLog().extend(items)
+            if node._length:
+                self._parent, self._item, self._length = node._parent, node._item, node._length
+                self._items = None
+
+    @classmethod
+    def _node(cls, parent: "MessageLog[T]", item: T) -> "MessageLog[T]":
+        node = cls.__new__(cls)
+        node._parent = parent
+        node._item = item
+        node._length = parent._length + 1
+        node._items = None
+        node._children = 0
+        return node
+
+    def append(self, item: T) -> "MessageLog[T]":
+        """Return a new log with item added (O(1))"""
+        self._children += 1
+        return self._node(self, item)
+
+    def extend(self, items: Iterable[T]) -> "MessageLog[T]":
+        """Return a new log with items added"""
+        node = self
+        for item in items:
+            node = node.append(item)
+        return node
+
+    @property
+    def parent(self) -> Optional["MessageLog[T]"]:
+        """Log without the last item (None for the empty log)"""
+        return self._parent
+
+    @property
+    def last(self) -> Optional[T]:
+        """Last item, or None for the empty log"""
+        return self._item if self._length else None
+
+    def truncate(self, length: int) -> "MessageLog[T]":
+        """Return the prefix with the first `length` items (shares nodes)"""
+        if length < 0:
+            length = max(0, self._length + length)
+        node = self
+        while node._length > length:
+            node = node._parent
+        return node
+
+    def find(self, predicate: Callable[[T], bool]) -> Optional["MessageLog[T]"]:
+        """Return the prefix ending at the newest item matching predicate"""
+        node = self
+        while node._length:
+            if predicate(node._item):
+                return node
+            node = node._parent
+        return None
+
+    def since(self, ancestor: "MessageLog[T]") -> Optional[List[T]]:
+        """
+        Items appended after an ancestor log
+
+        Returns:
+            List of new items, or None if ancestor is not a prefix of this log
+        """
+        items: List[T] = []
+        node = self
+        while node._length > ancestor._length:
+            items.append(node._item)
+            node = node._parent
+        if node is not ancestor:
+            return None
+        items.reverse()
+        return items
+
+    def to_tuple(self) -> Tuple[T, ...]:
+        """
+        Materialize the log (cached per node)
+
+        Only the nodes after the nearest cached ancestor are walked, but the
+        result is a fresh tuple, so a cache miss costs O(len(self)).
+        """
+        if self._items is not None:
+            return self._items
+
+        tail: List[T] = []
+        node = self
+        while node._items is None:
+            tail.append(node._item)
+            node = node._parent
+        tail.reverse()
+        self._items = node._items + tuple(tail)
+
+        # A linear ancestor's tuple is superseded by ours; dropping it keeps
+        # memory proportional to the number of branches, not history length
+        if node._children == 1 and node._length:
+            node._items = None
+        return self._items
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __bool__(self) -> bool:
+        return self._length > 0
+
+    def __getitem__(self, index):
+        if index == -1 and self._length and isinstance(index, int):
+            return self._item
+        return self.to_tuple()[index]
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.to_tuple())
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, (MessageLog, list, tuple)):
+            return len(self) == len(other) and tuple(self) == tuple(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MessageLog({self._length} messages)"
@@ -5,6 +5,7 @@ This module provides the Mom agent system, equivalent to Pi Mono's mom package.
 
 Key Components:
 - MomAgent: Multi-channel agent runner with per-channel memory
+- ChannelScheduler: Ordered per-channel queues on a shared worker pool
 - ContextManager: Dynamic context management with auto-compaction
 - EventsWatcher: Event scheduling and file watching
 - StructuredLogger: Rich structured logging
@@ -42,6 +43,18 @@ from koda.mom.agent import (
     ChannelConfig,
     ChannelMemory,
 )
+from koda.mom.memory_store import (
+    MemoryBackend,
+    FileMemoryBackend,
+    SingleFileMemoryBackend,
+    SQLiteMemoryBackend,
+    create_memory_backend,
+)
+from koda.mom.scheduler import (
+    ChannelScheduler,
+    QueueFullError,
+    SchedulerClosedError,
+)
 from koda.mom.context import (
     ContextManager,
     MomSettings,
@@ -78,6 +91,8 @@ from koda.mom.sandbox import (
 from koda.mom.store import (
     Store,
     Attachment,
+    BlobStore,
+    get_blob_store,
     LoggedMessage,
     MessageHistory,
     processAttachments,
@@ -138,6 +153,16 @@ __all__ = [
     "MomAgentConfig",
     "ChannelConfig",
     "ChannelMemory",
+    # Memory persistence
+    "MemoryBackend",
+    "FileMemoryBackend",
+    "SingleFileMemoryBackend",
+    "SQLiteMemoryBackend",
+    "create_memory_backend",
+    # Scheduler
+    "ChannelScheduler",
+    "QueueFullError",
+    "SchedulerClosedError",
     # Context
     "ContextManager",
     "MomSettings",
@@ -170,6 +195,8 @@ __all__ = [
     # Store
     "Store",
     "Attachment",
+    "BlobStore",
+    "get_blob_store",
     "LoggedMessage",
     "MessageHistory",
     "processAttachments",
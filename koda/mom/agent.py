@@ -6,21 +6,43 @@ Provides:
 - Multi-channel agent management
 - Per-channel memory
 - Agent session lifecycle
+- Bounded session cache with hibernation of idle channels
+- Per-channel ordered message handling on a shared worker pool
+- Batched persistence of changed channel memories
 """
 import asyncio
-from dataclasses import dataclass, field
+import os
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from pathlib import Path
 from typing import Any, AsyncIterator, Dict, List, Optional
 import json
 import uuid
 
-from koda.ai.types import Context, Message, UserMessage, AssistantMessage
+from koda.ai.types import (
+    Context,
+    Message,
+    UserMessage,
+    AssistantMessage,
+    ToolResultMessage,
+    TextContent,
+    ThinkingContent,
+    ImageContent,
+    ToolCall,
+    Usage,
+    StopReason,
+)
 from koda.ai.provider_base import BaseProvider
 from koda.ai.models.registry import ModelRegistry, get_model_registry
 from koda.coding.core.agent_session import AgentSession, AgentSessionConfig, SessionEvent
 from koda.mom.store import MomStore
 from koda.mom.context import ContextManager
+from koda.mom.scheduler import ChannelScheduler
+from koda.mom.memory_store import MemoryBackend, create_memory_backend
+
+_END_OF_RESPONSE = object()
 
 
 @dataclass
@@ -39,13 +61,45 @@ class ChannelConfig:
 
 @dataclass
 class ChannelMemory:
-    """Channel memory/state"""
+    """
+    Channel memory/state
+
+    Assigning any field marks the memory dirty so the next flush persists
+    it. In-place mutation (e.g. ``key_facts.append``) must be followed by
+    ``mark_dirty()``.
+    """
     channel_id: str
     summary: str = ""
     key_facts: List[str] = field(default_factory=list)
     last_activity: datetime = field(default_factory=datetime.now)
     message_count: int = 0
 
+    def __post_init__(self) -> None:
+        self.mark_clean()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_version", getattr(self, "_version", 0) + 1)
+
+    @property
+    def dirty(self) -> bool:
+        """Whether there are changes not yet persisted"""
+        return self._version != self._saved_version
+
+    def mark_dirty(self) -> None:
+        """Flag an in-place change"""
+        object.__setattr__(self, "_version", self._version + 1)
+
+    def mark_clean(self, version: Optional[int] = None) -> None:
+        """
+        Record that the memory was persisted.
+
+        Args:
+            version: Version that was written; later changes stay dirty
+        """
+        object.__setattr__(self, "_saved_version", self._version if version is None else version)
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "channel_id": self.channel_id,
@@ -77,10 +131,90 @@ class MomAgentConfig:
     # Memory settings
     auto_memory_update: bool = True
     memory_update_interval: float = 300.0  # 5 minutes
+    memory_backend: str = "files"  # "files", "single_file" or "sqlite"
 
     # Response settings
     default_response_timeout: float = 120.0
 
+    # Scheduling settings
+    # Messages in one channel are handled in order, one at a time; at most
+    # max_concurrent_runs channels are handled at once. Messages beyond the
+    # queue limits are rejected with QueueFullError.
+    max_concurrent_runs: int = 8
+    max_channel_queue: int = 16
+    max_total_queue: int = 1000
+
+    # Session cache settings
+    # Sessions beyond these limits (least recently used first) or idle for
+    # longer than session_idle_timeout are hibernated to session_dir and
+    # rehydrated on the next message in the channel.
+    max_resident_sessions: int = 1000
+    max_resident_tokens: Optional[int] = None  # Estimated context tokens across sessions
+    session_idle_timeout: Optional[float] = 1800.0  # 30 minutes; None disables
+    hibernation_check_interval: float = 60.0
+
+
+def _content_to_dict(item: Any) -> Any:
+    if isinstance(item, (TextContent, ThinkingContent, ImageContent, ToolCall)):
+        return asdict(item)
+    return item
+
+
+def _content_from_dict(data: Any) -> Any:
+    if not isinstance(data, dict):
+        return data
+
+    content_types = {
+        "text": TextContent,
+        "thinking": ThinkingContent,
+        "image": ImageContent,
+        "toolCall": ToolCall,
+    }
+    content_cls = content_types.get(data.get("type"))
+    return content_cls(**data) if content_cls else data
+
+
+def _message_to_dict(message: Message) -> Dict[str, Any]:
+    """Serialize a message for hibernation"""
+    data = {
+        key: value
+        for key, value in vars(message).items()
+        if key not in ("content", "usage", "stop_reason")
+    }
+
+    if isinstance(message.content, str):
+        data["content"] = message.content
+    else:
+        data["content"] = [_content_to_dict(item) for item in message.content]
+
+    if isinstance(message, AssistantMessage):
+        data["usage"] = asdict(message.usage)
+        data["stop_reason"] = message.stop_reason.value
+
+    return data
+
+
+def _message_from_dict(data: Dict[str, Any]) -> Message:
+    """Restore a message serialized by _message_to_dict"""
+    data = dict(data)
+    content = data.pop("content", "")
+    if not isinstance(content, str):
+        content = [_content_from_dict(item) for item in content]
+
+    role = data.get("role")
+    if role == "assistant":
+        usage = data.pop("usage", None)
+        stop_reason = data.pop("stop_reason", None)
+        return AssistantMessage(
+            content=content,
+            usage=Usage(**usage) if usage else Usage(),
+            stop_reason=StopReason(stop_reason) if stop_reason else StopReason.STOP,
+            **data,
+        )
+    if role == "toolResult":
+        return ToolResultMessage(content=content, **data)
+    return UserMessage(content=content, **data)
+
 
 class MomAgent:
     """
@@ -116,8 +250,19 @@ class MomAgent:
         self.config.memory_dir.mkdir(parents=True, exist_ok=True)
         self.config.session_dir.mkdir(parents=True, exist_ok=True)
 
-        # Channel sessions
-        self._sessions: Dict[str, AgentSession] = {}
+        # Resident channel sessions, least recently used first
+        self._sessions: "OrderedDict[str, AgentSession]" = OrderedDict()
+        self._session_last_used: Dict[str, float] = {}
+
+        # Session cache metrics
+        self._cache_stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "rehydrated": 0,
+            "hibernated": 0,
+            "evicted_lru": 0,
+            "evicted_idle": 0,
+        }
 
         # Channel memories
         self._memories: Dict[str, ChannelMemory] = {}
@@ -127,22 +272,49 @@ class MomAgent:
 
         # Store
         self._store = MomStore(self.config.memory_dir)
+        self._memory_backend = self._create_memory_backend()
+        self._memory_backend_closed = False
+        self._memory_flush_lock = asyncio.Lock()
+
+        # Message scheduler
+        self._scheduler = self._create_scheduler()
 
         # Model registry
         self._model_registry = get_model_registry()
 
         # Background tasks
         self._memory_task: Optional[asyncio.Task] = None
+        self._hibernation_task: Optional[asyncio.Task] = None
         self._running = False
 
+    def _create_memory_backend(self) -> MemoryBackend:
+        return create_memory_backend(self.config.memory_backend, self.config.memory_dir)
+
+    def _create_scheduler(self) -> ChannelScheduler:
+        return ChannelScheduler(
+            max_workers=self.config.max_concurrent_runs,
+            max_channel_queue=self.config.max_channel_queue,
+            max_total_queue=self.config.max_total_queue,
+        )
+
     async def start(self) -> None:
         """Start the mom agent"""
         self._running = True
 
+        # A stopped agent can be restarted
+        if self._scheduler.closed:
+            self._scheduler = self._create_scheduler()
+        if self._memory_backend_closed:
+            self._memory_backend = self._create_memory_backend()
+            self._memory_backend_closed = False
+
         # Start background memory update task
         if self.config.auto_memory_update:
             self._memory_task = asyncio.create_task(self._memory_update_loop())
 
+        if self.config.session_idle_timeout is not None:
+            self._hibernation_task = asyncio.create_task(self._hibernation_loop())
+
     async def stop(self) -> None:
         """Stop the mom agent"""
         self._running = False
@@ -150,10 +322,16 @@ class MomAgent:
         # Cancel background tasks
         if self._memory_task:
             self._memory_task.cancel()
+        if self._hibernation_task:
+            self._hibernation_task.cancel()
 
-        # Save all memories
-        for channel_id, memory in self._memories.items():
-            await self.save_memory(channel_id, memory)
+        # Cancel queued and running messages
+        await self._scheduler.close()
+
+        # Persist all unsaved memory changes, then release the backend
+        await self.flush_memories()
+        await asyncio.to_thread(self._memory_backend.close)
+        self._memory_backend_closed = True
 
         # Close all sessions
         for session in self._sessions.values():
@@ -171,8 +349,12 @@ class MomAgent:
             AgentSession for the channel
         """
         if channel_id in self._sessions:
+            self._cache_stats["hits"] += 1
+            self._touch_session(channel_id)
             return self._sessions[channel_id]
 
+        self._cache_stats["misses"] += 1
+
         # Get channel config
         channel_config = self._channel_configs.get(channel_id, ChannelConfig(
             channel_id=channel_id,
@@ -196,6 +378,10 @@ class MomAgent:
         # Create session
         session = AgentSession(self.provider, model_info, session_config)
 
+        # Rehydrate a hibernated session
+        if await self._restore_session(channel_id, session):
+            self._cache_stats["rehydrated"] += 1
+
         # Load memory if enabled
         if channel_config.memory_enabled:
             memory = await self.load_memory(channel_id)
@@ -205,6 +391,8 @@ class MomAgent:
                 pass
 
         self._sessions[channel_id] = session
+        self._touch_session(channel_id)
+        await self._enforce_session_budget(keep=channel_id)
         return session
 
     async def handle_message(
@@ -217,6 +405,10 @@ class MomAgent:
         """
         Handle an incoming message from a user in a channel.
 
+        The message is queued behind earlier messages in the same channel
+        and runs when a scheduler worker is free; events are streamed back
+        as they are produced.
+
         Args:
             channel_id: Channel identifier
             user_id: User identifier
@@ -225,7 +417,53 @@ class MomAgent:
 
         Yields:
             SessionEvent objects
+
+        Raises:
+            QueueFullError: If the message was shed because queues are full
+            SchedulerClosedError: If the agent stopped before the message ran
         """
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def run() -> None:
+            try:
+                await self._process_message(channel_id, user_id, content, metadata, events)
+            finally:
+                events.put_nowait(_END_OF_RESPONSE)
+
+        result = self._scheduler.submit(channel_id, run)
+
+        while True:
+            if events.empty():
+                # A job failed by the scheduler never runs, so never posts the end marker
+                if result.done():
+                    break
+                getter = asyncio.ensure_future(events.get())
+                try:
+                    await asyncio.wait({getter, result}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    if not getter.done():
+                        getter.cancel()
+                if not getter.done():
+                    continue
+                event = getter.result()
+            else:
+                event = events.get_nowait()
+            if event is _END_OF_RESPONSE:
+                break
+            yield event
+
+        # Propagate errors from the run
+        await result
+
+    async def _process_message(
+        self,
+        channel_id: str,
+        user_id: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]],
+        events: asyncio.Queue
+    ) -> None:
+        """Run one message through the channel's session (called by the scheduler)"""
         # Get or create session
         session = await self.get_or_create_runner(channel_id)
 
@@ -242,7 +480,7 @@ class MomAgent:
 
         # Stream response
         async for event in session.prompt(enhanced_content):
-            yield event
+            events.put_nowait(event)
 
     def _build_enhanced_content(
         self,
@@ -283,7 +521,7 @@ class MomAgent:
             return self._memories[channel_id]
 
         # Try to load from store
-        memory_data = await self._store.load(f"{channel_id}_memory.json")
+        memory_data = await asyncio.to_thread(self._memory_backend.load, channel_id)
 
         if memory_data:
             memory = ChannelMemory.from_dict(memory_data)
@@ -309,7 +547,36 @@ class MomAgent:
         if not memory:
             return
 
-        await self._store.save(f"{channel_id}_memory.json", memory.to_dict())
+        version = memory._version
+        await asyncio.to_thread(
+            self._memory_backend.save_many, {channel_id: memory.to_dict()}
+        )
+        memory.mark_clean(version)
+
+    async def flush_memories(self) -> int:
+        """
+        Persist every memory with unsaved changes in one batch.
+
+        Returns:
+            Number of memories written
+        """
+        async with self._memory_flush_lock:
+            batch = {}
+            versions = {}
+            for channel_id, memory in self._memories.items():
+                if memory.dirty:
+                    batch[channel_id] = memory.to_dict()
+                    versions[channel_id] = (memory, memory._version)
+
+            if not batch:
+                return 0
+
+            await asyncio.to_thread(self._memory_backend.save_many, batch)
+
+            # Changes made while writing stay dirty for the next flush
+            for memory, version in versions.values():
+                memory.mark_clean(version)
+            return len(batch)
 
     def set_channel_config(self, channel_id: str, config: ChannelConfig) -> None:
         """Set configuration for a channel"""
@@ -330,6 +597,20 @@ class MomAgent:
             "is_idle": session.is_idle if session else True,
             "memory": memory.to_dict() if memory else None,
             "stats": session.get_stats() if session else None,
+            "queue": self._scheduler.get_channel_stats(channel_id),
+        }
+
+    def get_queue_stats(self) -> Dict[str, Any]:
+        """Get message queue statistics"""
+        return self._scheduler.get_stats()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get session cache statistics"""
+        return {
+            **self._cache_stats,
+            "resident_sessions": len(self._sessions),
+            "resident_memories": len(self._memories),
+            "resident_tokens": self._resident_tokens(),
         }
 
     async def list_active_channels(self) -> List[str]:
@@ -340,21 +621,170 @@ class MomAgent:
         """Close a channel session"""
         if channel_id in self._sessions:
             del self._sessions[channel_id]
+        self._session_last_used.pop(channel_id, None)
+        self._hibernation_path(channel_id).unlink(missing_ok=True)
 
         # Save memory before closing
-        if channel_id in self._memories:
-            await self.save_memory(channel_id)
+        await self._release_memory(channel_id)
+
+    async def hibernate_channel(self, channel_id: str) -> bool:
+        """
+        Serialize a channel's session to disk and drop it from memory.
+
+        The session is restored transparently on the next
+        get_or_create_runner() call for the channel.
+
+        Args:
+            channel_id: Channel identifier
+
+        Returns:
+            False if the channel has no resident session or it is busy
+        """
+        session = self._sessions.get(channel_id)
+        if session is None or not session.is_idle:
+            return False
+
+        data = {
+            "channel_id": channel_id,
+            "session_id": session.session_id,
+            "hibernated_at": datetime.now().isoformat(),
+            "messages": [_message_to_dict(m) for m in session.messages],
+            "metrics": {
+                "total_tokens_input": session._total_tokens_input,
+                "total_tokens_output": session._total_tokens_output,
+                "total_cost": session._total_cost,
+                "tool_calls_count": session._tool_calls_count,
+            },
+        }
+        await asyncio.to_thread(self._write_hibernation_file, channel_id, data)
+
+        # The session may have been picked up while the file was written
+        if not session.is_idle or self._sessions.get(channel_id) is not session:
+            return False
+
+        del self._sessions[channel_id]
+        self._session_last_used.pop(channel_id, None)
+
+        await self._release_memory(channel_id)
+
+        self._cache_stats["hibernated"] += 1
+        return True
+
+    async def _release_memory(self, channel_id: str) -> None:
+        """
+        Persist a channel's memory and drop it from the cache.
+
+        The memory stays cached if the save fails, so the next flush can
+        retry it.
+        """
+        memory = self._memories.get(channel_id)
+        if memory is None:
+            return
+        if memory.dirty:
+            await self.save_memory(channel_id, memory)
+        # Changes made while saving stay cached for the next flush
+        if self._memories.get(channel_id) is memory and not memory.dirty:
             del self._memories[channel_id]
 
+    def _hibernation_path(self, channel_id: str) -> Path:
+        safe_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in channel_id)
+        return self.config.session_dir / f"mom_{safe_id}.json"
+
+    def _write_hibernation_file(self, channel_id: str, data: Dict[str, Any]) -> None:
+        path = self._hibernation_path(channel_id)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def _restore_session(self, channel_id: str, session: AgentSession) -> bool:
+        """Load hibernated state into a fresh session, if any"""
+        path = self._hibernation_path(channel_id)
+
+        def read() -> Optional[Dict[str, Any]]:
+            try:
+                return json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                return None
+
+        try:
+            data = await asyncio.to_thread(read)
+        except Exception as e:
+            print(f"Failed to restore session for {channel_id}: {e}")
+            return False
+
+        if not data:
+            return False
+
+        session.context.messages = [_message_from_dict(m) for m in data.get("messages", [])]
+
+        metrics = data.get("metrics", {})
+        session._total_tokens_input = metrics.get("total_tokens_input", 0)
+        session._total_tokens_output = metrics.get("total_tokens_output", 0)
+        session._total_cost = metrics.get("total_cost", 0.0)
+        session._tool_calls_count = metrics.get("tool_calls_count", 0)
+        return True
+
+    def _touch_session(self, channel_id: str) -> None:
+        self._sessions.move_to_end(channel_id)
+        self._session_last_used[channel_id] = time.monotonic()
+
+    def _resident_tokens(self) -> int:
+        return sum(session._estimate_tokens() for session in self._sessions.values())
+
+    async def _enforce_session_budget(self, keep: Optional[str] = None) -> None:
+        """Hibernate least recently used idle sessions until within budget"""
+        max_sessions = self.config.max_resident_sessions
+        max_tokens = self.config.max_resident_tokens
+        tokens = self._resident_tokens() if max_tokens is not None else 0
+
+        for channel_id in list(self._sessions):
+            over_sessions = len(self._sessions) > max_sessions
+            over_tokens = max_tokens is not None and tokens > max_tokens
+            if not (over_sessions or over_tokens):
+                break
+            if channel_id == keep:
+                continue
+
+            session = self._sessions[channel_id]
+            session_tokens = session._estimate_tokens() if max_tokens is not None else 0
+            if await self.hibernate_channel(channel_id):
+                self._cache_stats["evicted_lru"] += 1
+                tokens -= session_tokens
+
+    async def _evict_idle_sessions(self) -> None:
+        """Hibernate sessions unused for longer than session_idle_timeout"""
+        timeout = self.config.session_idle_timeout
+        if timeout is None:
+            return
+
+        cutoff = time.monotonic() - timeout
+        # Least recently used first, so stop at the first recent one
+        for channel_id in list(self._sessions):
+            if self._session_last_used.get(channel_id, 0.0) > cutoff:
+                break
+            if await self.hibernate_channel(channel_id):
+                self._cache_stats["evicted_idle"] += 1
+
+    async def _hibernation_loop(self) -> None:
+        """Background task to hibernate idle sessions"""
+        while self._running:
+            try:
+                await asyncio.sleep(self.config.hibernation_check_interval)
+                await self._evict_idle_sessions()
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"Session hibernation error: {e}")
+
     async def _memory_update_loop(self) -> None:
         """Background task to periodically update memories"""
         while self._running:
             try:
                 await asyncio.sleep(self.config.memory_update_interval)
 
-                # Save all dirty memories
-                for channel_id, memory in self._memories.items():
-                    await self.save_memory(channel_id, memory)
+                # Save only memories that changed since the last flush
+                await self.flush_memories()
 
             except asyncio.CancelledError:
                 break
@@ -371,7 +801,8 @@ class MomAgent:
         Update memory summary for a channel.
 
         This can be called after important conversations to
-        maintain context across sessions.
+        maintain context across sessions. The change is written by the
+        next memory flush (periodic, or on stop()).
 
         Args:
             channel_id: Channel identifier
@@ -391,5 +822,3 @@ class MomAgent:
 
             # Keep only last 20 facts
             memory.key_facts = memory.key_facts[-20:]
-
-        await self.save_memory(channel_id, memory)
@@ -8,14 +8,19 @@ Provides:
 - Event callbacks
 """
 import asyncio
+import bisect
+import heapq
+import itertools
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 import logging
 import os
 import re
 
+from koda.mom.fs_notify import InotifyNotifier
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,19 +89,82 @@ class CronParser:
 
         return [int(field)]
 
+    # Sparse day constraints (e.g. Feb 29 on a given weekday) can recur
+    # decades apart; give up beyond this horizon
+    MAX_YEARS_AHEAD = 50
+
     @staticmethod
     def get_next_run(parsed: Dict[str, Any], after: datetime) -> datetime:
-        """Get next run time after given datetime"""
-        next_time = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        """
+        Get next run time after given datetime.
+
+        Jumps field by field (month, day, hour, minute) to the next allowed
+        value instead of testing every minute.
+        """
+        minutes = sorted(parsed["minute"])
+        hours = sorted(parsed["hour"])
+        days = set(parsed["day_of_month"])
+        months = sorted(parsed["month"])
+        weekdays = set(parsed["day_of_week"])
+
+        if not (minutes and hours and days and months and weekdays):
+            raise ValueError("Cron expression can never match")
+
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last_year = t.year + CronParser.MAX_YEARS_AHEAD
+
+        while t.year <= last_year:
+            # Month: jump to the first day of the next allowed month
+            if t.month not in months:
+                i = bisect.bisect_right(months, t.month)
+                if i < len(months):
+                    t = t.replace(month=months[i], day=1, hour=0, minute=0)
+                else:
+                    t = t.replace(year=t.year + 1, month=months[0], day=1, hour=0, minute=0)
+                continue
+
+            # Day: both day of month and day of week must match
+            if t.day not in days or t.weekday() not in weekdays:
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            # Hour: next allowed hour today, else tomorrow
+            if t.hour not in hours:
+                i = bisect.bisect_right(hours, t.hour)
+                if i < len(hours):
+                    t = t.replace(hour=hours[i], minute=0)
+                else:
+                    t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            # Minute: next allowed minute this hour, else next hour
+            if t.minute not in minutes:
+                i = bisect.bisect_right(minutes, t.minute)
+                if i < len(minutes):
+                    t = t.replace(minute=minutes[i])
+                else:
+                    t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            return t
 
-        # Search for next matching time (max 1 year ahead)
-        max_iterations = 365 * 24 * 60  # minutes in a year
-        for _ in range(max_iterations):
-            if CronParser._matches(parsed, next_time):
-                return next_time
-            next_time += timedelta(minutes=1)
+        raise ValueError(
+            f"Could not find next run time within {CronParser.MAX_YEARS_AHEAD} years"
+        )
 
-        raise ValueError("Could not find next run time within 1 year")
+    @staticmethod
+    def get_next_runs(parsed: Dict[str, Any], after: datetime, count: int) -> List[datetime]:
+        """
+        Get the next ``count`` run times after given datetime.
+
+        Useful for previewing a schedule.
+        """
+        runs = []
+        current = after
+        for _ in range(count):
+            current = CronParser.get_next_run(parsed, current)
+            runs.append(current)
+        return runs
 
     @staticmethod
     def _matches(parsed: Dict[str, Any], dt: datetime) -> bool:
@@ -120,6 +188,14 @@ class EventsWatcher:
     - Periodic (cron-based) callbacks
     - File system watching
 
+    Scheduled events are kept in a min-heap keyed by next run time. The
+    event loop sleeps until the earliest deadline (or until a new event is
+    scheduled) and runs due callbacks concurrently, at most
+    ``max_concurrent_callbacks`` at a time.
+
+    File and directory watches use inotify on Linux (see fs_notify.py) and
+    fall back to mtime polling elsewhere.
+
     Usage:
         watcher = EventsWatcher()
 
@@ -139,7 +215,7 @@ class EventsWatcher:
         await watcher.start()
     """
 
-    def __init__(self):
+    def __init__(self, max_concurrent_callbacks: int = 16, use_native_fs_events: bool = True):
         self._events: Dict[str, ScheduledEvent] = {}
         self._file_watchers: Dict[str, Dict[str, Any]] = {}
         self._running = False
@@ -147,12 +223,42 @@ class EventsWatcher:
         self._file_task: Optional[asyncio.Task] = None
         self._event_id_counter = 0
 
+        # (next_run, sequence, event_id); entries whose event was cancelled,
+        # disabled or rescheduled are skipped when they reach the top
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._heap_seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+        self.max_concurrent_callbacks = max_concurrent_callbacks
+        self._callback_slots = asyncio.Semaphore(max_concurrent_callbacks)
+        self._callback_tasks: Set[asyncio.Task] = set()
+        self._in_flight: Set[str] = set()
+
+        # Native file notifications; watchers it could not take are polled.
+        # The inotify fd is opened on first use and released by stop()
+        self._use_native_fs_events = use_native_fs_events and InotifyNotifier.available()
+        self._notifier: Optional[InotifyNotifier] = None
+
     async def start(self) -> None:
         """Start the event watcher"""
         self._running = True
         self._event_task = asyncio.create_task(self._event_loop())
         self._file_task = asyncio.create_task(self._file_watch_loop())
 
+        notifier = self._get_notifier()
+        if notifier:
+            # Watchers registered before a restart (or while polled) go native again
+            for watch_id, watcher in list(self._file_watchers.items()):
+                if not watcher.get("native"):
+                    self._watch_natively(
+                        watch_id,
+                        watcher["path"],
+                        is_directory=watcher.get("is_directory", False),
+                        recursive=watcher.get("recursive", False),
+                        debounce=watcher.get("debounce", 0.1),
+                    )
+            notifier.attach(asyncio.get_running_loop())
+
     async def stop(self) -> None:
         """Stop the event watcher"""
         self._running = False
@@ -161,6 +267,14 @@ class EventsWatcher:
             self._event_task.cancel()
         if self._file_task:
             self._file_task.cancel()
+        for task in list(self._callback_tasks):
+            task.cancel()
+
+        if self._notifier:
+            self._notifier.close()
+            self._notifier = None
+            for watcher in self._file_watchers.values():
+                watcher.pop("native", None)
 
     def schedule_immediate(
         self,
@@ -178,15 +292,17 @@ class EventsWatcher:
             Event ID
         """
         event_id = self._generate_id()
+        now = datetime.now()
         event = ScheduledEvent(
             id=event_id,
             callback=callback,
-            trigger_time=datetime.now(),
+            trigger_time=now,
             repeat=False,
+            next_run=now,
             metadata=metadata or {},
         )
 
-        self._events[event_id] = event
+        self._add_event(event)
         return event_id
 
     def schedule_one_shot(
@@ -216,7 +332,7 @@ class EventsWatcher:
             metadata=metadata or {},
         )
 
-        self._events[event_id] = event
+        self._add_event(event)
         return event_id
 
     def schedule_periodic(
@@ -249,7 +365,7 @@ class EventsWatcher:
             metadata={**(metadata or {}), "cron_parsed": parsed},
         )
 
-        self._events[event_id] = event
+        self._add_event(event)
         return event_id
 
     def watch_file(
@@ -280,6 +396,9 @@ class EventsWatcher:
             "last_triggered": datetime.min,
         }
 
+        if self._watch_natively(watch_id, path, is_directory=False, recursive=False, debounce=debounce):
+            return watch_id
+
         # Track initial modification time
         try:
             self._file_watchers[watch_id]["last_modified"] = os.path.getmtime(path)
@@ -317,6 +436,9 @@ class EventsWatcher:
             "file_mtimes": {},
         }
 
+        if self._watch_natively(watch_id, path, is_directory=True, recursive=recursive, debounce=0.1):
+            return watch_id
+
         # Track initial mtimes
         try:
             for root, dirs, files in os.walk(path):
@@ -345,14 +467,37 @@ class EventsWatcher:
         """
         if event_id in self._events:
             del self._events[event_id]
+            self._compact_heap()
             return True
 
         if event_id in self._file_watchers:
             del self._file_watchers[event_id]
+            if self._notifier:
+                self._notifier.remove(event_id)
             return True
 
         return False
 
+    def set_enabled(self, event_id: str, enabled: bool) -> bool:
+        """
+        Enable or disable a scheduled event.
+
+        Args:
+            event_id: Event ID
+            enabled: New state
+
+        Returns:
+            True if the event exists
+        """
+        event = self._events.get(event_id)
+        if event is None:
+            return False
+
+        event.enabled = enabled
+        if enabled:
+            self._push(event)
+        return True
+
     def list_scheduled(self) -> List[Dict[str, Any]]:
         """List all scheduled events"""
         result = []
@@ -370,34 +515,58 @@ class EventsWatcher:
         self._event_id_counter += 1
         return f"event_{self._event_id_counter}_{datetime.now().timestamp()}"
 
+    def _add_event(self, event: ScheduledEvent) -> None:
+        """Register an event and queue its next run"""
+        self._events[event.id] = event
+        self._push(event)
+
+    def _push(self, event: ScheduledEvent) -> None:
+        if event.next_run is None:
+            return
+        heapq.heappush(self._heap, (event.next_run, next(self._heap_seq), event.id))
+        # Wake the loop in case this deadline is earlier than the one it waits for
+        self._wakeup.set()
+
+    def _is_current(self, entry: Tuple[datetime, int, str]) -> bool:
+        """Whether a heap entry still describes the event's next run"""
+        run_at, _, event_id = entry
+        event = self._events.get(event_id)
+        return event is not None and event.enabled and event.next_run == run_at
+
+    def _compact_heap(self) -> None:
+        """Drop stale entries once they outnumber live ones"""
+        if len(self._heap) > 2 * len(self._events) + 64:
+            self._heap = [entry for entry in self._heap if self._is_current(entry)]
+            heapq.heapify(self._heap)
+
     async def _event_loop(self) -> None:
         """Main event loop"""
         while self._running:
             try:
-                now = datetime.now()
-                events_to_run = []
+                # Discard stale entries at the top
+                while self._heap and not self._is_current(self._heap[0]):
+                    heapq.heappop(self._heap)
 
-                # Find events to run
-                for event_id, event in list(self._events.items()):
-                    if not event.enabled or not event.next_run:
-                        continue
-
-                    if event.next_run <= now:
-                        events_to_run.append(event)
+                self._wakeup.clear()
 
-                # Run events
-                for event in events_to_run:
-                    await self._run_event(event)
+                if not self._heap:
+                    await self._wakeup.wait()
+                    continue
 
-                # Sleep until next event or 1 second
-                next_event = self._get_next_event_time()
-                if next_event:
-                    sleep_time = min(1.0, (next_event - datetime.now()).total_seconds())
-                    sleep_time = max(0.1, sleep_time)
-                else:
-                    sleep_time = 1.0
+                delay = (self._heap[0][0] - datetime.now()).total_seconds()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
 
-                await asyncio.sleep(sleep_time)
+                # Dispatch everything that is due
+                now = datetime.now()
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    if self._is_current(entry):
+                        self._dispatch(self._events[entry[2]], now)
 
             except asyncio.CancelledError:
                 break
@@ -405,45 +574,122 @@ class EventsWatcher:
                 logger.error(f"Event loop error: {e}")
                 await asyncio.sleep(1.0)
 
+    def _dispatch(self, event: ScheduledEvent, now: datetime) -> None:
+        """Start a due event and queue its next run"""
+        if event.repeat and event.cron_expression:
+            parsed = event.metadata.get("cron_parsed")
+            if parsed:
+                event.next_run = CronParser.get_next_run(parsed, now)
+                self._push(event)
+        else:
+            event.next_run = None
+
+        # A periodic callback still running from its last fire skips this one
+        if event.id in self._in_flight:
+            return
+
+        self._in_flight.add(event.id)
+        task = asyncio.create_task(self._run_event(event))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
+
     async def _run_event(self, event: ScheduledEvent) -> None:
         """Run a scheduled event"""
         try:
-            callback = event.callback
+            async with self._callback_slots:
+                callback = event.callback
 
-            if asyncio.iscoroutinefunction(callback):
-                await callback(event.metadata)
-            else:
-                callback(event.metadata)
+                if asyncio.iscoroutinefunction(callback):
+                    await callback(event.metadata)
+                else:
+                    callback(event.metadata)
 
-            event.last_run = datetime.now()
+                event.last_run = datetime.now()
 
-            # Update next run for periodic events
-            if event.repeat and event.cron_expression:
-                parsed = event.metadata.get("cron_parsed")
-                if parsed:
-                    event.next_run = CronParser.get_next_run(parsed, datetime.now())
+        except Exception as e:
+            logger.error(f"Event callback error ({event.id}): {e}")
+
+        finally:
+            self._in_flight.discard(event.id)
 
             # Remove one-shot events
-            elif not event.repeat:
+            if not event.repeat and self._events.get(event.id) is event:
                 del self._events[event.id]
 
-        except Exception as e:
-            logger.error(f"Event callback error ({event.id}): {e}")
-
     def _get_next_event_time(self) -> Optional[datetime]:
         """Get the next event trigger time"""
-        next_time = None
-        for event in self._events.values():
-            if event.enabled and event.next_run:
-                if next_time is None or event.next_run < next_time:
-                    next_time = event.next_run
-        return next_time
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _watch_natively(
+        self,
+        watch_id: str,
+        path: str,
+        is_directory: bool,
+        recursive: bool,
+        debounce: float
+    ) -> bool:
+        """Register a watcher with inotify; False means it will be polled"""
+        notifier = self._get_notifier()
+        if not notifier:
+            return False
+
+        try:
+            notifier.add(
+                watch_id, path, is_directory=is_directory, recursive=recursive, debounce=debounce
+            )
+        except OSError as e:
+            logger.warning(f"Cannot watch {path} natively, polling instead: {e}")
+            return False
+
+        self._file_watchers[watch_id]["native"] = True
+        return True
+
+    def _get_notifier(self) -> Optional[InotifyNotifier]:
+        """The inotify notifier, created on first use"""
+        if self._notifier is None and self._use_native_fs_events:
+            try:
+                self._notifier = InotifyNotifier(self._on_native_fs_event)
+            except OSError as e:
+                logger.warning(f"inotify unavailable, polling files instead: {e}")
+                self._use_native_fs_events = False
+        return self._notifier
+
+    def _on_native_fs_event(self, watch_id: str, path: str, event_type: str) -> None:
+        """Deliver a coalesced inotify event to the watcher's callback"""
+        watcher = self._file_watchers.get(watch_id)
+        if watcher is None:
+            return
+
+        if watcher.get("is_directory"):
+            args = (path, event_type)
+        elif event_type == "deleted":
+            # File watchers report changes only, as in polling mode
+            return
+        else:
+            args = (path,)
+
+        callback = watcher["callback"]
+
+        try:
+            result = callback(*args)
+        except Exception as e:
+            logger.error(f"File watch callback error ({watch_id}): {e}")
+            return
+
+        if asyncio.iscoroutine(result):
+            task = asyncio.ensure_future(result)
+            self._callback_tasks.add(task)
+            task.add_done_callback(self._callback_tasks.discard)
 
     async def _file_watch_loop(self) -> None:
-        """File watching loop"""
+        """File watching loop (polling fallback)"""
         while self._running:
             try:
                 for watch_id, watcher in list(self._file_watchers.items()):
+                    if watcher.get("native"):
+                        continue
                     if watcher.get("is_directory"):
                         await self._check_directory(watch_id, watcher)
                     else:
@@ -0,0 +1,335 @@
+"""
+Mom FS Notify - Native filesystem notifications for EventsWatcher
+
+Linux inotify through ctypes (no extra dependency). Each watched directory
+gets one kernel watch; events are read from a non-blocking fd registered
+with the event loop, so an idle watched tree costs no CPU regardless of
+how many files it holds.
+
+Events for the same path are coalesced: a path is reported once it has
+been quiet for the subscription's debounce interval, with the combined
+event type (e.g. created + modified -> created, created + deleted ->
+nothing).
+
+On other platforms, or when inotify cannot be initialised,
+``InotifyNotifier.available()`` is False and EventsWatcher polls instead.
+"""
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Result of merging a pending event type with a new one; None drops the path
+_COALESCE: Dict[Tuple[str, str], Optional[str]] = {
+    ("created", "modified"): "created",
+    ("created", "deleted"): None,
+    ("modified", "created"): "modified",
+    ("modified", "deleted"): "deleted",
+    ("deleted", "created"): "modified",
+    ("deleted", "modified"): "modified",
+}
+
+# callback(subscription_key, path, event_type)
+NotifyCallback = Callable[[str, str, str], None]
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # noqa: B018 - probe for the symbol
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+@dataclass
+class _Subscription:
+    """One watch_file / watch_directory registration"""
+    key: str
+    path: str
+    is_directory: bool
+    recursive: bool
+    debounce: float
+    dirs: Set[str] = field(default_factory=set)
+
+
+class InotifyNotifier:
+    """
+    inotify-backed notifier.
+
+    Usage:
+        notifier = InotifyNotifier(on_event)
+        notifier.add("w1", "/some/dir", is_directory=True, recursive=True)
+        notifier.attach(asyncio.get_running_loop())
+        ...
+        notifier.close()
+    """
+
+    def __init__(self, callback: NotifyCallback):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self.fd = fd
+        self.callback = callback
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._subscriptions: Dict[str, _Subscription] = {}
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+        self._dir_refs: Dict[str, Set[str]] = {}
+
+        # (key, path) -> (event_type, timer)
+        self._pending: Dict[Tuple[str, str], Tuple[str, Optional[asyncio.TimerHandle]]] = {}
+
+    @staticmethod
+    def available() -> bool:
+        """Whether inotify can be used on this system"""
+        return _libc is not None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start delivering events on ``loop``"""
+        self._loop = loop
+        loop.add_reader(self.fd, self._read_events)
+
+    def detach(self) -> None:
+        """Stop delivering events (watches stay registered)"""
+        if self._loop is not None:
+            self._loop.remove_reader(self.fd)
+            for _, timer in self._pending.values():
+                if timer is not None:
+                    timer.cancel()
+            self._pending.clear()
+            self._loop = None
+
+    def close(self) -> None:
+        """Release the inotify fd"""
+        self.detach()
+        os.close(self.fd)
+        self._subscriptions.clear()
+        self._wd_to_dir.clear()
+        self._dir_to_wd.clear()
+        self._dir_refs.clear()
+
+    def add(
+        self,
+        key: str,
+        path: str,
+        is_directory: bool,
+        recursive: bool = True,
+        debounce: float = 0.1,
+    ) -> None:
+        """
+        Watch a file or directory.
+
+        Files are watched through their parent directory so atomic
+        replacements (write to temp + rename) are seen.
+
+        Raises:
+            OSError: If the kernel refuses a watch (e.g. watch limit reached)
+        """
+        subscription = _Subscription(key, path, is_directory, recursive, debounce)
+        self._subscriptions[key] = subscription
+
+        try:
+            if not is_directory:
+                self._watch_dir(subscription, os.path.dirname(path))
+            elif recursive:
+                for root, _, _ in os.walk(path):
+                    self._watch_dir(subscription, root)
+            else:
+                self._watch_dir(subscription, path)
+        except OSError:
+            self.remove(key)
+            raise
+
+    def remove(self, key: str) -> None:
+        """Stop watching a subscription"""
+        subscription = self._subscriptions.pop(key, None)
+        if subscription is None:
+            return
+
+        for directory in subscription.dirs:
+            refs = self._dir_refs.get(directory)
+            if refs is None:
+                continue
+            refs.discard(key)
+            if not refs:
+                self._unwatch_dir(directory)
+
+        for pending_key in [k for k in self._pending if k[0] == key]:
+            _, timer = self._pending.pop(pending_key)
+            if timer is not None:
+                timer.cancel()
+
+    def _watch_dir(self, subscription: _Subscription, directory: str) -> None:
+        if directory not in self._dir_to_wd:
+            wd = _libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, f"inotify_add_watch({directory}): {os.strerror(err)}")
+            self._wd_to_dir[wd] = directory
+            self._dir_to_wd[directory] = wd
+
+        self._dir_refs.setdefault(directory, set()).add(subscription.key)
+        subscription.dirs.add(directory)
+
+    def _unwatch_dir(self, directory: str) -> None:
+        self._dir_refs.pop(directory, None)
+        wd = self._dir_to_wd.pop(directory, None)
+        if wd is not None:
+            self._wd_to_dir.pop(wd, None)
+            _libc.inotify_rm_watch(self.fd, wd)
+
+    def _read_events(self) -> None:
+        """Drain the inotify fd (called by the event loop when readable)"""
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            except OSError as e:
+                logger.error(f"inotify read error: {e}")
+                return
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                try:
+                    self._handle_event(wd, mask, os.fsdecode(name))
+                except Exception as e:
+                    logger.error(f"inotify event error: {e}")
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed; some file events were lost")
+            return
+
+        directory = self._wd_to_dir.get(wd)
+        if directory is None:
+            return
+
+        if mask & IN_IGNORED:
+            # Kernel dropped the watch (directory deleted or unmounted)
+            self._wd_to_dir.pop(wd, None)
+            self._dir_to_wd.pop(directory, None)
+            for key in self._dir_refs.pop(directory, set()):
+                subscription = self._subscriptions.get(key)
+                if subscription is not None:
+                    subscription.dirs.discard(directory)
+            return
+
+        if not name:
+            # Event on the watched directory itself
+            return
+
+        path = os.path.join(directory, name)
+
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_new_directory(directory, path)
+            return
+
+        if mask & (IN_CREATE | IN_MOVED_TO):
+            event_type = "created"
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            event_type = "deleted"
+        else:
+            event_type = "modified"
+
+        for key in list(self._dir_refs.get(directory, ())):
+            subscription = self._subscriptions[key]
+            if subscription.is_directory or subscription.path == path:
+                self._queue(subscription, path, event_type)
+
+    def _add_new_directory(self, parent: str, path: str) -> None:
+        """Start watching a directory created inside a recursive watch"""
+        for key in list(self._dir_refs.get(parent, ())):
+            subscription = self._subscriptions[key]
+            if not (subscription.is_directory and subscription.recursive):
+                continue
+
+            for root, _, files in os.walk(path):
+                try:
+                    self._watch_dir(subscription, root)
+                except OSError as e:
+                    logger.warning(f"Cannot watch {root}: {e}")
+                    continue
+                # Files may have been written before the watch existed
+                for f in files:
+                    self._queue(subscription, os.path.join(root, f), "created")
+
+    def _queue(self, subscription: _Subscription, path: str, event_type: str) -> None:
+        """Coalesce an event and (re)start the path's quiet timer"""
+        pending_key = (subscription.key, path)
+        previous = self._pending.pop(pending_key, None)
+
+        if previous is not None:
+            old_type, timer = previous
+            if timer is not None:
+                timer.cancel()
+            if old_type != event_type:
+                event_type = _COALESCE.get((old_type, event_type), event_type)
+                if event_type is None:
+                    return
+
+        timer = None
+        if self._loop is not None:
+            timer = self._loop.call_later(subscription.debounce, self._deliver, pending_key)
+        self._pending[pending_key] = (event_type, timer)
+
+    def _deliver(self, pending_key: Tuple[str, str]) -> None:
+        pending = self._pending.pop(pending_key, None)
+        if pending is None:
+            return
+        key, path = pending_key
+        self.callback(key, path, pending[0])
+
+
+__all__ = ["InotifyNotifier"]
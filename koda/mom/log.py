@@ -7,10 +7,15 @@ Provides structured logging with:
 - Rich console output
 - Log levels
 - Context fields
+- Async mode: entries are queued and written in batches by a background
+  thread, with size/time based file rotation and drop counters
 """
 import json
 import logging
+import os
+import queue
 import sys
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -54,6 +59,18 @@ class LogEntry:
         return json.dumps(self.to_dict())
 
 
+_LEVEL_VALUES = {
+    LogLevel.DEBUG: 0,
+    LogLevel.INFO: 1,
+    LogLevel.WARNING: 2,
+    LogLevel.ERROR: 3,
+    LogLevel.CRITICAL: 4,
+}
+
+# Queue marker asking the writer thread to exit
+_STOP = object()
+
+
 class StructuredLogger:
     """
     Structured logger with rich output.
@@ -79,6 +96,14 @@ class StructuredLogger:
         # Rich output
         logger.set_rich_output(True)
         logger.info("Processing complete", {"items": 100, "time_ms": 150})
+
+        # Non-blocking: callers only enqueue, a thread formats and writes
+        logger = StructuredLogger(
+            "mom", output=Path("mom.log"), json_output=True,
+            async_mode=True, max_bytes=10 * 1024 * 1024,
+        )
+        print(logger.get_stats())
+        logger.close()
     """
 
     # Color codes for rich output
@@ -99,7 +124,14 @@ class StructuredLogger:
         level: LogLevel = LogLevel.INFO,
         output: Optional[Union[TextIO, Path]] = None,
         rich_output: bool = True,
-        json_output: bool = False
+        json_output: bool = False,
+        async_mode: bool = False,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        max_bytes: Optional[int] = None,
+        rotate_interval: Optional[float] = None,
+        backup_count: int = 5,
     ):
         """
         Initialize logger.
@@ -110,9 +142,17 @@ class StructuredLogger:
             output: Output stream or file path
             rich_output: Use colors and formatting
             json_output: Output as JSON
+            async_mode: Queue entries for a background writer thread
+            queue_size: Entries buffered in async mode before dropping
+            batch_size: Entries written per batch in async mode
+            flush_interval: Longest time an entry waits before being written
+            max_bytes: Rotate a file output once it reaches this size
+            rotate_interval: Rotate a file output after this many seconds
+            backup_count: Rotated files to keep (name.1 ... name.N)
         """
         self.name = name
         self.level = level
+        self._threshold = _LEVEL_VALUES[level]
         self.rich_output = rich_output and sys.stdout.isatty()
         self.json_output = json_output
 
@@ -123,21 +163,59 @@ class StructuredLogger:
         # Output
         self._output: TextIO
         self._close_output = False
+        self._path: Optional[Path] = None
 
         if output is None:
             self._output = sys.stdout
         elif isinstance(output, Path):
+            self._path = output
             self._output = output.open("a")
             self._close_output = True
         else:
             self._output = output
 
+        # Rotation (file outputs only)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self._bytes_written = self._path.stat().st_size if self._path else 0
+        self._opened_at = time.monotonic()
+
         # Thread lock for thread safety
         self._lock = threading.Lock()
 
+        # Stats
+        self._written = 0
+        self._dropped: Dict[str, int] = {}
+        self._dropped_by_level: Dict[str, int] = {}
+        # Separate from _lock so producers never wait on the writer's I/O
+        self._drop_lock = threading.Lock()
+        self._rotations = 0
+        self._write_errors = 0
+
+        # Async mode
+        self.async_mode = async_mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+        if async_mode:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._writer = threading.Thread(
+                target=self._writer_loop, name=f"log-writer-{name}", daemon=True
+            )
+            self._writer.start()
+
     def set_level(self, level: LogLevel) -> None:
         """Set minimum log level"""
         self.level = level
+        self._threshold = _LEVEL_VALUES[level]
+
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        """Whether entries at ``level`` would be logged"""
+        return _LEVEL_VALUES[level] >= self._threshold
 
     def set_context(self, context: Dict[str, Any]) -> None:
         """Set persistent context for all log entries"""
@@ -190,8 +268,8 @@ class StructuredLogger:
         context: Optional[Dict[str, Any]] = None
     ) -> None:
         """Internal logging method"""
-        # Check level
-        if self._level_value(level) < self._level_value(self.level):
+        # Fast path: nothing is built for filtered levels
+        if _LEVEL_VALUES[level] < self._threshold:
             return
 
         # Build entry
@@ -199,30 +277,157 @@ class StructuredLogger:
             timestamp=datetime.now(),
             level=level,
             message=message,
-            context={**self._context, **(context or {})},
+            context={**self._context, **context} if context else dict(self._context),
             source=self.name,
             trace_id=self._trace_id,
         )
 
+        if self._queue is not None:
+            # Formatting and I/O happen on the writer thread
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                with self._drop_lock:
+                    self._dropped[level.value] = self._dropped.get(level.value, 0) + 1
+            return
+
         # Format and write
         with self._lock:
-            if self.json_output:
-                self._output.write(entry.to_json() + "\n")
-            else:
-                self._output.write(self._format_rich(entry) + "\n")
-
+            self._write(self._format_entry(entry) + "\n")
             self._output.flush()
 
     def _level_value(self, level: LogLevel) -> int:
         """Get numeric level value"""
-        values = {
-            LogLevel.DEBUG: 0,
-            LogLevel.INFO: 1,
-            LogLevel.WARNING: 2,
-            LogLevel.ERROR: 3,
-            LogLevel.CRITICAL: 4,
+        return _LEVEL_VALUES.get(level, 0)
+
+    def _format_entry(self, entry: LogEntry) -> str:
+        """Format an entry for the configured output style"""
+        if self.json_output:
+            return json.dumps(entry.to_dict(), default=str)
+        return self._format_rich(entry)
+
+    def _write(self, text: str, entries: int = 1) -> None:
+        """Write text, rotating the file first if due (caller holds the lock)"""
+        if self._path is not None and self._should_rotate():
+            self._rotate()
+        self._output.write(text)
+        self._bytes_written += len(text)
+        self._written += entries
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes is not None and self._bytes_written >= self.max_bytes:
+            return True
+        if self.rotate_interval is not None:
+            return time.monotonic() - self._opened_at >= self.rotate_interval
+        return False
+
+    def _rotate(self) -> None:
+        """Shift name.N-1 -> name.N ... name -> name.1 and reopen"""
+        self._output.close()
+
+        path = self._path
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = path.with_name(f"{path.name}.{i}")
+                if src.exists():
+                    os.replace(src, path.with_name(f"{path.name}.{i + 1}"))
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink(missing_ok=True)
+
+        self._output = path.open("a")
+        self._bytes_written = 0
+        self._opened_at = time.monotonic()
+        self._rotations += 1
+
+    def _writer_loop(self) -> None:
+        """Background thread: drain the queue and write entries in batches"""
+        q = self._queue
+        stop = False
+
+        while not stop:
+            try:
+                item = q.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = []
+            while True:
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+                if stop or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+
+            lines = []
+            for entry in batch:
+                try:
+                    lines.append(self._format_entry(entry) + "\n")
+                except Exception:
+                    self._write_errors += 1
+
+            try:
+                with self._lock:
+                    if lines:
+                        self._write("".join(lines), len(lines))
+                    self._write_drop_notice()
+                    self._output.flush()
+            except Exception:
+                self._write_errors += 1
+            finally:
+                for _ in range(len(batch) + stop):
+                    q.task_done()
+
+    def _write_drop_notice(self) -> None:
+        """Record entries dropped since the last notice (caller holds the lock)"""
+        with self._drop_lock:
+            if not self._dropped:
+                return
+            dropped = self._dropped
+            self._dropped = {}
+            for level, count in dropped.items():
+                self._dropped_by_level[level] = self._dropped_by_level.get(level, 0) + count
+
+        notice = LogEntry(
+            timestamp=datetime.now(),
+            level=LogLevel.WARNING,
+            message=f"Dropped {sum(dropped.values())} log entries (queue full)",
+            context={"dropped": dropped},
+            source=self.name,
+        )
+        self._write(self._format_entry(notice) + "\n")
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until queued entries have been written"""
+        if self._queue is not None and self._writer is not None and self._writer.is_alive():
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._queue.unfinished_tasks:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                time.sleep(0.005)
+        with self._lock:
+            self._output.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get logger statistics"""
+        with self._drop_lock:
+            dropped_by_level = dict(self._dropped_by_level)
+            for level, count in self._dropped.items():
+                dropped_by_level[level] = dropped_by_level.get(level, 0) + count
+        return {
+            "async": self.async_mode,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "written": self._written,
+            "dropped": sum(dropped_by_level.values()),
+            "dropped_by_level": dropped_by_level,
+            "rotations": self._rotations,
+            "write_errors": self._write_errors,
         }
-        return values.get(level, 0)
 
     def _format_rich(self, entry: LogEntry) -> str:
         """Format entry with rich output"""
@@ -276,7 +481,16 @@ class StructuredLogger:
         return f"{timestamp} {level} {source} {trace} {entry.message}{context_str}".strip()
 
     def close(self) -> None:
-        """Close the logger"""
+        """Close the logger (in async mode, after writing what is queued)"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
         if self._close_output:
             self._output.close()
 
@@ -0,0 +1,170 @@
+"""
+Memory Store - Batched persistence for channel memories
+
+Backends take a batch of changed memories and write them in one go:
+- FileMemoryBackend: one JSON file per channel (the default layout)
+- SingleFileMemoryBackend: all channels in one JSON file
+- SQLiteMemoryBackend: one row per channel, one transaction per batch
+
+Backends are synchronous; callers run them off the event loop.
+"""
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write a file via a temporary file and rename"""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MemoryBackend:
+    """Base class for channel memory backends"""
+
+    def load(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        """Load one channel's memory, or None if there is none"""
+        raise NotImplementedError
+
+    def save_many(self, memories: Dict[str, Dict[str, Any]]) -> None:
+        """Persist a batch of memories keyed by channel id"""
+        raise NotImplementedError
+
+    def delete(self, channel_id: str) -> None:
+        """Remove one channel's memory"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release resources"""
+
+
+class FileMemoryBackend(MemoryBackend):
+    """One ``<channel>_memory.json`` file per channel"""
+
+    def __init__(self, memory_dir: Path):
+        self.memory_dir = Path(memory_dir)
+        self.memory_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, channel_id: str) -> Path:
+        return self.memory_dir / f"{channel_id}_memory.json"
+
+    def load(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._path(channel_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def save_many(self, memories: Dict[str, Dict[str, Any]]) -> None:
+        for channel_id, data in memories.items():
+            _atomic_write(self._path(channel_id), json.dumps(data, ensure_ascii=False, indent=2))
+
+    def delete(self, channel_id: str) -> None:
+        self._path(channel_id).unlink(missing_ok=True)
+
+
+class SingleFileMemoryBackend(MemoryBackend):
+    """All channel memories in one JSON file, rewritten once per batch"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _all(self) -> Dict[str, Dict[str, Any]]:
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                self._data = {}
+        return self._data
+
+    def load(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._all().get(channel_id)
+
+    def save_many(self, memories: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            data = self._all()
+            data.update(memories)
+            _atomic_write(self.path, json.dumps(data, ensure_ascii=False))
+
+    def delete(self, channel_id: str) -> None:
+        with self._lock:
+            data = self._all()
+            if data.pop(channel_id, None) is not None:
+                _atomic_write(self.path, json.dumps(data, ensure_ascii=False))
+
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """Channel memories in a SQLite table"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memories ("
+            "channel_id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self, channel_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM memories WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_many(self, memories: Dict[str, Dict[str, Any]]) -> None:
+        rows = [
+            (channel_id, json.dumps(data, ensure_ascii=False))
+            for channel_id, data in memories.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO memories (channel_id, data) VALUES (?, ?)", rows
+            )
+
+    def delete(self, channel_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memories WHERE channel_id = ?", (channel_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_memory_backend(kind: str, memory_dir: Path) -> MemoryBackend:
+    """
+    Create a memory backend by name.
+
+    Args:
+        kind: "files", "single_file" or "sqlite"
+        memory_dir: Directory holding the memory data
+    """
+    if kind == "files":
+        return FileMemoryBackend(memory_dir)
+    if kind == "single_file":
+        return SingleFileMemoryBackend(Path(memory_dir) / "memories.json")
+    if kind == "sqlite":
+        return SQLiteMemoryBackend(Path(memory_dir) / "memories.db")
+    raise ValueError(f"Unknown memory backend: {kind}")
+
+
+__all__ = [
+    "MemoryBackend",
+    "FileMemoryBackend",
+    "SingleFileMemoryBackend",
+    "SQLiteMemoryBackend",
+    "create_memory_backend",
+]
@@ -0,0 +1,268 @@
+"""
+Channel Scheduler - Ordered per-channel work with a shared worker pool
+
+Provides:
+- One FIFO queue per channel, processed by at most one worker at a time
+- A global bounded pool of workers shared by all channels
+- Weighted round-robin across channels with pending work
+- Queue-depth metrics and load shedding
+"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List
+
+
+class QueueFullError(Exception):
+    """Raised when a job is shed because a queue limit was reached"""
+
+    def __init__(self, channel_id: str, reason: str):
+        self.channel_id = channel_id
+        self.reason = reason
+        super().__init__(f"Channel {channel_id} queue full ({reason})")
+
+
+class SchedulerClosedError(RuntimeError):
+    """Raised for jobs submitted to, or still pending on, a closed scheduler"""
+
+    def __init__(self):
+        super().__init__("Scheduler is closed")
+
+
+@dataclass
+class _Job:
+    """A queued unit of work"""
+    func: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _ChannelQueue:
+    """Per-channel queue state"""
+    jobs: Deque[_Job] = field(default_factory=deque)
+    weight: int = 1
+    running: bool = False
+    scheduled: bool = False
+    processed: int = 0
+    shed: int = 0
+    max_depth: int = 0
+
+
+class ChannelScheduler:
+    """
+    Scheduler running per-channel FIFO queues on a shared worker pool.
+
+    Jobs in the same channel run strictly one after another in submission
+    order. Channels with pending work take turns: a worker picks the next
+    ready channel, runs up to ``weight`` of its jobs, and puts it back at
+    the end of the line if it still has work.
+
+    Usage:
+        scheduler = ChannelScheduler(max_workers=8)
+        result = await scheduler.submit("C123", lambda: handle(...))
+        print(scheduler.get_stats())
+        await scheduler.close()
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_channel_queue: int = 16,
+        max_total_queue: int = 1000,
+    ):
+        """
+        Args:
+            max_workers: Jobs running concurrently across all channels
+            max_channel_queue: Pending jobs allowed per channel
+            max_total_queue: Pending jobs allowed across all channels
+        """
+        self.max_workers = max_workers
+        self.max_channel_queue = max_channel_queue
+        self.max_total_queue = max_total_queue
+
+        self._channels: Dict[str, _ChannelQueue] = {}
+        self._ready: Deque[str] = deque()
+        self._ready_event = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._total_queued = 0
+        self._active = 0
+        self._closed = False
+
+        # Metrics
+        self._processed = 0
+        self._shed = 0
+        self._total_wait = 0.0
+
+    @property
+    def closed(self) -> bool:
+        """Whether close() has been called"""
+        return self._closed
+
+    def set_channel_weight(self, channel_id: str, weight: int) -> None:
+        """Set how many jobs a channel may run per turn (default 1)"""
+        self._channel(channel_id).weight = max(1, weight)
+
+    def submit(self, channel_id: str, func: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """
+        Queue a job for a channel.
+
+        Args:
+            channel_id: Channel identifier
+            func: Coroutine function to run
+
+        Returns:
+            Future resolved with the job's result
+
+        Raises:
+            QueueFullError: If the channel or global queue is full
+            SchedulerClosedError: If the scheduler has been closed
+        """
+        if self._closed:
+            raise SchedulerClosedError()
+
+        queue = self._channel(channel_id)
+        if len(queue.jobs) >= self.max_channel_queue:
+            queue.shed += 1
+            self._shed += 1
+            raise QueueFullError(channel_id, "channel limit")
+        if self._total_queued >= self.max_total_queue:
+            queue.shed += 1
+            self._shed += 1
+            raise QueueFullError(channel_id, "global limit")
+
+        self._ensure_workers()
+
+        future = asyncio.get_running_loop().create_future()
+        queue.jobs.append(_Job(func=func, future=future))
+        queue.max_depth = max(queue.max_depth, len(queue.jobs))
+        self._total_queued += 1
+
+        if not queue.running and not queue.scheduled:
+            queue.scheduled = True
+            self._ready.append(channel_id)
+            self._ready_event.set()
+
+        return future
+
+    def queue_depth(self, channel_id: str) -> int:
+        """Pending jobs for a channel"""
+        queue = self._channels.get(channel_id)
+        return len(queue.jobs) if queue else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics"""
+        depths = {
+            channel_id: len(queue.jobs)
+            for channel_id, queue in self._channels.items()
+            if queue.jobs
+        }
+        return {
+            "workers": len(self._workers),
+            "active": self._active,
+            "queued": self._total_queued,
+            "ready_channels": len(self._ready),
+            "processed": self._processed,
+            "shed": self._shed,
+            "avg_wait": self._total_wait / self._processed if self._processed else 0.0,
+            "queue_depths": depths,
+        }
+
+    def get_channel_stats(self, channel_id: str) -> Dict[str, Any]:
+        """Get statistics for one channel"""
+        queue = self._channels.get(channel_id)
+        if queue is None:
+            return {"queued": 0, "running": False, "processed": 0, "shed": 0, "max_depth": 0}
+        return {
+            "queued": len(queue.jobs),
+            "running": queue.running,
+            "processed": queue.processed,
+            "shed": queue.shed,
+            "max_depth": queue.max_depth,
+        }
+
+    async def close(self) -> None:
+        """Stop all workers and fail unfinished jobs with SchedulerClosedError"""
+        self._closed = True
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+        for queue in self._channels.values():
+            while queue.jobs:
+                job = queue.jobs.popleft()
+                if not job.future.done():
+                    job.future.set_exception(SchedulerClosedError())
+        self._channels.clear()
+        self._ready.clear()
+        self._total_queued = 0
+
+    def _channel(self, channel_id: str) -> _ChannelQueue:
+        queue = self._channels.get(channel_id)
+        if queue is None:
+            queue = _ChannelQueue()
+            self._channels[channel_id] = queue
+        return queue
+
+    def _ensure_workers(self) -> None:
+        """Start the worker pool on first use (needs a running loop)"""
+        while len(self._workers) < self.max_workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while True:
+            while not self._ready:
+                self._ready_event.clear()
+                await self._ready_event.wait()
+
+            channel_id = self._ready.popleft()
+            queue = self._channels[channel_id]
+            queue.scheduled = False
+            queue.running = True
+
+            try:
+                for _ in range(queue.weight):
+                    if not queue.jobs:
+                        break
+                    await self._run(queue, queue.jobs.popleft())
+            finally:
+                queue.running = False
+
+                if queue.jobs:
+                    # Back of the line so other channels get a turn
+                    queue.scheduled = True
+                    self._ready.append(channel_id)
+                    self._ready_event.set()
+
+    async def _run(self, queue: _ChannelQueue, job: _Job) -> None:
+        self._total_queued -= 1
+        self._active += 1
+        self._total_wait += time.monotonic() - job.enqueued_at
+
+        try:
+            if job.future.cancelled():
+                return
+            result = await job.func()
+        except asyncio.CancelledError:
+            if not job.future.done():
+                if self._closed:
+                    job.future.set_exception(SchedulerClosedError())
+                else:
+                    job.future.cancel()
+            raise
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._active -= 1
+            self._processed += 1
+            queue.processed += 1
+
+
+__all__ = ["ChannelScheduler", "QueueFullError", "SchedulerClosedError"]
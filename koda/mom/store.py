@@ -1,12 +1,20 @@
 """
 Store - Persistent storage with attachment handling
 Equivalent to Pi Mono's store.ts
+
+Attachment bytes live in a content-addressed BlobStore (files named by
+SHA-256, reference counted, shared across stores that use the same blob
+directory); the JSON database only holds attachment metadata.
 """
+import io
 import json
 import base64
 import hashlib
+import os
+import tempfile
+import threading
 import time
-from typing import Optional, Any, List, Dict, Union, Callable
+from typing import Optional, Any, BinaryIO, Iterator, List, Dict, Union, Callable
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -16,6 +24,156 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+BLOB_CHUNK_SIZE = 1024 * 1024
+
+
+class BlobStore:
+    """
+    Content-addressed blob storage
+
+    Blobs are stored once per distinct content at ``<root>/<aa>/<sha256>``
+    and reference counted; the file is removed when the last reference is
+    released. Reference counts are kept in ``<root>/refs.json``.
+
+    Use get_blob_store() so stores sharing a directory share one instance.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._refs_path = self.root / "refs.json"
+        self._refs: Optional[Dict[str, int]] = None
+        self._lock = threading.RLock()
+
+    def path(self, digest: str) -> Path:
+        """Path of a blob file"""
+        return self.root / digest[:2] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def put_bytes(self, data: bytes) -> str:
+        """Store bytes and add a reference; returns the SHA-256 digest"""
+        return self.put_stream(io.BytesIO(data))
+
+    def put_file(self, file_path: Union[str, Path]) -> str:
+        """Store a file's content (streamed) and add a reference"""
+        with open(file_path, "rb") as f:
+            return self.put_stream(f)
+
+    def put_stream(self, stream: BinaryIO) -> str:
+        """
+        Store content read from a binary stream and add a reference.
+
+        Content is hashed while it is copied to a temporary file, so large
+        uploads are never held in memory.
+        """
+        hasher = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(BLOB_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    tmp.write(chunk)
+
+            digest = hasher.hexdigest()
+            with self._lock:
+                target = self.path(digest)
+                if target.exists():
+                    # Identical content already stored
+                    os.unlink(tmp_name)
+                else:
+                    target.parent.mkdir(exist_ok=True)
+                    os.replace(tmp_name, target)
+                self._add_ref(digest)
+            return digest
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def open(self, digest: str) -> BinaryIO:
+        """Open a blob for streamed reading"""
+        return open(self.path(digest), "rb")
+
+    def release(self, digest: str) -> bool:
+        """
+        Drop one reference; deletes the blob when none remain.
+
+        Returns:
+            True if the blob file was deleted
+        """
+        with self._lock:
+            refs = self._load_refs()
+            if digest not in refs:
+                return False
+
+            refs[digest] -= 1
+            if refs[digest] > 0:
+                self._save_refs()
+                return False
+
+            del refs[digest]
+            self._save_refs()
+            self.path(digest).unlink(missing_ok=True)
+            return True
+
+    def ref_count(self, digest: str) -> int:
+        with self._lock:
+            return self._load_refs().get(digest, 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Blob count, references and bytes on disk"""
+        with self._lock:
+            refs = dict(self._load_refs())
+        total_bytes = 0
+        for digest in refs:
+            try:
+                total_bytes += self.path(digest).stat().st_size
+            except OSError:
+                pass
+        return {
+            "blobs": len(refs),
+            "references": sum(refs.values()),
+            "total_bytes": total_bytes,
+        }
+
+    def _add_ref(self, digest: str) -> None:
+        refs = self._load_refs()
+        refs[digest] = refs.get(digest, 0) + 1
+        self._save_refs()
+
+    def _load_refs(self) -> Dict[str, int]:
+        if self._refs is None:
+            try:
+                self._refs = json.loads(self._refs_path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._refs = {}
+        return self._refs
+
+    def _save_refs(self) -> None:
+        tmp_path = self._refs_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(self._refs), encoding="utf-8")
+        os.replace(tmp_path, self._refs_path)
+
+
+_blob_stores: Dict[Path, BlobStore] = {}
+_blob_stores_lock = threading.Lock()
+
+
+def get_blob_store(root: Union[str, Path]) -> BlobStore:
+    """Get the shared BlobStore for a directory"""
+    root = Path(root).resolve()
+    with _blob_stores_lock:
+        blob_store = _blob_stores.get(root)
+        if blob_store is None:
+            blob_store = BlobStore(root)
+            _blob_stores[root] = blob_store
+        return blob_store
+
 
 @dataclass
 class Attachment:
@@ -104,20 +262,44 @@ class Attachment:
         if mime_type is None:
             mime_type = "application/octet-stream"
 
-        # Read content and compute checksum
-        content = file_path.read_bytes()
-        checksum = hashlib.sha256(content).hexdigest()
+        # Compute checksum without loading the file; content is read lazily
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(BLOB_CHUNK_SIZE), b""):
+                hasher.update(chunk)
 
         return cls(
             id=attachment_id,
             filename=file_path.name,
             mime_type=mime_type,
-            content=content,
-            size_bytes=len(content),
-            checksum=checksum,
+            content_path=str(file_path),
+            size_bytes=file_path.stat().st_size,
+            checksum=hasher.hexdigest(),
             metadata=metadata or {},
         )
 
+    def open(self) -> Optional[BinaryIO]:
+        """Open content for streamed reading (None if unavailable)"""
+        if self.content is not None:
+            return io.BytesIO(self.content)
+
+        if self.content_path:
+            try:
+                return open(self.content_path, "rb")
+            except OSError:
+                return None
+
+        return None
+
+    def iter_content(self, chunk_size: int = BLOB_CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over content in chunks"""
+        stream = self.open()
+        if stream is None:
+            return
+        with stream:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                yield chunk
+
     def get_content(self) -> Optional[bytes]:
         """Get attachment content"""
         if self.content is not None:
@@ -132,9 +314,12 @@ class Attachment:
 
     def get_content_base64(self) -> Optional[str]:
         """Get content as base64 string"""
-        content = self.get_content()
-        if content:
-            return base64.b64encode(content).decode('utf-8')
+        # Encode in 3-byte aligned chunks so the raw bytes are never
+        # held in memory next to their encoding
+        chunk_size = BLOB_CHUNK_SIZE - BLOB_CHUNK_SIZE % 3
+        parts = [base64.b64encode(chunk).decode('utf-8') for chunk in self.iter_content(chunk_size)]
+        if parts:
+            return "".join(parts)
         return None
 
 
@@ -272,16 +457,14 @@ def processAttachments(
             })
             continue
 
-        # Store content if needed
+        # Store content if needed (deduplicated by content hash)
         if store_path and attachment.content:
-            att_dir = store_path / "attachments"
-            att_dir.mkdir(parents=True, exist_ok=True)
-
-            file_path = att_dir / f"{attachment.id}_{attachment.filename}"
-            file_path.write_bytes(attachment.content)
+            blob_store = get_blob_store(store_path / "blobs")
+            digest = blob_store.put_bytes(attachment.content)
 
             # Update attachment with stored path
-            attachment.content_path = str(file_path)
+            attachment.checksum = digest
+            attachment.content_path = str(blob_store.path(digest))
             attachment.content = None  # Clear memory
 
         result["processed"].append(attachment)
@@ -568,18 +751,27 @@ class Store:
 
     Simple JSON-based storage for agent data with support for:
     - Key-value operations
-    - Attachments
+    - Attachments (metadata here, bytes in a BlobStore)
     - Message history
     """
 
-    def __init__(self, db_path: Path):
+    def __init__(self, db_path: Path, blob_dir: Optional[Path] = None):
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._data: dict = {}
         self._attachments: Dict[str, Attachment] = {}
         self._message_history: Optional[MessageHistory] = None
+        self._blob_dir = blob_dir or self.db_path.parent / "blobs"
+        self._blob_store: Optional[BlobStore] = None
         self._load()
 
+    @property
+    def blobs(self) -> BlobStore:
+        """Blob store for attachment content (created on first use)"""
+        if self._blob_store is None:
+            self._blob_store = get_blob_store(self._blob_dir)
+        return self._blob_store
+
     def _load(self) -> None:
         """Load data from disk"""
         if self.db_path.exists():
@@ -627,12 +819,40 @@ class Store:
         """
         Store an attachment
 
+        The content is moved into the blob store (identical content is
+        stored once) and dropped from the attachment object, which then
+        points at the blob file.
+
         Args:
             attachment: Attachment to store
 
         Returns:
             Attachment ID
         """
+        digest = None
+        adopted = False
+        if attachment.content is not None:
+            digest = self.blobs.put_bytes(attachment.content)
+        elif self._in_blob_store(attachment):
+            # Already a blob here (e.g. from processAttachments): adopt the
+            # reference taken when it was stored instead of copying it again
+            digest = attachment.checksum
+            adopted = True
+        elif attachment.content_path and Path(attachment.content_path).is_file():
+            digest = self.blobs.put_file(attachment.content_path)
+
+        # Replacing an attachment releases the previous content; re-storing
+        # the same attachment keeps the reference it already holds
+        if not (adopted and self._attachments.get(attachment.id) is attachment):
+            self._release_blob(attachment.id)
+
+        if digest is not None:
+            blob_path = self.blobs.path(digest)
+            attachment.checksum = digest
+            attachment.content_path = str(blob_path)
+            attachment.size_bytes = blob_path.stat().st_size
+            attachment.content = None
+
         self._attachments[attachment.id] = attachment
 
         # Store reference in data
@@ -641,6 +861,29 @@ class Store:
 
         return attachment.id
 
+    def open_attachment(self, attachment_id: str) -> Optional[BinaryIO]:
+        """Open an attachment's content for streamed reading"""
+        attachment = self.get_attachment(attachment_id)
+        return attachment.open() if attachment else None
+
+    def _in_blob_store(self, attachment: Attachment) -> bool:
+        """Whether an attachment's content file is a blob of this store"""
+        return bool(
+            attachment.checksum
+            and attachment.content_path
+            and Path(attachment.content_path) == self.blobs.path(attachment.checksum)
+            and self.blobs.exists(attachment.checksum)
+        )
+
+    def _release_blob(self, attachment_id: str) -> None:
+        """Drop the blob reference held by a stored attachment"""
+        data = self._data.get(f"attachment:{attachment_id}")
+        if not data or not data.get("checksum") or not data.get("content_path"):
+            return
+        # Only attachments whose content lives in this blob store hold a reference
+        if Path(data["content_path"]) == self.blobs.path(data["checksum"]):
+            self.blobs.release(data["checksum"])
+
     def get_attachment(self, attachment_id: str) -> Optional[Attachment]:
         """Get attachment by ID"""
         # Check memory cache
@@ -667,6 +910,7 @@ class Store:
     def delete_attachment(self, attachment_id: str) -> bool:
         """Delete an attachment"""
         if f"attachment:{attachment_id}" in self._data:
+            self._release_blob(attachment_id)
             del self._data[f"attachment:{attachment_id}"]
             if attachment_id in self._attachments:
                 del self._attachments[attachment_id]
@@ -0,0 +1,114 @@
+"""
+Tests for context caching (system prompt, tool definitions, message views)
+"""
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from koda.agent.agent import Agent, AgentConfig
+from koda.agent.context_cache import FileSnapshotCache, MessageView
+from koda.agent.tools import Tool, ToolRegistry
+
+
+def make_tool(name: str) -> Tool:
+    return Tool(name=name, description=f"{name} tool", parameters={"path": {"type": "string"}}, handler=lambda **kw: "")
+
+
+@pytest.fixture
+def agent(tmp_path):
+    with patch.object(Agent, "_register_builtin_tools"), patch.object(Path, "home", return_value=tmp_path / "home"):
+        agent = Agent(None, AgentConfig(working_dir=tmp_path))
+        agent.tools.register(make_tool("read"))
+        yield agent
+
+
+class TestToolRegistryCache:
+    """Test versioned tool definitions"""
+
+    def test_definitions_rebuilt_only_on_change(self):
+        registry = ToolRegistry()
+        registry.register(make_tool("read"))
+        version = registry.version
+
+        with patch.object(Tool, "to_definition", autospec=True, side_effect=lambda t: {"name": t.name}) as to_def:
+            assert registry.get_definitions() == [{"name": "read"}]
+            assert registry.get_definitions() == [{"name": "read"}]
+            assert to_def.call_count == 1
+
+            registry.register(make_tool("bash"))
+            assert registry.version == version + 1
+            assert [d["name"] for d in registry.get_definitions()] == ["read", "bash"]
+            assert to_def.call_count == 3
+
+    def test_ai_tools_cached(self):
+        registry = ToolRegistry()
+        registry.register(make_tool("read"))
+
+        first = registry.get_ai_tools()
+        assert [t.name for t in first] == ["read"]
+        assert registry.get_ai_tools()[0] is first[0]
+
+        registry.unregister("read")
+        assert registry.get_ai_tools() == []
+
+
+class TestSystemPromptCache:
+    """Test memoized system prompt"""
+
+    def test_reused_until_tools_change(self, agent):
+        prompt = agent._build_system_prompt()
+        assert agent._build_system_prompt() is prompt
+
+        agent.tools.register(make_tool("grep"))
+        updated = agent._build_system_prompt()
+        assert updated is not prompt
+        assert "- grep: grep tool" in updated
+
+    def test_agents_md_change_detected(self, agent, tmp_path):
+        agents_md = tmp_path / "AGENTS.md"
+        assert "AGENTS.md" not in agent._build_system_prompt()
+
+        agents_md.write_text("Use tabs.", encoding="utf-8")
+        assert "Use tabs." in agent._build_system_prompt()
+        reads = agent._agents_md_cache.reads
+
+        agent._build_system_prompt()
+        assert agent._agents_md_cache.reads == reads
+
+        agents_md.write_text("Use spaces!", encoding="utf-8")
+        os.utime(agents_md, ns=(1, 1))
+        assert "Use spaces!" in agent._build_system_prompt()
+
+
+class TestFileSnapshotCache:
+    """Test stat-validated file cache"""
+
+    def test_missing_file(self, tmp_path):
+        cache = FileSnapshotCache()
+
+        assert cache.read(tmp_path / "missing.md") == ""
+        assert cache.reads == 0
+
+
+class TestMessageView:
+    """Test read-only message snapshots"""
+
+    def test_snapshot_length_fixed(self):
+        messages = ["a", "b"]
+        view = MessageView(messages)
+        messages.append("c")
+
+        assert len(view) == 2
+        assert list(view) == ["a", "b"]
+        assert view[-1] == "b"
+        assert view[0:5] == ["a", "b"]
+        with pytest.raises(IndexError):
+            view[2]
+
+    def test_read_only(self):
+        view = MessageView(["a"])
+
+        assert view == ["a"]
+        assert not hasattr(view, "append")
@@ -0,0 +1,169 @@
+"""
+Tests for the token-budget rate limiter
+"""
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from koda.agent.agent import Agent, AgentConfig
+from koda.ai.provider import LLMProvider, Message, StreamEvent
+from koda.ai.provider import Usage as ChatUsage
+from koda.ai.rate_limiter import RateLimitConfig, TokenBudgetLimiter, rate_limit_key
+from koda.ai.types import Usage
+
+
+def make_limiter(requests_per_minute: int = 600, tokens_per_minute: int = 6000) -> TokenBudgetLimiter:
+    return TokenBudgetLimiter(RateLimitConfig(
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        default_output_tokens=100,
+    ))
+
+
+class TestTokenBudget:
+    """Test reservation and reconciliation"""
+
+    async def test_reserve_estimate(self):
+        limiter = make_limiter()
+
+        reservation = await limiter.acquire("k", input_tokens=400)
+
+        assert reservation.tokens == 500
+        status = limiter.get_status("k")["k"]
+        assert status["available_tokens"] < 5600
+        assert status["in_flight"] == 1
+
+    async def test_reconcile_refunds_unused(self):
+        limiter = make_limiter()
+        reservation = await limiter.acquire("k", input_tokens=4000, output_tokens=2000)
+
+        limiter.reconcile(reservation, Usage(input=1000, output=100))
+        limiter.reconcile(reservation, Usage(input=5000))  # settled once
+
+        status = limiter.get_status("k")["k"]
+        assert 4800 <= status["available_tokens"] <= 6000
+        assert status["in_flight"] == 0
+
+    async def test_waits_for_token_budget(self):
+        limiter = make_limiter(tokens_per_minute=600)  # 10 tokens/s
+        await limiter.acquire("k", input_tokens=590, output_tokens=0)
+
+        assert await limiter.acquire("k", input_tokens=20, output_tokens=0, timeout=0.2) is None
+        assert limiter.time_until_available("k", 20) > 0.5
+
+    async def test_keys_independent(self):
+        limiter = make_limiter(requests_per_minute=1)
+        await limiter.acquire("a")
+
+        assert await limiter.acquire("b", timeout=0.1) is not None
+        assert await limiter.acquire("a", timeout=0.1) is None
+
+    async def test_concurrent_waiters_fifo(self):
+        limiter = make_limiter(requests_per_minute=6000, tokens_per_minute=60000)  # 1000 tokens/s
+        await limiter.acquire("k", input_tokens=60000, output_tokens=0)
+        order = []
+
+        async def request(name, tokens):
+            await limiter.acquire("k", input_tokens=tokens, output_tokens=0)
+            order.append(name)
+
+        await asyncio.gather(request("large", 200), request("small", 10))
+
+        assert order == ["large", "small"]
+
+
+class TestHeaderFeedback:
+    """Test adapting to provider headers"""
+
+    def test_limits_and_remaining(self):
+        limiter = make_limiter()
+
+        limiter.update_from_headers("k", {
+            "X-RateLimit-Limit-Requests": "60",
+            "X-RateLimit-Limit-Tokens": "30000",
+            "X-RateLimit-Remaining-Tokens": "1200",
+        })
+
+        status = limiter.get_status("k")["k"]
+        assert status["requests_per_minute"] == 60
+        assert status["tokens_per_minute"] == 30000
+        assert status["available_tokens"] < 1300
+
+    def test_anthropic_headers_exhausted(self):
+        limiter = make_limiter()
+
+        limiter.update_from_headers("k", {
+            "anthropic-ratelimit-requests-remaining": "0",
+            "anthropic-ratelimit-requests-reset": "30s",
+        })
+
+        assert limiter.time_until_available("k") > 25
+
+    async def test_retry_after_blocks(self):
+        limiter = make_limiter()
+
+        limiter.update_from_headers("k", {"retry-after-ms": "300"})
+
+        start = time.monotonic()
+        assert await limiter.acquire("k", input_tokens=0, output_tokens=0) is not None
+        assert time.monotonic() - start >= 0.29
+
+    def test_key_hides_api_key(self):
+        key = rate_limit_key("openai", "sk-secret")
+
+        assert key.startswith("openai:")
+        assert "secret" not in key
+        assert key == rate_limit_key("openai", "sk-secret")
+
+
+class FakeProvider(LLMProvider):
+    """Provider whose responses carry rate-limit headers"""
+
+    provider_id = "acme"
+
+    def __init__(self, headers, **kwargs):
+        super().__init__("sk-test", **kwargs)
+        self.headers = headers
+
+    async def chat(self, messages, **kwargs):
+        # What the httpx response hook does for a real client
+        await self._http_event_hooks()["response"][0](SimpleNamespace(headers=self.headers))
+        yield StreamEvent.usage(ChatUsage(prompt_tokens=10, completion_tokens=5))
+        yield StreamEvent.stop()
+
+    async def get_models(self):
+        return []
+
+
+class TestProviderFeedback:
+    """Test headers seen by providers throttle the budget agents reserve from"""
+
+    async def test_provider_headers_throttle_acquire(self):
+        limiter = make_limiter()
+        provider = FakeProvider({"retry-after-ms": "300"}, rate_limiter=limiter)
+
+        async for _ in provider.chat([]):
+            pass
+
+        assert provider.rate_limit_key == rate_limit_key("acme", "sk-test")
+        start = time.monotonic()
+        await limiter.acquire(provider.rate_limit_key, output_tokens=0)
+        assert time.monotonic() - start >= 0.29
+
+    async def test_agent_shares_provider_budget(self, tmp_path):
+        limiter = make_limiter()
+        provider = FakeProvider({"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "300ms"})
+        with patch.object(Agent, "_register_builtin_tools"), patch.object(Path, "home", return_value=tmp_path):
+            agent = Agent(provider, AgentConfig(working_dir=tmp_path, rate_limiter=limiter))
+
+        assert provider.rate_limiter is limiter
+        async for _ in agent._call_llm([Message.user("hi")]):
+            pass
+
+        start = time.monotonic()
+        async for _ in agent._call_llm([Message.user("again")]):
+            pass
+        assert time.monotonic() - start >= 0.29
+        assert limiter.get_status(provider.rate_limit_key)[provider.rate_limit_key]["in_flight"] == 0
@@ -0,0 +1,126 @@
+"""
+Tests for model registry indexes, catalog cache and background refresh
+"""
+import asyncio
+import json
+import time
+
+from koda.ai.registry import CATALOG_SCHEMA_VERSION, ModelCapability, ModelInfo, ModelRegistry
+
+
+def make_model(model_id: str, provider: str = "acme", context_window: int = 32000) -> ModelInfo:
+    return ModelInfo(
+        id=model_id,
+        name=model_id.upper(),
+        provider=provider,
+        context_window=context_window,
+        capabilities={ModelCapability.CHAT},
+    )
+
+
+class TestRegistryIndexes:
+    """Test indexed lookups"""
+
+    def test_builtins_not_shared(self):
+        first = ModelRegistry()
+        first.get("gpt-4o").capabilities.clear()
+
+        assert ModelCapability.VISION in ModelRegistry().get("gpt-4o").capabilities
+
+    def test_indexes_follow_changes(self):
+        registry = ModelRegistry()
+        assert registry.list_models(provider="acme") == []
+
+        registry.register(make_model("acme-1"))
+        assert [m.id for m in registry.list_models(provider="acme")] == ["acme-1"]
+        assert "acme" in registry.list_providers()
+        assert registry.find_by_name("ACME-1").id == "acme-1"
+
+        registry.unregister("acme-1")
+        assert registry.list_models(provider="acme") == []
+        assert registry.find_by_name("acme") is None
+
+    def test_select_for_context(self):
+        registry = ModelRegistry()
+        registry.register(make_model("acme-huge", context_window=2_000_000))
+
+        assert [m.id for m in registry.select_for_context(1_000_000)] == ["acme-huge"]
+        assert all(m.context_window >= 200000 for m in registry.select_for_context(200000))
+        assert registry.select_for_context(0, provider="kimi", capability=ModelCapability.REASONING)[0].id == "kimi-k1-5"
+
+
+class TestCatalogCache:
+    """Test the persistent catalog"""
+
+    async def test_refresh_persists_catalog(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        registry = ModelRegistry(cache_path=path)
+        registry.register_provider_discoverer("acme", lambda: [make_model("acme-1")])
+
+        assert await registry.refresh() == 1
+        assert json.loads(path.read_text())["schema_version"] == CATALOG_SCHEMA_VERSION
+
+        reloaded = ModelRegistry(cache_path=path)
+        reloaded.register_provider_discoverer("acme", lambda: [])
+        assert reloaded.get("acme-1") is not None
+        assert reloaded.stale_providers() == []
+
+    async def test_builtins_not_persisted(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        registry = ModelRegistry(cache_path=path)
+        registry.register(make_model("gpt-4o", provider="openai", context_window=1))
+        registry.register_provider_discoverer("acme", lambda: [make_model("acme-1")])
+        await registry.refresh()
+
+        assert [m["id"] for m in json.loads(path.read_text())["models"]] == ["acme-1"]
+        assert ModelRegistry(cache_path=path).get("gpt-4o").context_window == 128000
+
+    def test_other_schema_ignored(self, tmp_path):
+        path = tmp_path / "catalog.json"
+        path.write_text(json.dumps({"schema_version": -1, "models": [make_model("acme-1").to_dict()]}))
+
+        assert ModelRegistry(cache_path=path).get("acme-1") is None
+
+
+class TestBackgroundRefresh:
+    """Test stale-while-revalidate refresh"""
+
+    async def test_discoverers_run_concurrently(self):
+        registry = ModelRegistry()
+
+        async def discover_a():
+            await asyncio.sleep(0.2)
+            return [make_model("a-1")]
+
+        def discover_b():
+            time.sleep(0.2)
+            return [make_model("b-1")]
+
+        registry.register_provider_discoverer("a", discover_a)
+        registry.register_provider_discoverer("b", discover_b)
+        registry.register_provider_discoverer("broken", lambda: 1 / 0)
+
+        start = time.monotonic()
+        assert await registry.refresh() == 2
+        assert time.monotonic() - start < 0.35
+
+    async def test_refresh_in_background(self):
+        registry = ModelRegistry()
+        registry.register_provider_discoverer("acme", lambda: [make_model("acme-1")])
+
+        task = registry.refresh_in_background()
+        assert registry.refresh_in_background() is None
+        assert registry.get("acme-1") is None
+
+        await task
+        assert registry.get("acme-1") is not None
+        assert registry.refresh_in_background() is None
+
+    def test_refresh_without_loop_uses_thread(self):
+        registry = ModelRegistry()
+        registry.register_provider_discoverer("acme", lambda: [make_model("acme-1")])
+
+        thread = registry.refresh_in_background()
+        thread.join(5)
+
+        assert registry.get("acme-1") is not None
@@ -0,0 +1,99 @@
+"""
+Tests for the schema compiler and the validators built on it
+"""
+import pytest
+
+from koda.ai.schema_compiler import compile_schema, canonical_schema_hash, clear_schema_cache
+from koda.ai.validation import SchemaValidator, coerce_types, validate_with_coercion
+from koda.ai.typebox_helpers import Validator
+from koda.ai.json_schema import JSONSchemaValidator
+
+
+BASH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "command": {"type": "string", "minLength": 1},
+        "timeout": {"type": "integer", "minimum": 1},
+        "background": {"type": "boolean"},
+        "env": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["command"],
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_schema_cache()
+    yield
+    clear_schema_cache()
+
+
+class TestCompileSchema:
+    """Test compile_schema caching"""
+
+    def test_hash_ignores_key_order(self):
+        reordered = {"required": ["command"], "properties": BASH_SCHEMA["properties"], "type": "object"}
+        assert canonical_schema_hash(reordered) == canonical_schema_hash(BASH_SCHEMA)
+
+    def test_equal_schemas_share_compiled_form(self):
+        copy = {**BASH_SCHEMA, "properties": dict(BASH_SCHEMA["properties"])}
+
+        assert compile_schema(BASH_SCHEMA) is compile_schema(BASH_SCHEMA)
+        assert compile_schema(copy) is compile_schema(BASH_SCHEMA)
+
+    def test_mutated_schema_recompiled(self):
+        schema = {"type": "object", "properties": {"n": {"type": "integer"}}}
+        first = compile_schema(schema)
+        assert first.errors({"n": "x", "s": 1}) == ["n: Expected type integer, got str"]
+
+        schema["properties"]["s"] = {"type": "string"}
+
+        assert compile_schema(schema) is not first
+        assert compile_schema(schema).errors({"n": 1, "s": 1}) == ["s: Expected type string, got int"]
+        assert first.errors({"n": 1, "s": 1}) == []
+
+    def test_coerce_and_validate(self):
+        compiled = compile_schema(BASH_SCHEMA)
+        coerced = compiled.coerce({"command": "ls", "timeout": "30", "background": "false", "env": "A=1"})
+
+        assert coerced == {"command": "ls", "timeout": 30, "background": False, "env": ["A=1"]}
+        assert compiled.errors(coerced) == []
+        assert compiled.errors({"timeout": 0}) == [
+            ": Missing required field 'command'",
+            "timeout: Value 0 is less than minimum 1",
+        ]
+
+
+class TestFrontEnds:
+    """Test the validator front-ends keep their result formats"""
+
+    def test_validate_with_coercion(self):
+        result = validate_with_coercion({"command": "ls", "timeout": "5"}, BASH_SCHEMA)
+
+        assert result.valid is True
+        assert result.coerced_value == {"command": "ls", "timeout": 5}
+
+    def test_falsy_coercions_kept(self):
+        schema = {"type": "object", "properties": {"n": {"type": "integer"}, "b": {"type": "boolean"}}}
+
+        assert coerce_types({"n": "0", "b": "false"}, schema) == {"n": 0, "b": False}
+
+    def test_schema_validator_union_type(self):
+        validator = SchemaValidator({"type": ["integer", "null"]})
+
+        assert validator.validate("7").coerced_value == 7
+        assert validator.validate(None).valid is True
+        assert validator.validate([]).errors == [": Expected one of types ['integer', 'null'], got list"]
+
+    def test_typebox_validator(self):
+        validator = Validator({"anyOf": [{"type": "string"}, {"type": "integer", "maximum": 3}]})
+
+        assert validator.validate("x").success is True
+        assert validator.validate(2).success is True
+        assert validator.validate(5).errors == [": Value does not match anyOf schema"]
+
+    def test_json_schema_validator(self):
+        result = JSONSchemaValidator().validate({"timeout": 1}, BASH_SCHEMA)
+
+        assert result.valid is False
+        assert "command" in result.errors[0]
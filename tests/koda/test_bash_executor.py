@@ -0,0 +1,99 @@
+"""
+Tests for bash_executor module
+"""
+import os
+import sys
+
+import pytest
+
+from koda.coding.bash_executor import BashExecutor, BashHooks, _StreamCapture, run_bash
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="需要 bash")
+
+
+class TestBashExecutorCapture:
+    """测试增量输出捕获"""
+
+    def test_full_capture(self):
+        """默认模式保留完整输出"""
+        result = BashExecutor().run("echo out; echo err >&2")
+
+        assert result.exit_code == 0
+        assert result.stdout == "out\n"
+        assert result.stderr == "err\n"
+        assert result.truncated is False
+        assert result.metadata["capture"]["stdout"]["dropped_bytes"] == 0
+
+    def test_input_data(self):
+        """input_data 通过 stdin 传入"""
+        result = BashExecutor().run("cat", input_data="piped\n")
+
+        assert result.stdout == "piped\n"
+
+    def test_output_hook_per_chunk(self):
+        """每个输出块触发 on_output 钩子"""
+        hooks = BashHooks()
+        received = []
+        hooks.on_output(lambda ctx, stream, text: received.append((stream, text)))
+
+        BashExecutor(hooks=hooks).run("echo a; echo b >&2")
+
+        assert "".join(t for s, t in received if s == "stdout") == "a\n"
+        assert "".join(t for s, t in received if s == "stderr") == "b\n"
+
+    def test_tail_capture_bounded(self):
+        """tail 模式只保留末尾，完整输出写入临时文件"""
+        executor = BashExecutor(capture="tail", max_output_bytes=1000, max_output_lines=10)
+
+        result = executor.run("seq 1 100000")
+        stats = result.metadata["capture"]["stdout"]
+
+        try:
+            assert result.truncated is True
+            assert result.stdout.splitlines()[-1] == "100000"
+            assert stats["captured_lines"] == len(result.stdout.splitlines())
+            assert stats["total_lines"] == 100000
+            assert stats["dropped_lines"] == 100000 - stats["captured_lines"]
+            assert stats["total_bytes"] == os.path.getsize(stats["full_output_path"])
+        finally:
+            os.unlink(stats["full_output_path"])
+
+    def test_unknown_capture_mode(self):
+        """未知捕获模式报错"""
+        with pytest.raises(ValueError):
+            BashExecutor(capture="head")
+
+    def test_run_bash_capture(self):
+        """run_bash 默认保留完整输出，capture="tail" 时只保留末尾"""
+        full = run_bash("seq 1 100000")
+        assert full.truncated is False
+        assert len(full.stdout.splitlines()) == 100000
+
+        tail = run_bash("seq 1 100000", capture="tail")
+        stats = tail.metadata["capture"]["stdout"]
+        try:
+            assert tail.truncated is True
+            assert tail.stdout.splitlines()[-1] == "100000"
+            assert stats["captured_bytes"] < stats["total_bytes"]
+        finally:
+            os.unlink(stats["full_output_path"])
+
+    def test_line_counts_match_across_modes(self):
+        """两种模式统计的行数一致"""
+        for command in ("seq 1 5", "printf 'a\\nb'", "true"):
+            full = BashExecutor().run(command).metadata["capture"]["stdout"]
+            tail = BashExecutor(capture="tail").run(command).metadata["capture"]["stdout"]
+            assert full["total_lines"] == tail["total_lines"]
+            assert full["captured_lines"] == tail["captured_lines"]
+
+    def test_write_after_finish_discarded(self):
+        """finish() 之后仍在读取的线程不再修改结果"""
+        capture = _StreamCapture("stdout", "tail", 100, 10)
+        capture.write(b"early\n")
+
+        text, stats = capture.finish()
+
+        assert capture.write(b"late\n" * 1000) == ""
+        assert text == "early\n"
+        assert stats["total_bytes"] == 6
+        assert capture.spill_path is None
@@ -0,0 +1,98 @@
+"""
+Tests for export_html module
+"""
+import io
+
+from koda.coding.export_html import ExportOptions, SessionExporter, export_to_html, export_to_markdown
+from koda.coding.session_entries import CompactionEntry, EntryType, SessionMessageEntry
+
+
+def make_entries(count, start=0):
+    return [
+        SessionMessageEntry(
+            id=f"m{i}",
+            type=EntryType.MESSAGE,
+            timestamp=1700000000000 + i,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message <{i}>",
+        )
+        for i in range(start, start + count)
+    ]
+
+
+class TestSessionExporter:
+    """测试流式增量导出"""
+
+    def test_write_html_stream(self):
+        """写入文件句柄，内容被转义"""
+        buffer = io.StringIO()
+
+        count = SessionExporter().write_html(make_entries(2), buffer)
+
+        assert count == 2
+        assert "message &lt;1&gt;" in buffer.getvalue()
+        assert buffer.getvalue().rstrip().endswith("</html>")
+
+    def test_reexport_renders_only_new_entries(self, tmp_path):
+        """会话增长后重新导出只渲染新条目"""
+        exporter = SessionExporter()
+        entries = make_entries(3)
+        exporter.export_html(entries, tmp_path / "s.html")
+        assert exporter.rendered == 3
+
+        exporter.export_html(entries + make_entries(2, start=3), tmp_path / "s.html")
+
+        assert exporter.rendered == 5
+        assert exporter.reused == 3
+        assert "message &lt;4&gt;" in (tmp_path / "s.html").read_text(encoding="utf-8")
+
+    def test_changed_entry_rerendered(self):
+        """条目内容变化时不复用旧片段"""
+        exporter = SessionExporter()
+        entry = make_entries(1)[0]
+        exporter.render_entry(entry)
+
+        entry.content = "edited"
+
+        assert "edited" in exporter.render_entry(entry)
+        assert exporter.rendered == 2
+
+    def test_pagination(self, tmp_path):
+        """分页输出并带上下页链接，未变化的页面不重写"""
+        exporter = SessionExporter(ExportOptions(page_size=2))
+
+        paths = exporter.export_html(make_entries(5), str(tmp_path / "s.html"))
+
+        assert [p.split("/")[-1] for p in paths] == ["s.html", "s-2.html", "s-3.html"]
+        assert 'href="s-2.html"' in (tmp_path / "s.html").read_text(encoding="utf-8")
+        assert 'href="s-2.html"' in (tmp_path / "s-3.html").read_text(encoding="utf-8")
+
+        exporter.export_html(make_entries(6), str(tmp_path / "s.html"))
+        assert exporter.pages_skipped == 2
+
+        exporter.export_html(make_entries(3), str(tmp_path / "s.html"))
+        assert not (tmp_path / "s-3.html").exists()
+
+
+class TestExportFunctions:
+    """测试原有导出函数"""
+
+    def test_export_to_markdown(self, tmp_path):
+        """Markdown 导出格式保持不变"""
+        entries = make_entries(2) + [
+            CompactionEntry(id="c", type=EntryType.COMPACTION, timestamp=0, summary="older turns")
+        ]
+
+        path = export_to_markdown(entries, str(tmp_path / "s.md"))
+        text = (tmp_path / "s.md").read_text(encoding="utf-8")
+
+        assert path == str(tmp_path / "s.md")
+        assert "\n\n**User**:\n\nmessage <0>\n" in text
+        assert "\n\n> [Summarized: older turns...]\n" in text
+
+    def test_export_to_html_returns_first_page(self, tmp_path):
+        """分页时返回第一页路径"""
+        path = export_to_html(make_entries(3), str(tmp_path / "s.html"), ExportOptions(page_size=2))
+
+        assert path == str(tmp_path / "s.html")
+        assert (tmp_path / "s-2.html").exists()
@@ -0,0 +1,93 @@
+"""
+Tests for image_resize module
+"""
+import asyncio
+import base64
+import io
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from koda.coding._support.image_resize import (
+    resize_image,
+    resize_image_async,
+    resize_image_bytes,
+    clear_resize_cache,
+    shutdown_resize_executor,
+)
+
+
+def make_image(width: int, height: int, format: str = "PNG", noise: bool = False) -> bytes:
+    """生成测试图片（noise=True 时几乎不可压缩）"""
+    if noise:
+        img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    else:
+        img = Image.new("RGB", (width, height), (200, 30, 30))
+    buffer = io.BytesIO()
+    img.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_resize_cache()
+    yield
+    clear_resize_cache()
+
+
+class TestResizeImage:
+    """测试图片缩放"""
+
+    def test_within_limits_unchanged(self):
+        """尺寸和大小都在限制内时原样返回"""
+        data = base64.b64encode(make_image(100, 50)).decode()
+
+        result = resize_image(data, "image/png")
+
+        assert result.wasResized is False
+        assert result.data == data
+        assert (result.width, result.height) == (100, 50)
+
+    def test_downscale_to_max_dimensions(self):
+        """超出尺寸时按比例缩小"""
+        result = resize_image_bytes(make_image(4000, 1000, "JPEG"), "image/jpeg")
+
+        assert result.wasResized is True
+        assert (result.originalWidth, result.originalHeight) == (4000, 1000)
+        assert (result.width, result.height) == (2000, 500)
+
+    def test_fits_byte_budget(self):
+        """不可压缩的图片会降低质量/尺寸直到满足字节预算"""
+        max_bytes = 100 * 1024
+        result = resize_image_bytes(make_image(800, 800, noise=True), "image/png", max_bytes=max_bytes)
+
+        assert result.wasResized is True
+        assert result.mimeType == "image/jpeg"
+        assert len(base64.b64decode(result.data)) <= max_bytes
+
+    def test_results_cached(self):
+        """相同内容和限制命中缓存"""
+        data = make_image(3000, 3000, "JPEG")
+
+        first = resize_image_bytes(data, "image/jpeg")
+        assert resize_image_bytes(data, "image/jpeg") is first
+        assert resize_image_bytes(data, "image/jpeg", max_width=1000) is not first
+
+    def test_async_matches_sync(self):
+        """进程池结果与同步结果一致"""
+        data = make_image(2500, 1200, noise=True)
+
+        async def run():
+            return await resize_image_async(data, "image/png", max_bytes=500 * 1024)
+
+        try:
+            result = asyncio.run(run())
+        finally:
+            shutdown_resize_executor()
+        clear_resize_cache()
+        expected = resize_image_bytes(data, "image/png", max_bytes=500 * 1024)
+
+        assert (result.width, result.height) == (expected.width, expected.height)
+        assert result.data == expected.data
@@ -0,0 +1,128 @@
+"""
+Tests for the JSON-RPC server
+"""
+import asyncio
+import json
+
+from koda.coding.modes.rpc.server import RPCErrorCode, RPCServer
+
+
+async def start(server, limit=2 ** 16):
+    """启动服务并返回 (listener, reader, writer)"""
+    listener = await asyncio.start_server(server._handle_client, "127.0.0.1", 0, limit=limit)
+    server._running = True
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=limit)
+    return listener, reader, writer
+
+
+async def stop(listener, writer):
+    writer.close()
+    listener.close()
+    await listener.wait_closed()
+
+
+def request(method, request_id, **params):
+    return {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+
+
+async def send(writer, payload):
+    writer.write((json.dumps(payload) + "\n").encode("utf-8"))
+    await writer.drain()
+
+
+async def receive(reader):
+    return json.loads(await asyncio.wait_for(reader.readline(), 5))
+
+
+class TestPipelining:
+    """测试同一连接上的请求流水线"""
+
+    async def test_fast_request_not_blocked(self):
+        """慢请求不阻塞其后的快请求"""
+        server = RPCServer()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "slow"
+
+        server.register_method("slow", slow)
+        server.register_method("fast", lambda: "fast")
+        listener, reader, writer = await start(server)
+        try:
+            await send(writer, request("slow", 1))
+            await send(writer, request("fast", 2))
+
+            assert await receive(reader) == {"jsonrpc": "2.0", "result": "fast", "id": 2}
+            release.set()
+            assert await receive(reader) == {"jsonrpc": "2.0", "result": "slow", "id": 1}
+        finally:
+            await stop(listener, writer)
+
+    async def test_oversized_line_rejected(self):
+        """超长请求先返回错误再断开"""
+        server = RPCServer()
+        listener, reader, writer = await start(server, limit=1024)
+        try:
+            writer.write(b"x" * 4096 + b"\n")
+            await writer.drain()
+
+            response = await receive(reader)
+            assert response["error"]["code"] == RPCErrorCode.INVALID_REQUEST.value
+            assert await asyncio.wait_for(reader.read(), 5) == b""
+        finally:
+            await stop(listener, writer)
+
+
+class TestBatch:
+    """测试批量请求"""
+
+    async def test_members_share_in_flight_limit(self):
+        """每个批量成员占用一个并发槽位"""
+        server = RPCServer(max_in_flight=2)
+        running = 0
+        peak = 0
+
+        async def work(n):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return n * 2
+
+        server.register_method("work", work)
+        listener, reader, writer = await start(server)
+        try:
+            await send(writer, [request("work", i, n=i) for i in range(6)])
+
+            responses = await receive(reader)
+            assert sorted(r["result"] for r in responses) == [0, 2, 4, 6, 8, 10]
+            assert peak == 2
+        finally:
+            await stop(listener, writer)
+
+    async def test_batch_larger_than_window(self):
+        """批量大小超过 max_in_flight=1 时不死锁，通知不返回结果"""
+        server = RPCServer(max_in_flight=1)
+        server.register_method("echo", lambda value: value)
+        listener, reader, writer = await start(server)
+        try:
+            notification = {"jsonrpc": "2.0", "method": "echo", "params": {"value": 0}}
+            await send(writer, [request("echo", 1, value="a"), notification, request("echo", 2, value="b")])
+
+            responses = await receive(reader)
+            assert [r["result"] for r in responses] == ["a", "b"]
+        finally:
+            await stop(listener, writer)
+
+    async def test_invalid_members(self):
+        """无效成员返回各自的错误"""
+        server = RPCServer()
+
+        response = json.loads(await server.handle_http_request(json.dumps([1, request("missing", 7)])))
+
+        assert response[0]["error"]["code"] == RPCErrorCode.INVALID_REQUEST.value
+        assert response[1]["error"]["code"] == RPCErrorCode.METHOD_NOT_FOUND.value
+        assert response[1]["id"] == 7
@@ -0,0 +1,178 @@
+"""
+Tests for RPC event streaming
+"""
+import asyncio
+
+from koda.coding.modes.rpc.client import RPCSubscription
+from koda.coding.modes.rpc.streaming import EventPublisher, Subscription
+
+
+class Recorder:
+    """记录发送的通知"""
+
+    def __init__(self):
+        self.frames = []
+        self.received = asyncio.Event()
+
+    async def send(self, payload):
+        self.frames.append(payload["params"])
+        self.received.set()
+
+    def events(self):
+        return [e for frame in self.frames for e in frame["events"]]
+
+
+def delta(text, index=0, event_type="text_delta"):
+    return {"type": event_type, "content_index": index, "delta": text}
+
+
+class TestSubscription:
+    """测试缓冲、合并与丢弃"""
+
+    async def test_deltas_merged_into_one_frame(self):
+        """同一内容块的连续增量合并为一个事件"""
+        recorder = Recorder()
+        subscription = Subscription("s1", "assistant", recorder.send, flush_interval=0.01)
+
+        for text in ("Hel", "lo", " world"):
+            subscription.push(delta(text))
+        subscription.push(delta("!", index=1))
+        subscription.push({"type": "done"})
+        await asyncio.wait_for(recorder.received.wait(), 5)
+        await subscription.close()
+
+        assert recorder.frames[0]["subscription"] == "s1"
+        assert recorder.events() == [delta("Hello world"), delta("!", index=1), {"type": "done"}]
+
+    async def test_shed_progress_before_deltas_and_terminals(self):
+        """超出上限时先丢进度事件，再丢增量，终止事件保留"""
+        subscription = Subscription("s1", "t", Recorder().send, flush_interval=60, max_pending=3)
+
+        subscription.push({"type": "progress"})
+        subscription.push(delta("a"))
+        subscription.push({"type": "done"})
+        subscription.push(delta("b", index=1))
+        assert [e["type"] for e in subscription._pending] == ["text_delta", "done", "text_delta"]
+
+        subscription.push({"type": "error"})
+        assert [e["type"] for e in subscription._pending] == ["done", "text_delta", "error"]
+        assert subscription.dropped == 2
+        await subscription.close()
+
+    async def test_terminal_only_buffer_bounded(self):
+        """只剩终止事件时仍保持在上限之内"""
+        subscription = Subscription("s1", "t", Recorder().send, flush_interval=60, max_pending=4)
+
+        for i in range(100):
+            subscription.push({"type": "turn_end", "n": i})
+
+        assert len(subscription._pending) == 4
+        assert subscription._pending[-1]["n"] == 99
+        assert subscription.dropped == 96
+        await subscription.close()
+
+    async def test_dropped_count_reported(self):
+        """丢弃数量随下一帧发送后清零"""
+        recorder = Recorder()
+        subscription = Subscription("s1", "t", recorder.send, flush_interval=0.01, max_pending=1)
+
+        subscription.push({"type": "progress"})
+        subscription.push({"type": "done"})
+        await asyncio.wait_for(recorder.received.wait(), 5)
+        await subscription.close()
+
+        assert recorder.frames == [{"subscription": "s1", "topic": "t", "events": [{"type": "done"}], "dropped": 1}]
+        assert subscription.dropped == 0
+
+
+class TestEventPublisher:
+    """测试订阅与取消订阅"""
+
+    async def test_topic_and_wildcard(self):
+        """按主题投递，"*" 接收所有主题"""
+        publisher = EventPublisher(flush_interval=0.01)
+        status, everything = Recorder(), Recorder()
+        first = publisher.subscribe("status", status.send)
+        second = publisher.subscribe("*", everything.send)
+
+        publisher.publish("status", {"type": "idle"})
+        publisher.publish("assistant", delta("x"))
+        await asyncio.wait_for(status.received.wait(), 5)
+        await publisher.unsubscribe(first.id, flush=True)
+        await publisher.unsubscribe(second.id, flush=True)
+
+        assert status.events() == [{"type": "idle"}]
+        assert everything.events() == [{"type": "idle"}, delta("x")]
+
+    async def test_subscribers_merge_independently(self):
+        """各订阅者拿到独立副本，合并互不影响"""
+        publisher = EventPublisher(flush_interval=60)
+        a = publisher.subscribe("t", Recorder().send)
+        b = publisher.subscribe("t", Recorder().send)
+
+        publisher.publish("t", delta("1"))
+        a.push(delta("2"))
+
+        assert a._pending == [delta("12")]
+        assert b._pending == [delta("1")]
+        await publisher.unsubscribe(a.id)
+        await publisher.unsubscribe(b.id)
+
+    async def test_unsubscribe(self):
+        """取消订阅后不再投递，未知 ID 返回 False"""
+        publisher = EventPublisher(flush_interval=0.01)
+        recorder = Recorder()
+        subscription = publisher.subscribe("t", recorder.send)
+
+        assert await publisher.unsubscribe(subscription.id) is True
+        assert await publisher.unsubscribe(subscription.id) is False
+        assert publisher.topics() == []
+
+        publisher.publish("t", {"type": "done"})
+        await asyncio.sleep(0.05)
+        assert recorder.frames == []
+        assert subscription.closed
+
+    async def test_flush_on_unsubscribe(self):
+        """flush=True 时先发送缓冲中的事件"""
+        publisher = EventPublisher(flush_interval=0.01)
+        recorder = Recorder()
+        subscription = publisher.subscribe("t", recorder.send)
+
+        publisher.publish("t", {"type": "done"})
+        await publisher.unsubscribe(subscription.id, flush=True)
+
+        assert recorder.events() == [{"type": "done"}]
+
+
+class TestRPCSubscription:
+    """测试客户端订阅缓冲"""
+
+    async def test_slow_consumer_bounded(self):
+        """消费者读取过慢时缓冲保持在上限之内，增量继续合并"""
+        subscription = RPCSubscription(None, "s1", "t", max_pending=3)
+
+        for i in range(100):
+            subscription._put({"events": [{"type": "progress", "n": i}], "dropped": 0})
+        assert len(subscription._events) == 3
+        subscription._put({"events": [delta("a"), delta("b"), {"type": "done"}], "dropped": 5})
+        subscription._put(None)
+
+        events = [event async for event in subscription]
+        assert events == [{"type": "progress", "n": 99}, delta("ab"), {"type": "done"}]
+        assert subscription.dropped == 97 + 2 + 5
+
+    async def test_events_delivered_before_end(self):
+        """结束前已缓冲的事件仍然送达"""
+        subscription = RPCSubscription(None, "s1", "t")
+
+        async def feed():
+            await asyncio.sleep(0.01)
+            subscription._put({"events": [delta("a"), delta("b", index=1)]})
+            subscription._put(None)
+
+        feeder = asyncio.ensure_future(feed())
+        events = [event async for event in subscription]
+        await feeder
+
+        assert events == [delta("a"), delta("b", index=1)]
@@ -7,6 +7,9 @@ from koda.coding._support.truncation import (
     truncate_head,
     truncate_tail,
     truncate_for_read,
+    truncate_line,
+    HeadTruncator,
+    TailTruncator,
     TruncationResult,
     DEFAULT_MAX_LINES,
     DEFAULT_MAX_BYTES,
@@ -120,3 +123,73 @@ class TestTruncationResult:
         
         assert result.content == "test"
         assert result.truncated is True
+
+
+def feed(truncator, data, size):
+    """按固定大小分块写入"""
+    for i in range(0, len(data), size):
+        truncator.write(data[i:i + size])
+    return truncator.finish()
+
+
+class TestStreamingTruncators:
+    """测试流式截断器"""
+    
+    CONTENT = "\n".join(f"行 {i} " + "x" * (i % 37) for i in range(3000)) + "\n末尾 é"
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_head_matches_truncate_head(self, chunk_size):
+        """分块写入（字节，跨越多字节字符）与一次性截断结果一致"""
+        expected = truncate_head(self.CONTENT, max_lines=500, max_bytes=8000)
+        
+        result = feed(HeadTruncator(max_lines=500, max_bytes=8000), self.CONTENT.encode("utf-8"), chunk_size)
+        
+        assert result == expected
+    
+    @pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+    def test_tail_matches_truncate_tail(self, chunk_size):
+        """尾部截断分块写入与一次性截断结果一致"""
+        expected = truncate_tail(self.CONTENT, max_lines=500, max_bytes=8000)
+        
+        result = feed(TailTruncator(max_lines=500, max_bytes=8000), self.CONTENT, chunk_size)
+        
+        assert result == expected
+        assert result.content.endswith("末尾 é")
+    
+    def test_tail_long_last_line(self):
+        """最后一行超出字节限制时保留其末尾"""
+        truncator = TailTruncator(max_bytes=100)
+        truncator.write("first\n")
+        for _ in range(1000):
+            truncator.write("漢" * 10)
+        
+        result = truncator.finish()
+        
+        assert result.last_line_partial is True
+        assert result.last_line_bytes == 30000
+        assert result.output_bytes <= 100
+        assert result.content == "漢" * 33
+    
+    def test_head_stops_retaining_when_full(self):
+        """头部窗口满后只计数不保留数据"""
+        truncator = HeadTruncator(max_lines=10, max_bytes=1000)
+        for i in range(10000):
+            truncator.write(f"line {i}\n")
+        
+        assert truncator.full is True
+        result = truncator.finish()
+        assert result.output_lines == 10
+        assert result.total_lines == 10001
+        assert result.truncated_by == "lines"
+
+
+class TestTruncateLine:
+    """测试单行截断"""
+    
+    def test_long_line(self):
+        """超长行被截断并标记"""
+        result = truncate_line("a" * 600, 500)
+        
+        assert result.was_truncated is True
+        assert result.text == "a" * 500 + "... [truncated]"
+        assert truncate_line("short").was_truncated is False
@@ -3,6 +3,9 @@ Tests for Mom Module
 """
 import pytest
 import asyncio
+import base64
+import json
+import os
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime
 from pathlib import Path
@@ -13,6 +16,8 @@ from koda.mom.agent import (
     ChannelConfig,
     ChannelMemory,
 )
+from koda.mom.scheduler import ChannelScheduler, QueueFullError, SchedulerClosedError
+from koda.mom.fs_notify import InotifyNotifier
 from koda.mom.events import (
     EventsWatcher,
     CronParser,
@@ -23,6 +28,7 @@ from koda.mom.log import (
     LogLevel,
     LogEntry,
 )
+from koda.mom.store import Store, Attachment, processAttachments
 from koda.mom.tools import MomTools, ToolResult
 
 
@@ -58,6 +64,24 @@ class TestChannelMemory:
         assert restored.key_facts == memory.key_facts
         assert restored.message_count == memory.message_count
 
+    def test_dirty_tracking(self):
+        """Field assignment marks the memory dirty"""
+        memory = ChannelMemory(channel_id="test")
+        assert memory.dirty is False
+
+        memory.summary = "changed"
+        assert memory.dirty is True
+
+        version = memory._version
+        memory.message_count += 1
+        memory.mark_clean(version)
+        assert memory.dirty is True
+
+        memory.mark_clean()
+        memory.key_facts.append("fact")
+        memory.mark_dirty()
+        assert memory.dirty is True
+
 
 class TestMomAgentConfig:
     """Test MomAgentConfig"""
@@ -134,6 +158,305 @@ class TestMomAgent:
         assert agent._running is False
 
 
+class _FakeSession:
+    """Lightweight stand-in for AgentSession in cache tests"""
+
+    def __init__(self, provider, model_info, config):
+        self.session_id = config.session_id
+        self.context = MagicMock(messages=[])
+        self.is_idle = True
+        self._total_tokens_input = 0
+        self._total_tokens_output = 0
+        self._total_cost = 0.0
+        self._tool_calls_count = 0
+
+    @property
+    def messages(self):
+        return self.context.messages
+
+    def _estimate_tokens(self):
+        return sum(len(m.content) // 4 for m in self.context.messages)
+
+
+class TestSessionCache:
+    """Test bounded session cache with hibernation"""
+
+    def _make_agent(self, tmp_path, **kwargs):
+        config = MomAgentConfig(
+            memory_dir=tmp_path / "memory",
+            session_dir=tmp_path / "sessions",
+            auto_memory_update=False,
+            **kwargs,
+        )
+        agent = MomAgent(MagicMock(), config)
+        agent._model_registry = MagicMock()
+        return agent
+
+    @pytest.mark.asyncio
+    async def test_lru_hibernation_and_rehydration(self, tmp_path):
+        """Evicted sessions are restored with their messages"""
+        from koda.ai.types import UserMessage
+
+        agent = self._make_agent(tmp_path, max_resident_sessions=2)
+
+        with patch("koda.mom.agent.AgentSession", _FakeSession):
+            first = await agent.get_or_create_runner("a")
+            first.context.messages.append(UserMessage(content="hello from a"))
+            await agent.get_or_create_runner("b")
+            await agent.get_or_create_runner("c")
+
+            assert await agent.list_active_channels() == ["b", "c"]
+            assert (tmp_path / "sessions" / "mom_a.json").exists()
+
+            restored = await agent.get_or_create_runner("a")
+            assert restored is not first
+            assert restored.messages[0].content == "hello from a"
+
+        stats = agent.get_cache_stats()
+        assert stats["rehydrated"] == 1
+        assert stats["evicted_lru"] == 2
+        assert stats["resident_sessions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_busy_sessions_are_not_evicted(self, tmp_path):
+        """Sessions that are running stay resident"""
+        agent = self._make_agent(tmp_path, max_resident_sessions=1)
+
+        with patch("koda.mom.agent.AgentSession", _FakeSession):
+            busy = await agent.get_or_create_runner("busy")
+            busy.is_idle = False
+            await agent.get_or_create_runner("other")
+
+        assert "busy" in await agent.list_active_channels()
+
+    @pytest.mark.asyncio
+    async def test_idle_timeout(self, tmp_path):
+        """Idle sessions are hibernated"""
+        agent = self._make_agent(tmp_path, session_idle_timeout=0.0)
+
+        with patch("koda.mom.agent.AgentSession", _FakeSession):
+            await agent.get_or_create_runner("a")
+            await agent._evict_idle_sessions()
+
+        assert await agent.list_active_channels() == []
+        assert agent.get_cache_stats()["evicted_idle"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_memory(self, tmp_path):
+        """Memory stays cached when saving it fails on hibernate or close"""
+        agent = self._make_agent(tmp_path)
+
+        with patch("koda.mom.agent.AgentSession", _FakeSession):
+            await agent.get_or_create_runner("a")
+            memory = await agent.load_memory("a")
+            memory.summary = "unsaved"
+
+            with patch.object(agent._memory_backend, "save_many", side_effect=OSError("disk full")):
+                with pytest.raises(OSError):
+                    await agent.hibernate_channel("a")
+                assert agent._memories["a"] is memory
+
+                with pytest.raises(OSError):
+                    await agent.close_channel("a")
+                assert agent._memories["a"] is memory
+
+            await agent.close_channel("a")
+
+        assert "a" not in agent._memories
+        assert (await agent.load_memory("a")).summary == "unsaved"
+
+    @pytest.mark.asyncio
+    async def test_soak_10k_channels(self, tmp_path):
+        """Resident sessions and memories stay bounded across 10k channels"""
+        agent = self._make_agent(tmp_path, max_resident_sessions=100)
+
+        with patch("koda.mom.agent.AgentSession", _FakeSession):
+            for i in range(10_000):
+                await agent.get_or_create_runner(f"channel-{i}")
+                assert len(agent._sessions) <= 100
+                assert len(agent._memories) <= 100
+
+        stats = agent.get_cache_stats()
+        assert stats["misses"] == 10_000
+        assert stats["hibernated"] == 9_900
+
+
+class TestChannelScheduler:
+    """Test ChannelScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_channel_order(self):
+        """Jobs in one channel run one at a time in order"""
+        scheduler = ChannelScheduler(max_workers=4)
+        order = []
+        running = 0
+
+        def job(i):
+            async def run():
+                nonlocal running
+                running += 1
+                assert running == 1
+                await asyncio.sleep(0.001)
+                order.append(i)
+                running -= 1
+            return run
+
+        await asyncio.gather(*(scheduler.submit("c", job(i)) for i in range(10)))
+        await scheduler.close()
+
+        assert order == list(range(10))
+
+    @pytest.mark.asyncio
+    async def test_global_limit_and_round_robin(self):
+        """Workers are bounded and channels take turns"""
+        scheduler = ChannelScheduler(max_workers=1)
+        order = []
+
+        def job(channel_id):
+            async def run():
+                order.append(channel_id)
+                await asyncio.sleep(0)
+            return run
+
+        futures = [scheduler.submit("a", job("a")) for _ in range(3)]
+        futures += [scheduler.submit("b", job("b")) for _ in range(3)]
+        await asyncio.gather(*futures)
+        await scheduler.close()
+
+        assert order == ["a", "b", "a", "b", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_load_shedding(self):
+        """Submissions beyond the queue limit are rejected"""
+        scheduler = ChannelScheduler(max_workers=1, max_channel_queue=2)
+        blocker = asyncio.Event()
+
+        first = scheduler.submit("a", blocker.wait)
+        await asyncio.sleep(0)
+        scheduler.submit("a", blocker.wait)
+        scheduler.submit("a", blocker.wait)
+
+        with pytest.raises(QueueFullError):
+            scheduler.submit("a", blocker.wait)
+
+        stats = scheduler.get_stats()
+        assert stats["shed"] == 1
+        assert stats["queue_depths"] == {"a": 2}
+
+        blocker.set()
+        await first
+        await scheduler.close()
+
+
+    @pytest.mark.asyncio
+    async def test_close_fails_unfinished_jobs(self):
+        """Queued and running jobs fail with SchedulerClosedError on close"""
+        scheduler = ChannelScheduler(max_workers=1)
+        blocker = asyncio.Event()
+
+        running = scheduler.submit("a", blocker.wait)
+        queued = scheduler.submit("a", blocker.wait)
+        await asyncio.sleep(0)
+        await scheduler.close()
+
+        for future in (running, queued):
+            with pytest.raises(SchedulerClosedError):
+                await future
+        with pytest.raises(SchedulerClosedError):
+            scheduler.submit("a", blocker.wait)
+
+    @pytest.mark.asyncio
+    async def test_channel_metrics_kept_when_idle(self):
+        """Per-channel metrics survive the queue draining"""
+        scheduler = ChannelScheduler(max_workers=1)
+
+        await scheduler.submit("a", lambda: asyncio.sleep(0))
+        await asyncio.sleep(0)
+
+        assert scheduler.get_channel_stats("a")["processed"] == 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_stop_ends_pending_messages(self, tmp_path):
+        """Consumers of queued and running messages do not hang after stop()"""
+        config = MomAgentConfig(memory_dir=tmp_path / "memory", session_dir=tmp_path / "sessions")
+        agent = MomAgent(MagicMock(), config)
+        started = asyncio.Event()
+
+        async def process(channel_id, user_id, content, metadata, events):
+            started.set()
+            await asyncio.Event().wait()
+
+        async def consume(content):
+            return [event async for event in agent.handle_message("c", "u", content)]
+
+        with patch.object(agent, "_process_message", process):
+            consumers = [asyncio.ensure_future(consume(text)) for text in ("first", "second")]
+            await started.wait()
+            await agent.stop()
+
+            results = await asyncio.wait_for(asyncio.gather(*consumers, return_exceptions=True), 5)
+
+        assert [type(r) for r in results] == [SchedulerClosedError, SchedulerClosedError]
+
+
+class TestMemoryPersistence:
+    """Test batched memory persistence"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["files", "single_file", "sqlite"])
+    async def test_flush_writes_only_dirty(self, tmp_path, backend):
+        """Only changed memories are written, and they survive a restart"""
+        config = MomAgentConfig(
+            memory_dir=tmp_path / "memory",
+            session_dir=tmp_path / "sessions",
+            memory_backend=backend,
+        )
+        agent = MomAgent(MagicMock(), config)
+
+        for i in range(5):
+            await agent.load_memory(f"c{i}")
+        assert await agent.flush_memories() == 0
+
+        await agent.update_memory_summary("c1", "one", ["fact"])
+        await agent.update_memory_summary("c3", "three")
+        assert await agent.flush_memories() == 2
+        assert await agent.flush_memories() == 0
+
+        (await agent.load_memory("c4")).summary = "four"
+        await agent.stop()
+
+        reloaded = MomAgent(MagicMock(), config)
+        assert (await reloaded.load_memory("c1")).key_facts == ["fact"]
+        assert (await reloaded.load_memory("c4")).summary == "four"
+        assert (await reloaded.load_memory("c0")).summary == ""
+
+
+    @pytest.mark.asyncio
+    async def test_stop_closes_backend(self, tmp_path):
+        """stop() closes the memory backend and start() reopens it"""
+        import sqlite3
+
+        config = MomAgentConfig(
+            memory_dir=tmp_path / "memory",
+            session_dir=tmp_path / "sessions",
+            memory_backend="sqlite",
+            auto_memory_update=False,
+        )
+        agent = MomAgent(MagicMock(), config)
+        (await agent.load_memory("c")).summary = "kept"
+        backend = agent._memory_backend
+
+        await agent.stop()
+        with pytest.raises(sqlite3.ProgrammingError):
+            backend.load("c")
+
+        await agent.start()
+        agent._memories.clear()
+        assert (await agent.load_memory("c")).summary == "kept"
+        await agent.stop()
+
+
 class TestCronParser:
     """Test CronParser"""
 
@@ -182,6 +505,77 @@ class TestCronParser:
         assert next_run.hour == 11
         assert next_run.minute == 0
 
+    def test_sparse_schedule(self):
+        """Leap-day schedules are found without scanning every minute"""
+        parsed = CronParser.parse("0 0 29 2 *")
+
+        assert CronParser.get_next_run(parsed, datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+
+        # Feb 29 that is also a Monday
+        parsed = CronParser.parse("0 0 29 2 0")
+        assert CronParser.get_next_run(parsed, datetime(2024, 3, 1)) == datetime(2044, 2, 29)
+
+    def test_get_next_runs(self):
+        """Previewing several fire times"""
+        parsed = CronParser.parse("30 9 * * 0-4")
+        runs = CronParser.get_next_runs(parsed, datetime(2024, 1, 5, 10, 0), 3)
+
+        assert runs == [
+            datetime(2024, 1, 8, 9, 30),
+            datetime(2024, 1, 9, 9, 30),
+            datetime(2024, 1, 10, 9, 30),
+        ]
+
+    def test_matches_brute_force(self):
+        """Field jumping agrees with minute-by-minute search"""
+        import random
+        from datetime import timedelta
+
+        def brute_force(parsed, after, limit):
+            t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            while t <= limit:
+                if CronParser._matches(parsed, t):
+                    return t
+                t += timedelta(minutes=1)
+            return None
+
+        def random_field(rng, low, high):
+            kind = rng.choice(["*", "step", "value", "range", "list"])
+            if kind == "*":
+                return "*"
+            if kind == "step":
+                return f"*/{rng.randint(2, max(2, (high - low) // 2))}"
+            if kind == "value":
+                return str(rng.randint(low, high))
+            if kind == "range":
+                start = rng.randint(low, high)
+                return f"{start}-{rng.randint(start, high)}"
+            return ",".join(str(v) for v in rng.sample(range(low, high + 1), 3))
+
+        rng = random.Random(1234)
+        for _ in range(60):
+            expression = " ".join([
+                random_field(rng, 0, 59),
+                random_field(rng, 0, 23),
+                random_field(rng, 1, 31),
+                "*" if rng.random() < 0.7 else random_field(rng, 1, 12),
+                random_field(rng, 0, 6),
+            ])
+            parsed = CronParser.parse(expression)
+            after = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 366 * 24 * 60))
+            limit = after + timedelta(days=31)
+
+            expected = brute_force(parsed, after, limit)
+            try:
+                actual = CronParser.get_next_run(parsed, after)
+            except ValueError:
+                actual = None
+
+            if expected is None:
+                assert actual is None or actual > limit, expression
+            else:
+                assert actual == expected, (expression, after)
+
 
 class TestEventsWatcher:
     """Test EventsWatcher"""
@@ -247,6 +641,202 @@ class TestEventsWatcher:
         assert result is True
         assert event_id not in watcher._events
 
+    @pytest.mark.asyncio
+    async def test_due_callbacks_run_concurrently(self):
+        """Slow callbacks do not delay each other"""
+        watcher = EventsWatcher(max_concurrent_callbacks=4)
+        finished = []
+
+        async def slow(metadata):
+            await asyncio.sleep(0.2)
+            finished.append(metadata["n"])
+
+        for n in range(4):
+            watcher.schedule_immediate(slow, {"n": n})
+
+        await watcher.start()
+        await asyncio.sleep(0.35)
+        await watcher.stop()
+
+        assert sorted(finished) == [0, 1, 2, 3]
+        assert watcher._events == {}
+
+    @pytest.mark.asyncio
+    async def test_wakes_for_new_earlier_event(self):
+        """A newly scheduled event is not delayed by a later deadline"""
+        from datetime import timedelta
+
+        watcher = EventsWatcher()
+        called = asyncio.Event()
+
+        watcher.schedule_one_shot(datetime.now() + timedelta(hours=1), MagicMock())
+        await watcher.start()
+        await asyncio.sleep(0.05)
+
+        watcher.schedule_one_shot(
+            datetime.now() + timedelta(milliseconds=50),
+            lambda metadata: called.set(),
+        )
+        await asyncio.wait_for(called.wait(), timeout=1.0)
+        await watcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_many_events(self):
+        """Large numbers of events are dispatched from the heap"""
+        from datetime import timedelta
+
+        watcher = EventsWatcher(max_concurrent_callbacks=64)
+        count = 0
+
+        def callback(metadata):
+            nonlocal count
+            count += 1
+
+        soon = datetime.now() + timedelta(milliseconds=100)
+        for _ in range(20_000):
+            watcher.schedule_one_shot(soon, callback)
+        later = [
+            watcher.schedule_one_shot(soon + timedelta(days=1), callback)
+            for _ in range(20_000)
+        ]
+
+        await watcher.start()
+        await asyncio.sleep(0.5)
+        await watcher.stop()
+
+        assert count == 20_000
+        assert set(watcher._events) == set(later)
+        assert watcher._get_next_event_time() == soon + timedelta(days=1)
+
+
+@pytest.mark.skipif(not InotifyNotifier.available(), reason="inotify not available")
+class TestNativeFileWatching:
+    """Test inotify-backed file watching"""
+
+    @pytest.mark.asyncio
+    async def test_directory_events_are_coalesced(self, tmp_path):
+        """Bursts of writes to one path produce one event"""
+        watcher = EventsWatcher()
+        events = []
+
+        watch_id = watcher.watch_directory(tmp_path, lambda path, kind: events.append((path, kind)))
+        assert watcher._file_watchers[watch_id]["native"] is True
+        await watcher.start()
+
+        target = tmp_path / "sub" / "file.txt"
+        target.parent.mkdir()
+        await asyncio.sleep(0.05)
+        for i in range(10):
+            target.write_text(str(i))
+        (tmp_path / "temp.txt").write_text("x")
+        (tmp_path / "temp.txt").unlink()
+
+        await asyncio.sleep(0.3)
+        await watcher.stop()
+
+        assert events == [(str(target), "created")]
+
+    @pytest.mark.asyncio
+    async def test_watch_file_sees_atomic_replace(self, tmp_path):
+        """Replacing a file via rename triggers its watcher"""
+        target = tmp_path / "config.json"
+        target.write_text("{}")
+
+        watcher = EventsWatcher()
+        changed = asyncio.Event()
+        watcher.watch_file(target, lambda path: changed.set(), debounce=0.05)
+        await watcher.start()
+
+        tmp = tmp_path / "config.json.tmp"
+        tmp.write_text('{"a": 1}')
+        tmp.replace(target)
+
+        await asyncio.wait_for(changed.wait(), timeout=2.0)
+        await watcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_releases_inotify_fd(self, tmp_path):
+        """start/stop cycles do not leak inotify fds; watches survive a restart"""
+        fd_count = lambda: len(os.listdir("/proc/self/fd"))
+        watcher = EventsWatcher()
+        changed = asyncio.Event()
+        watcher.watch_directory(tmp_path, lambda path, kind: changed.set())
+        await watcher.start()
+        await watcher.stop()
+        before = fd_count()
+
+        for _ in range(20):
+            await watcher.start()
+            await watcher.stop()
+        assert fd_count() == before
+
+        await watcher.start()
+        (tmp_path / "new.txt").write_text("x")
+        await asyncio.wait_for(changed.wait(), timeout=2.0)
+        await watcher.stop()
+
+
+class TestAttachmentBlobs:
+    """Test content-addressed attachment storage"""
+
+    def _attachment(self, attachment_id, content):
+        return Attachment(
+            id=attachment_id, filename="a.bin", mime_type="application/octet-stream", content=content
+        )
+
+    def test_identical_content_shared_across_stores(self, tmp_path):
+        blob_dir = tmp_path / "blobs"
+        store_a = Store(tmp_path / "a" / "store.json", blob_dir=blob_dir)
+        store_b = Store(tmp_path / "b" / "store.json", blob_dir=blob_dir)
+
+        store_a.store_attachment(self._attachment("x", b"same bytes"))
+        store_b.store_attachment(self._attachment("y", b"same bytes"))
+
+        stats = store_a.blobs.get_stats()
+        assert stats["blobs"] == 1
+        assert stats["references"] == 2
+
+        attachment = store_b.get_attachment("y")
+        assert attachment.content is None
+        assert attachment.get_content() == b"same bytes"
+        assert "same bytes" not in (tmp_path / "b" / "store.json").read_text()
+
+    def test_blob_removed_with_last_reference(self, tmp_path):
+        store = Store(tmp_path / "store.json")
+        store.store_attachment(self._attachment("x", b"data"))
+        store.store_attachment(self._attachment("y", b"data"))
+        blob_path = Path(store.get_attachment("x").content_path)
+
+        store.delete_attachment("x")
+        assert blob_path.exists()
+        store.delete_attachment("y")
+        assert not blob_path.exists()
+
+    def test_processed_attachment_adopted(self, tmp_path):
+        store = Store(tmp_path / "store.json")
+        attachment = processAttachments([self._attachment("x", b"data")], store_path=tmp_path)["processed"][0]
+        digest = attachment.checksum
+
+        store.store_attachment(attachment)
+        store.store_attachment(attachment)
+        assert store.blobs.ref_count(digest) == 1
+
+        store.delete_attachment("x")
+        assert store.blobs.ref_count(digest) == 0
+        assert not store.blobs.exists(digest)
+
+    def test_reload_is_metadata_only(self, tmp_path):
+        content = bytes(range(256)) * 10000
+        store = Store(tmp_path / "store.json")
+        store.store_attachment(self._attachment("x", content))
+
+        reloaded = Store(tmp_path / "store.json")
+        attachment = reloaded.get_attachment("x")
+        assert attachment.content is None
+        assert attachment.size_bytes == len(content)
+        assert b"".join(attachment.iter_content(4096)) == content
+        assert attachment.get_content_base64() == base64.b64encode(content).decode()
+
 
 class TestStructuredLogger:
     """Test StructuredLogger"""
@@ -288,6 +878,53 @@ class TestStructuredLogger:
         assert data["message"] == "Test message"
         assert data["context"]["key"] == "value"
 
+    def test_async_mode_writes_json_lines(self, tmp_path):
+        """Test queued entries are written by the background thread"""
+        log_path = tmp_path / "mom.log"
+        logger = StructuredLogger("test", output=log_path, json_output=True, async_mode=True)
+
+        logger.debug("filtered")
+        for i in range(500):
+            logger.info("event", {"i": i})
+        logger.close()
+
+        lines = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [line["context"]["i"] for line in lines] == list(range(500))
+        assert logger.get_stats()["written"] == 500
+
+    def test_async_mode_drops_when_full(self, tmp_path):
+        """Test overload drops entries and counts them instead of blocking"""
+        logger = StructuredLogger(
+            "test", output=tmp_path / "mom.log", json_output=True,
+            async_mode=True, queue_size=10,
+        )
+        with logger._lock:
+            # Writer is blocked on the lock, so the queue fills up
+            for i in range(100):
+                logger.warning("event", {"i": i})
+        logger.close()
+
+        stats = logger.get_stats()
+        assert stats["dropped"] > 0
+        assert stats["dropped_by_level"] == {"warning": stats["dropped"]}
+        assert "Dropped" in (tmp_path / "mom.log").read_text()
+
+    def test_size_rotation(self, tmp_path):
+        """Test file output rotates once max_bytes is reached"""
+        log_path = tmp_path / "mom.log"
+        logger = StructuredLogger(
+            "test", output=log_path, json_output=True, max_bytes=1000, backup_count=2
+        )
+        for i in range(100):
+            logger.info("x" * 50)
+        logger.close()
+
+        assert logger.get_stats()["rotations"] > 2
+        assert (tmp_path / "mom.log.1").exists()
+        assert (tmp_path / "mom.log.2").exists()
+        assert not (tmp_path / "mom.log.3").exists()
+        assert log_path.stat().st_size < 1200
+
 
 class TestMomTools:
     """Test MomTools"""
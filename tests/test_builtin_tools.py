@@ -7,6 +7,7 @@ import pytest
 import json
 import tempfile
 import os
+import shutil
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -18,6 +19,7 @@ from evoskill.skills.builtin import (
     execute_command,
     fetch_url,
 )
+from evoskill.skills.workspace_index import WorkspaceIndex, ripgrep_search
 
 
 @pytest.mark.asyncio
@@ -81,6 +83,19 @@ class TestListDirTool:
         result = await list_dir(path=str(subdir))
         
         assert "file.txt" in result
+    
+    async def test_list_recursive_respects_gitignore(self, temp_dir):
+        """测试递归列出时跳过忽略的目录"""
+        (temp_dir / ".gitignore").write_text("node_modules/\n")
+        (temp_dir / "src").mkdir()
+        (temp_dir / "src" / "app.py").write_text("")
+        (temp_dir / "node_modules").mkdir()
+        (temp_dir / "node_modules" / "pkg.js").write_text("")
+        
+        result = await list_dir(path=str(temp_dir), recursive=True)
+        
+        assert "src/app.py" in result
+        assert "node_modules" not in result
 
 
 @pytest.mark.asyncio
@@ -114,6 +129,50 @@ class TestSearchFilesTool:
         )
         
         assert "no matches" in result.lower() or "0 matches" in result.lower()
+    
+    async def test_search_respects_gitignore(self, temp_dir):
+        """测试搜索跳过 .gitignore 中忽略的文件"""
+        (temp_dir / ".gitignore").write_text("build/\n*.log\n")
+        (temp_dir / "main.py").write_text("marker_abc = 1")
+        (temp_dir / "debug.log").write_text("marker_abc")
+        (temp_dir / "build").mkdir()
+        (temp_dir / "build" / "out.py").write_text("marker_abc = 2")
+        
+        result = await search_files(pattern="marker_abc", path=str(temp_dir))
+        
+        assert "main.py" in result
+        assert "debug.log" not in result
+        assert "out.py" not in result
+    
+    @pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep 未安装")
+    async def test_ripgrep_matches_index(self, temp_dir):
+        """测试 rg 与索引结果一致（非 git 仓库、隐藏文件）"""
+        (temp_dir / ".gitignore").write_text("build/\n*.log\n")
+        (temp_dir / "main.py").write_text("marker_abc = 1")
+        (temp_dir / "debug.log").write_text("marker_abc")
+        (temp_dir / "build").mkdir()
+        (temp_dir / "build" / "out.py").write_text("marker_abc = 2")
+        (temp_dir / ".config").mkdir()
+        (temp_dir / ".config" / "settings.py").write_text("marker_abc = 3")
+        (temp_dir / ".git").mkdir()
+        (temp_dir / ".git" / "HEAD").write_text("marker_abc")
+        
+        for file_pattern in (None, "*.py"):
+            found = ripgrep_search("marker_abc", temp_dir, file_pattern)
+            indexed = WorkspaceIndex(temp_dir).search("marker_abc", file_pattern)
+            
+            assert found == indexed
+            assert [m[0] for m in found[0]] == [".config/settings.py", "main.py"]
+    
+    async def test_search_sees_written_file(self, temp_dir):
+        """测试 write_file 后索引刷新"""
+        (temp_dir / "a.py").write_text("x = 1")
+        await search_files(pattern="x = 1", path=str(temp_dir))
+        
+        await write_file(path=str(temp_dir / "b.py"), content="fresh_marker = 1")
+        result = await search_files(pattern="fresh_marker", path=str(temp_dir))
+        
+        assert "b.py:1" in result
 
 
 @pytest.mark.asyncio
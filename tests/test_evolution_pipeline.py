@@ -0,0 +1,169 @@
+"""
+进化流水线测试
+
+测试阶段缓存的合并与取消、Skill 锁和并发进化
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from evoskill.evolution.analyzer import NeedAnalysis
+from evoskill.evolution.designer import SkillDesign
+from evoskill.evolution.engine import SkillEvolutionEngine
+from evoskill.evolution.pipeline import StageCache
+from evoskill.evolution.validator import ValidationResult
+
+
+@pytest.mark.asyncio
+class TestStageCache:
+    """测试 StageCache"""
+
+    async def test_concurrent_requests_deduplicated(self):
+        """相同 key 的并发请求只计算一次"""
+        cache = StageCache()
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": 1}, True
+
+        results = await asyncio.gather(*(cache.get_or_create("k", factory) for _ in range(5)))
+
+        assert calls == 1
+        assert results == [{"value": 1}] * 5
+        assert results[0] is not results[1]
+        assert (cache.misses, cache.hits) == (1, 4)
+
+    async def test_uncacheable_result_not_stored(self):
+        """不可缓存的结果不写入缓存"""
+        cache = StageCache()
+
+        async def factory():
+            return "fallback", False
+
+        assert await cache.get_or_create("k", factory) == "fallback"
+        assert len(cache) == 0
+
+    async def test_waiter_retries_when_creator_cancelled(self):
+        """计算方被取消时，等待者重新计算而不是收到 CancelledError"""
+        cache = StageCache()
+        started = asyncio.Event()
+
+        async def hang():
+            started.set()
+            await asyncio.sleep(10)
+            return "never", True
+
+        async def compute():
+            return "fresh", True
+
+        creator = asyncio.create_task(cache.get_or_create("k", hang))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_create("k", compute))
+        await asyncio.sleep(0)
+
+        creator.cancel()
+
+        assert await waiter == "fresh"
+        assert creator.cancelled()
+        assert cache.get("k") == "fresh"
+
+    async def test_cancelled_waiter_does_not_cancel_creator(self):
+        """等待者被取消不影响计算方"""
+        cache = StageCache()
+        release = asyncio.Event()
+
+        async def factory():
+            await release.wait()
+            return "done", True
+
+        creator = asyncio.create_task(cache.get_or_create("k", factory))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_create("k", factory))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        release.set()
+
+        assert await creator == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+
+def make_engine(tmp_path, build_delay=0.0):
+    """创建各阶段均为假实现的引擎"""
+    with patch("evoskill.evolution.engine.SkillGenerator"):
+        engine = SkillEvolutionEngine(Mock(), tmp_path)
+    engine.running = 0
+    engine.peak = 0
+
+    async def analyze(user_request, existing_skills):
+        return NeedAnalysis(
+            intent=user_request,
+            domain="other",
+            required_capabilities=[],
+            complexity="simple",
+            can_use_existing=False,
+            suggested_skill_name=None,
+        )
+
+    async def design(need, existing_skills):
+        return SkillDesign(name=need.intent, description=need.intent)
+
+    async def generate(design, skills_dir):
+        engine.running += 1
+        engine.peak = max(engine.peak, engine.running)
+        await asyncio.sleep(build_delay)
+        engine.running -= 1
+        return {"SKILL.md": ""}
+
+    async def validate(skill_path):
+        return ValidationResult(valid=True)
+
+    engine.analyzer.analyze = analyze
+    engine.designer.design = design
+    engine.generator.generate = generate
+    engine.validator.validate = validate
+    engine.integrator.integrate = Mock(return_value={"success": True, "registered_tools": []})
+    return engine
+
+
+@pytest.mark.asyncio
+class TestEvolutionEngine:
+    """测试 SkillEvolutionEngine 的并发行为"""
+
+    async def test_evolve_many_runs_concurrently(self, tmp_path):
+        """不同 Skill 并发构建，结果与请求顺序一致"""
+        engine = make_engine(tmp_path, build_delay=0.05)
+
+        results = await engine.evolve_many(["a", "b", "c"], [])
+
+        assert [r.skill_name for r in results] == ["a", "b", "c"]
+        assert all(r.status == "created" for r in results)
+        assert engine.peak == 3
+
+    async def test_same_skill_serialized(self, tmp_path):
+        """同名 Skill 的构建串行执行"""
+        engine = make_engine(tmp_path, build_delay=0.02)
+
+        results = await engine.evolve_many(["a", "a", "a"], [])
+
+        assert [r.status for r in results] == ["created"] * 3
+        assert engine.peak == 1
+
+    async def test_abandoned_consumer_releases_lock(self, tmp_path):
+        """消费者中途放弃迭代后，Skill 锁仍会释放"""
+        engine = make_engine(tmp_path)
+        events = engine.evolve("a", [])
+
+        async for event in events:
+            if event.data.get("status") == "generating":
+                break
+
+        results = await asyncio.wait_for(engine.evolve_many(["a"], []), 5)
+
+        assert results[0].status == "created"
+        await events.aclose()
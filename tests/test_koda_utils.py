@@ -154,6 +154,73 @@ class TestGitUtils:
         if info.is_git_repo:
             assert isinstance(info.branch, (str, type(None)))
 
+    def test_parse_porcelain_v2(self):
+        from koda.coding.utils.git import parse_porcelain_v2
+        
+        state = parse_porcelain_v2(
+            "# branch.oid 1234abcd\n"
+            "# branch.head main\n"
+            "# branch.upstream origin/main\n"
+            "# branch.ab +2 -1\n"
+            "1 M. N... 100644 100644 100644 aaa bbb staged file.py\n"
+            "1 .M N... 100644 100644 100644 aaa bbb edited.py\n"
+            "2 R. N... 100644 100644 100644 aaa bbb R100 new.py\told.py\n"
+            "? notes.txt\n"
+        )
+        
+        assert state.branch == "main"
+        assert (state.ahead, state.behind) == (2, 1)
+        assert state.staged == ["staged file.py", "new.py"]
+        assert state.modified == ["edited.py"]
+        assert state.untracked == ["notes.txt"]
+    
+    def test_state_service_caches_until_change(self, tmp_path):
+        import subprocess
+        from koda.coding.utils.git import GitStateService
+        
+        subprocess.run(["git", "init", "-q", "-b", "main", str(tmp_path)], check=True)
+        service = GitStateService(cwd=str(tmp_path), max_age=60, min_interval=0)
+        
+        state = service.get_state()
+        assert state.is_git_repo and state.branch == "main"
+        assert service.get_state() is state
+        assert service.wait(5)
+        assert service.refresh_count == 1
+        
+        (tmp_path / "a.txt").write_text("a")
+        subprocess.run(["git", "add", "a.txt"], cwd=tmp_path, check=True)
+        service.get_state()  # index changed: refresh in the background
+        assert service.wait(5)
+        assert service.refresh_count == 2
+        assert service.get_state().staged == ["a.txt"]
+    
+    def test_state_service_keeps_newest_refresh(self, tmp_path):
+        import threading
+        from koda.coding.utils.git import GitState, GitStateService
+        
+        service = GitStateService(cwd=str(tmp_path))
+        started = threading.Event()
+        release = threading.Event()
+        
+        def collect():
+            if threading.current_thread() is slow:
+                started.set()
+                release.wait(5)
+                return GitState(is_git_repo=True, branch="old")
+            return GitState(is_git_repo=True, branch="new")
+        
+        service._collect = collect
+        slow = threading.Thread(target=service.refresh)
+        slow.start()
+        assert started.wait(5)
+        
+        assert service.refresh().branch == "new"
+        release.set()
+        slow.join(5)
+        
+        assert service.get_state().branch == "new"
+        assert service.refresh_count == 2
+
 
 class TestClipboardUtils:
     """Test ClipboardUtils"""
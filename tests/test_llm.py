@@ -216,3 +216,76 @@ class TestMessageConversion:
             assert 'tool_calls' in result[0]
             assert len(result[0]['tool_calls']) == 1
             assert result[0]['tool_calls'][0]['function']['name'] == 'get_weather'
+
+
+class _CountingProvider(AnthropicProvider):
+    """记录调用次数的 Provider（不访问网络）"""
+    
+    def __init__(self, config):
+        self.config = config
+        self.calls = 0
+    
+    async def chat(self, messages, tools=None, stream=True, **kwargs):
+        self.calls += 1
+        yield {"type": "text_delta", "content": "Hel"}
+        yield {"type": "text_delta", "content": "lo"}
+        yield {"type": "finish", "finish_reason": "stop"}
+
+
+@pytest.mark.asyncio
+class TestLLMResponseCache:
+    """测试 LLM 响应缓存"""
+    
+    async def test_replays_deterministic_request(self, tmp_path):
+        """测试 temperature=0 的相同请求从缓存回放"""
+        from evoskill.core.llm_cache import CachedLLMProvider, LLMResponseCache
+        
+        inner = _CountingProvider(LLMConfig(provider="anthropic", model="m", temperature=0.0))
+        provider = CachedLLMProvider(inner, LLMResponseCache(tmp_path / "cache.db"))
+        messages = [UserMessage(content="hi")]
+        
+        first = [e async for e in provider.chat(messages)]
+        second = [e async for e in provider.chat(messages)]
+        
+        assert first == second
+        assert inner.calls == 1
+    
+    async def test_skips_non_deterministic_request(self):
+        """测试 temperature>0 的请求不缓存"""
+        from evoskill.core.llm_cache import CachedLLMProvider, LLMResponseCache
+        
+        inner = _CountingProvider(LLMConfig(provider="anthropic", model="m", temperature=0.7))
+        provider = CachedLLMProvider(inner, LLMResponseCache())
+        messages = [UserMessage(content="hi")]
+        
+        [e async for e in provider.chat(messages)]
+        [e async for e in provider.chat(messages)]
+        
+        assert inner.calls == 2
+    
+    async def test_caches_need_analysis(self):
+        """测试需求分析以 temperature=0 调用，默认配置下也能命中缓存"""
+        from evoskill.core.llm_cache import CachedLLMProvider, LLMResponseCache
+        from evoskill.evolution.analyzer import NeedAnalyzer
+        
+        inner = _CountingProvider(LLMConfig(provider="anthropic", model="m"))
+        provider = CachedLLMProvider(inner, LLMResponseCache())
+        
+        await NeedAnalyzer(provider).analyze("统计代码行数", [])
+        await NeedAnalyzer(provider).analyze("统计代码行数", [])
+        
+        assert inner.config.temperature > 0
+        assert inner.calls == 1
+    
+    async def test_evicts_by_size(self):
+        """测试超过大小上限时淘汰最久未使用的条目"""
+        from evoskill.core.llm_cache import LLMResponseCache
+        
+        cache = LLMResponseCache(max_bytes=200)
+        events = [{"type": "text_delta", "content": "x" * 50}]
+        for i in range(5):
+            cache.put(f"key{i}", events)
+        
+        assert len(cache) < 5
+        assert cache.get("key4") == events
+        assert cache.get("key0") is None
@@ -0,0 +1,125 @@
+"""
+Tests for the persistent message log and the branching built on it
+"""
+import pytest
+
+from koda.mes.message_log import MessageLog
+from koda.mes.history import HistoryManager
+from koda.ai.provider import Message
+from koda.coding.session_manager import SessionManager, SessionMessageEntry, EntryType
+
+
+def message_entry(entry_id: str, content: str) -> SessionMessageEntry:
+    return SessionMessageEntry(
+        id=entry_id,
+        type=EntryType.MESSAGE,
+        timestamp=0,
+        role="user",
+        content=content,
+    )
+
+
+class TestMessageLog:
+    """Test MessageLog structural sharing"""
+
+    def test_append_does_not_mutate(self):
+        base = MessageLog(["a", "b"])
+        left = base.append("c")
+        right = base.append("d")
+
+        assert list(base) == ["a", "b"]
+        assert list(left) == ["a", "b", "c"]
+        assert list(right) == ["a", "b", "d"]
+        assert left.parent is base and right.parent is base
+
+    def test_sequence_access(self):
+        log = MessageLog(range(5))
+
+        assert len(log) == 5
+        assert log[-1] == 4
+        assert log[1:3] == (1, 2)
+        assert log.truncate(2) == [0, 1]
+        assert log.find(lambda x: x == 3).last == 3
+
+    def test_since_ancestor(self):
+        base = MessageLog(["a"])
+        head = base.extend(["b", "c"])
+
+        assert head.since(base) == ["b", "c"]
+        assert head.since(base.append("x")) is None
+
+    def test_materialization_cached(self):
+        log = MessageLog(range(3))
+
+        assert log.to_tuple() is log.to_tuple()
+        assert log.append(3).to_tuple() == (0, 1, 2, 3)
+
+
+class TestHistoryBranching:
+    """Test HistoryManager branches share history"""
+
+    def test_branch_and_switch(self):
+        history = HistoryManager()
+        history.add_message(Message.user("one"))
+        history.add_message(Message.user("two"))
+
+        history.branch("alt")
+        history.add_message(Message.user("alt reply"))
+        assert [m.content for m in history.get_messages()] == ["one", "two", "alt reply"]
+
+        assert history.switch_branch("main")
+        assert [m.content for m in history.get_messages()] == ["one", "two"]
+
+
+class TestSessionBranching:
+    """Test SessionManager fork_branch with shared prefixes"""
+
+    def test_fork_keeps_prefix_and_main(self, tmp_path):
+        manager = SessionManager(tmp_path)
+        session = manager.create_session("fork")
+        for i in range(3):
+            manager.add_entry(session, message_entry(f"m{i}", f"main {i}"))
+
+        manager.fork_branch(session, "m1", "alt")
+        manager.add_entry(session, message_entry("a0", "alt 0"))
+
+        alt = [e.id for e in manager.get_branch_history(session, "alt")]
+        main = [e.id for e in manager.get_branch_history(session, "main")]
+        assert alt == ["m0", "m1", "a0"]
+        assert main == ["m0", "m1", "m2"]
+        assert session.entries[-1].parent_id == "m1"
+
+        context = manager.build_context(session)
+        assert [m.content for m in context.messages] == ["main 0", "main 1", "alt 0"]
+
+    def test_fork_survives_reload(self, tmp_path):
+        manager = SessionManager(tmp_path)
+        session = manager.create_session("reload")
+        manager.add_entry(session, message_entry("m0", "main 0"))
+        manager.add_entry(session, message_entry("m1", "main 1"))
+        manager.fork_branch(session, "m0", "alt")
+        manager.add_entry(session, message_entry("a0", "alt 0"))
+
+        loaded = SessionManager(tmp_path).load_session(session.id)
+
+        assert loaded.current_branch == "alt"
+        assert [e.id for e in SessionManager(tmp_path).get_branch_history(loaded, "alt")] == ["m0", "a0"]
+
+    def test_build_context_incremental(self, tmp_path):
+        manager = SessionManager(tmp_path)
+        session = manager.create_session("ctx")
+        manager.add_entry(session, message_entry("m0", "hi"))
+        first = manager.build_context(session).messages
+
+        manager.add_entry(session, message_entry("m1", "again"))
+        second = manager.build_context(session).messages
+
+        assert second[0] is first[0]
+        assert [m.content for m in second] == ["hi", "again"]
+
+    def test_fork_unknown_entry(self, tmp_path):
+        manager = SessionManager(tmp_path)
+        session = manager.create_session("missing")
+
+        with pytest.raises(ValueError):
+            manager.fork_branch(session, "nope", "alt")
@@ -0,0 +1,155 @@
+"""
+pytest worker 池测试
+
+测试 worker 复用与回收、超时结束进程、启动失败后的空槽位补位
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from evoskill.evolution.engine import SkillEvolutionEngine
+from evoskill.evolution.runner_pool import PytestWorkerPool
+
+
+def write_test(skill_path, body="def test_ok():\n    assert True\n"):
+    """在 Skill 目录下写入测试文件"""
+    test_file = skill_path / "tests" / "test_main.py"
+    test_file.parent.mkdir(parents=True, exist_ok=True)
+    test_file.write_text(body, encoding="utf-8")
+    return test_file
+
+
+def worker_pids(pool):
+    return {w.proc.pid for w in pool._workers}
+
+
+async def settle(pool):
+    """等待后台补位完成"""
+    while pool._tasks:
+        await asyncio.gather(*pool._tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+class TestPytestWorkerPool:
+    """测试 PytestWorkerPool"""
+
+    async def test_run_reports_cases(self, tmp_path):
+        """运行结果包含每个用例"""
+        test_file = write_test(tmp_path, "def test_ok():\n    pass\n\ndef test_bad():\n    assert False\n")
+        pool = PytestWorkerPool(size=1)
+        try:
+            result = await pool.run(test_file, tmp_path)
+        finally:
+            await pool.close()
+
+        assert result.passed is False
+        assert {c.nodeid.split("::")[-1]: c.outcome for c in result.cases} == {
+            "test_ok": "passed",
+            "test_bad": "failed",
+        }
+
+    async def test_worker_recycled_after_max_runs(self, tmp_path):
+        """worker 运行 max_runs_per_worker 次后被替换"""
+        test_file = write_test(tmp_path)
+        pool = PytestWorkerPool(size=1, max_runs_per_worker=2)
+        try:
+            await pool.start()
+            first = worker_pids(pool)
+
+            await pool.run(test_file, tmp_path)
+            assert worker_pids(pool) == first
+
+            await pool.run(test_file, tmp_path)
+            await settle(pool)
+            assert len(pool._workers) == 1
+            assert worker_pids(pool) != first
+
+            assert (await pool.run(test_file, tmp_path)).passed
+        finally:
+            await pool.close()
+
+    async def test_timeout_kills_worker(self, tmp_path):
+        """超时的 worker 被结束并补位"""
+        slow_file = write_test(tmp_path, "import time\n\ndef test_slow():\n    time.sleep(30)\n")
+        pool = PytestWorkerPool(size=1, timeout=1.0)
+        try:
+            await pool.start()
+            worker = pool._workers[0]
+
+            result = await pool.run(slow_file, tmp_path)
+            await settle(pool)
+
+            assert result.passed is False
+            assert result.output == "测试超时"
+            assert worker.proc.returncode is not None
+            assert len(pool._workers) == 1 and pool._workers[0] is not worker
+        finally:
+            await pool.close()
+
+    async def test_failed_spawn_keeps_slot(self, tmp_path):
+        """补位启动失败时保留空槽位，之后按需重新启动"""
+        test_file = write_test(tmp_path)
+        pool = PytestWorkerPool(size=1, max_runs_per_worker=1)
+        try:
+            python = pool.python
+            await pool.run(test_file, tmp_path)
+            pool.python = str(tmp_path / "missing-python")
+            await settle(pool)
+            assert pool._workers == []
+
+            with pytest.raises(RuntimeError):
+                await pool.run(test_file, tmp_path)
+
+            pool.python = python
+            assert (await pool.run(test_file, tmp_path)).passed
+        finally:
+            await pool.close()
+
+    async def test_cancelled_run_replaces_worker(self, tmp_path):
+        """运行中被取消的 worker 被结束，下一次运行不会读到上一次的响应"""
+        slow_file = write_test(tmp_path / "slow", "import time\n\ndef test_slow():\n    time.sleep(0.5)\n")
+        bad_file = write_test(tmp_path / "bad", "def test_bad():\n    assert False\n")
+        pool = PytestWorkerPool(size=1)
+        try:
+            await pool.start()
+            worker = pool._workers[0]
+
+            task = asyncio.ensure_future(pool.run(slow_file, tmp_path / "slow"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            result = await pool.run(bad_file, tmp_path / "bad")
+
+            assert result.passed is False
+            assert [c.nodeid.split("::")[-1] for c in result.cases] == ["test_bad"]
+            assert worker.proc.returncode is not None
+        finally:
+            await pool.close()
+
+    async def test_close_stops_workers(self, tmp_path):
+        """close() 结束所有 worker，之后不能再运行"""
+        pool = PytestWorkerPool(size=2)
+        await pool.start()
+        workers = list(pool._workers)
+
+        await pool.close()
+
+        assert all(w.proc.returncode is not None for w in workers)
+        with pytest.raises(RuntimeError):
+            await pool.run(write_test(tmp_path), tmp_path)
+
+    async def test_engine_close_stops_validator_pool(self, tmp_path):
+        """引擎关闭时结束验证器的 worker"""
+        with patch("evoskill.evolution.engine.SkillGenerator"):
+            engine = SkillEvolutionEngine(Mock(), tmp_path)
+        write_test(tmp_path)
+        assert (await engine.validator._run_tests(tmp_path))["passed"]
+        workers = list(engine.validator._pool._workers)
+
+        await engine.close()
+
+        assert engine.validator._pool is None
+        assert all(w.proc.returncode is not None for w in workers)
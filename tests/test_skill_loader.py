@@ -0,0 +1,178 @@
+"""
+Skill 加载器测试
+
+测试 manifest 缓存、增量刷新、延迟加载的处理函数和目录监视器
+"""
+import asyncio
+import os
+import shutil
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from evoskill.skills.loader import MANIFEST_FILENAME, SkillLoader, create_default_skill
+from evoskill.skills.watcher import SkillWatcher
+
+
+def bump_mtime(path):
+    """推后文件 mtime，避免同一时间片内的修改无法被检测"""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+
+class TestSkillManifest:
+    """测试 SKILL.md 解析缓存"""
+
+    def test_manifest_reused_across_loaders(self, temp_dir):
+        """新的加载器直接使用 manifest，不再解析 YAML"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        SkillLoader(temp_dir).load_all_skills()
+        assert (temp_dir / MANIFEST_FILENAME).exists()
+
+        with patch("evoskill.skills.loader.yaml.safe_load") as safe_load:
+            skills = SkillLoader(temp_dir).load_all_skills()
+
+        safe_load.assert_not_called()
+        assert [s.name for s in skills] == ["demo"]
+
+    def test_touched_file_not_reparsed(self, temp_dir):
+        """只修改 mtime 时按 sha256 判断内容未变"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        SkillLoader(temp_dir).load_all_skills()
+        bump_mtime(temp_dir / "demo" / "SKILL.md")
+
+        with patch("evoskill.skills.loader.yaml.safe_load") as safe_load:
+            SkillLoader(temp_dir).load_all_skills()
+
+        safe_load.assert_not_called()
+
+
+class TestSkillRefresh:
+    """测试增量刷新"""
+
+    def test_refresh_reports_changes(self, temp_dir):
+        """只返回新增、修改和删除的 Skill"""
+        loader = SkillLoader(temp_dir)
+        create_default_skill(temp_dir / "a", "a", "A")
+        create_default_skill(temp_dir / "b", "b", "B")
+
+        changed, removed = loader.refresh()
+        assert sorted(s.name for s in changed) == ["a", "b"]
+        assert loader.refresh() == ([], [])
+
+        skill_md = temp_dir / "a" / "SKILL.md"
+        skill_md.write_text(skill_md.read_text(encoding="utf-8").replace("description: A", "description: A2"), encoding="utf-8")
+        bump_mtime(skill_md)
+        changed, removed = loader.refresh()
+        assert [(s.name, s.description) for s in changed] == [("a", "A2")]
+
+        shutil.rmtree(temp_dir / "b")
+        assert loader.refresh() == ([], ["b"])
+        assert loader.list_skills() == ["a"]
+
+
+@pytest.mark.asyncio
+class TestToolHandlers:
+    """测试工具处理函数"""
+
+    async def test_lazy_handler_imports_on_call(self, temp_dir):
+        """main.py 在第一次调用时才导入，修改后重新导入"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        loader = SkillLoader(temp_dir)
+        tool = loader.load_all_skills()[0].tools[0]
+        assert loader._modules == {}
+
+        assert await tool.handler(param1="x") == "Hello, x!"
+
+        main_py = temp_dir / "demo" / "main.py"
+        main_py.write_text("async def example_tool(param1):\n    return 'v2'\n", encoding="utf-8")
+        bump_mtime(main_py)
+        assert await tool.handler(param1="x") == "v2"
+
+    async def test_missing_handler_is_none(self, temp_dir):
+        """main.py 中没有对应函数的工具，处理函数为 None"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        main_py = temp_dir / "demo" / "main.py"
+        main_py.write_text("def other():\n    pass\n", encoding="utf-8")
+
+        tool = SkillLoader(temp_dir).load_all_skills()[0].tools[0]
+
+        assert tool.handler is None
+
+    async def test_nested_handler_definitions(self, temp_dir):
+        """if/try 语句块内定义的处理函数同样可用"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        main_py = temp_dir / "demo" / "main.py"
+        main_py.write_text(
+            "try:\n"
+            "    from missing_module import example_tool\n"
+            "except ImportError:\n"
+            "    if True:\n"
+            "        def example_tool(param1):\n"
+            "            return 'fallback ' + param1\n",
+            encoding="utf-8",
+        )
+        tool = SkillLoader(temp_dir).load_all_skills()[0].tools[0]
+        assert await tool.handler(param1="x") == "fallback x"
+
+        main_py.write_text("example_tool: object = lambda param1: param1\n", encoding="utf-8")
+        tool = SkillLoader(temp_dir).load_all_skills()[0].tools[0]
+        assert await tool.handler(param1="y") == "y"
+
+    async def test_handle_prefix_and_star_import(self, temp_dir):
+        """支持 handle_ 前缀；star import 无法静态判断时保留延迟处理函数"""
+        create_default_skill(temp_dir / "demo", "demo", "演示")
+        main_py = temp_dir / "demo" / "main.py"
+        main_py.write_text("def handle_example_tool(param1):\n    return param1 * 2\n", encoding="utf-8")
+        tool = SkillLoader(temp_dir).load_all_skills()[0].tools[0]
+        assert await tool.handler(param1="ab") == "abab"
+
+        main_py.write_text("from os.path import *\n", encoding="utf-8")
+        tool = SkillLoader(temp_dir).load_all_skills()[0].tools[0]
+        assert tool.handler is not None
+
+
+@pytest.mark.asyncio
+class TestSkillWatcher:
+    """测试 SkillWatcher"""
+
+    async def test_poll_detects_changes(self, tmp_path):
+        """轮询模式下检测到新增和删除"""
+        temp_dir = tmp_path / "skills"
+        temp_dir.mkdir()
+        loader = SkillLoader(temp_dir)
+        received = asyncio.Queue()
+
+        async def on_change(changed, removed):
+            await received.put(([s.name for s in changed], removed))
+
+        watcher = SkillWatcher(loader, on_change=on_change, poll_interval=0.05, use_native=False)
+        await watcher.start()
+        try:
+            # 先在目录外创建再移入，避免轮询看到写了一半的 Skill
+            create_default_skill(temp_dir.parent / "staging-demo", "demo", "演示")
+            os.rename(temp_dir.parent / "staging-demo", temp_dir / "demo")
+            assert await asyncio.wait_for(received.get(), 5) == (["demo"], [])
+
+            shutil.rmtree(temp_dir / "demo")
+            assert await asyncio.wait_for(received.get(), 5) == ([], ["demo"])
+        finally:
+            await watcher.stop()
+
+        assert not watcher.native
+
+    async def test_check_runs_refresh_off_loop(self, temp_dir):
+        """check() 在线程中执行 refresh()"""
+        loader = SkillLoader(temp_dir)
+        threads = []
+        refresh = loader.refresh
+
+        def tracking_refresh():
+            threads.append(threading.current_thread())
+            return refresh()
+
+        loader.refresh = tracking_refresh
+        await SkillWatcher(loader, use_native=False).check()
+
+        assert threads and threads[0] is not threading.main_thread()
@@ -146,6 +146,27 @@ def calc(a, b):
         assert llm.call_count > 0
 
 
+    @pytest.mark.asyncio
+    async def test_reflector_requests_temperature_zero(self):
+        """Test LLM calls use temperature 0 when the LLM accepts it"""
+        calls = []
+
+        class ChatLLM:
+            async def chat(self, messages, **kwargs):
+                calls.append(kwargs)
+                return "ISSUES:\n- Missing docstring\n\nCAN_FIX: yes\n\nCONFIDENCE: 0.9"
+
+        reflector = Reflector(llm=ChatLLM())
+        execution = ExecutionResult(
+            success=True,
+            artifacts=[CodeArtifact("main.py", 'def calc(a,b): return a+b')]
+        )
+
+        await reflector.reflect(execution)
+
+        assert calls and all(kwargs == {"temperature": 0} for kwargs in calls)
+
+
 class TestValidationFeatures:
     """Test specific validation features"""
     